@@ -0,0 +1 @@
+# Benchmarks de servicios y cargadores de páginas (ver bench/run.py).
@@ -0,0 +1,77 @@
+# bench/compare.py
+"""
+Compara dos corridas de bench.run y marca regresiones.
+
+Una regresión es un caso cuya mediana crece más que el umbral relativo
+(por defecto 15%) y más que un piso absoluto (por defecto 1 ms, para
+no alarmar por ruido en casos de microsegundos).
+
+Uso:
+  python -m bench.compare bench/results/antes.json bench/results/despues.json
+  python -m bench.compare antes.json despues.json --threshold 0.25 --min-ms 2
+
+Sale con código 1 si hay regresiones (útil en CI).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def compare(old: dict, new: dict, threshold: float = 0.15, min_ms: float = 1.0) -> List[Dict[str, object]]:
+    """Devuelve una fila por (escala, caso) presente en ambas corridas."""
+    rows: List[Dict[str, object]] = []
+    old_res = old.get("results", {})
+    for scale, cases in new.get("results", {}).items():
+        for name, cur in cases.items():
+            prev = old_res.get(scale, {}).get(name)
+            if not prev or "median_ms" not in prev or "median_ms" not in cur:
+                continue
+            a, b = float(prev["median_ms"]), float(cur["median_ms"])
+            delta = (b - a) / a if a > 0 else 0.0
+            if b - a > min_ms and delta > threshold:
+                status = "REGRESIÓN"
+            elif a - b > min_ms and -delta > threshold:
+                status = "mejora"
+            else:
+                status = "="
+            rows.append({"scale": scale, "case": name, "old_ms": a, "new_ms": b, "delta": delta, "status": status})
+    return rows
+
+
+def format_rows(rows: List[Dict[str, object]]) -> str:
+    if not rows:
+        return "No hay casos comunes entre ambas corridas."
+    width = max(len(str(r["case"])) for r in rows)
+    lines = [f"{'escala':>6}  {'caso':<{width}}  {'antes ms':>10}  {'ahora ms':>10}  {'Δ':>8}  estado"]
+    for r in rows:
+        lines.append(
+            f"{r['scale']:>6}  {r['case']:<{width}}  {r['old_ms']:>10.2f}  {r['new_ms']:>10.2f}  "
+            f"{r['delta']:>+7.1%}  {r['status']}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.compare")
+    ap.add_argument("old", type=Path)
+    ap.add_argument("new", type=Path)
+    ap.add_argument("--threshold", type=float, default=0.15, help="crecimiento relativo tolerado (0.15 = 15%%)")
+    ap.add_argument("--min-ms", type=float, default=1.0, help="diferencia absoluta mínima para marcar")
+    args = ap.parse_args(argv)
+
+    old = json.loads(args.old.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    rows = compare(old, new, args.threshold, args.min_ms)
+    print(format_rows(rows))
+    regressions = [r for r in rows if r["status"] == "REGRESIÓN"]
+    if regressions:
+        print(f"\n{len(regressions)} regresión(es) por encima de {args.threshold:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+# bench/importtime.py
+"""
+Costo de importación al arranque (estilo `python -X importtime`).
+
+Corre `python -X importtime -c "import <módulo>"` en un subproceso limpio,
+toma el mínimo por módulo entre repeticiones (menos ruido) y ordena los
+módulos del proyecto (ui, data, services, …) por tiempo acumulado.
+
+Uso:
+  python -m bench.importtime                    # ui.main_window, top 25
+  python -m bench.importtime main --repeat 5
+  python -m bench.importtime --all --top 40     # incluye terceros (PyQt5, sqlalchemy…)
+  python -m bench.importtime --json out.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_TARGET = "ui.main_window"
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def project_roots() -> set:
+    """Paquetes/módulos de primer nivel que pertenecen al proyecto."""
+    roots = set()
+    for p in ROOT.iterdir():
+        if p.name.startswith((".", "_")) or p.name == "tests":
+            continue
+        if p.is_dir() and (p / "__init__.py").exists():
+            roots.add(p.name)
+        elif p.suffix == ".py":
+            roots.add(p.stem)
+    return roots
+
+
+def parse(text: str) -> List[Dict[str, object]]:
+    """Líneas de -X importtime → [{name, self_ms, cum_ms, depth}]."""
+    rows: List[Dict[str, object]] = []
+    for line in text.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, indent, name = m.groups()
+        rows.append({
+            "name": name,
+            "self_ms": int(self_us) / 1000.0,
+            "cum_ms": int(cum_us) / 1000.0,
+            "depth": len(indent) // 2,
+        })
+    return rows
+
+
+def measure(target: str = DEFAULT_TARGET, repeat: int = 3) -> Dict[str, Dict[str, object]]:
+    """Importa 'target' en subprocesos nuevos; devuelve {módulo: mínimo entre corridas}."""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    best: Dict[str, Dict[str, object]] = {}
+    for _ in range(max(1, repeat)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {target} falló:\n{proc.stderr[-2000:]}")
+        for r in parse(proc.stderr):
+            prev = best.get(r["name"])
+            if prev is None or r["cum_ms"] < prev["cum_ms"]:
+                best[r["name"]] = r
+    return best
+
+
+def rank(modules: Dict[str, Dict[str, object]], include_all: bool = False, top: int = 25) -> List[Dict[str, object]]:
+    roots = project_roots()
+    rows = [
+        r for r in modules.values()
+        if include_all or str(r["name"]).split(".")[0] in roots
+    ]
+    rows.sort(key=lambda r: r["cum_ms"], reverse=True)
+    return rows[:top] if top else rows
+
+
+def format_rank(rows: List[Dict[str, object]], target: str, total_ms: Optional[float]) -> str:
+    if not rows:
+        return "Sin módulos medidos."
+    width = max(len("módulo"), *(len(str(r["name"])) for r in rows))
+    head = f"import {target}: {total_ms:.1f} ms acumulados" if total_ms is not None else f"import {target}"
+    lines = [head, f"{'módulo':<{width}}  {'acum ms':>9}  {'propio ms':>9}"]
+    for r in rows:
+        lines.append(f"{r['name']:<{width}}  {r['cum_ms']:>9.1f}  {r['self_ms']:>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.importtime", description=__doc__.split("\n\n")[0])
+    ap.add_argument("target", nargs="?", default=DEFAULT_TARGET)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--top", type=int, default=25, help="0 = todos")
+    ap.add_argument("--all", action="store_true", help="incluir módulos de terceros")
+    ap.add_argument("--json", type=Path, default=None)
+    args = ap.parse_args(argv)
+
+    modules = measure(args.target, args.repeat)
+    total = modules.get(args.target, {}).get("cum_ms")
+    rows = rank(modules, include_all=args.all, top=args.top)
+    print(format_rank(rows, args.target, total))
+    if args.json:
+        args.json.write_text(json.dumps({"target": args.target, "total_ms": total, "modules": rows}, indent=2),
+                             encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
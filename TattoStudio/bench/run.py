@@ -0,0 +1,261 @@
+# bench/run.py
+"""
+Suite de benchmarks de servicios y cargadores de datos de páginas.
+
+Cada escala corre en un subproceso propio con DB_PATH apuntando a una copia
+de la BD sintética (el engine se crea al importar data.db.session), así las
+escrituras de un caso (complete_session) no contaminan la base cacheada.
+
+Uso:
+  python -m bench.run                       # escalas 1k y 50k
+  python -m bench.run --scales 1k 50k 500k  # todas
+  python -m bench.run --repeat 7 --out bench/results/mi_corrida.json
+  python -m bench.run --fresh               # regenera las BDs sintéticas
+
+Las BDs sintéticas salen de data/tools/seed.py --scale (semilla fija).
+
+Resultados (JSON):
+  {"meta": {...}, "results": {"1k": {"list_sessions.week": {"median_ms":…}, …}}}
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "bench" / ".data"
+RESULTS_DIR = ROOT / "bench" / "results"
+
+SCALES: Dict[str, int] = {"1k": 1_000, "50k": 50_000, "500k": 500_000}
+DEFAULT_SCALES = ("1k", "50k")
+
+_qt_app = None  # la QApplication debe vivir mientras existan las páginas
+
+
+# ------------------ Utilidades de medición ------------------
+
+def _measure(fn: Callable[[int], object], repeat: int) -> Dict[str, object]:
+    """Corre fn(i) 'repeat' veces (tras un calentamiento) y resume en ms."""
+    fn(-1)  # calentamiento (caché de SQLite / imports perezosos)
+    runs: List[float] = []
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        fn(i)
+        runs.append((time.perf_counter() - t0) * 1000.0)
+    runs_sorted = sorted(runs)
+    p95_idx = max(0, min(len(runs_sorted) - 1, int(round(0.95 * len(runs_sorted))) - 1))
+    return {
+        "median_ms": round(statistics.median(runs_sorted), 3),
+        "min_ms": round(runs_sorted[0], 3),
+        "p95_ms": round(runs_sorted[p95_idx], 3),
+        "runs": [round(r, 3) for r in runs],
+    }
+
+
+# ------------------ Casos (corren dentro del subproceso) ------------------
+
+def _cases(repeat: int) -> List[Tuple[str, Callable[[int], object], int]]:
+    """[(nombre, fn(i), repeticiones)] — los cargadores de página usan Qt offscreen."""
+    from sqlalchemy import func, select
+
+    from data.db.session import SessionLocal
+    from data.models.session_tattoo import TattooSession
+    from data.models.transaction import Transaction
+    from services import sessions as svc
+    from services.contracts import set_current_user
+
+    set_current_user({"id": 1, "username": "admin", "role": "admin", "artist_id": None})
+
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    week_from = now - timedelta(days=now.weekday())
+    week_to = week_from + timedelta(days=7)
+
+    with SessionLocal() as db:
+        busiest = db.execute(
+            select(TattooSession.artist_id, func.count()).group_by(TattooSession.artist_id)
+            .order_by(func.count().desc()).limit(1)
+        ).first()
+        artist_id = int(busiest[0]) if busiest else 1
+        # Sesiones sin cobro para completar (una por corrida, + calentamiento)
+        pending = [
+            sid for (sid,) in db.execute(
+                select(TattooSession.id)
+                .outerjoin(Transaction, Transaction.session_id == TattooSession.id)
+                .where(TattooSession.status == "Activa", Transaction.id.is_(None))
+                .order_by(TattooSession.id).limit(repeat + 1)
+            )
+        ]
+
+    cases: List[Tuple[str, Callable[[int], object], int]] = [
+        ("list_sessions.week", lambda i: svc.list_sessions({"from": week_from, "to": week_to}), repeat),
+        ("list_sessions.artist_month", lambda i: svc.list_sessions({
+            "from": now - timedelta(days=30), "to": now, "artist_id": artist_id}), repeat),
+    ]
+
+    def overlap(i):
+        with SessionLocal() as db:
+            try:
+                svc._check_overlap(db, artist_id, now + timedelta(hours=1), now + timedelta(hours=3))
+            except ValueError:
+                pass
+    cases.append(("check_overlap", overlap, repeat))
+
+    if len(pending) >= repeat + 1:
+        def complete(i):
+            svc.complete_session(pending[i + 1], {"method": "Efectivo"})
+        cases.append(("complete_session", complete, repeat))
+
+    from ui.pages.portfolios import PortfolioService
+    cases.append(("portfolio.users_with_counts", lambda i: PortfolioService.users_with_counts(), repeat))
+
+    # ---- Cargadores que viven en páginas (requieren QApplication) ----
+    global _qt_app
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        _qt_app = QApplication.instance() or QApplication([])
+        from ui.pages.clients import ClientsPage
+        from ui.pages.reports import ReportsPage
+        from ui.pages.inventory_dashboard import InventoryDashboardPage
+    except Exception as ex:  # sin Qt: se reportan como omitidos
+        print(f"[bench] cargadores de páginas omitidos: {ex}", file=sys.stderr)
+        return cases
+
+    # Las páginas ya cargan una vez en __init__ (sirve de calentamiento)
+    clients_page = ClientsPage()
+    reports_page = ReportsPage()
+    dash = InventoryDashboardPage()
+
+    heavy = max(1, min(repeat, 3))
+    cases.append(("clients.reload_from_db", lambda i: clients_page._reload_from_db(), heavy))
+
+    def reports_month(i):
+        reports_page.period = "month"
+        return reports_page._query_rows()
+    cases.append(("reports.query_rows.month", reports_month, repeat))
+
+    def reports_year(i):
+        from PyQt5.QtCore import QDate
+        reports_page.period = "custom"
+        reports_page.custom_to = QDate.currentDate()
+        reports_page.custom_from = QDate.currentDate().addDays(-365)
+        return reports_page._query_rows()
+    cases.append(("reports.query_rows.year", reports_year, repeat))
+
+    cases.append(("inventory.dashboard_refresh", lambda i: dash.refrescar_datos(), repeat))
+
+    # Construcción de la ventana principal (tiempo hasta la primera ventana, sin login)
+    from ui.main_window import MainWindow
+
+    def build_main_window(i):
+        w = MainWindow(login=False)
+        w.deleteLater()
+        _qt_app.processEvents()
+    cases.append(("main_window.build", build_main_window, heavy))
+    return cases
+
+
+def _worker(scale: str, repeat: int, out: Path) -> int:
+    results: Dict[str, object] = {}
+    for name, fn, n in _cases(repeat):
+        try:
+            results[name] = _measure(fn, n)
+            print(f"[bench] {scale:>5}  {name:<32} {results[name]['median_ms']:>10.2f} ms", file=sys.stderr)
+        except Exception as ex:
+            results[name] = {"error": f"{type(ex).__name__}: {ex}"}
+            print(f"[bench] {scale:>5}  {name:<32} ERROR {ex}", file=sys.stderr)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+# ------------------ Orquestación (proceso padre) ------------------
+
+def _ensure_dataset(scale: str, fresh: bool) -> Path:
+    """Genera (una vez) la BD sintética de la escala en bench/.data/."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / f"studio_{scale}.db"
+    if path.exists() and not fresh:
+        return path
+    if path.exists():
+        path.unlink()
+    print(f"[bench] generando estudio sintético {scale} ({SCALES[scale]:,} sesiones)…", file=sys.stderr)
+    t0 = time.perf_counter()
+    env = dict(os.environ, DB_PATH=str(path))
+    subprocess.run(
+        [sys.executable, "-m", "data.tools.seed", "--scale", str(SCALES[scale]), "--seed", "42"],
+        cwd=ROOT, env=env, check=True,
+    )
+    print(f"[bench] {scale} listo en {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    return path
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(scales: List[str], repeat: int, fresh: bool, out: Optional[Path]) -> Path:
+    report = {
+        "meta": {
+            "when": datetime.now().isoformat(timespec="seconds"),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    for scale in scales:
+        base = _ensure_dataset(scale, fresh)
+        with tempfile.TemporaryDirectory() as tmp:
+            work = Path(tmp) / base.name
+            shutil.copy2(base, work)
+            part = Path(tmp) / "result.json"
+            env = dict(os.environ, DB_PATH=str(work), QT_QPA_PLATFORM="offscreen")
+            subprocess.run(
+                [sys.executable, "-m", "bench.run", "--worker", scale, "--repeat", str(repeat), "--out", str(part)],
+                cwd=ROOT, env=env, check=True,
+            )
+            report["results"][scale] = json.loads(part.read_text(encoding="utf-8"))
+
+    if out is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out = RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Resultados: {out}")
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.run", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=list(DEFAULT_SCALES))
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--fresh", action="store_true", help="regenerar las BDs sintéticas")
+    ap.add_argument("--out", type=Path, default=None)
+    ap.add_argument("--worker", metavar="SCALE", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.worker:
+        return _worker(args.worker, args.repeat, args.out)
+    run(args.scales, args.repeat, args.fresh, args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+# bench/server_load.py
+"""
+Prueba de carga del servidor del estudio (services/studio_server) en localhost.
+
+Levanta el servidor sobre una BD temporal y simula N estaciones, cada una con
+su conexión, su canal de eventos y un hilo que agenda citas (escritura) y
+consulta la agenda (lectura) sin pausa. Mide latencias por tipo, cuántas
+escrituras entraron por lote y si todas las estaciones recibieron todos los
+eventos.
+
+Uso:
+  python -m bench.server_load                        # 8 estaciones x 50 citas
+  python -m bench.server_load --stations 20 --ops 100 --out bench/results/servidor.json
+
+Resultado (JSON):
+  {"meta": {...}, "write": {"median_ms":…, "p95_ms":…}, "read": {...},
+   "server": {"batches":…, "writes":…, "max_batch":…}, "events_ok": true}
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def _summary(runs: List[float]) -> Dict[str, float]:
+    runs = sorted(runs)
+    p95 = runs[max(0, min(len(runs) - 1, int(round(0.95 * len(runs))) - 1))]
+    return {"n": len(runs), "median_ms": round(statistics.median(runs), 3), "p95_ms": round(p95, 3),
+            "max_ms": round(runs[-1], 3)}
+
+
+def _seed(stations: int) -> None:
+    from data.db.base import Base
+    from data.db.session import SessionLocal, engine
+    from data.models import load_all_models
+    from data.models.artist import Artist
+    from data.models.client import Client
+    from data.models.user import User
+    from services import auth
+
+    load_all_models()
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add_all([Artist(id=i, name=f"Artista {i}") for i in range(1, stations + 1)])
+        db.add_all([Client(id=i, name=f"Cliente {i}") for i in range(1, 51)])
+        db.add(User(username="carga", role="admin", is_active=True,
+                    password_hash=auth.hash_password("carga", rounds=4)))
+        db.commit()
+    SessionLocal.remove()
+
+
+def run(stations: int, ops: int, batch_max: int) -> Dict[str, object]:
+    from services import events
+    from services.studio_server import StudioServer
+    from services.transport import RemoteClient
+
+    _seed(stations)
+    srv = StudioServer(port=0, batch_max=batch_max).start_in_thread()
+    clients = []
+    for _ in range(stations):
+        c = RemoteClient(f"http://127.0.0.1:{srv.port}")
+        c.login("carga", "carga")
+        clients.append(c)
+
+    received = [0]
+    lock = threading.Lock()
+
+    def on_event(_ev) -> None:
+        if threading.current_thread().name == "studio-events":   # no contar lo del propio servidor
+            with lock:
+                received[0] += 1
+
+    unsub = events.subscribe(events.SessionChanged, on_event)
+    for c in clients:
+        c.listen().ready.wait(5)
+
+    lat: Dict[str, List[float]] = {"write": [], "read": []}
+    errors: List[str] = []
+    day0 = (datetime.now() + timedelta(days=1)).replace(hour=8, minute=0, second=0, microsecond=0)
+
+    def station(i: int, c: RemoteClient) -> None:
+        for k in range(ops):
+            start = day0 + timedelta(days=k // 12, hours=k % 12)
+            try:
+                t0 = time.perf_counter()
+                c.call("sessions.create_session", {"client_id": 1 + (i * ops + k) % 50, "artist_id": i + 1,
+                                                   "start": start, "end": start + timedelta(minutes=50)})
+                t1 = time.perf_counter()
+                c.call("sessions.sessions_for_day", start.date())
+                t2 = time.perf_counter()
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            with lock:
+                lat["write"].append((t1 - t0) * 1000.0)
+                lat["read"].append((t2 - t1) * 1000.0)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=station, args=(i, c)) for i, c in enumerate(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    expected = stations * ops * stations
+    deadline = time.time() + 10
+    while received[0] < expected and time.time() < deadline:
+        time.sleep(0.05)
+    unsub()
+    for c in clients:
+        c.close()
+    srv.shutdown()
+
+    return {
+        "meta": {"stations": stations, "ops": ops, "batch_max": batch_max, "elapsed_s": round(elapsed, 3),
+                 "writes_per_s": round(stations * ops / elapsed, 1), "when": datetime.now().isoformat(timespec="seconds")},
+        "write": _summary(lat["write"]) if lat["write"] else {},
+        "read": _summary(lat["read"]) if lat["read"] else {},
+        "server": dict(srv.stats),
+        "errors": errors[:10],
+        "events_ok": received[0] == expected,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.server_load", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--stations", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=50, help="citas por estación")
+    ap.add_argument("--batch-max", type=int, default=64)
+    ap.add_argument("--out", type=Path, default=None)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # el engine se crea al importar data.db.session: DB_PATH antes de cualquier import
+        os.environ["DB_PATH"] = str(Path(tmp) / "carga.db")
+        result = run(args.stations, args.ops, args.batch_max)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(text, encoding="utf-8")
+    return 0 if result["events_ok"] and not result["errors"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,12 +2,28 @@
 Paquete 'data': DB/ORM, modelos y utilidades.
 """
 
+import os
+from pathlib import Path
+
+
+def _find_dotenv():
+    """Busca un .env en el cwd y desde este paquete hacia arriba (como find_dotenv)."""
+    for base in (Path.cwd(), *Path(__file__).resolve().parents):
+        candidate = base / ".env"
+        if candidate.is_file():
+            return candidate
+    return None
+
+
 # Carga variables de entorno desde .env si existe, sin romper nada si no.
-try:
-    from dotenv import load_dotenv  # type: ignore
-    load_dotenv(override=False)
-except Exception:
-    pass
+# python-dotenv sólo se importa cuando hay un .env que leer.
+_env_file = _find_dotenv()
+if _env_file is not None:
+    try:
+        from dotenv import load_dotenv  # type: ignore
+        load_dotenv(_env_file, override=False)
+    except Exception:
+        pass
 
 __all__ = ["db", "models", "tools"]
 
@@ -1,9 +1,17 @@
 import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import Mapper, Session, sessionmaker, scoped_session
 from .base import Base
 from data.models import load_all_models
-load_all_models()
+
+# Los modelos se registran justo antes de configurar los mappers (primera
+# consulta/instancia), no al importar este módulo: así relaciones declaradas
+# por nombre ("TattooSession", ...) siempre resuelven y el arranque no paga
+# por importar todos los modelos.
+event.listen(Mapper, "before_configured", load_all_models)
 
 # Ruta del archivo SQLite. Si no hay variable de entorno, usa ./dev.db
 DB_PATH = os.getenv("DB_PATH", "./dev.db")
@@ -23,6 +31,15 @@ SessionLocal = scoped_session(
     sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 )
 
+@contextmanager
+def session_scope(db: Optional[Session] = None) -> Iterator[Session]:
+    """La sesión del llamador si la pasa (no se cierra); si no, una propia de SessionLocal."""
+    if db is not None:
+        yield db
+    else:
+        with SessionLocal() as s:
+            yield s
+
 def init_db() -> None:
     """Crea tablas si no existen. Útil en desarrollo/pruebas."""
     from data.models import load_all_models  # asegura que todas las tablas se importen
@@ -9,3 +9,10 @@ def load_all_models():
     from .setting import Setting  # noqa: F401
     from .portfolio import PortfolioItem  # noqa: F401
     from .user import User  # noqa: F401
+    from .inventory import (  # noqa: F401
+        InventoryMovement, StockSnapshot, ConsumptionMonthly, ServiceTemplate, ServiceTemplateItem,
+        ProductLot, InventoryMovementLot,
+    )
+    from .payout import PayoutPeriod, Payout, PayoutLine  # noqa: F401
+    from .cash_close import CashClose, CashCloseLine  # noqa: F401
+    from .client_preference import ClientPreference  # noqa: F401
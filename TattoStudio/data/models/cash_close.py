@@ -0,0 +1,84 @@
+# data/models/cash_close.py
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import DDL, Date, DateTime, Float, ForeignKey, Index, Integer, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from data.db.base import Base
+
+
+class CashClose(Base):
+    """
+    Corte de caja de un día: foto inmutable de lo esperado (transacciones
+    vivas de [window_start, window_end)) contra lo contado en caja.
+    Mientras exista, las transacciones de esa ventana quedan bloqueadas
+    (triggers de abajo).
+    """
+    __tablename__ = "cash_closes"
+    __table_args__ = (
+        Index("ix_cash_close_window", "window_start", "window_end"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    day: Mapped[date] = mapped_column(Date, unique=True, nullable=False)
+    window_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    window_end: Mapped[datetime] = mapped_column(DateTime, nullable=False)     # exclusivo
+    expected_total: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    counted_total: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    difference: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)  # contado - esperado
+    tx_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    note: Mapped[Optional[str]] = mapped_column(String(200), default=None)
+    closed_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    closed_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+
+class CashCloseLine(Base):
+    """
+    Renglón del corte: kind='method' (por método de pago, con lo contado) o
+    kind='artist' (por tatuador; key = artist_id, label = nombre al cerrar).
+    """
+    __tablename__ = "cash_close_lines"
+
+    close_id: Mapped[int] = mapped_column(ForeignKey("cash_closes.id", ondelete="CASCADE"), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(8), primary_key=True)      # method | artist
+    key: Mapped[str] = mapped_column(String(40), primary_key=True)      # método o artist_id
+    label: Mapped[str] = mapped_column(String(120), nullable=False)
+    expected: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    counted: Mapped[Optional[float]] = mapped_column(Float, default=None)   # sólo kind='method'
+    tx_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+# ------------------ Bloqueo de la ventana cerrada ------------------
+# En la BD y no sólo en services/: la caja y otras pantallas escriben
+# transacciones directo con el ORM. Un corte es inmutable.
+_IN_CLOSED = "EXISTS (SELECT 1 FROM cash_closes c WHERE c.window_start <= {d} AND c.window_end > {d})"
+
+LOCK_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS trg_tx_closed_insert
+    BEFORE INSERT ON transactions
+    WHEN {_IN_CLOSED.format(d="NEW.date")}
+    BEGIN SELECT RAISE(ABORT, 'Caja cerrada: el día de esta transacción ya tiene corte.'); END;""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_tx_closed_update
+    BEFORE UPDATE ON transactions
+    WHEN {_IN_CLOSED.format(d="OLD.date")} OR {_IN_CLOSED.format(d="NEW.date")}
+    BEGIN SELECT RAISE(ABORT, 'Caja cerrada: el día de esta transacción ya tiene corte.'); END;""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_tx_closed_delete
+    BEFORE DELETE ON transactions
+    WHEN {_IN_CLOSED.format(d="OLD.date")}
+    BEGIN SELECT RAISE(ABORT, 'Caja cerrada: el día de esta transacción ya tiene corte.'); END;""",
+    """CREATE TRIGGER IF NOT EXISTS trg_cash_close_immutable
+    BEFORE UPDATE ON cash_closes
+    BEGIN SELECT RAISE(ABORT, 'Un corte de caja no se modifica.'); END;""",
+    """CREATE TRIGGER IF NOT EXISTS trg_cash_close_lines_immutable
+    BEFORE UPDATE ON cash_close_lines
+    BEGIN SELECT RAISE(ABORT, 'Un corte de caja no se modifica.'); END;""",
+)
+
+# create_all los crea al final (ya existen transactions y cash_closes); en BDs
+# existentes los crea la migración 2025_10_27_add_cash_closes.py
+for _sql in LOCK_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(_sql).execute_if(dialect="sqlite"))
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from sqlalchemy import (
-    Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, func, text
+    Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, Index, func, text
 )
 from sqlalchemy.orm import relationship
 
@@ -64,3 +64,7 @@ class Client(Base):
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
+
+
+# Orden/búsqueda por nombre (listas, combos de cita)
+Index("ix_clients_name", Client.name)
@@ -0,0 +1,27 @@
+# data/models/client_preference.py
+from __future__ import annotations
+
+from sqlalchemy import ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from data.db.base import Base
+
+
+class ClientPreference(Base):
+    """
+    Preferencia del cliente, una fila por valor:
+      kind='style'  estilo favorito (Línea fina, Realismo, ...)
+      kind='zone'   zona de interés (Antebrazo, Espalda, ...)
+      kind='source' cómo nos conoció (a lo más una por cliente)
+    Antes vivían en una línea META_PREFS|... dentro de Client.notes
+    (migración 2025_10_29_add_client_preferences.py).
+    """
+    __tablename__ = "client_preferences"
+    __table_args__ = (
+        # Segmentación: "clientes con estilo X" -> SEARCH (kind=? AND value=?)
+        Index("ix_client_prefs_kind_value", "kind", "value", "client_id"),
+    )
+
+    client_id: Mapped[int] = mapped_column(ForeignKey("clients.id", ondelete="CASCADE"), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(8), primary_key=True)      # style | zone | source
+    value: Mapped[str] = mapped_column(String(60), primary_key=True)
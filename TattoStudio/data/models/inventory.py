@@ -0,0 +1,131 @@
+# data/models/inventory.py
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from data.db.base import Base
+
+# Tipos de movimiento (mismos textos que muestra la UI)
+MovementKind = ("Entrada", "Salida", "Ajuste", "Conteo", "Consumo")
+# Salidas que cuentan como consumo del mes (Consumo = insumos de una sesión completada)
+OutflowKinds = ("Salida", "Consumo")
+
+
+class InventoryMovement(Base):
+    """Libro de movimientos: cada cambio de stock deja una fila con su saldo resultante."""
+    __tablename__ = "inventory_movements"
+    __table_args__ = (
+        Index("ix_invmov_product_time", "product_id", "created_at"),
+        Index("ix_invmov_time", "created_at"),
+        Index("ix_invmov_kind_time", "kind", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    kind: Mapped[str] = mapped_column(String(12), nullable=False)      # Entrada | Salida | Ajuste | Conteo | Consumo
+    qty: Mapped[int] = mapped_column(Integer, nullable=False)          # delta con signo
+    balance: Mapped[int] = mapped_column(Integer, nullable=False)      # stock después del movimiento
+    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    note: Mapped[Optional[str]] = mapped_column(String(200), default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+class StockSnapshot(Base):
+    """
+    Foto periódica del stock de todos los productos. 'last_movement_id' marca
+    hasta qué movimiento del libro ya está incluido en la foto.
+    """
+    __tablename__ = "stock_snapshots"
+    __table_args__ = (
+        Index("ix_stock_snap_time", "taken_at", "product_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    taken_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    stock: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_movement_id: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class ConsumptionMonthly(Base):
+    """
+    Acumulado mensual de salidas por producto (unidades y costo al momento de
+    la salida). Se actualiza en la misma transacción que el libro.
+    """
+    __tablename__ = "inventory_consumption_monthly"
+
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)      # 'YYYY-MM'
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    units: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    cost: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+
+class ServiceTemplate(Base):
+    """
+    Plantilla de consumo (lista de materiales) por servicio: lo que se descuenta
+    del inventario al completar una sesión de ese servicio.
+    """
+    __tablename__ = "service_templates"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(80), unique=True, nullable=False)
+    is_default: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+class ServiceTemplateItem(Base):
+    __tablename__ = "service_template_items"
+    __table_args__ = (
+        UniqueConstraint("template_id", "product_id", name="uq_service_template_product"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    template_id: Mapped[int] = mapped_column(
+        ForeignKey("service_templates.id", ondelete="CASCADE"), nullable=False
+    )
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    qty: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ProductLot(Base):
+    """
+    Lote de un producto (código, caducidad, existencia restante). Las salidas
+    toman primero del lote que caduca antes (FEFO). Product.stock sigue siendo
+    el total: lotes + existencia sin lote (anterior a los lotes o de conteos).
+    """
+    __tablename__ = "product_lots"
+    __table_args__ = (
+        UniqueConstraint("product_id", "lot_code", name="uq_product_lot_code"),
+        # Parciales: los lotes agotados se conservan (trazabilidad) sin pesar en las búsquedas
+        Index("ix_lots_expiry", "expires_on", sqlite_where=text("qty > 0")),
+        Index("ix_lots_fefo", "product_id", "expires_on", "id", sqlite_where=text("qty > 0")),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    lot_code: Mapped[str] = mapped_column(String(60), nullable=False)
+    expires_on: Mapped[Optional[date]] = mapped_column(Date, default=None)
+    qty: Mapped[int] = mapped_column(Integer, default=0, nullable=False)   # existencia restante
+    received_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+class InventoryMovementLot(Base):
+    """Qué lotes tocó cada movimiento del libro (qty con signo); una salida FEFO puede repartirse en varios."""
+    __tablename__ = "inventory_movement_lots"
+    __table_args__ = (
+        Index("ix_invmov_lots_lot", "lot_id"),
+    )
+
+    movement_id: Mapped[int] = mapped_column(
+        ForeignKey("inventory_movements.id", ondelete="CASCADE"), primary_key=True
+    )
+    lot_id: Mapped[int] = mapped_column(ForeignKey("product_lots.id", ondelete="CASCADE"), primary_key=True)
+    qty: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,64 @@
+# data/models/payout.py
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from data.db.base import Base
+
+
+class PayoutPeriod(Base):
+    """
+    Periodo de pago de comisiones cerrado: [start, end) en fechas locales.
+    Al cerrarse se congelan sus liquidaciones (payouts) y renglones; consultar
+    un periodo cerrado es leer esas filas, no volver a recorrer transacciones.
+    """
+    __tablename__ = "payout_periods"
+    __table_args__ = (
+        UniqueConstraint("start", "end", name="uq_payout_period"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    start: Mapped[date] = mapped_column(Date, nullable=False)
+    end: Mapped[date] = mapped_column(Date, nullable=False)       # exclusivo
+    closed_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    closed_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+
+class Payout(Base):
+    """Liquidación congelada de un tatuador en un periodo (totales de sus renglones)."""
+    __tablename__ = "payouts"
+    __table_args__ = (
+        UniqueConstraint("period_id", "artist_id", name="uq_payout_period_artist"),
+        Index("ix_payouts_artist", "artist_id", "period_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    period_id: Mapped[int] = mapped_column(ForeignKey("payout_periods.id", ondelete="CASCADE"), nullable=False)
+    artist_id: Mapped[int] = mapped_column(ForeignKey("artists.id", ondelete="RESTRICT"), nullable=False)
+    gross: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)        # cobrado
+    commission: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)   # a pagar al tatuador
+    tx_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class PayoutLine(Base):
+    """
+    Renglón de una liquidación: una transacción con la tasa aplicada.
+    transaction_id es la llave: una transacción se liquida una sola vez.
+    """
+    __tablename__ = "payout_lines"
+    __table_args__ = (
+        Index("ix_payout_lines_payout", "payout_id"),
+    )
+
+    transaction_id: Mapped[int] = mapped_column(
+        ForeignKey("transactions.id", ondelete="RESTRICT"), primary_key=True
+    )
+    payout_id: Mapped[int] = mapped_column(ForeignKey("payouts.id", ondelete="CASCADE"), nullable=False)
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    rate: Mapped[float] = mapped_column(Float, nullable=False)
+    commission: Mapped[float] = mapped_column(Float, nullable=False)
@@ -1,6 +1,6 @@
 # imports recomendados arriba del archivo
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from data.db.base import Base
 
@@ -37,3 +37,14 @@ class PortfolioItem(Base):
     client = relationship("Client", foreign_keys=[client_id], lazy="joined")
     session = relationship("TattooSession", foreign_keys=[session_id], lazy="joined")
     transaction = relationship("Transaction", foreign_keys=[transaction_id], lazy="joined")
+
+
+# Galería por usuario, más recientes primero (el rowid completa el desempate por id)
+Index("ix_portfolio_user_created", PortfolioItem.user_id, PortfolioItem.created_at)
+# Galería del cliente (ClientDetailPage), mismo orden
+Index("ix_portfolio_client_created", PortfolioItem.client_id, PortfolioItem.created_at)
+# Llaves foráneas hacia sesión/transacción: sin índice, borrar una sesión o
+# transacción (services/archive) recorre toda la tabla para revisar la FK
+Index("ix_portfolio_session", PortfolioItem.session_id, sqlite_where=PortfolioItem.session_id.isnot(None))
+Index("ix_portfolio_transaction", PortfolioItem.transaction_id,
+      sqlite_where=PortfolioItem.transaction_id.isnot(None))
@@ -1,5 +1,6 @@
+from datetime import date
 from typing import Optional
-from sqlalchemy import String, Float, Integer, Boolean
+from sqlalchemy import String, Float, Integer, Boolean, Date, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from data.db.base import Base
 
@@ -7,7 +8,7 @@ class Product(Base):
     __tablename__ = "products"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    sku: Mapped[str] = mapped_column(String(50) )
+    sku: Mapped[str] = mapped_column(String(50), index=True)
     name: Mapped[str] = mapped_column(String(120), index=True)
     category: Mapped[Optional[str]] = mapped_column(String(60), default="consumibles")
     unidad: Mapped[str] = mapped_column(String(50) )
@@ -17,4 +18,13 @@ class Product(Base):
     caduca: Mapped[bool] = mapped_column(Boolean, default=False)
     proveedor: Mapped[str] = mapped_column(String(50) )
     activo: Mapped[bool] = mapped_column(Boolean, default=True)
-    fechacaducidad: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    fechacaducidad: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
+
+# Por caducar: rango sobre la fecha, sólo productos que caducan
+Index("ix_products_expiry", Product.fechacaducidad, sqlite_where=text("caduca = 1"))
+# Catálogo: orden por nombre y búsqueda por prefijo (LIKE no distingue mayúsculas)
+Index("ix_products_name_nocase", Product.name.collate("NOCASE"))
+Index("ix_products_sku_nocase", Product.sku.collate("NOCASE"))
+# Bajo stock: 'stock < min_stock' compara dos columnas; se indexa el déficit
+Index("ix_products_low_stock", Product.stock - Product.min_stock, sqlite_where=text("activo = 1"))
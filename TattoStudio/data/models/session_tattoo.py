@@ -3,7 +3,8 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional, List
 
-from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, Float, Index
+from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, Float, Index, func, select
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from data.db.base import Base
@@ -54,21 +55,43 @@ class TattooSession(Base):
             return None
         return self.transactions[-1]
 
-    @property
+    # total_paid / balance son híbridos: en una instancia suman sus transacciones
+    # cargadas; en una consulta son un SUM correlacionado (ix_tx_live_session)
+    # utilizable en where()/order_by(), p. ej. .where(TattooSession.balance > 0).
+    @hybrid_property
     def total_paid(self) -> float:
-        """Suma de montos no borrados (si usas deleted_flag en Transaction)."""
+        """Suma de montos no borrados."""
         total = 0.0
         for t in self.transactions or []:
-            # Si Transaction tiene deleted_flag; si no, quita esta condición
             if getattr(t, "deleted_flag", False):
                 continue
             total += float(getattr(t, "amount", 0.0) or 0.0)
         return total
 
-    @property
+    @total_paid.inplace.expression
+    @classmethod
+    def _total_paid_expression(cls):
+        from data.models.transaction import Transaction
+        # "deleted_flag = 0" literal: condición del índice parcial ix_tx_live_session
+        return (
+            select(func.coalesce(func.sum(Transaction.amount), 0.0))
+            .where(Transaction.session_id == cls.id, Transaction.deleted_flag == False)  # noqa: E712
+            .correlate_except(Transaction)
+            .scalar_subquery()
+        )
+
+    @hybrid_property
     def balance(self) -> float:
         """Saldo: price - total_paid (no negativo)."""
         return max(0.0, float(self.price or 0.0) - self.total_paid)
 
+    @balance.inplace.expression
+    @classmethod
+    def _balance_expression(cls):
+        # max() escalar de SQLite: el SUM correlacionado se evalúa una vez (un CASE lo repetiría)
+        return func.max(func.coalesce(cls.price, 0.0) - cls.total_paid, 0.0)
+
 
 Index("ix_sessions_artist_time", TattooSession.artist_id, TattooSession.start, TattooSession.end)
+# Próxima/última cita de un cliente
+Index("ix_sessions_client_start", TattooSession.client_id, TattooSession.start)
@@ -10,6 +10,7 @@ from sqlalchemy import (
     Float,
     Boolean,
     Index,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -22,6 +23,9 @@ class Transaction(Base):
     __table_args__ = (
         Index("ix_tx_date", "date"),
         Index("ix_tx_artist_date", "artist_id", "date"),
+        Index("ix_tx_method_date", "method", "date"),
+        # Pagado por sesión: sólo filas vivas (parcial; la consulta debe decir deleted_flag = 0)
+        Index("ix_tx_live_session", "session_id", "amount", sqlite_where=text("deleted_flag = 0")),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
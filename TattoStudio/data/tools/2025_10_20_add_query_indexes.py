@@ -0,0 +1,105 @@
+"""
+Migración idempotente: índices para las consultas reales de la app
+(ver data/tools/index_advisor.py, que los detectó).
+
+- ix_clients_name            clients(name)                     orden/búsqueda por nombre
+- ix_sessions_client_start   sessions(client_id, start)        próxima/última cita del cliente
+- ix_portfolio_user_created  portfolio_items(user_id, created_at)
+- ix_tx_method_date          transactions(method, date)        reportes por método de pago
+- ix_tx_live_session         transactions(session_id, amount) WHERE deleted_flag = 0
+- ix_products_sku            products(sku)                     entradas/ajustes por SKU
+
+Al final corre ANALYZE para que el planificador tenga estadísticas.
+Usa DB_PATH si está definida; si no, dev.db en la raíz del repo.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import List
+
+# nombre -> (tabla, columnas requeridas, DDL)
+NEEDED_INDEXES = {
+    "ix_clients_name": (
+        "clients", ("name",),
+        "CREATE INDEX IF NOT EXISTS ix_clients_name ON clients(name)",
+    ),
+    "ix_sessions_client_start": (
+        "sessions", ("client_id", "start"),
+        "CREATE INDEX IF NOT EXISTS ix_sessions_client_start ON sessions(client_id, start)",
+    ),
+    "ix_portfolio_user_created": (
+        "portfolio_items", ("user_id", "created_at"),
+        "CREATE INDEX IF NOT EXISTS ix_portfolio_user_created ON portfolio_items(user_id, created_at)",
+    ),
+    "ix_tx_method_date": (
+        "transactions", ("method", "date"),
+        "CREATE INDEX IF NOT EXISTS ix_tx_method_date ON transactions(method, date)",
+    ),
+    "ix_tx_live_session": (
+        "transactions", ("session_id", "amount", "deleted_flag"),
+        "CREATE INDEX IF NOT EXISTS ix_tx_live_session ON transactions(session_id, amount) WHERE deleted_flag = 0",
+    ),
+    "ix_products_sku": (
+        "products", ("sku",),
+        "CREATE INDEX IF NOT EXISTS ix_products_sku ON products(sku)",
+    ),
+}
+
+
+def _resolve_db_path() -> Path:
+    env_path = os.environ.get("DB_PATH")
+    if env_path:
+        return Path(env_path).resolve()
+    return (Path(__file__).resolve().parents[2] / "dev.db").resolve()
+
+
+def _existing_columns(cur: sqlite3.Cursor, table: str) -> set:
+    cur.execute(f"PRAGMA table_info({table})")
+    return {row[1].lower() for row in cur.fetchall()}
+
+
+def _existing_indexes(cur: sqlite3.Cursor) -> set:
+    cur.execute("SELECT name FROM sqlite_master WHERE type='index'")
+    return {row[0] for row in cur.fetchall()}
+
+
+def apply(con: sqlite3.Connection) -> List[str]:
+    """Crea los índices que falten; devuelve los nombres creados."""
+    cur = con.cursor()
+    before = _existing_indexes(cur)
+    created = []
+    for name, (table, cols, ddl) in NEEDED_INDEXES.items():
+        have = _existing_columns(cur, table)
+        if not have:
+            print(f"[SKIP] {name}: no existe la tabla '{table}'")
+            continue
+        missing = [c for c in cols if c not in have]
+        if missing:
+            print(f"[SKIP] {name}: faltan columnas {missing} en '{table}'")
+            continue
+        cur.execute(ddl)
+        if name not in before:
+            created.append(name)
+    if created:
+        cur.execute("ANALYZE")
+    con.commit()
+    return created
+
+
+def main():
+    db_path = _resolve_db_path()
+    print("Usando DB:", db_path)
+    con = sqlite3.connect(str(db_path))
+    try:
+        created = apply(con)
+    finally:
+        con.close()
+    for name in created:
+        print(f"[OK] índice creado: {name}")
+    if not created:
+        print("[OK] Índices al día. Nada que hacer.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# data/tools/2025_10_21_add_inventory_movements.py
+"""
+Migración idempotente: libro de movimientos de inventario.
+
+- Crea inventory_movements y stock_snapshots (con sus índices) si no existen.
+- Toma una foto inicial del stock actual, para que stock_at()/stock_levels_at()
+  tengan un saldo de partida anterior al primer movimiento.
+
+Usa DB_PATH si está definida (igual que la app); si no, ./dev.db.
+"""
+from sqlalchemy import inspect
+
+from data.db.session import SessionLocal, engine
+from data.models import load_all_models
+
+
+def main():
+    load_all_models()
+    from data.models.inventory import InventoryMovement, StockSnapshot
+    from services.inventory import take_snapshot
+
+    print("Usando DB:", engine.url)
+    tables = set(inspect(engine).get_table_names())
+    if "products" not in tables:
+        print("ERROR: no existe la tabla 'products'. Revisa tu DB_PATH.")
+        return
+
+    for model in (InventoryMovement, StockSnapshot):
+        name = model.__tablename__
+        if name in tables:
+            print(f"[OK] '{name}' ya existe.")
+        else:
+            model.__table__.create(bind=engine, checkfirst=True)
+            print(f"[OK] tabla creada: {name}")
+
+    with SessionLocal() as db:
+        if db.query(StockSnapshot.id).first() is None:
+            n = take_snapshot(db)
+            db.commit()
+            print(f"[OK] foto inicial de stock: {n} productos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Migración idempotente: products.fechacaducidad pasa de TEXT libre a DATE.
+
+- Normaliza los valores a ISO 'YYYY-MM-DD' (acepta también 'dd/mm/yyyy' y
+  fechas con hora); lo que no se puede interpretar queda en NULL y se reporta.
+- Cambia el tipo declarado a DATE sin reconstruir la tabla: columna nueva,
+  copia, DROP COLUMN y RENAME COLUMN (SQLite >= 3.35).
+- Crea los índices del tablero de inventario:
+    ix_products_expiry     products(fechacaducidad) WHERE caduca = 1
+    ix_products_low_stock  products(stock - min_stock) WHERE activo = 1
+  y corre ANALYZE.
+
+Usa DB_PATH si está definida; si no, dev.db en la raíz del repo.
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+COLUMN = "fechacaducidad"
+FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%d/%m/%Y", "%d-%m-%Y")
+
+NEEDED_INDEXES = {
+    "ix_products_expiry":
+        "CREATE INDEX IF NOT EXISTS ix_products_expiry ON products (fechacaducidad) WHERE caduca = 1",
+    "ix_products_low_stock":
+        "CREATE INDEX IF NOT EXISTS ix_products_low_stock ON products (stock - min_stock) WHERE activo = 1",
+}
+
+
+def _resolve_db_path() -> Path:
+    env_path = os.environ.get("DB_PATH")
+    if env_path:
+        return Path(env_path).resolve()
+    return (Path(__file__).resolve().parents[2] / "dev.db").resolve()
+
+
+def iso_date(value) -> Optional[str]:
+    """'YYYY-MM-DD' o None si el valor no es una fecha reconocible."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    for fmt in FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _column_type(cur: sqlite3.Cursor) -> Optional[str]:
+    cur.execute("PRAGMA table_info(products)")
+    for row in cur.fetchall():
+        if row[1].lower() == COLUMN:
+            return (row[2] or "").upper()
+    return None
+
+
+def apply(con: sqlite3.Connection) -> Dict[str, object]:
+    """Convierte la columna y crea los índices; devuelve un resumen de lo hecho."""
+    con.create_function("iso_date", 1, iso_date, deterministic=True)
+    cur = con.cursor()
+    summary: Dict[str, object] = {"converted": False, "invalid": 0, "indexes": []}
+
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='products'")
+    if cur.fetchone() is None:
+        print("[SKIP] no existe la tabla 'products'")
+        return summary
+
+    col_type = _column_type(cur)
+    if col_type is not None:
+        cur.execute(
+            f"SELECT count(*) FROM products WHERE {COLUMN} IS NOT NULL AND iso_date({COLUMN}) IS NULL"
+        )
+        summary["invalid"] = cur.fetchone()[0]
+
+    if col_type is None:
+        cur.execute(f"ALTER TABLE products ADD COLUMN {COLUMN} DATE")
+        summary["converted"] = True
+    elif col_type != "DATE":
+        cur.execute(f"ALTER TABLE products ADD COLUMN {COLUMN}_new DATE")
+        cur.execute(f"UPDATE products SET {COLUMN}_new = iso_date({COLUMN})")
+        cur.execute(f"ALTER TABLE products DROP COLUMN {COLUMN}")
+        cur.execute(f"ALTER TABLE products RENAME COLUMN {COLUMN}_new TO {COLUMN}")
+        summary["converted"] = True
+    else:
+        # Ya es DATE: sólo se normalizan valores que hayan quedado en otro formato
+        cur.execute(
+            f"UPDATE products SET {COLUMN} = iso_date({COLUMN}) "
+            f"WHERE {COLUMN} IS NOT NULL AND {COLUMN} IS NOT iso_date({COLUMN})"
+        )
+
+    cur.execute("SELECT name FROM sqlite_master WHERE type='index'")
+    before = {row[0] for row in cur.fetchall()}
+    for name, ddl in NEEDED_INDEXES.items():
+        cur.execute(ddl)
+        if name not in before:
+            summary["indexes"].append(name)
+    if summary["converted"] or summary["indexes"]:
+        cur.execute("ANALYZE")
+    con.commit()
+    return summary
+
+
+def main():
+    db_path = _resolve_db_path()
+    print("Usando DB:", db_path)
+    con = sqlite3.connect(str(db_path))
+    try:
+        summary = apply(con)
+    finally:
+        con.close()
+    if summary["converted"]:
+        print(f"[OK] {COLUMN} ahora es DATE")
+    if summary["invalid"]:
+        print(f"[OK] {summary['invalid']} fecha(s) no reconocibles quedaron en NULL")
+    for name in summary["indexes"]:
+        print(f"[OK] índice creado: {name}")
+    if not summary["converted"] and not summary["indexes"]:
+        print("[OK] Columna e índices al día. Nada que hacer.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Migración idempotente: índices del catálogo de productos (InventoryItemsPage).
+
+- ix_products_name_nocase  products(name COLLATE NOCASE)  orden por nombre + keyset
+                                                          + búsqueda 'texto%'
+- ix_products_sku_nocase   products(sku COLLATE NOCASE)   búsqueda 'texto%' por SKU
+
+LIKE en SQLite no distingue mayúsculas, así que sólo aprovecha índices NOCASE.
+Al final corre ANALYZE. Usa DB_PATH si está definida; si no, dev.db en la raíz.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import List
+
+NEEDED_INDEXES = {
+    "ix_products_name_nocase":
+        "CREATE INDEX IF NOT EXISTS ix_products_name_nocase ON products (name COLLATE NOCASE)",
+    "ix_products_sku_nocase":
+        "CREATE INDEX IF NOT EXISTS ix_products_sku_nocase ON products (sku COLLATE NOCASE)",
+}
+
+
+def _resolve_db_path() -> Path:
+    env_path = os.environ.get("DB_PATH")
+    if env_path:
+        return Path(env_path).resolve()
+    return (Path(__file__).resolve().parents[2] / "dev.db").resolve()
+
+
+def apply(con: sqlite3.Connection) -> List[str]:
+    """Crea los índices que falten; devuelve los nombres creados."""
+    cur = con.cursor()
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='products'")
+    if cur.fetchone() is None:
+        print("[SKIP] no existe la tabla 'products'")
+        return []
+    cur.execute("SELECT name FROM sqlite_master WHERE type='index'")
+    before = {row[0] for row in cur.fetchall()}
+    created = []
+    for name, ddl in NEEDED_INDEXES.items():
+        cur.execute(ddl)
+        if name not in before:
+            created.append(name)
+    if created:
+        cur.execute("ANALYZE")
+    con.commit()
+    return created
+
+
+def main():
+    db_path = _resolve_db_path()
+    print("Usando DB:", db_path)
+    con = sqlite3.connect(str(db_path))
+    try:
+        created = apply(con)
+    finally:
+        con.close()
+    for name in created:
+        print(f"[OK] índice creado: {name}")
+    if not created:
+        print("[OK] Índices al día. Nada que hacer.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# data/tools/2025_10_24_add_service_templates.py
+"""
+Migración idempotente: plantillas de consumo por servicio.
+
+- Crea service_templates, service_template_items e
+  inventory_consumption_monthly si no existen.
+- Reconstruye el acumulado mensual de consumo desde el libro de movimientos
+  (costo al precio actual de cada producto).
+
+Requiere el libro (2025_10_21_add_inventory_movements.py).
+Usa DB_PATH si está definida (igual que la app); si no, ./dev.db.
+"""
+from sqlalchemy import inspect
+
+from data.db.session import SessionLocal, engine
+from data.models import load_all_models
+
+
+def main():
+    load_all_models()
+    from data.models.inventory import ConsumptionMonthly, ServiceTemplate, ServiceTemplateItem
+    from services.inventory import rebuild_consumption
+
+    print("Usando DB:", engine.url)
+    tables = set(inspect(engine).get_table_names())
+    if "inventory_movements" not in tables:
+        print("ERROR: no existe 'inventory_movements'. Corre antes 2025_10_21_add_inventory_movements.py.")
+        return
+
+    for model in (ServiceTemplate, ServiceTemplateItem, ConsumptionMonthly):
+        name = model.__tablename__
+        if name in tables:
+            print(f"[OK] '{name}' ya existe.")
+        else:
+            model.__table__.create(bind=engine, checkfirst=True)
+            print(f"[OK] tabla creada: {name}")
+
+    with SessionLocal() as db:
+        n = rebuild_consumption(db)
+        db.commit()
+        print(f"[OK] consumo mensual reconstruido: {n} filas")
+
+
+if __name__ == "__main__":
+    main()
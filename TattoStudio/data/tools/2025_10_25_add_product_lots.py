@@ -0,0 +1,67 @@
+# data/tools/2025_10_25_add_product_lots.py
+"""
+Migración idempotente: lotes de producto con salida FEFO.
+
+- Crea product_lots (ix_lots_expiry, ix_lots_fefo) e inventory_movement_lots
+  si no existen.
+- Backfill: cada producto que caduca, con fecha y stock > 0 y sin lotes,
+  recibe un lote 'INICIAL' con su fecha actual y todo su stock. Así
+  fechacaducidad pasa a ser el agregado de sus lotes desde el primer movimiento.
+
+Usa DB_PATH si está definida (igual que la app); si no, ./dev.db.
+"""
+from datetime import datetime
+
+from sqlalchemy import exists, inspect, literal, select
+
+from data.db.session import SessionLocal, engine
+from data.models import load_all_models
+
+
+def backfill(db) -> int:
+    """Un INSERT ... SELECT; devuelve cuántos lotes creó."""
+    from data.models.inventory import ProductLot
+    from data.models.product import Product
+
+    src = select(
+        Product.id, literal("INICIAL"), Product.fechacaducidad, Product.stock, literal(datetime.now()),
+    ).where(
+        Product.caduca == True,  # noqa: E712
+        Product.fechacaducidad.isnot(None),
+        Product.stock > 0,
+        ~exists().where(ProductLot.product_id == Product.id),
+    )
+    res = db.execute(
+        ProductLot.__table__.insert().from_select(
+            ["product_id", "lot_code", "expires_on", "qty", "received_at"], src
+        )
+    )
+    return int(res.rowcount or 0)
+
+
+def main():
+    load_all_models()
+    from data.models.inventory import InventoryMovementLot, ProductLot
+
+    print("Usando DB:", engine.url)
+    tables = set(inspect(engine).get_table_names())
+    if "inventory_movements" not in tables:
+        print("ERROR: no existe 'inventory_movements'. Corre antes 2025_10_21_add_inventory_movements.py.")
+        return
+
+    for model in (ProductLot, InventoryMovementLot):
+        name = model.__tablename__
+        if name in tables:
+            print(f"[OK] '{name}' ya existe.")
+        else:
+            model.__table__.create(bind=engine, checkfirst=True)
+            print(f"[OK] tabla creada: {name}")
+
+    with SessionLocal() as db:
+        n = backfill(db)
+        db.commit()
+        print(f"[OK] lotes iniciales: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# data/tools/2025_10_26_add_payouts.py
+"""
+Migración idempotente: liquidación de comisiones por periodo.
+
+- Crea payout_periods, payouts y payout_lines si no existen.
+No toca transacciones: los periodos se cierran desde Reportes → Comisiones.
+
+Usa DB_PATH si está definida (igual que la app); si no, ./dev.db.
+"""
+from sqlalchemy import inspect
+
+from data.db.session import engine
+from data.models import load_all_models
+
+
+def main():
+    load_all_models()
+    from data.models.payout import Payout, PayoutLine, PayoutPeriod
+
+    print("Usando DB:", engine.url)
+    tables = set(inspect(engine).get_table_names())
+    for model in (PayoutPeriod, Payout, PayoutLine):
+        name = model.__tablename__
+        if name in tables:
+            print(f"[OK] '{name}' ya existe.")
+        else:
+            model.__table__.create(bind=engine, checkfirst=True)
+            print(f"[OK] tabla creada: {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# data/tools/2025_10_27_add_cash_closes.py
+"""
+Migración idempotente: corte de caja diario.
+
+- Crea cash_closes y cash_close_lines si no existen.
+- Crea los triggers que bloquean las transacciones de un día con corte
+  (insert/update/delete) y hacen inmutable el corte.
+
+Usa DB_PATH si está definida (igual que la app); si no, ./dev.db.
+"""
+from sqlalchemy import inspect, text
+
+from data.db.session import engine
+from data.models import load_all_models
+
+
+def apply_triggers(conn) -> None:
+    from data.models.cash_close import LOCK_TRIGGERS
+    for sql in LOCK_TRIGGERS:
+        conn.execute(text(sql))
+
+
+def main():
+    load_all_models()
+    from data.models.cash_close import CashClose, CashCloseLine
+
+    print("Usando DB:", engine.url)
+    tables = set(inspect(engine).get_table_names())
+    if "transactions" not in tables:
+        print("ERROR: no existe la tabla 'transactions' en esta DB.")
+        return
+
+    for model in (CashClose, CashCloseLine):
+        name = model.__tablename__
+        if name in tables:
+            print(f"[OK] '{name}' ya existe.")
+        else:
+            model.__table__.create(bind=engine, checkfirst=True)
+            print(f"[OK] tabla creada: {name}")
+
+    with engine.begin() as conn:
+        apply_triggers(conn)
+    print("[OK] triggers de bloqueo de caja")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# data/tools/2025_10_29_add_client_preferences.py
+"""
+Migración idempotente: preferencias de clientes en su propia tabla.
+
+- Crea client_preferences (+ ix_client_prefs_kind_value) si no existe.
+- Backfill: las notas con una línea META_PREFS|styles=..;zones=..;source=..
+  se pasan a filas (style / zone / source) y la línea se quita de las notas,
+  todo en una transacción. Correrla otra vez no encuentra líneas que mover.
+  Al final corre ANALYZE de la tabla (el planificador elige entre el índice
+  por valor y la llave primaria por cliente).
+
+Usa DB_PATH si está definida (igual que la app); si no, ./dev.db.
+"""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import bindparam, inspect, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+
+from data.db.session import engine
+from data.models import load_all_models
+
+
+def backfill(conn: Connection) -> Tuple[int, int]:
+    """Mueve las líneas META_PREFS a client_preferences; devuelve (clientes, filas)."""
+    from data.models.client import Client
+    from data.models.client_preference import ClientPreference
+    from services.client_prefs import META_PREFIX, parse_meta_prefs, strip_meta_prefs
+
+    found = conn.execute(
+        select(Client.id, Client.notes).where(Client.notes.like(f"%{META_PREFIX}%"))
+    ).all()
+    prefs: List[Dict] = []
+    notes: List[Dict] = []
+    for cid, text in found:
+        parsed = parse_meta_prefs(text)
+        if parsed is None:
+            continue
+        prefs += [{"client_id": cid, "kind": kind, "value": v} for kind, values in parsed.items() for v in values]
+        notes.append({"cid": cid, "notes": strip_meta_prefs(text)})
+    if prefs:
+        conn.execute(insert(ClientPreference).on_conflict_do_nothing(), prefs)
+    if notes:
+        conn.execute(
+            update(Client.__table__).where(Client.__table__.c.id == bindparam("cid"))
+            .values(notes=bindparam("notes")),
+            notes,
+        )
+    return len(notes), len(prefs)
+
+
+def main():
+    load_all_models()
+    from data.models.client_preference import ClientPreference
+
+    print("Usando DB:", engine.url)
+    name = ClientPreference.__tablename__
+    if name in set(inspect(engine).get_table_names()):
+        print(f"[OK] '{name}' ya existe.")
+    else:
+        ClientPreference.__table__.create(bind=engine, checkfirst=True)
+        print(f"[OK] tabla creada: {name}")
+
+    with engine.begin() as conn:
+        clients, rows = backfill(conn)
+        if rows:
+            conn.exec_driver_sql("ANALYZE client_preferences")
+    print(f"[OK] preferencias migradas de notas: {clients} cliente(s), {rows} fila(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+# data/tools/index_advisor.py
+"""
+Asesor de índices: corre EXPLAIN QUERY PLAN sobre un catálogo con las
+consultas reales de la app (mismas formas que services/ y ui/pages/) y
+reporta recorridos completos y B-trees temporales.
+
+  SCAN t                      -> full_scan   (lee toda la tabla)
+  USE TEMP B-TREE FOR ...     -> temp_btree  (ordena/agrupa en memoria)
+  SEARCH / SCAN ... USING INDEX -> ok
+
+Cada consulta declara qué hallazgos son esperables (p. ej. la lista de
+clientes lee la tabla completa a propósito); el resto se marcan. Recorrer
+una tabla chica (< --min-rows filas) tampoco se marca: con ANALYZE el
+planificador lo prefiere y está bien.
+
+Uso:
+  python -m data.tools.index_advisor                   # BD de DB_PATH (o dev.db)
+  python -m data.tools.index_advisor --db bench/.data/studio_50k.db
+  python -m data.tools.index_advisor --verbose         # plan completo por consulta
+  python -m data.tools.index_advisor --min-rows 0      # marcar todo recorrido completo
+
+Sale con código 1 si hay hallazgos no esperados. Los índices que sugiere se
+crean con data/tools/2025_10_20_add_query_indexes.py.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional
+
+from sqlalchemy import create_engine, exists, func, literal_column, or_, select
+from sqlalchemy.engine import Connection, Engine
+
+FULL_SCAN = "full_scan"
+TEMP_BTREE = "temp_btree"
+DEFAULT_MIN_ROWS = 1000
+
+
+class Statement(NamedTuple):
+    name: str
+    origin: str                       # de dónde sale la consulta en la app
+    build: Callable[[], object]       # -> Select
+    allow: FrozenSet[str] = frozenset()
+
+
+# ------------------ Catálogo ------------------
+
+def catalog() -> List[Statement]:
+    from data.models.artist import Artist
+    from data.models.client import Client
+    from data.models.client_preference import ClientPreference
+    from data.models.inventory import InventoryMovement, ProductLot
+    from data.models.payout import Payout, PayoutLine
+    from data.models.portfolio import PortfolioItem
+    from data.models.product import Product
+    from data.models.session_tattoo import TattooSession
+    from data.models.transaction import Transaction
+    from data.models.user import User
+
+    now = datetime(2025, 1, 1)
+
+    def report_rows():
+        return (
+            select(Transaction.date, Client.name, Transaction.amount, Transaction.method,
+                   Artist.name, Transaction.artist_id)
+            .join(TattooSession, TattooSession.id == Transaction.session_id)
+            .join(Client, Client.id == TattooSession.client_id)
+            .join(Artist, Artist.id == Transaction.artist_id)
+            .where(Transaction.date >= now, Transaction.date <= now)
+        )
+
+    def client_session(col, upcoming: bool):
+        when = TattooSession.start >= now if upcoming else TattooSession.start < now
+        order = TattooSession.start.asc() if upcoming else TattooSession.start.desc()
+        return (select(col).where(TattooSession.client_id == Client.id, when)
+                .order_by(order).limit(1).correlate(Client).scalar_subquery())
+
+    return [
+        Statement("login.user", "services/auth.get_user_by_username",
+                  lambda: select(User).where(User.username == "x").limit(1)),
+        Statement("agenda.range", "services/sessions.list_sessions",
+                  lambda: select(TattooSession)
+                  .where(TattooSession.start >= now, TattooSession.start < now)
+                  .order_by(TattooSession.start.asc())),
+        Statement("agenda.overlap", "services/sessions._check_overlap",
+                  lambda: select(TattooSession.id).where(
+                      TattooSession.artist_id == 1, TattooSession.status != "Cancelada",
+                      TattooSession.start < now, TattooSession.end > now)),
+        Statement("clients.list", "ui/pages/clients._reload_from_db",
+                  lambda: select(Client).order_by(Client.id.asc()),
+                  frozenset({FULL_SCAN})),
+        Statement("clients.next_session", "ui/pages/clients._reload_from_db",
+                  lambda: select(TattooSession)
+                  .where(TattooSession.client_id == 1, TattooSession.start >= now)
+                  .order_by(TattooSession.start.asc()).limit(1)),
+        Statement("clients.last_session", "ui/pages/clients._reload_from_db",
+                  lambda: select(TattooSession)
+                  .where(TattooSession.client_id == 1, TattooSession.start < now)
+                  .order_by(TattooSession.start.desc()).limit(1)),
+        Statement("clients.profile", "services/client_profile.get_profile (ClientDetailPage)",
+                  lambda: select(Client.name, Client.notes,
+                                 func.coalesce(client_session(TattooSession.artist_id, True),
+                                               client_session(TattooSession.artist_id, False),
+                                               Client.preferred_artist_id),
+                                 client_session(TattooSession.start, True))
+                  .where(Client.id == 1)),
+        Statement("clients.profile_artists", "services/client_profile.get_profile (combo de artistas)",
+                  lambda: select(Artist.id, Artist.name).order_by(Artist.name.asc())),
+        Statement("portfolio.for_client", "ui/pages/portfolios.PortfolioService.portfolio_for_client",
+                  lambda: select(PortfolioItem).where(PortfolioItem.client_id == 1)
+                  .order_by(PortfolioItem.created_at.desc(), PortfolioItem.id.desc()).limit(200)),
+        Statement("clients.segment", "services/client_prefs.segment (filtros de ClientsPage)",
+                  lambda: select(Client.id).where(
+                      Client.id.in_(select(ClientPreference.client_id).where(
+                          ClientPreference.kind == "style", ClientPreference.value.in_(["a", "b"]))),
+                      Client.id.in_(select(ClientPreference.client_id).where(
+                          ClientPreference.kind == "zone", ClientPreference.value.in_(["c"]))))
+                  .order_by(Client.id.asc())),
+        Statement("clients.pref_counts", "services/client_prefs.preference_counts",
+                  lambda: select(ClientPreference.kind, ClientPreference.value, func.count())
+                  .group_by(ClientPreference.kind, ClientPreference.value),
+                  frozenset({FULL_SCAN})),  # recorre el índice (kind, value) completo, sin ordenar
+        Statement("lookups.clients", "services/warmup lookups.clients · agenda",
+                  lambda: select(Client.id, Client.name).order_by(Client.name.asc())),
+        Statement("reports.rows", "services/reports.transaction_rows",
+                  lambda: report_rows().order_by(Transaction.date.asc(), Client.name.asc()),
+                  frozenset({TEMP_BTREE})),  # desempate por nombre de cliente
+        Statement("reports.rows.method", "services/reports.transaction_rows(method=…)",
+                  lambda: report_rows().where(Transaction.method == "Efectivo")
+                  .order_by(Transaction.date.asc(), Client.name.asc()),
+                  frozenset({TEMP_BTREE})),
+        Statement("reports.rows.artist", "services/reports.transaction_rows(artist_id=…)",
+                  lambda: report_rows().where(Transaction.artist_id == 1)
+                  .order_by(Transaction.date.asc(), Client.name.asc()),
+                  frozenset({TEMP_BTREE})),
+        Statement("reports.receivables", "services/reports.receivables_by_artist",
+                  lambda: select(Artist.name, func.sum(TattooSession.balance))
+                  .join(Artist, Artist.id == TattooSession.artist_id)
+                  .where(TattooSession.status != "Cancelada", TattooSession.start < now)
+                  .group_by(Artist.id, Artist.name).order_by(Artist.name, Artist.id),
+                  frozenset({FULL_SCAN, TEMP_BTREE})),  # saldo de toda sesión pasada, agrupado
+        Statement("reports.receivable_sessions", "services/reports.receivable_sessions",
+                  lambda: select(TattooSession.id, TattooSession.balance)
+                  .where(TattooSession.status != "Cancelada", TattooSession.start < now,
+                         TattooSession.balance > 0)
+                  .order_by(TattooSession.start.asc(), TattooSession.id.asc()).limit(51)),
+        Statement("sessions.paid", "TattooSession.total_paid (suma de cobros vivos)",
+                  lambda: select(func.coalesce(func.sum(Transaction.amount), 0.0))
+                  .where(Transaction.session_id == 1, Transaction.deleted_flag == False)),  # noqa: E712
+        Statement("payouts.preview", "services/payouts.settlement (periodo abierto) · close_period",
+                  lambda: select(Transaction.artist_id, func.sum(Transaction.amount), func.count())
+                  .join(Artist, Artist.id == Transaction.artist_id)
+                  .outerjoin(TattooSession, TattooSession.id == Transaction.session_id)
+                  .where(Transaction.deleted_flag == False, Transaction.date >= now,  # noqa: E712
+                         Transaction.date < now,
+                         ~exists().where(PayoutLine.transaction_id == Transaction.id))
+                  .group_by(Transaction.artist_id),
+                  frozenset({TEMP_BTREE})),  # por ix_tx_date agrupa aparte; por ix_tx_artist_date no
+        Statement("payouts.closed", "services/payouts.settlement (periodo cerrado)",
+                  lambda: select(Payout.artist_id, Artist.name, Payout.commission)
+                  .join(Artist, Artist.id == Payout.artist_id)
+                  .where(Payout.period_id == 1).order_by(Artist.name.asc()),
+                  frozenset({TEMP_BTREE})),  # ordena los pocos tatuadores del periodo
+        Statement("cash.close_totals", "services/cash_close.day_totals · close_day",
+                  lambda: select(Transaction.method, Transaction.artist_id, Artist.name,
+                                 func.sum(Transaction.amount), func.count())
+                  .select_from(Transaction)
+                  .outerjoin(Artist, Artist.id == Transaction.artist_id)
+                  .where(Transaction.deleted_flag == False,  # noqa: E712
+                         Transaction.date >= now, Transaction.date < now)
+                  .group_by(Transaction.method, Transaction.artist_id, Artist.name),
+                  frozenset({TEMP_BTREE})),  # agrupa las transacciones de un día
+        Statement("cash.sessions_day", "services/sessions.sessions_for_day (caja)",
+                  lambda: select(TattooSession.id, Client.name, TattooSession.price - select(
+                      func.coalesce(func.sum(Transaction.amount), 0.0))
+                      .where(Transaction.session_id == TattooSession.id,
+                             Transaction.deleted_flag == False).scalar_subquery())  # noqa: E712
+                  .outerjoin(Client, Client.id == TattooSession.client_id)
+                  .where(TattooSession.artist_id == 1, TattooSession.start >= now, TattooSession.start < now)
+                  .order_by(TattooSession.start.asc())),
+        Statement("staff.appointments", "services/sessions.artist_history (StaffDetailPage)",
+                  lambda: select(TattooSession.id, TattooSession.start, Client.name, TattooSession.status)
+                  .outerjoin(Client, Client.id == TattooSession.client_id)
+                  .where(TattooSession.artist_id == 1, TattooSession.start <= now,
+                         or_(TattooSession.start < now, TattooSession.id < 1))
+                  .order_by(TattooSession.start.desc(), TattooSession.id.desc()).limit(51),
+                  frozenset({TEMP_BTREE})),  # sólo desempata por id citas con el mismo inicio
+        Statement("staff.status_counts", "services/sessions.artist_status_counts",
+                  lambda: select(TattooSession.status, func.count())
+                  .where(TattooSession.artist_id == 1).group_by(TattooSession.status),
+                  frozenset({TEMP_BTREE})),  # pocos estados por artista
+        Statement("portfolio.for_user", "ui/pages/portfolios.PortfolioService.portfolio_for_user",
+                  lambda: select(PortfolioItem).where(PortfolioItem.user_id == 1)
+                  .order_by(PortfolioItem.created_at.desc(), PortfolioItem.id.desc()).limit(60)),
+        Statement("portfolio.counts_by_user", "ui/pages/portfolios.PortfolioService.users_with_counts",
+                  lambda: select(PortfolioItem.user_id, func.count(PortfolioItem.id))
+                  .where(PortfolioItem.user_id.isnot(None)).group_by(PortfolioItem.user_id)),
+        Statement("inventory.by_sku", "ui/pages/nueva_entrada · ajuste_producto",
+                  lambda: select(Product).where(Product.sku == "X").limit(1)),
+        Statement("inventory.moves", "services/inventory.list_movements",
+                  lambda: select(InventoryMovement)
+                  .where(InventoryMovement.kind == "Entrada", InventoryMovement.created_at >= now,
+                         InventoryMovement.created_at < now)
+                  .order_by(InventoryMovement.created_at.desc(), InventoryMovement.id.desc()).limit(50)),
+        Statement("inventory.low_stock", "services/inventory.low_stock_items",
+                  lambda: select(Product.name).where(Product.activo == True,  # noqa: E712
+                                                     Product.stock - Product.min_stock < 0)
+                  .order_by((Product.stock - Product.min_stock).asc()).limit(50)),
+        Statement("inventory.expiring", "services/inventory.expiring_items (productos sin lotes)",
+                  lambda: select(Product.name).where(Product.caduca == True,  # noqa: E712
+                                                     Product.fechacaducidad <= date(2025, 1, 1),
+                                                     ~exists().where(ProductLot.product_id == Product.id))
+                  .order_by(Product.fechacaducidad.asc()).limit(50)),
+        Statement("inventory.expiring_lots", "services/inventory.expiring_items (lotes)",
+                  lambda: select(ProductLot.lot_code, Product.name)
+                  .join(Product, Product.id == ProductLot.product_id)
+                  .where(ProductLot.qty > literal_column("0"), ProductLot.expires_on <= date(2025, 1, 1))
+                  .order_by(ProductLot.expires_on.asc()).limit(50)),
+        Statement("inventory.fefo", "services/inventory.pick_fefo",
+                  lambda: select(ProductLot.id, func.sum(ProductLot.qty).over(
+                      partition_by=ProductLot.product_id,
+                      order_by=(ProductLot.expires_on.asc().nulls_last(), ProductLot.id.asc())))
+                  .where(ProductLot.product_id.in_([1, 2]), ProductLot.qty > literal_column("0")),
+                  frozenset({FULL_SCAN})),  # recorre la co-rutina de la ventana, no la tabla
+        Statement("inventory.catalog", "services/inventory.list_products (página siguiente)",
+                  lambda: select(Product.id).where(
+                      Product.activo == True,  # noqa: E712
+                      Product.name.collate("NOCASE") >= "m",
+                      or_(Product.name.collate("NOCASE") > "m", Product.id > 1))
+                  .order_by(Product.name.collate("NOCASE"), Product.id).limit(21)),
+        Statement("inventory.search", "services/inventory.list_products(text=…)",
+                  lambda: select(Product.id).where(
+                      or_(Product.name.like("ab%", escape="\\"), Product.sku.like("ab%", escape="\\")))
+                  .order_by(Product.name.collate("NOCASE"), Product.id).limit(21),
+                  frozenset({TEMP_BTREE})),  # ordena sólo las coincidencias del prefijo
+        Statement("inventory.stock_at", "services/inventory.stock_at",
+                  lambda: select(InventoryMovement.balance)
+                  .where(InventoryMovement.product_id == 1, InventoryMovement.created_at <= now)
+                  .order_by(InventoryMovement.created_at.desc(), InventoryMovement.id.desc()).limit(1)),
+    ]
+
+
+# ------------------ EXPLAIN ------------------
+
+def explain(conn: Connection, stmt) -> List[str]:
+    """Líneas 'detail' de EXPLAIN QUERY PLAN (los valores de los parámetros no importan)."""
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(None for _ in (compiled.positiontup or ()))
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params).fetchall()
+    return [str(r[-1]) for r in rows]
+
+
+def classify(detail: str) -> Optional[str]:
+    d = detail.upper()
+    if "USE TEMP B-TREE" in d:
+        return TEMP_BTREE
+    if d.startswith("SCAN ") and " USING " not in d:
+        return FULL_SCAN
+    return None
+
+
+def _row_count(conn: Connection, table: str, cache: Dict[str, int]) -> int:
+    if table not in cache:
+        try:
+            cache[table] = int(conn.exec_driver_sql(f'SELECT count(*) FROM "{table}"').scalar() or 0)
+        except Exception:
+            cache[table] = 1 << 62  # alias/tabla desconocida: no se asume chica
+    return cache[table]
+
+
+def analyze(
+    engine: Engine,
+    statements: Optional[List[Statement]] = None,
+    min_rows: int = DEFAULT_MIN_ROWS,
+) -> List[Dict[str, object]]:
+    """Una fila por consulta: plan, hallazgos y cuáles no estaban permitidos."""
+    out: List[Dict[str, object]] = []
+    counts: Dict[str, int] = {}
+    with engine.connect() as conn:
+        for st in statements or catalog():
+            plan = explain(conn, st.build())
+            findings = [(k, d) for d in plan for k in [classify(d)] if k]
+            unexpected = [
+                (k, d) for k, d in findings
+                if k not in st.allow
+                and not (k == FULL_SCAN and _row_count(conn, d.split()[1], counts) < min_rows)
+            ]
+            out.append({
+                "name": st.name,
+                "origin": st.origin,
+                "plan": plan,
+                "findings": findings,
+                "unexpected": unexpected,
+            })
+    return out
+
+
+def format_report(rows: List[Dict[str, object]], verbose: bool = False) -> str:
+    width = max(len("consulta"), *(len(str(r["name"])) for r in rows)) if rows else 10
+    lines = [f"{'consulta':<{width}}  estado      detalle"]
+    for r in rows:
+        if r["unexpected"]:
+            status, detail = "REVISAR", "; ".join(d for _k, d in r["unexpected"])
+        elif r["findings"]:
+            status, detail = "esperado", "; ".join(d for _k, d in r["findings"])
+        else:
+            status, detail = "ok", (r["plan"] or [""])[0]
+        lines.append(f"{r['name']:<{width}}  {status:<10}  {detail}")
+        if verbose:
+            lines.append(f"{'':<{width}}  ↳ {r['origin']}")
+            lines.extend(f"{'':<{width}}    {d}" for d in r["plan"])
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m data.tools.index_advisor", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--db", default=None, help="ruta a la BD (por defecto DB_PATH / dev.db)")
+    ap.add_argument("--verbose", action="store_true")
+    ap.add_argument("--min-rows", type=int, default=DEFAULT_MIN_ROWS,
+                    help="no marcar recorridos completos de tablas con menos filas")
+    args = ap.parse_args(argv)
+
+    if args.db:
+        engine = create_engine(f"sqlite:///{args.db}", future=True)
+    else:
+        from data.db.session import engine
+    rows = analyze(engine, min_rows=args.min_rows)
+    print(format_report(rows, args.verbose))
+    bad = [r for r in rows if r["unexpected"]]
+    if bad:
+        print(f"\n{len(bad)} consulta(s) con recorridos completos o B-trees temporales no esperados.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,14 +9,33 @@ Qué hace (en este orden):
 
 El seeder es **idempotente** a nivel de colecciones: si ya hay filas,
 no vuelve a insertar ese bloque (evita duplicados al correr varias veces).
+
+Modo masivo (pruebas de carga):
+  python -m data.tools.seed --scale 1m [--seed 42] [--workers 4] [--batch 50000] [--anchor 2025-01-31]
+
+  - Genera clientes, artistas, sesiones, transacciones, portafolio y productos
+    de forma determinista (misma semilla → mismas filas) y en paralelo por
+    bloques de días (multiprocessing).
+  - Inserta con Core (executemany) en lotes grandes; los índices de esas
+    tablas se eliminan antes de cargar y se reconstruyen al final.
+  - Distribuciones: sábados y viernes cargados, tardes más llenas que mañanas,
+    clientes recurrentes (pocos clientes concentran muchas citas), artistas
+    con distinta demanda, cancelaciones y pagos con pesos realistas.
+  - Exige tablas vacías (apunta DB_PATH a un archivo nuevo).
 """
 
+import argparse
+import math
 import os
 import random
-from datetime import datetime, timedelta
-from typing import List
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from faker import Faker
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from data.db.session import SessionLocal, init_db
@@ -28,12 +47,16 @@ from data.models.session_tattoo import TattooSession
 from data.models.transaction import Transaction
 
 # Usuarios
-from services.auth import hash_password
+from services.auth import MIN_ROUNDS, configured_rounds, hash_password
 from data.models.user import User
 
 fake = Faker("es_MX")
 random.seed(42)  # reproducible
 
+# Costo de bcrypt explícito: el seeder no calibra ni toca settings (corre dentro de
+# su propia transacción). Si luego se fija un costo mayor, el login sube el hash.
+SEED_ROUNDS = configured_rounds() or MIN_ROUNDS
+
 
 # ----------------------------
 #  BLOQUES DE SEED
@@ -152,7 +175,7 @@ def seed_users(db: Session) -> None:
     if "admin" not in existing:
         db.add(User(
             username="admin",
-            password_hash=hash_password("admin123"),
+            password_hash=hash_password("admin123", rounds=SEED_ROUNDS),
             role="admin",
             is_active=True,
         ))
@@ -161,7 +184,7 @@ def seed_users(db: Session) -> None:
     if "assistant" not in existing:
         db.add(User(
             username="assistant",
-            password_hash=hash_password("assistant123"),
+            password_hash=hash_password("assistant123", rounds=SEED_ROUNDS),
             role="assistant",
             is_active=True,
         ))
@@ -171,24 +194,377 @@ def seed_users(db: Session) -> None:
         artist = db.query(Artist).filter(Artist.name == "Jesus Esquer").first() or db.query(Artist).first()
         db.add(User(
             username="jesus",
-            password_hash=hash_password("tattoo123"),
+            password_hash=hash_password("tattoo123", rounds=SEED_ROUNDS),
             role="artist",
             artist_id=artist.id if artist else None,
             is_active=True,
         ))
 
 
+# ----------------------------
+#  MODO MASIVO (--scale)
+# ----------------------------
+
+BULK_TABLES = ("clients", "artists", "users", "sessions", "transactions", "portfolio_items", "products")
+
+# Peso relativo por día de la semana (lunes=0 … domingo=6): sábados cargados
+WEEKDAY_WEIGHTS = (0.55, 0.75, 0.85, 1.0, 1.45, 2.1, 0.35)
+# Hora de la primera cita del día (las tardes se llenan más)
+FIRST_SLOT_HOURS = (10, 11, 12, 13, 14, 15, 16)
+FIRST_SLOT_WEIGHTS = (3, 3, 4, 5, 4, 3, 2)
+DURATIONS_H = (1, 2, 3, 4)
+DURATION_WEIGHTS = (3, 5, 3, 1)
+METHODS = ("Efectivo", "Tarjeta", "Transferencia")
+METHOD_WEIGHTS = (45, 40, 15)
+PRICE_BY_HOURS = {1: (600, 800, 1000), 2: (1200, 1400, 1800), 3: (2000, 2200, 2800), 4: (3200, 3800, 4500)}
+MAX_SESSIONS_PER_ARTIST_DAY = 4
+# Bloques de trabajo fijos: el resultado no depende de --workers ni --batch
+DAYS_PER_JOB = 30
+CLIENTS_PER_JOB = 25_000
+PRODUCT_CATEGORIES = ("consumibles", "tintas", "agujas", "higiene", "aftercare", "mobiliario")
+SERVICES = ("Tatuaje", "Retoque", "Cover up", "Fine line", "Lettering", "Realismo", "Tradicional")
+
+
+def _parse_scale(raw: str) -> int:
+    """'50k' → 50000, '1.5m' → 1500000, '2000' → 2000."""
+    s = raw.strip().lower().replace("_", "")
+    mult = 1
+    if s.endswith("k"):
+        mult, s = 1_000, s[:-1]
+    elif s.endswith("m"):
+        mult, s = 1_000_000, s[:-1]
+    return int(float(s) * mult)
+
+
+def bulk_shape(n_sessions: int) -> Dict[str, int]:
+    """Dimensiona el estudio sintético a partir del número de sesiones."""
+    days = max(90, min(5 * 365, n_sessions // 40))
+    per_day = n_sessions / days
+    # El sábado (día más cargado) llena ~80% de la capacidad del estudio
+    peak = per_day * max(WEEKDAY_WEIGHTS) / (sum(WEEKDAY_WEIGHTS) / 7) * 1.15
+    artists = max(4, math.ceil(peak / (MAX_SESSIONS_PER_ARTIST_DAY * 0.8)))
+    return {
+        "sessions": n_sessions,
+        "days": days,
+        "artists": artists,
+        "clients": max(40, n_sessions // 4),
+        "products": max(60, min(50_000, n_sessions // 50)),
+    }
+
+
+def _day_quotas(n_sessions: int, days: int, anchor: date, rnd: random.Random) -> List[Tuple[int, int]]:
+    """
+    Reparte n_sessions entre días (≈85% pasado, 15% futuro) según el peso del
+    día de la semana, con método de residuo mayor. → [(ordinal_del_día, cupo)]
+    """
+    future = max(14, days // 6)
+    first = anchor.toordinal() - (days - future)
+    ordinals = list(range(first, first + days))
+    weights = [WEEKDAY_WEIGHTS[date.fromordinal(o).weekday()] * rnd.uniform(0.85, 1.15) for o in ordinals]
+    total_w = sum(weights)
+    raw = [n_sessions * w / total_w for w in weights]
+    quotas = [int(x) for x in raw]
+    missing = n_sessions - sum(quotas)
+    by_rem = sorted(range(days), key=lambda i: raw[i] - quotas[i], reverse=True)
+    for i in by_rem[:missing]:
+        quotas[i] += 1
+    return list(zip(ordinals, quotas))
+
+
+def _name_pools(seed: int) -> Tuple[List[str], List[str]]:
+    """Pools de nombres/apellidos (Faker una sola vez; luego se combinan)."""
+    Faker.seed(seed)
+    f = Faker("es_MX")
+    firsts = sorted({f.first_name() for _ in range(600)})
+    lasts = sorted({f.last_name() for _ in range(600)})
+    return firsts, lasts
+
+
+def _gen_clients_chunk(args) -> List[tuple]:
+    """Worker: filas de clientes [id_from, id_to) con semilla propia por bloque."""
+    seed, idx, id_from, id_to, firsts, lasts, n_artists, anchor_ord, days = args
+    rnd = random.Random(f"clients:{seed}:{idx}")
+    anchor = datetime.combine(date.fromordinal(anchor_ord), datetime.min.time())
+    out = []
+    for cid in range(id_from, id_to):
+        fn, ln = rnd.choice(firsts), rnd.choice(lasts)
+        slug = f"{fn}.{ln}".lower().replace(" ", "")
+        out.append((
+            cid,
+            f"{fn} {ln} {rnd.choice(lasts)}",
+            f"55{rnd.randrange(10**8):08d}",
+            f"{slug}{cid}@example.com" if rnd.random() < 0.8 else None,
+            slug[:28] if rnd.random() < 0.55 else None,
+            anchor - timedelta(days=rnd.randrange(days), minutes=rnd.randrange(1440)),
+            rnd.randint(1, n_artists) if rnd.random() < 0.6 else None,
+        ))
+    return out
+
+
+def _gen_sessions_chunk(args) -> List[tuple]:
+    """
+    Worker: sesiones para un bloque de días. Por día, reparte el cupo entre
+    artistas (pesos de demanda) y encadena las citas de cada artista sin
+    traslapes. Cliente: sesgado hacia pocos clientes recurrentes.
+    → [(client_id, artist_id, start, end, status, price, notes, method|None, deleted, in_portfolio)]
+    """
+    seed, idx, day_quotas, artist_weights, n_clients, anchor_ord = args
+    rnd = random.Random(f"sessions:{seed}:{idx}")
+    artist_ids = list(range(1, len(artist_weights) + 1))
+    out = []
+    for ordinal, quota in day_quotas:
+        day = datetime.combine(date.fromordinal(ordinal), datetime.min.time())
+        is_past = ordinal < anchor_ord
+        per_artist: Dict[int, int] = {}
+        ids, weights = list(artist_ids), list(artist_weights)
+        for _ in range(quota):
+            k = rnd.choices(range(len(ids)), weights=weights)[0]
+            aid = ids[k]
+            per_artist[aid] = per_artist.get(aid, 0) + 1
+            if per_artist[aid] >= MAX_SESSIONS_PER_ARTIST_DAY:
+                # Agenda llena: sale del sorteo de ese día
+                del ids[k], weights[k]
+        for aid in sorted(per_artist):
+            cursor = day + timedelta(
+                hours=rnd.choices(FIRST_SLOT_HOURS, weights=FIRST_SLOT_WEIGHTS)[0],
+                minutes=rnd.choice((0, 30)),
+            )
+            for _ in range(per_artist[aid]):
+                hours = rnd.choices(DURATIONS_H, weights=DURATION_WEIGHTS)[0]
+                start, end = cursor, cursor + timedelta(hours=hours)
+                cursor = end + timedelta(minutes=rnd.choice((0, 30, 60)))
+                # Clientes recurrentes: distribución sesgada hacia ids bajos
+                cid = 1 + int((n_clients - 1) * (rnd.random() ** 2.4))
+                price = float(rnd.choice(PRICE_BY_HOURS[hours]))
+                r = rnd.random()
+                if is_past:
+                    status = "Completada" if r < 0.86 else ("Cancelada" if r < 0.97 else "Activa")
+                else:
+                    status = "Activa" if r < 0.88 else ("En espera" if r < 0.96 else "Cancelada")
+                method = None
+                deleted = False
+                in_portfolio = False
+                if status == "Completada":
+                    method = rnd.choices(METHODS, weights=METHOD_WEIGHTS)[0]
+                    deleted = rnd.random() < 0.01
+                    in_portfolio = rnd.random() < 0.12
+                notes = rnd.choice(SERVICES)
+                if status == "Cancelada" and rnd.random() < 0.3:
+                    notes = "[No-show] " + notes
+                out.append((cid, aid, start, end, status, price, notes, method, deleted, in_portfolio))
+    return out
+
+
+def _chunks(seq: Sequence, size: int) -> Iterable[Sequence]:
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def _map(fn, jobs: List[tuple], workers: int):
+    """map ordenado: en paralelo si workers>1, si no en el proceso actual."""
+    if workers <= 1 or len(jobs) <= 1:
+        for j in jobs:
+            yield fn(j)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(fn, jobs)
+
+
+def _drop_indexes(conn) -> List[str]:
+    """Elimina índices (no automáticos) de las tablas masivas; devuelve su DDL."""
+    placeholders = ", ".join(f"'{t}'" for t in BULK_TABLES)
+    rows = conn.execute(text(
+        f"SELECT name, sql FROM sqlite_master WHERE type='index' AND sql IS NOT NULL "
+        f"AND tbl_name IN ({placeholders})"
+    )).all()
+    for name, _sql in rows:
+        conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+    return [sql for _name, sql in rows]
+
+
+def bulk_seed(
+    n_sessions: int,
+    seed: int = 42,
+    workers: Optional[int] = None,
+    batch: int = 50_000,
+    anchor: Optional[date] = None,
+) -> Dict[str, int]:
+    """
+    Carga masiva determinista sobre la BD de DB_PATH (tablas vacías).
+    Devuelve el conteo por tabla.
+    """
+    from data.db.session import engine
+    from data.models.portfolio import PortfolioItem
+
+    load_all_models()
+    init_db()
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    anchor = anchor or date.today()
+    rnd = random.Random(seed)
+    shape = bulk_shape(n_sessions)
+    t0 = time.perf_counter()
+
+    def log(msg: str) -> None:
+        print(f"[seed {time.perf_counter() - t0:7.1f}s] {msg}", flush=True)
+
+    with engine.connect() as conn:
+        for t in BULK_TABLES:
+            if conn.execute(text(f"SELECT 1 FROM {t} LIMIT 1")).first():
+                raise SystemExit(f"La tabla '{t}' ya tiene filas; usa DB_PATH con un archivo nuevo para --scale.")
+
+    counts = {t: 0 for t in BULK_TABLES}
+    with engine.begin() as conn:
+        # Carga sin journal ni fsync; es una BD de pruebas recién creada
+        conn.execute(text("PRAGMA synchronous=OFF"))
+        conn.execute(text("PRAGMA cache_size=-200000"))
+        conn.execute(text("PRAGMA temp_store=MEMORY"))
+        index_ddl = _drop_indexes(conn)
+        log(f"{len(index_ddl)} índices eliminados; forma: {shape}")
+
+        # --- Artistas + usuarios ligados (un solo hash bcrypt para todos) ---
+        artist_weights = [round(rnd.lognormvariate(0, 0.45), 4) for _ in range(shape["artists"])]
+        artist_rates = [rnd.choice((0.40, 0.45, 0.50, 0.55, 0.60)) for _ in range(shape["artists"])]
+        firsts, lasts = _name_pools(seed)
+        conn.execute(Artist.__table__.insert(), [
+            {"id": i + 1, "name": f"{rnd.choice(firsts)} {rnd.choice(lasts)}",
+             "rate_commission": artist_rates[i], "active": rnd.random() < 0.95}
+            for i in range(shape["artists"])
+        ])
+        pw = hash_password("tattoo123", rounds=SEED_ROUNDS)
+        conn.execute(User.__table__.insert(), [
+            {"username": f"artist{i + 1}", "password_hash": pw, "role": "artist",
+             "artist_id": i + 1, "is_active": True, "name": f"Artista {i + 1}"}
+            for i in range(shape["artists"])
+        ])
+        counts["artists"] = counts["users"] = shape["artists"]
+        user_by_artist = {
+            aid: uid for uid, aid in conn.execute(text("SELECT id, artist_id FROM users WHERE artist_id IS NOT NULL"))
+        }
+
+        # --- Clientes (paralelo por bloques) ---
+        n_clients = shape["clients"]
+        step = CLIENTS_PER_JOB
+        jobs = [
+            (seed, i, lo, min(lo + step, n_clients + 1), firsts, lasts, shape["artists"], anchor.toordinal(), shape["days"])
+            for i, lo in enumerate(range(1, n_clients + 1, step))
+        ]
+        cols = ("id", "name", "phone", "email", "instagram", "created_at", "preferred_artist_id")
+        for rows in _map(_gen_clients_chunk, jobs, workers):
+            conn.execute(Client.__table__.insert(), [
+                dict(zip(cols, r), is_active=True) for r in rows
+            ])
+            counts["clients"] += len(rows)
+        log(f"{counts['clients']:,} clientes")
+
+        # --- Sesiones + transacciones + portafolio (paralelo por bloques de días) ---
+        quotas = _day_quotas(n_sessions, shape["days"], anchor, rnd)
+        if max(q for _o, q in quotas) > shape["artists"] * MAX_SESSIONS_PER_ARTIST_DAY:
+            raise SystemExit("Cupo diario mayor que la capacidad de los artistas; revisa bulk_shape().")
+        jobs = [
+            (seed, i, list(block), artist_weights, n_clients, anchor.toordinal())
+            for i, block in enumerate(_chunks(quotas, DAYS_PER_JOB))
+        ]
+        sid = 0
+        pid = 0
+        s_buf: List[dict] = []
+        t_buf: List[dict] = []
+        p_buf: List[dict] = []
+
+        def flush(force: bool = False) -> None:
+            # Se vacían juntos: transacciones/portafolio referencian sesiones del mismo lote
+            if not s_buf or (len(s_buf) < batch and not force):
+                return
+            conn.execute(TattooSession.__table__.insert(), s_buf)
+            if t_buf:
+                conn.execute(Transaction.__table__.insert(), t_buf)
+            if p_buf:
+                conn.execute(PortfolioItem.__table__.insert(), p_buf)
+            counts["sessions"] += len(s_buf)
+            counts["transactions"] += len(t_buf)
+            counts["portfolio_items"] += len(p_buf)
+            s_buf.clear(); t_buf.clear(); p_buf.clear()
+
+        for rows in _map(_gen_sessions_chunk, jobs, workers):
+            for (cid, aid, start, end, status, price, notes, method, deleted, in_portfolio) in rows:
+                sid += 1
+                s_buf.append({
+                    "id": sid, "client_id": cid, "artist_id": aid, "start": start, "end": end,
+                    "status": status, "price": price, "notes": notes,
+                })
+                if method is not None:
+                    t_buf.append({
+                        "session_id": sid, "artist_id": aid, "amount": price, "method": method,
+                        "concept": "", "date": end,
+                        "commission_amount": round(price * artist_rates[aid - 1], 2),
+                        "deleted_flag": deleted, "created_at": end, "updated_at": end,
+                    })
+                if in_portfolio:
+                    pid += 1
+                    p_buf.append({
+                        "id": pid, "artist_id": aid, "user_id": user_by_artist.get(aid), "client_id": cid,
+                        "session_id": sid, "path": f"assets/uploads/portfolios/{user_by_artist.get(aid)}/{pid}.png",
+                        "is_public": True, "is_cover": False, "created_at": end,
+                    })
+            flush()
+            log(f"{counts['sessions'] + len(s_buf):,} sesiones generadas")
+        flush(force=True)
+
+        # --- Productos ---
+        today = anchor
+        products = []
+        for i in range(1, shape["products"] + 1):
+            caduca = rnd.random() < 0.4
+            min_stock = rnd.randint(0, 40)
+            products.append({
+                "id": i, "sku": f"SKU-{i:06d}", "name": f"{rnd.choice(PRODUCT_CATEGORIES).capitalize()} {i}",
+                "category": rnd.choice(PRODUCT_CATEGORIES), "unidad": rnd.choice(("pieza", "caja", "ml", "par")),
+                "cost": float(rnd.randint(10, 900)), "stock": max(0, int(rnd.gauss(min_stock * 2, 15))),
+                "min_stock": min_stock, "caduca": caduca, "proveedor": f"Proveedor {rnd.randint(1, 30)}",
+                "activo": rnd.random() < 0.95,
+                "fechacaducidad": (today + timedelta(days=rnd.randint(-30, 540))) if caduca else None,
+            })
+        for chunk in _chunks(products, batch):
+            conn.execute(Product.__table__.insert(), list(chunk))
+        counts["products"] = len(products)
+
+        # --- Índices al final + estadísticas del planificador ---
+        log("reconstruyendo índices…")
+        for ddl in index_ddl:
+            conn.execute(text(ddl))
+        conn.execute(text("ANALYZE"))
+
+    with SessionLocal() as db:
+        with db.begin():
+            seed_users(db)
+        counts["users"] = db.query(User).count()
+    log(f"listo: {counts}")
+    return counts
+
+
 # ----------------------------
 #  ENTRYPOINT
 # ----------------------------
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """
     Punto de entrada del seeder:
-      - Carga modelos y crea tablas.
-      - Ejecuta cada bloque de seed (idempotentes).
-      - Commit/rollback seguro.
+      - Sin argumentos: seed de desarrollo (idempotente, pocos datos).
+      - Con --scale: carga masiva determinista (ver docstring del módulo).
     """
+    ap = argparse.ArgumentParser(prog="python -m data.tools.seed")
+    ap.add_argument("--scale", help="número de sesiones para el modo masivo (p. ej. 50k, 1m)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workers", type=int, default=None, help="procesos generadores (default: CPUs-1)")
+    ap.add_argument("--batch", type=int, default=50_000, help="filas por executemany")
+    ap.add_argument("--anchor", type=date.fromisoformat, default=None,
+                    help="fecha 'hoy' del estudio sintético (YYYY-MM-DD); fija el resultado entre días")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.scale:
+        bulk_seed(_parse_scale(args.scale), seed=args.seed, workers=args.workers,
+                  batch=args.batch, anchor=args.anchor)
+        return
+
     # Para dev: usa dev.db en la raíz si no se ha configurado DB_PATH
     os.environ.setdefault("DB_PATH", "./dev.db")
 
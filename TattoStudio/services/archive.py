@@ -0,0 +1,377 @@
+# services/archive.py
+"""
+Archivo frío: historia cerrada fuera de la BD de todos los días.
+
+Con los años, sessions y transactions se llenan de citas terminadas que sólo
+tocan los reportes de fin de año, pero cada consulta de agenda, clientes y
+caja recorre índices que las incluyen. archive_old() mueve a archive.db
+(junto al .db, o ARCHIVE_DB_PATH):
+
+  - sesiones Completada/Cancelada que terminaron antes del corte (hace N
+    meses) y que no tienen cobros posteriores ni piezas de portafolio
+  - sus transacciones y las sueltas (sin sesión) anteriores al corte
+  - los renglones de liquidación (payout_lines) de esas transacciones
+
+Lo de todos los días sólo ve el archivo caliente. Lo que mira hacia atrás
+(reportes, liquidaciones, historial del tatuador, ficha del cliente) hace
+UNION ALL con el archivo adjunto (ATTACH ... AS archive) cuando existe y,
+para rangos, sólo si el rango empieza antes del corte (horizon()).
+
+  attach(db)            -> bool   adjunta archive.db a la conexión (si existe)
+  horizon(db)           -> datetime | None  corte del último archivado
+  reaches_back(db, t)   -> bool   ¿un rango que empieza en t necesita el archivo?
+  archive_old(months)   -> (sesiones, transacciones) movidas
+  restore(after=None, session_ids=None) -> (sesiones, transacciones) devueltas
+
+Los cortes de caja bloquean con triggers tocar transacciones de días
+cerrados. Archivar no cambia lo cobrado (las filas siguen, en el otro
+archivo) y el corte guarda su propia foto, así que los triggers se quitan y
+se vuelven a crear DENTRO de la misma transacción: ninguna otra conexión ve
+la caja abierta.
+
+  python -m services.archive --months 24
+  python -m services.archive --restore-after 2023-01-01
+"""
+from __future__ import annotations
+
+import argparse
+import calendar
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, Table, bindparam, func, insert, select, text,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.types import NullType
+
+from data.db.session import session_scope
+from data.models import load_all_models
+from data.models.cash_close import LOCK_TRIGGERS
+from data.models.payout import PayoutLine
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services.scoping import OWNERS
+
+ALIAS = "archive"
+DEFAULT_MONTHS = 24
+TX_LOCKS = ("trg_tx_closed_insert", "trg_tx_closed_update", "trg_tx_closed_delete")
+
+# ------------------ Tablas del archivo ------------------
+# Mismas columnas que las calientes, sin llaves foráneas (viven en otro archivo).
+# Una llave foránea toma su tipo de la tabla a la que apunta, que puede no estar
+# cargada al importar este módulo: _resolve_types() lo copia en el primer attach().
+
+metadata = MetaData()
+
+
+def _cold(table: Table) -> Table:
+    return Table(
+        table.name, metadata,
+        *[Column(c.name, c.type, primary_key=c.primary_key) for c in table.columns],
+        schema=ALIAS,
+    )
+
+
+sessions = _cold(TattooSession.__table__)
+transactions = _cold(Transaction.__table__)
+payout_lines = _cold(PayoutLine.__table__)
+runs = Table(
+    "archive_runs", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("ran_at", DateTime, nullable=False),
+    Column("cutoff", DateTime, nullable=False),
+    Column("sessions", Integer, nullable=False),
+    Column("transactions", Integer, nullable=False),
+    schema=ALIAS,
+)
+
+Index("ix_archive_sessions_client_start", sessions.c.client_id, sessions.c.start)
+Index("ix_archive_sessions_artist_start", sessions.c.artist_id, sessions.c.start)
+Index("ix_archive_tx_date", transactions.c.date)
+Index("ix_archive_tx_session", transactions.c.session_id)
+Index("ix_archive_payout_lines_payout", payout_lines.c.payout_id)
+
+_HOT = ((sessions, TattooSession.__table__), (transactions, Transaction.__table__),
+        (payout_lines, PayoutLine.__table__))
+
+_typed = False
+
+
+def _resolve_types() -> None:
+    global _typed
+    if _typed:
+        return
+    load_all_models()
+    for cold, hot in _HOT:
+        for c in cold.columns:
+            if isinstance(c.type, NullType):
+                c.type = hot.c[c.name].type
+    _typed = True
+
+
+# scope("agenda"/"reports", ..., archive.sessions / archive.transactions)
+OWNERS[sessions] = lambda artist_id, _user_id: sessions.c.artist_id == artist_id
+OWNERS[transactions] = lambda artist_id, _user_id: transactions.c.artist_id == artist_id
+
+
+# ------------------ Adjuntar ------------------
+
+def archive_path(bind) -> Optional[Path]:
+    """archive.db junto al .db de 'bind' (o ARCHIVE_DB_PATH); None para BDs en memoria."""
+    env = os.getenv("ARCHIVE_DB_PATH")
+    if env:
+        return Path(env)
+    database = bind.url.database
+    if not database or database == ":memory:":
+        return None
+    return Path(database).resolve().with_name("archive.db")
+
+
+def attach(db: Union[Session, Connection], *, create: bool = False) -> bool:
+    """
+    Adjunta el archivo a la conexión (una vez por conexión del pool; sin
+    archivo no ejecuta nada). create=True lo crea con su esquema.
+    """
+    _resolve_types()
+    conn = db.connection() if isinstance(db, Session) else db
+    if conn.info.get(ALIAS):
+        return True
+    path = archive_path(conn.engine)
+    if path is None or (not create and not path.exists()):
+        return False
+    try:
+        conn.exec_driver_sql(f"ATTACH DATABASE ? AS {ALIAS}", (str(path),))
+    except OperationalError:
+        if create:
+            raise
+        return False   # la conexión ya escribió en esta transacción: esta vez sin archivo
+    conn.info[ALIAS] = str(path)
+    if create:
+        metadata.create_all(conn)
+        _sync_columns(conn)
+    return True
+
+
+def _sync_columns(conn: Connection) -> None:
+    """Columnas que una migración agregó a la tabla caliente después del primer archivado."""
+    for cold, hot in _HOT:
+        have = {r[1] for r in conn.exec_driver_sql(f"PRAGMA {ALIAS}.table_info({cold.name})")}
+        for c in hot.columns:
+            if c.name not in have:
+                conn.exec_driver_sql(
+                    f'ALTER TABLE {ALIAS}.{cold.name} ADD COLUMN "{c.name}" {c.type.compile(conn.dialect)}'
+                )
+
+
+def horizon(db: Session) -> Optional[datetime]:
+    """Corte del último archivado (todo lo archivado es anterior) o None sin archivo."""
+    if not attach(db):
+        return None
+    return db.execute(select(func.max(runs.c.cutoff))).scalar()
+
+
+def reaches_back(db: Session, start: Optional[datetime]) -> bool:
+    h = horizon(db)
+    return h is not None and (start is None or start < h)
+
+
+def total_paid():
+    """Pagado de una sesión archivada (como TattooSession.total_paid)."""
+    return (
+        select(func.coalesce(func.sum(transactions.c.amount), 0.0))
+        .where(transactions.c.session_id == sessions.c.id, transactions.c.deleted_flag == False)  # noqa: E712
+        .correlate(sessions)
+        .scalar_subquery()
+    )
+
+
+def has_client_sessions(db: Session, client_id: int) -> bool:
+    if not attach(db):
+        return False
+    return db.execute(select(sessions.c.id).where(sessions.c.client_id == int(client_id)).limit(1)).first() is not None
+
+
+# ------------------ Mover / devolver ------------------
+
+def months_before(now: datetime, months: int) -> datetime:
+    """Medianoche del mismo día 'months' meses antes (día ajustado a fin de mes)."""
+    y, m = divmod(now.year * 12 + now.month - 1 - int(months), 12)
+    day = min(now.day, calendar.monthrange(y, m + 1)[1])
+    return datetime(y, m + 1, day)
+
+
+def _columns(table: Table) -> str:
+    return ", ".join(f'"{c.name}"' for c in table.columns)
+
+
+def _copy(conn: Connection, src: str, dst: str, table: Table, key: str, ids: str) -> int:
+    cols = _columns(table)
+    # al archivo: OR REPLACE (repetir tras una corrida interrumpida); de vuelta, un
+    # id ocupado en el caliente es un error, nunca se pisa
+    verb = "INSERT OR REPLACE" if dst == ALIAS else "INSERT"
+    return conn.exec_driver_sql(
+        f"{verb} INTO {dst}.{table.name} ({cols}) "
+        f"SELECT {cols} FROM {src}.{table.name} WHERE {key} IN (SELECT id FROM temp.{ids})"
+    ).rowcount
+
+
+def _delete(conn: Connection, schema: str, table: Table, key: str, ids: str) -> None:
+    conn.exec_driver_sql(f"DELETE FROM {schema}.{table.name} WHERE {key} IN (SELECT id FROM temp.{ids})")
+
+
+@contextmanager
+def _locks_lifted(conn: Connection) -> Iterator[None]:
+    """Quita los triggers de caja cerrada y los recrea al salir (misma transacción)."""
+    present = {r[0] for r in conn.exec_driver_sql("SELECT name FROM main.sqlite_master WHERE type = 'trigger'")}
+    lifted = [name for name in TX_LOCKS if name in present]
+    for name in lifted:
+        conn.exec_driver_sql(f"DROP TRIGGER main.{name}")
+    yield
+    for sql in LOCK_TRIGGERS:
+        if any(f"EXISTS {name}\n" in sql for name in lifted):
+            conn.exec_driver_sql(sql)
+
+
+@contextmanager
+def _id_tables(conn: Connection, *names: str) -> Iterator[None]:
+    for name in names:
+        conn.exec_driver_sql(f"CREATE TEMP TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY)")
+        conn.exec_driver_sql(f"DELETE FROM temp.{name}")
+    try:
+        yield
+    finally:
+        for name in names:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS temp.{name}")
+
+
+def _move(conn: Connection, src: str, dst: str) -> Tuple[int, int]:
+    """Copia a 'dst' lo de temp._ids_s / temp._ids_t y lo borra de 'src'."""
+    # temp._ids_* ya abrió la transacción (DELETE/INSERT): quitar triggers (DDL) entra en ella
+    n_s = _copy(conn, src, dst, TattooSession.__table__, "id", "_ids_s")
+    # BD sin la migración de liquidaciones: no hay renglones que mover
+    lines = conn.exec_driver_sql(
+        "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'payout_lines'"
+    ).first() is not None
+    with _locks_lifted(conn):
+        n_t = _copy(conn, src, dst, Transaction.__table__, "id", "_ids_t")
+        if lines:
+            _copy(conn, src, dst, PayoutLine.__table__, "transaction_id", "_ids_t")
+            # hijos antes que padres: sin SET NULL ni RESTRICT a medio camino
+            _delete(conn, src, PayoutLine.__table__, "transaction_id", "_ids_t")
+        _delete(conn, src, Transaction.__table__, "id", "_ids_t")
+        _delete(conn, src, TattooSession.__table__, "id", "_ids_s")
+    return n_s, n_t
+
+
+def _changed() -> None:
+    from services import client_profile
+    client_profile.invalidate()   # dueño/última cita pueden venir ahora del otro archivo
+
+
+def archive_old(months: int = DEFAULT_MONTHS, *, now: Optional[datetime] = None,
+                db: Optional[Session] = None) -> Tuple[int, int]:
+    """Mueve al archivo la historia cerrada anterior a hace 'months' meses. -> (sesiones, transacciones)"""
+    cutoff = months_before(now or datetime.now(), months)
+    with session_scope(db) as s:
+        conn = s.connection()
+        attach(conn, create=True)
+        with _id_tables(conn, "_ids_s", "_ids_t"):
+            pick = text(
+                # el id más alto se queda: SQLite (sin AUTOINCREMENT) lo volvería a dar
+                "INSERT INTO temp._ids_s (id) SELECT s.id FROM main.sessions s "
+                "WHERE s.status IN ('Completada', 'Cancelada') AND s.\"end\" < :cutoff "
+                "AND s.id < (SELECT max(id) FROM main.sessions) "
+                "AND NOT EXISTS (SELECT 1 FROM main.transactions t WHERE t.session_id = s.id "
+                "                AND (t.date >= :cutoff OR t.id = (SELECT max(id) FROM main.transactions) "
+                "                     OR EXISTS (SELECT 1 FROM main.portfolio_items p WHERE p.transaction_id = t.id))) "
+                "AND NOT EXISTS (SELECT 1 FROM main.portfolio_items p WHERE p.session_id = s.id)"
+            ).bindparams(bindparam("cutoff", type_=DateTime))
+            conn.execute(pick, {"cutoff": cutoff})
+            pick_tx = text(
+                "INSERT INTO temp._ids_t (id) SELECT t.id FROM main.transactions t "
+                "WHERE t.session_id IN (SELECT id FROM temp._ids_s) "
+                "OR (t.session_id IS NULL AND t.date < :cutoff "
+                "    AND t.id < (SELECT max(id) FROM main.transactions) "
+                "    AND NOT EXISTS (SELECT 1 FROM main.portfolio_items p WHERE p.transaction_id = t.id))"
+            ).bindparams(bindparam("cutoff", type_=DateTime))
+            conn.execute(pick_tx, {"cutoff": cutoff})
+            n_s, n_t = _move(conn, "main", ALIAS)
+            conn.execute(insert(runs).values(ran_at=datetime.now(), cutoff=cutoff, sessions=n_s, transactions=n_t))
+        s.commit()
+    _changed()
+    return n_s, n_t
+
+
+def restore(after: Optional[datetime] = None, *, session_ids: Optional[Iterable[int]] = None,
+            db: Optional[Session] = None) -> Tuple[int, int]:
+    """
+    Devuelve al archivo caliente sesiones archivadas (las que empiezan desde
+    'after', las de 'session_ids' o, sin filtros, todas) con sus transacciones;
+    con 'after' también las transacciones sueltas desde esa fecha.
+    -> (sesiones, transacciones)
+    """
+    ids: Sequence[int] = [int(i) for i in session_ids or ()]
+    with session_scope(db) as s:
+        conn = s.connection()
+        if not attach(conn):
+            return 0, 0
+        with _id_tables(conn, "_ids_s", "_ids_t"):
+            where: List[str] = []
+            if after is not None:
+                where.append("s.start >= :after")
+            if ids:
+                where.append(f"s.id IN ({', '.join(str(i) for i in ids)})")
+            params = {"after": after} if after is not None else {}
+            conn.execute(
+                text(
+                    f"INSERT INTO temp._ids_s (id) SELECT s.id FROM {ALIAS}.sessions s "
+                    # un cliente borrado después de archivar ya no tiene a dónde volver
+                    "WHERE EXISTS (SELECT 1 FROM main.clients c WHERE c.id = s.client_id) "
+                    + (f"AND ({' OR '.join(where)})" if where else "")
+                ).bindparams(*([bindparam("after", type_=DateTime)] if after is not None else [])),
+                params,
+            )
+            loose = "1" if not where else ("t.date >= :after" if after is not None else "0")
+            conn.execute(
+                text(
+                    f"INSERT INTO temp._ids_t (id) SELECT t.id FROM {ALIAS}.transactions t "
+                    "WHERE t.session_id IN (SELECT id FROM temp._ids_s) "
+                    f"OR (t.session_id IS NULL AND {loose})"
+                ).bindparams(*([bindparam("after", type_=DateTime)] if after is not None else [])),
+                params,
+            )
+            n_s, n_t = _move(conn, ALIAS, "main")
+        s.commit()
+    _changed()
+    return n_s, n_t
+
+
+# ------------------ CLI ------------------
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m services.archive")
+    ap.add_argument("--months", type=int, default=DEFAULT_MONTHS,
+                    help="archivar lo cerrado antes de hace N meses")
+    ap.add_argument("--restore-after", metavar="AAAA-MM-DD",
+                    help="en lugar de archivar, devolver lo que empieza desde esa fecha")
+    args = ap.parse_args(argv)
+
+    from data.db.session import engine
+    print("Usando DB:", engine.url, "->", archive_path(engine))
+    if args.restore_after:
+        n_s, n_t = restore(datetime.fromisoformat(args.restore_after))
+        print(f"[OK] devueltas {n_s} sesiones y {n_t} transacciones al archivo caliente")
+    else:
+        n_s, n_t = archive_old(args.months)
+        print(f"[OK] archivadas {n_s} sesiones y {n_t} transacciones (corte: hace {args.months} meses)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
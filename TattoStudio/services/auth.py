@@ -1,16 +1,167 @@
+import json
+import math
+import os
+import re
+import threading
+import time
 from datetime import datetime
-from typing import Optional, Dict
+from pathlib import Path
+from typing import Optional, Dict, Tuple
 
-import bcrypt
 from sqlalchemy.orm import Session
 
 from data.models.user import User
 
-def hash_password(plain: str) -> str:
-    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+# bcrypt se importa en el primer hash/verificación (no al arrancar la app)
+
+SETTINGS = Path(__file__).resolve().parents[1] / "settings.json"
+
+
+# ------------------ Costo de bcrypt ------------------
+# Cada ronda duplica el trabajo. El costo queda "fijado" por configuración o por
+# settings.BCRYPT_ROUNDS (lo guarda `python -m services.credentials --calibrate`).
+# Sin costo fijado, cada proceso calibra para que un hash tarde ~target_ms y lo
+# usa sólo en memoria para hashes nuevos. Hashear nunca escribe settings.
+# El login rehace un hash únicamente si su costo es MENOR al fijado: un costo
+# calibrado (ruido, otra estación) nunca reescribe ni baja el de un usuario.
+#   settings.json: {"auth": {"bcrypt_rounds": 12}}   costo fijo
+#                  {"auth": {"target_ms": 250}}       calibrar a 250 ms
+#   TATTOO_BCRYPT_ROUNDS=10                           gana sobre lo anterior
+ROUNDS_SETTING = "BCRYPT_ROUNDS"
+DEFAULT_TARGET_MS = 250.0
+MIN_ROUNDS, MAX_ROUNDS = 10, 16      # límites de la calibración
+BCRYPT_MIN, BCRYPT_MAX = 4, 31       # límites de bcrypt (costo fijo)
+PROBE_ROUNDS = 8
+
+_HASH_RE = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+_rounds_lock = threading.Lock()
+_rounds: Optional[int] = None
+_pinned = False                      # _rounds viene de configuración o de la BD
+
+
+def _auth_config() -> Dict:
+    try:
+        data = json.loads(SETTINGS.read_text(encoding="utf-8"))
+        cfg = (data or {}).get("auth") or {}
+        return cfg if isinstance(cfg, dict) else {}
+    except Exception:
+        return {}
+
+
+def configured_rounds() -> Optional[int]:
+    """Costo fijado por entorno o settings.json; None = calibrar."""
+    raw = os.getenv("TATTOO_BCRYPT_ROUNDS") or _auth_config().get("bcrypt_rounds")
+    try:
+        n = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return max(BCRYPT_MIN, min(BCRYPT_MAX, n))
+
+
+def target_ms() -> float:
+    try:
+        return max(1.0, float(_auth_config().get("target_ms", DEFAULT_TARGET_MS)))
+    except (TypeError, ValueError):
+        return DEFAULT_TARGET_MS
+
+
+def calibrate(target: Optional[float] = None, probe_rounds: int = PROBE_ROUNDS, samples: int = 3) -> int:
+    """Costo cuyo hash tarda lo más cerca posible de 'target' ms (en escala log2)."""
+    import bcrypt
+    target = target_ms() if target is None else target
+    salt = bcrypt.gensalt(rounds=probe_rounds)
+    best = float("inf")
+    for _ in range(max(1, samples)):
+        t0 = time.perf_counter()
+        bcrypt.hashpw(b"calibracion", salt)
+        best = min(best, (time.perf_counter() - t0) * 1000.0)
+    rounds = probe_rounds + round(math.log2(target / max(best, 0.01)))
+    return max(MIN_ROUNDS, min(MAX_ROUNDS, rounds))
+
+
+def _stored_rounds(db: Session) -> Optional[int]:
+    from data.models.setting import Setting
+    row = db.query(Setting).filter(Setting.key == ROUNDS_SETTING).one_or_none()
+    try:
+        return int(row.value) if row and row.value else None
+    except ValueError:
+        return None
+
+
+def save_rounds(db: Session, rounds: int) -> None:
+    """Persiste el costo calibrado y lo deja vigente (fijado) en este proceso."""
+    global _rounds, _pinned
+    from data.models.setting import Setting
+    row = db.query(Setting).filter(Setting.key == ROUNDS_SETTING).one_or_none()
+    if row is None:
+        db.add(Setting(key=ROUNDS_SETTING, value=str(rounds)))
+    else:
+        row.value = str(rounds)
+    db.commit()
+    with _rounds_lock:
+        _rounds, _pinned = rounds, True
+
+
+def _resolve_rounds(db: Optional[Session]) -> Tuple[int, bool]:
+    """(costo vigente, fijado): fijo > guardado en BD > calibrado (sólo en memoria)."""
+    global _rounds, _pinned
+    with _rounds_lock:
+        if _rounds is not None:
+            return _rounds, _pinned
+    fixed = configured_rounds()
+    if fixed is not None:
+        with _rounds_lock:
+            _rounds, _pinned = fixed, True
+        return fixed, True
+
+    try:
+        if db is not None:
+            stored = _stored_rounds(db)
+        else:
+            from data.db.session import SessionLocal
+            with SessionLocal() as s:
+                stored = _stored_rounds(s)
+    except Exception:
+        stored = None  # sin tabla settings (BD nueva/migración)
+    pinned = stored is not None
+    n = stored if pinned else calibrate()
+    with _rounds_lock:
+        _rounds, _pinned = n, pinned
+    return n, pinned
+
+
+def bcrypt_rounds(db: Optional[Session] = None) -> int:
+    """Costo para hashes nuevos."""
+    return _resolve_rounds(db)[0]
+
+
+def reset_rounds_cache() -> None:
+    global _rounds, _pinned
+    with _rounds_lock:
+        _rounds, _pinned = None, False
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    m = _HASH_RE.match(hashed or "")
+    return int(m.group(1)) if m else None
+
+
+def needs_rehash(hashed: str, db: Optional[Session] = None) -> bool:
+    """True si el hash tiene un costo menor al fijado (nunca contra uno sólo calibrado)."""
+    rounds, pinned = _resolve_rounds(db)
+    return pinned and (hash_rounds(hashed) or 0) < rounds
+
+
+# ------------------ Hash / verificación ------------------
+
+def hash_password(plain: str, rounds: Optional[int] = None) -> str:
+    import bcrypt
+    rounds = bcrypt_rounds() if rounds is None else rounds
+    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
 
 def verify_password(plain: str, hashed: str) -> bool:
     try:
+        import bcrypt
         return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
     except Exception:
         return False
@@ -26,6 +177,10 @@ def authenticate(db: Session, username: str, password: str) -> Optional[Dict]:
     if not verify_password(password, u.password_hash):
         return None
 
+    # si cambió el costo de bcrypt, se rehace el hash con la contraseña recién validada
+    if needs_rehash(u.password_hash, db):
+        u.password_hash = hash_password(password, rounds=bcrypt_rounds(db))
+
     # actualizar last_login
     u.last_login = datetime.utcnow()
     db.commit()
@@ -0,0 +1,187 @@
+# services/cash_close.py
+"""
+Corte de caja diario (RBAC reports.cash_close).
+
+- day_totals(day)          -> esperado del día por método y por tatuador, en
+    UNA consulta agregada (GROUP BY método, tatuador) que se pliega en Python
+- close_day(day, counted)  -> guarda la foto inmutable (cash_closes +
+    cash_close_lines) con contado vs. esperado y bloquea la ventana del día
+- get_close(day)           -> corte guardado (lectura de la foto, sin volver
+    a agregar transacciones) o None
+- list_closes()            -> cortes recientes
+- ensure_open(db, when)    -> CashClosedError si 'when' cae en un día cerrado
+
+El bloqueo vive en la BD (triggers en data/models/cash_close.py): una
+transacción con fecha dentro de un corte no se puede insertar, editar ni
+borrar. ensure_open sólo adelanta el error con un mensaje claro.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from data.db.session import session_scope
+from data.models.artist import Artist
+from data.models.cash_close import CashClose, CashCloseLine
+from data.models.transaction import Transaction
+
+PAYMENT_METHODS = ("Efectivo", "Tarjeta", "Transferencia")
+
+
+class CashClosedError(ValueError):
+    """La fecha cae dentro de un corte de caja ya cerrado."""
+
+
+def _window(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def _closed_at(when: datetime):
+    return exists().where(CashClose.window_start <= when, CashClose.window_end > when)
+
+
+def is_closed(when: datetime, db: Optional[Session] = None) -> bool:
+    with session_scope(db) as s:
+        return bool(s.execute(select(_closed_at(when))).scalar())
+
+
+def ensure_open(db: Session, when: datetime) -> None:
+    """Para escribir transacciones: falla antes del INSERT si el día ya tiene corte."""
+    if db.execute(select(_closed_at(when))).scalar():
+        raise CashClosedError(f"La caja del {when:%d/%m/%Y} ya está cerrada; no se pueden registrar ni editar cobros.")
+
+
+# ------------------ Totales ------------------
+
+def _fold(rows) -> Dict:
+    """(método, artist_id, artista, monto, n) -> totales por método y por tatuador."""
+    by_method: Dict[str, Dict] = {m: {"method": m, "expected": 0.0, "tx_count": 0} for m in PAYMENT_METHODS}
+    by_artist: Dict[int, Dict] = {}
+    total, count = 0.0, 0
+    for method, aid, name, amount, n in rows:
+        amount, n = float(amount or 0.0), int(n or 0)
+        m = by_method.setdefault(method or "—", {"method": method or "—", "expected": 0.0, "tx_count": 0})
+        m["expected"] += amount; m["tx_count"] += n
+        a = by_artist.setdefault(aid, {"artist_id": aid, "artist": name or "—", "expected": 0.0, "tx_count": 0})
+        a["expected"] += amount; a["tx_count"] += n
+        total += amount; count += n
+    for d in (*by_method.values(), *by_artist.values()):
+        d["expected"] = round(d["expected"], 2)
+    return {
+        "by_method": list(by_method.values()),
+        "by_artist": sorted(by_artist.values(), key=lambda a: a["artist"]),
+        "expected_total": round(total, 2),
+        "tx_count": count,
+    }
+
+
+def _aggregate(s: Session, day: date):
+    start, end = _window(day)
+    return s.execute(
+        select(Transaction.method, Transaction.artist_id, Artist.name,
+               func.sum(Transaction.amount), func.count())
+        .select_from(Transaction)
+        .outerjoin(Artist, Artist.id == Transaction.artist_id)
+        .where(Transaction.deleted_flag == False,  # noqa: E712
+               Transaction.date >= start, Transaction.date < end)
+        .group_by(Transaction.method, Transaction.artist_id, Artist.name)
+    ).all()
+
+
+def day_totals(day: date, db: Optional[Session] = None) -> Dict:
+    """{by_method: [{method, expected, tx_count}], by_artist: [{artist_id, artist, expected, tx_count}], expected_total, tx_count}."""
+    with session_scope(db) as s:
+        return _fold(_aggregate(s, day))
+
+
+# ------------------ Cierre ------------------
+
+def close_day(
+    day: date,
+    counted: Dict[str, float],
+    *,
+    note: Optional[str] = None,
+    user_id: Optional[int] = None,
+    db: Optional[Session] = None,
+) -> int:
+    """
+    Cierra la caja de 'day'. counted: {método: contado}; un método sin
+    contar se toma como cuadrado (contado = esperado). Devuelve el id del corte.
+    ValueError si el día ya tiene corte.
+    """
+    start, end = _window(day)
+    with session_scope(db) as s:
+        try:
+            if s.execute(select(CashClose.id).where(CashClose.day == day)).scalar_one_or_none() is not None:
+                raise CashClosedError(f"La caja del {day:%d/%m/%Y} ya está cerrada.")
+            totals = _fold(_aggregate(s, day))
+            lines: List[Dict] = []
+            counted_total = 0.0
+            for m in totals["by_method"]:
+                c = counted.get(m["method"])
+                c = round(float(c), 2) if c is not None else m["expected"]
+                counted_total += c
+                lines.append({"kind": "method", "key": m["method"], "label": m["method"],
+                              "expected": m["expected"], "counted": c, "tx_count": m["tx_count"]})
+            for a in totals["by_artist"]:
+                lines.append({"kind": "artist", "key": str(a["artist_id"]), "label": a["artist"],
+                              "expected": a["expected"], "counted": None, "tx_count": a["tx_count"]})
+            counted_total = round(counted_total, 2)
+
+            close_id = s.execute(
+                insert(CashClose).values(
+                    day=day, window_start=start, window_end=end,
+                    expected_total=totals["expected_total"], counted_total=counted_total,
+                    difference=round(counted_total - totals["expected_total"], 2),
+                    tx_count=totals["tx_count"], note=(note or "").strip() or None,
+                    closed_at=datetime.now(), closed_by=user_id,
+                ).returning(CashClose.id)
+            ).scalar_one()
+            s.execute(insert(CashCloseLine), [{"close_id": close_id, **ln} for ln in lines])
+            s.commit()
+        except Exception:
+            s.rollback()
+            raise
+    return close_id
+
+
+def get_close(day: date, db: Optional[Session] = None) -> Optional[Dict]:
+    """Corte guardado del día (misma forma que day_totals + contado/diferencia) o None."""
+    with session_scope(db) as s:
+        c = s.execute(select(CashClose).where(CashClose.day == day)).scalar_one_or_none()
+        if c is None:
+            return None
+        lines = s.execute(
+            select(CashCloseLine).where(CashCloseLine.close_id == c.id).order_by(CashCloseLine.label.asc())
+        ).scalars().all()
+    order = {m: i for i, m in enumerate(PAYMENT_METHODS)}
+    return {
+        "id": c.id, "day": c.day, "closed_at": c.closed_at, "closed_by": c.closed_by, "note": c.note,
+        "expected_total": c.expected_total, "counted_total": c.counted_total,
+        "difference": c.difference, "tx_count": c.tx_count,
+        "by_method": sorted(
+            ({"method": ln.key, "expected": ln.expected, "counted": ln.counted, "tx_count": ln.tx_count}
+             for ln in lines if ln.kind == "method"),
+            key=lambda m: (order.get(m["method"], len(order)), m["method"]),
+        ),
+        "by_artist": [
+            {"artist_id": int(ln.key) if ln.key.isdigit() else None, "artist": ln.label,
+             "expected": ln.expected, "tx_count": ln.tx_count}
+            for ln in lines if ln.kind == "artist"
+        ],
+    }
+
+
+def list_closes(limit: int = 30, db: Optional[Session] = None) -> List[Dict]:
+    """Cortes más recientes primero: [{day, expected_total, counted_total, difference}]."""
+    with session_scope(db) as s:
+        rows = s.execute(
+            select(CashClose.day, CashClose.expected_total, CashClose.counted_total, CashClose.difference)
+            .order_by(CashClose.day.desc())
+            .limit(limit)
+        ).all()
+    return [{"day": d, "expected_total": e, "counted_total": c, "difference": diff} for d, e, c, diff in rows]
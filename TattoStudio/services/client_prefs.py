@@ -0,0 +1,148 @@
+# services/client_prefs.py
+"""
+Preferencias de clientes (tabla client_preferences) y segmentación.
+
+- STYLES / ZONES / SOURCES      catálogos que ofrece el alta de cliente
+- set_preferences(db, cid, ...)  reemplaza las preferencias del cliente (sin commit)
+- get_preferences(cid)          -> {'style': (...), 'zone': (...), 'source': str|None}
+- segment(styles, zones, source) -> ids de clientes visibles que cumplen TODOS
+    los criterios dados; dentro de un criterio basta con uno de los valores
+    ("línea fina o realismo" y "antebrazo"). Una consulta con un IN por
+    criterio, resuelto desde ix_client_prefs_kind_value.
+- preference_counts()           -> {kind: {valor: clientes}} para los filtros
+- parse_meta_prefs(notes)       formato viejo META_PREFS|styles=..;zones=..;source=..
+    (sólo lo usa la migración que lo pasa a la tabla)
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from data.db.session import session_scope
+from data.models.client import Client
+from data.models.client_preference import ClientPreference
+from services.scoping import scope
+
+STYLE, ZONE, SOURCE = "style", "zone", "source"
+KINDS = (STYLE, ZONE, SOURCE)
+
+STYLES = ("Línea fina", "Realismo", "Tradicional", "Acuarela", "Geométrico", "Blackwork", "Anime")
+ZONES = ("Brazo", "Antebrazo", "Pierna", "Espalda", "Pecho", "Muñeca", "Tobillo")
+SOURCES = ("Instagram", "TikTok", "Google", "Referido", "Otro")
+
+META_PREFIX = "META_PREFS|"
+
+
+def _clean(values: Iterable[str]) -> List[str]:
+    """Sin vacíos ni duplicados, en el orden dado."""
+    out: List[str] = []
+    for v in values or ():
+        v = (v or "").strip()
+        if v and v not in out:
+            out.append(v)
+    return out
+
+
+# ------------------ Formato viejo (notas) ------------------
+
+def parse_meta_prefs(notes: Optional[str]) -> Optional[Dict[str, List[str]]]:
+    """
+    Línea META_PREFS|styles=a,b;zones=c;source=d de las notas ->
+    {'style': [...], 'zone': [...], 'source': [...]} o None si no hay línea.
+    """
+    line = next((ln.strip() for ln in (notes or "").splitlines() if ln.strip().startswith(META_PREFIX)), "")
+    if not line:
+        return None
+    parts = dict(kv.split("=", 1) for kv in line[len(META_PREFIX):].split(";") if "=" in kv)
+    return {
+        STYLE: _clean((parts.get("styles") or "").split(",")),
+        ZONE: _clean((parts.get("zones") or "").split(",")),
+        SOURCE: _clean([parts.get("source") or ""])[:1],
+    }
+
+
+def strip_meta_prefs(notes: Optional[str]) -> Optional[str]:
+    """Notas sin la línea META_PREFS (None si no queda texto)."""
+    kept = [ln for ln in (notes or "").splitlines() if not ln.strip().startswith(META_PREFIX)]
+    return "\n".join(kept).strip() or None
+
+
+# ------------------ Lectura / escritura ------------------
+
+def set_preferences(
+    db: Session,
+    client_id: int,
+    styles: Sequence[str] = (),
+    zones: Sequence[str] = (),
+    source: Optional[str] = None,
+) -> None:
+    """Reemplaza las preferencias del cliente; el commit es de quien llama."""
+    rows = (
+        [{"kind": STYLE, "value": v} for v in _clean(styles)]
+        + [{"kind": ZONE, "value": v} for v in _clean(zones)]
+        + [{"kind": SOURCE, "value": v} for v in _clean([source or ""])]
+    )
+    db.execute(delete(ClientPreference).where(ClientPreference.client_id == client_id))
+    if rows:
+        db.execute(insert(ClientPreference), [{"client_id": client_id, **r} for r in rows])
+
+
+def get_preferences(client_id: int, db: Optional[Session] = None) -> Dict[str, object]:
+    """{'style': (...), 'zone': (...), 'source': str|None} (valores en orden alfabético)."""
+    with session_scope(db) as s:
+        rows = s.execute(
+            select(ClientPreference.kind, ClientPreference.value)
+            .where(ClientPreference.client_id == client_id)
+            .order_by(ClientPreference.kind, ClientPreference.value)
+        ).all()
+    styles = tuple(v for k, v in rows if k == STYLE)
+    zones = tuple(v for k, v in rows if k == ZONE)
+    source = next((v for k, v in rows if k == SOURCE), None)
+    return {STYLE: styles, ZONE: zones, SOURCE: source}
+
+
+# ------------------ Segmentación ------------------
+
+def _has(kind: str, values: Sequence[str]):
+    # IN (subconsulta no correlacionada): se resuelve desde ix_client_prefs_kind_value
+    # en lugar de probar cliente por cliente
+    return Client.id.in_(
+        select(ClientPreference.client_id)
+        .where(ClientPreference.kind == kind, ClientPreference.value.in_(list(values)))
+    )
+
+
+def segment(
+    styles: Sequence[str] = (),
+    zones: Sequence[str] = (),
+    source: Optional[str] = None,
+    *,
+    user: Optional[dict] = None,
+    db: Optional[Session] = None,
+) -> List[int]:
+    """Ids (ascendentes) de los clientes visibles para el usuario que cumplen los criterios dados."""
+    criteria: List[Tuple[str, List[str]]] = [
+        (STYLE, _clean(styles)), (ZONE, _clean(zones)), (SOURCE, _clean([source or ""])),
+    ]
+    conds = [_has(kind, values) for kind, values in criteria if values]
+    with session_scope(db) as s:
+        return list(s.execute(
+            select(Client.id)
+            .where(*conds, *scope("clients", "view", Client, user=user))
+            .order_by(Client.id.asc())
+        ).scalars())
+
+
+def preference_counts(db: Optional[Session] = None) -> Dict[str, Dict[str, int]]:
+    """{kind: {valor: número de clientes}} en una consulta agregada."""
+    out: Dict[str, Dict[str, int]] = {k: {} for k in KINDS}
+    with session_scope(db) as s:
+        rows = s.execute(
+            select(ClientPreference.kind, ClientPreference.value, func.count())
+            .group_by(ClientPreference.kind, ClientPreference.value)
+        ).all()
+    for kind, value, n in rows:
+        out.setdefault(kind, {})[value] = int(n)
+    return out
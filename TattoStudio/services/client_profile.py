@@ -0,0 +1,260 @@
+# services/client_profile.py
+"""
+Ficha de cliente (ClientDetailPage) como una foto inmutable.
+
+- get_profile(client_id)   -> ClientProfile o None, en DOS consultas:
+    1) el cliente + próxima cita + tatuador "dueño" (próxima cita > última
+       cita > última archivada > preferido) como subconsultas correlacionadas
+       sobre ix_sessions_client_start + sus preferencias (client_preferences)
+    2) artistas (id, nombre) para el combo y para resolver los nombres
+- Caché por id de cliente (LRU de MAX_ENTRIES). Una entrada caduca a los
+  MAX_AGE_S o cuando su "próxima cita" ya pasó.
+    invalidate(client_id)  tras editar el cliente o tocar sus sesiones
+    invalidate()           vacía todo (p. ej. si cambian los artistas)
+  Se llama sola con los eventos de services/events: SessionChanged y
+  ClientSaved invalidan ese cliente, UserSaved todo (nombres de artista).
+- prefetch(client_id)      -> calcula la ficha en un hilo de fondo (el
+    siguiente cliente de la lista) para que abrirla sea un acierto de caché.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from data.db.session import session_scope
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.client_preference import ClientPreference
+from data.models.session_tattoo import TattooSession
+from services import archive
+from services.client_prefs import SOURCE, STYLE, ZONE
+from services.events import ClientSaved, SessionChanged, UserSaved, subscribe
+from services.tracing import span
+
+MAX_ENTRIES = 64
+MAX_AGE_S = 300.0
+
+HEALTH_FLAGS = (
+    "health_allergies", "health_diabetes", "health_coagulation", "health_epilepsy",
+    "health_cardiac", "health_anticoagulants", "health_preg_lact", "health_substances", "health_derm",
+)
+CONSENT_FLAGS = ("consent_info", "consent_image", "consent_data")
+_TEXT_FIELDS = (
+    "name", "phone", "email", "instagram", "city", "state", "notes", "health_obs",
+    "emergency_name", "emergency_relation", "emergency_phone",
+)
+
+
+@dataclass(frozen=True)
+class ClientProfile:
+    id: int
+    name: str
+    phone: Optional[str]
+    email: Optional[str]
+    instagram: Optional[str]
+    city: Optional[str]
+    state: Optional[str]
+    notes: Optional[str]
+    health_obs: Optional[str]
+    emergency_name: Optional[str]
+    emergency_relation: Optional[str]
+    emergency_phone: Optional[str]
+    preferred_artist_id: Optional[int]
+    owner_artist_id: Optional[int]
+    next_start: Optional[datetime]
+    health: Tuple[bool, ...]              # en el orden de HEALTH_FLAGS
+    consent: Tuple[bool, bool, bool]      # info, imagen, datos
+    styles: Tuple[str, ...]               # preferencias (orden alfabético)
+    zones: Tuple[str, ...]
+    source: Optional[str]
+    artists: Tuple[Tuple[int, str], ...]  # (id, nombre) ordenados por nombre
+
+    def artist_name(self, artist_id: Optional[int]) -> Optional[str]:
+        if artist_id is None:
+            return None
+        return next((name for aid, name in self.artists if aid == artist_id), None)
+
+    @property
+    def owner_artist(self) -> Optional[str]:
+        return self.artist_name(self.owner_artist_id)
+
+    @property
+    def preferred_artist(self) -> Optional[str]:
+        return self.artist_name(self.preferred_artist_id)
+
+
+# ------------------ Consulta ------------------
+
+def session_value(col, now: datetime, upcoming: bool):
+    """Columna de la próxima (upcoming) o de la última sesión del cliente."""
+    when = TattooSession.start >= now if upcoming else TattooSession.start < now
+    order = TattooSession.start.asc() if upcoming else TattooSession.start.desc()
+    return (
+        select(col)
+        .where(TattooSession.client_id == Client.id, when)
+        .order_by(order)
+        .limit(1)
+        .correlate(Client)
+        .scalar_subquery()
+    )
+
+
+_SEP = "\x1f"
+
+
+def _prefs_value(kind: str):
+    """Valores de una preferencia del cliente concatenados (o NULL)."""
+    return (
+        select(func.group_concat(ClientPreference.value, _SEP))
+        .where(ClientPreference.client_id == Client.id, ClientPreference.kind == kind)
+        .correlate(Client)
+        .scalar_subquery()
+    )
+
+
+def _split(joined: Optional[str]) -> Tuple[str, ...]:
+    return tuple(sorted(joined.split(_SEP))) if joined else ()
+
+
+def _archived_artist():
+    """Tatuador de la última sesión archivada del cliente (services/archive)."""
+    cold = archive.sessions
+    return (
+        select(cold.c.artist_id)
+        .where(cold.c.client_id == Client.id)
+        .order_by(cold.c.start.desc())
+        .limit(1)
+        .correlate(Client)
+        .scalar_subquery()
+    )
+
+
+def _fetch(s: Session, client_id: int, now: datetime) -> Optional[ClientProfile]:
+    last = [session_value(TattooSession.artist_id, now, upcoming=False)]
+    if archive.attach(s):
+        last.append(_archived_artist())   # sin citas recientes: la última archivada
+    owner = func.coalesce(
+        session_value(TattooSession.artist_id, now, upcoming=True),
+        *last,
+        Client.preferred_artist_id,
+    )
+    row = s.execute(
+        select(
+            *(getattr(Client, f) for f in _TEXT_FIELDS + HEALTH_FLAGS + CONSENT_FLAGS),
+            Client.preferred_artist_id,
+            owner.label("owner_artist_id"),
+            session_value(TattooSession.start, now, upcoming=True).label("next_start"),
+            _prefs_value(STYLE).label("styles"),
+            _prefs_value(ZONE).label("zones"),
+            _prefs_value(SOURCE).label("source"),
+        ).where(Client.id == client_id)
+    ).one_or_none()
+    if row is None:
+        return None
+    m = row._mapping
+    artists = tuple(
+        (int(aid), name or "")
+        for aid, name in s.execute(select(Artist.id, Artist.name).order_by(Artist.name.asc()))
+    )
+    return ClientProfile(
+        id=int(client_id),
+        **{f: m[f] for f in _TEXT_FIELDS},
+        preferred_artist_id=m["preferred_artist_id"],
+        owner_artist_id=m["owner_artist_id"],
+        next_start=m["next_start"],
+        health=tuple(bool(m[f]) for f in HEALTH_FLAGS),
+        consent=tuple(bool(m[f]) for f in CONSENT_FLAGS),
+        styles=_split(m["styles"]),
+        zones=_split(m["zones"]),
+        source=(_split(m["source"]) or (None,))[0],
+        artists=artists,
+    )
+
+
+# ------------------ Caché ------------------
+
+_lock = threading.Lock()
+_cache: "OrderedDict[int, Tuple[float, ClientProfile]]" = OrderedDict()   # id -> (monotonic_ts, ficha)
+_epoch = 0   # sube con cada invalidate(): una carga empezada antes no se guarda
+
+
+def _cached(client_id: int, now: datetime) -> Optional[ClientProfile]:
+    with _lock:
+        entry = _cache.get(client_id)
+        if entry is None:
+            return None
+        ts, profile = entry
+        if time.monotonic() - ts > MAX_AGE_S or (profile.next_start is not None and profile.next_start < now):
+            del _cache[client_id]
+            return None
+        _cache.move_to_end(client_id)
+        return profile
+
+
+def _store(profile: ClientProfile, epoch: int) -> None:
+    with _lock:
+        if epoch != _epoch:
+            return
+        _cache[profile.id] = (time.monotonic(), profile)
+        _cache.move_to_end(profile.id)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def invalidate(client_id: Optional[int] = None) -> None:
+    """Descarta la ficha de 'client_id' (o todas si es None)."""
+    global _epoch
+    with _lock:
+        _epoch += 1
+        if client_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(int(client_id), None)
+
+
+subscribe(SessionChanged, lambda ev: invalidate(ev.client_id) if ev.client_id is not None else None)
+subscribe(ClientSaved, lambda ev: invalidate(ev.client_id))
+subscribe(UserSaved, lambda ev: invalidate())
+
+
+def get_profile(client_id: int, *, refresh: bool = False, db: Optional[Session] = None) -> Optional[ClientProfile]:
+    """Ficha del cliente (de caché si sigue vigente) o None si no existe."""
+    cid = int(client_id)
+    now = datetime.now()
+    if not refresh:
+        hit = _cached(cid, now)
+        if hit is not None:
+            return hit
+    with _lock:
+        epoch = _epoch
+    with span("client_profile.fetch", client_id=cid), session_scope(db) as s:
+        profile = _fetch(s, cid, now)
+    if profile is not None:
+        _store(profile, epoch)
+    return profile
+
+
+def prefetch(client_id: Optional[int], *, background: bool = True) -> Optional[threading.Thread]:
+    """Precalcula la ficha (si no está en caché); en un hilo daemon salvo background=False."""
+    if client_id is None or _cached(int(client_id), datetime.now()) is not None:
+        return None
+
+    def run() -> None:
+        try:
+            get_profile(int(client_id))
+        except Exception:
+            pass   # es sólo un adelanto: al abrir la ficha se vuelve a intentar
+
+    if not background:
+        run()
+        return None
+    t = threading.Thread(target=run, name=f"client-profile-{client_id}", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,205 @@
+# services/consumables.py
+"""
+Plantillas de consumo por servicio (lista de materiales) y descuento automático
+al completar una sesión.
+
+Plantilla de la sesión (resolve_template):
+  1) la indicada explícitamente (complete_session(..., service_template_id=...))
+  2) la activa cuyo nombre coincide con la primera línea de las notas de la
+     sesión ("Servicio" en la agenda), sin distinguir mayúsculas
+  3) la marcada como predeterminada (p. ej. guantes + film por sesión)
+  Si no hay ninguna, no se descuenta nada.
+
+deduct_for_session() corre DENTRO de la transacción de complete_session:
+  - una lectura de los renglones de la plantilla y un UPDATE basado en
+    conjuntos sobre products (stock -= qty) con RETURNING (id, saldo), sin
+    cargar productos al ORM
+  - los lotes por FEFO, un INSERT múltiple al libro (kind='Consumo') y el
+    acumulado mensual (inventory.pick_fefo / post_movements)
+El consumo no bloquea el cierre de la sesión: si el stock no alcanza queda
+negativo y aparece en "Bajo stock" hasta el siguiente conteo.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from data.db.session import session_scope
+from data.models.inventory import ServiceTemplate, ServiceTemplateItem
+from data.models.product import Product
+from data.models.session_tattoo import TattooSession
+from services import inventory
+from services.contracts import get_current_user
+
+
+def service_name(notes: Optional[str]) -> str:
+    """Primera línea no vacía de las notas de la sesión (campo "Servicio")."""
+    for line in (notes or "").splitlines():
+        if line.strip():
+            return line.strip()
+    return ""
+
+
+# ------------------ Plantillas ------------------
+
+def list_templates(db: Optional[Session] = None) -> List[Dict]:
+    """Plantillas con sus renglones: [{id, name, is_default, active, items: [{product_id, sku, name, qty}]}]."""
+    with session_scope(db) as s:
+        templates = {
+            t.id: {"id": t.id, "name": t.name, "is_default": bool(t.is_default),
+                   "active": bool(t.active), "items": []}
+            for t in s.execute(select(ServiceTemplate).order_by(ServiceTemplate.name.asc())).scalars()
+        }
+        rows = s.execute(
+            select(ServiceTemplateItem.template_id, Product.id, Product.sku, Product.name, ServiceTemplateItem.qty)
+            .join(Product, Product.id == ServiceTemplateItem.product_id)
+            .order_by(Product.name.asc())
+        )
+        for tid, pid, sku, name, qty in rows:
+            if tid in templates:
+                templates[tid]["items"].append({"product_id": pid, "sku": sku, "name": name, "qty": int(qty)})
+    return list(templates.values())
+
+
+def save_template(
+    name: str,
+    items: Iterable[Tuple[int, int]],
+    *,
+    template_id: Optional[int] = None,
+    is_default: bool = False,
+    active: bool = True,
+    db: Optional[Session] = None,
+) -> int:
+    """
+    Crea o reemplaza una plantilla. items: (product_id, qty > 0); un producto
+    repetido suma. Sólo puede haber una predeterminada. Devuelve el id.
+    """
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("La plantilla necesita un nombre.")
+    merged: Dict[int, int] = {}
+    for pid, qty in items:
+        if int(qty) <= 0:
+            raise ValueError("Las cantidades deben ser mayores que cero.")
+        merged[int(pid)] = merged.get(int(pid), 0) + int(qty)
+
+    with session_scope(db) as s:
+        try:
+            dup = s.execute(
+                select(ServiceTemplate.id).where(func.lower(ServiceTemplate.name) == name.lower())
+            ).scalar_one_or_none()
+            if dup is not None and dup != template_id:
+                raise ValueError(f"Ya existe una plantilla llamada '{name}'.")
+            if template_id is None:
+                t = ServiceTemplate(name=name, is_default=is_default, active=active)
+                s.add(t)
+                s.flush()
+                template_id = t.id
+            else:
+                t = s.get(ServiceTemplate, template_id)
+                if t is None:
+                    raise ValueError("Plantilla no encontrada.")
+                t.name, t.is_default, t.active = name, is_default, active
+                s.execute(delete(ServiceTemplateItem).where(ServiceTemplateItem.template_id == template_id))
+            if is_default:
+                s.execute(
+                    update(ServiceTemplate)
+                    .where(ServiceTemplate.id != template_id)
+                    .values(is_default=False)
+                )
+            if merged:
+                s.execute(
+                    ServiceTemplateItem.__table__.insert(),
+                    [{"template_id": template_id, "product_id": pid, "qty": qty} for pid, qty in merged.items()],
+                )
+            s.commit()
+        except Exception:
+            s.rollback()
+            raise
+    return template_id
+
+
+def delete_template(template_id: int, db: Optional[Session] = None) -> None:
+    with session_scope(db) as s:
+        s.execute(delete(ServiceTemplateItem).where(ServiceTemplateItem.template_id == template_id))
+        s.execute(delete(ServiceTemplate).where(ServiceTemplate.id == template_id))
+        s.commit()
+
+
+def resolve_template(db: Session, session: TattooSession, template_id: Optional[int] = None) -> Optional[int]:
+    """Id de la plantilla que aplica a la sesión (ver orden en el docstring del módulo) o None."""
+    if template_id is not None:
+        return template_id
+    service = service_name(session.notes)
+    if service:
+        tid = db.execute(
+            select(ServiceTemplate.id).where(
+                ServiceTemplate.active == True,  # noqa: E712
+                func.lower(ServiceTemplate.name) == service.lower(),
+            )
+        ).scalar_one_or_none()
+        if tid is not None:
+            return tid
+    return db.execute(
+        select(ServiceTemplate.id).where(
+            ServiceTemplate.active == True, ServiceTemplate.is_default == True  # noqa: E712
+        ).limit(1)
+    ).scalar_one_or_none()
+
+
+# ------------------ Descuento ------------------
+
+def deduct_for_session(
+    db: Session,
+    session: TattooSession,
+    *,
+    template_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    when: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    Descuenta los insumos de la plantilla de la sesión. No hace commit: debe
+    llamarse dentro de la transacción que completa la sesión. Devuelve las
+    filas del libro insertadas ([] si no hay plantilla o está vacía).
+    """
+    tid = resolve_template(db, session, template_id)
+    if tid is None:
+        return []
+    when = when or datetime.now()
+    user_id = (get_current_user() or {}).get("id") if user_id is None else user_id
+
+    qty_by_product = dict(db.execute(
+        select(ServiceTemplateItem.product_id, ServiceTemplateItem.qty)
+        .where(ServiceTemplateItem.template_id == tid)
+    ).all())
+    if not qty_by_product:
+        return []
+
+    inventory.snapshot_if_due(db, when)
+    item_qty = (
+        select(ServiceTemplateItem.qty)
+        .where(ServiceTemplateItem.template_id == tid, ServiceTemplateItem.product_id == Product.id)
+        .scalar_subquery()
+    )
+    # RETURNING sólo columnas de products: ahí las columnas se emiten sin prefijo
+    # de tabla y una subconsulta correlacionada se resolvería contra su propia tabla.
+    stmt = (
+        update(Product)
+        .where(Product.id.in_(list(qty_by_product)))
+        .values(stock=func.coalesce(Product.stock, 0) - item_qty)
+        .returning(Product.id, Product.stock)
+        .execution_options(synchronize_session=False)
+    )
+    note = f"Sesión #{session.id}"
+    rows = [
+        {"product_id": pid, "kind": "Consumo", "qty": -int(qty_by_product[pid]), "balance": int(balance),
+         "user_id": user_id, "note": note, "created_at": when}
+        for pid, balance in db.execute(stmt)
+    ]
+    if rows:
+        picks = inventory.pick_fefo(db, qty_by_product)
+        inventory.post_movements(db, rows, [picks.get(r["product_id"], []) for r in rows])
+    return rows
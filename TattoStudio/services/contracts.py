@@ -1,14 +1,27 @@
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import TypedDict, Literal, Optional, Dict
+from typing import TypedDict, Literal, Optional, Dict, Iterator
 
 _current_user: Optional[Dict] = None
+_local = threading.local()   # acting_as(): usuario propio de un hilo (modo servidor)
 
 def set_current_user(u: Optional[Dict]):
     global _current_user
     _current_user = u
 
 def get_current_user() -> Optional[Dict]:
-    return _current_user
+    return getattr(_local, "user", None) or _current_user
+
+@contextmanager
+def acting_as(u: Optional[Dict]) -> Iterator[None]:
+    """Dentro del bloque, get_current_user() de ESTE hilo devuelve 'u'."""
+    prev = getattr(_local, "user", None)
+    _local.user = u
+    try:
+        yield
+    finally:
+        _local.user = prev
 
 
 PaymentMethod = Literal["Efectivo", "Tarjeta", "Transferencia"]
@@ -37,4 +50,8 @@ def create_session(payload: SessionCreate) -> int: ...
 def update_session(session_id: int, payload: SessionUpdate) -> None: ...
 def complete_session(session_id: int, payment: PaymentInput) -> int: ...
 def list_transactions(filters: dict) -> list[dict]: ...
-def compute_commission(transaction_id: int) -> float: ...
+
+def compute_commission(transaction_id: int) -> float:
+    """Implementada en services.payouts (import diferido: payouts depende de este módulo)."""
+    from services.payouts import compute_commission as _compute
+    return _compute(transaction_id)
@@ -0,0 +1,177 @@
+# services/credentials.py
+"""
+Credenciales fuera del hilo de UI.
+
+bcrypt es lento a propósito (cientos de ms con un costo razonable, ver
+services/auth.py); en el hilo de UI congela la ventana. Aquí se corre en un
+pool propio y el resultado vuelve por señales al hilo de UI:
+
+  job = authenticate_async(usuario, clave)
+  job.done.connect(on_ok)          # on_ok(resultado)
+  job.failed.connect(on_error)     # on_error(mensaje)
+
+  authenticate_async(username, password)  -> dict de usuario | None
+  verify_master_code_async(code)          -> bool
+  hash_password_async(plain)              -> hash
+
+Para flujos que ya son síncronos (diálogo de código maestro, guardar un
+usuario) está run_blocking(fn, ...): corre fn en el pool y gira un QEventLoop
+local hasta que termina, así la ventana sigue pintando mientras tanto.
+
+  python -m services.credentials --calibrate    recalibra y guarda el costo
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Any, Callable, Optional, Set
+
+from PyQt5.QtCore import (
+    QCoreApplication, QEventLoop, QObject, QRunnable, QThreadPool, QTimer,
+    pyqtSignal, pyqtSlot,
+)
+
+from data.db.session import SessionLocal
+from services import auth, transport
+from services.permissions import verify_master_code
+
+_pool: Optional[QThreadPool] = None
+_pending: Set["CredentialJob"] = set()   # evita que el GC se lleve jobs en vuelo
+
+
+def pool() -> QThreadPool:
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(2)
+    return _pool
+
+
+# ------------------ Job ------------------
+
+class _Runner(QRunnable):
+    def __init__(self, job: "CredentialJob"):
+        super().__init__()
+        self.job = job
+        self.setAutoDelete(False)
+
+    def run(self) -> None:
+        job = self.job
+        try:
+            value = job._fn(*job._args)
+        except Exception as ex:
+            job._finished.emit(False, ex)
+        else:
+            job._finished.emit(True, value)
+
+
+class CredentialJob(QObject):
+    """Una operación de credenciales en curso. Vive en el hilo de UI."""
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    _finished = pyqtSignal(bool, object)   # hilo del pool -> hilo de UI (encolada)
+
+    def __init__(self, fn: Callable[..., Any], *args: Any):
+        super().__init__()
+        self._fn = fn
+        self._args = args
+        self._runner = _Runner(self)
+        self.finished = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self._finished.connect(self._deliver)
+
+    def start(self) -> "CredentialJob":
+        _pending.add(self)
+        pool().start(self._runner)
+        return self
+
+    @pyqtSlot(bool, object)
+    def _deliver(self, ok: bool, value: Any) -> None:
+        self.finished = True
+        _pending.discard(self)
+        if ok:
+            self.result = value
+            self.done.emit(value)
+        else:
+            self.error = value
+            self.failed.emit(str(value))
+
+    def wait(self, timeout_ms: int = -1) -> bool:
+        """Gira el loop de eventos (sin entrada del usuario) hasta que termine."""
+        if self.finished:
+            return True
+        loop = QEventLoop()
+        self.done.connect(loop.quit)
+        self.failed.connect(loop.quit)
+        if timeout_ms >= 0:
+            QTimer.singleShot(timeout_ms, loop.quit)
+        loop.exec_(QEventLoop.ExcludeUserInputEvents)
+        return self.finished
+
+
+def submit(fn: Callable[..., Any], *args: Any) -> CredentialJob:
+    return CredentialJob(fn, *args).start()
+
+
+def run_blocking(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Corre fn en el pool y espera sin congelar la ventana; devuelve su resultado
+    o relanza su excepción. Sin QApplication (scripts) se llama directo.
+    """
+    if QCoreApplication.instance() is None:
+        return fn(*args)
+    job = submit(fn, *args)
+    job.wait()
+    if job.error is not None:
+        raise job.error
+    return job.result
+
+
+# ------------------ Operaciones ------------------
+
+def _authenticate(username: str, password: str):
+    if transport.is_remote():
+        return transport.login(username, password)   # y abre el canal de eventos
+    with SessionLocal() as db:
+        return auth.authenticate(db, username, password)
+
+
+def check_master_code(code: str) -> bool:
+    if transport.is_remote():
+        return transport.client().elevate(code)   # los permisos se revisan en el servidor
+    with SessionLocal() as db:
+        return verify_master_code(code, db)
+
+
+def authenticate_async(username: str, password: str) -> CredentialJob:
+    return submit(_authenticate, username, password)
+
+
+def verify_master_code_async(code: str) -> CredentialJob:
+    return submit(check_master_code, code)
+
+
+def hash_password_async(plain: str) -> CredentialJob:
+    return submit(auth.hash_password, plain)
+
+
+# ------------------ CLI ------------------
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m services.credentials")
+    ap.add_argument("--calibrate", action="store_true", help="medir y guardar el costo de bcrypt")
+    ap.add_argument("--target-ms", type=float, default=None)
+    args = ap.parse_args(argv)
+
+    if args.calibrate:
+        rounds = auth.calibrate(args.target_ms)
+        with SessionLocal() as db:
+            auth.save_rounds(db, rounds)
+        print(f"[OK] bcrypt rounds = {rounds} (objetivo {args.target_ms or auth.target_ms():.0f} ms)")
+    fixed = auth.configured_rounds()
+    print(f"costo vigente: {auth.bcrypt_rounds()}" + (" (fijado por configuración)" if fixed else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+# services/events.py
+"""
+Bus de eventos de dominio (en proceso, síncrono, sin Qt).
+
+Los servicios publican DESPUÉS del commit qué cambió; las páginas se
+suscriben y aplican un parche de una fila (insertar un cliente, mover una
+cita, sumar una pieza al conteo) en lugar de recargar todo desde la BD.
+
+- subscribe(SessionChanged, handler) -> unsubscribe()
+    el handler recibe los eventos de ese tipo y de sus subclases
+    (subscribe(DomainEvent, ...) los recibe todos)
+- publish(event) -> número de handlers que lo recibieron
+    corre en el hilo de quien publica; un handler que falla no corta a
+    los demás ni al servicio. Para la UI, ui.pages.common.subscribe_events
+    lo entrega en el hilo de Qt.
+- with deferred(): ...
+    lo publicado en ESTE hilo dentro del bloque se entrega al salir sin
+    error y se descarta si hubo excepción (p. ej. el servidor agrupa varias
+    escrituras en una transacción y avisa sólo tras su commit).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type, TypeVar
+
+log = logging.getLogger("tattoo.events")
+
+# Acciones
+CREATED, UPDATED, DELETED = "created", "updated", "deleted"
+COMPLETED, CANCELLED, ARCHIVED = "completed", "cancelled", "archived"
+
+
+# ------------------ Eventos ------------------
+
+@dataclass(frozen=True)
+class DomainEvent:
+    """Base de todos los eventos (sólo para suscribirse a todo)."""
+
+
+@dataclass(frozen=True)
+class SessionChanged(DomainEvent):
+    session_id: int
+    client_id: Optional[int]
+    artist_id: Optional[int]
+    action: str                     # CREATED | UPDATED | COMPLETED | CANCELLED
+
+
+@dataclass(frozen=True)
+class ClientSaved(DomainEvent):
+    client_id: int
+    action: str                     # CREATED | UPDATED | ARCHIVED | DELETED
+
+
+@dataclass(frozen=True)
+class UserSaved(DomainEvent):
+    user_id: int
+    artist_id: Optional[int]
+    action: str                     # CREATED | UPDATED
+
+
+@dataclass(frozen=True)
+class PortfolioUploaded(DomainEvent):
+    user_id: int
+    artist_id: Optional[int]
+    item_ids: Tuple[int, ...]
+
+
+# ------------------ Suscripción / publicación ------------------
+
+E = TypeVar("E", bound=DomainEvent)
+
+_lock = threading.Lock()
+_handlers: Dict[type, List[Callable[[DomainEvent], None]]] = {}
+_local = threading.local()   # .pending: eventos retenidos por deferred() en este hilo
+
+
+def subscribe(event_type: Type[E], handler: Callable[[E], None]) -> Callable[[], None]:
+    """Registra 'handler' para 'event_type'; devuelve la función que lo da de baja."""
+    with _lock:
+        _handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe() -> None:
+        with _lock:
+            subs = _handlers.get(event_type, [])
+            if handler in subs:
+                subs.remove(handler)
+
+    return unsubscribe
+
+
+def publish(event: DomainEvent) -> int:
+    """Entrega 'event' a los handlers de su tipo y de sus bases (0 si queda retenido)."""
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        pending.append(event)
+        return 0
+    with _lock:
+        # copia: un handler puede (des)suscribirse mientras se entrega
+        targets = [h for t in type(event).__mro__ for h in _handlers.get(t, ())]
+    for handler in targets:
+        try:
+            handler(event)
+        except Exception:
+            log.exception("Handler de %s falló", type(event).__name__)
+    return len(targets)
+
+
+@contextmanager
+def deferred() -> Iterator[List[DomainEvent]]:
+    """Retiene lo publicado en este hilo y lo entrega al salir sin excepción."""
+    outer = getattr(_local, "pending", None)
+    held: List[DomainEvent] = []
+    _local.pending = held
+    try:
+        yield held
+    except BaseException:
+        _local.pending = outer
+        raise
+    _local.pending = outer
+    for ev in held:
+        publish(ev)   # si hay un deferred() exterior, queda retenido en él
@@ -0,0 +1,729 @@
+# services/inventory.py
+"""
+Libro de movimientos de inventario (sin Qt).
+
+Cada cambio de stock pasa por record_movement():
+  - UPDATE products SET stock = stock + :delta ... RETURNING stock   (atómico;
+    una salida que dejaría stock negativo no toca la fila y lanza StockError)
+  - INSERT en inventory_movements con usuario, fecha y saldo resultante
+  todo en la misma transacción. record_movements() hace lo mismo para un lote
+  (escaneo) con un solo INSERT múltiple al libro.
+
+Tipos: Entrada (+), Salida (−), Ajuste (±), Conteo (cantidad contada; el
+delta se calcula contra el stock actual), Consumo (−, insumos de una sesión;
+ver services/consumables).
+
+Lotes (product_lots): una entrada puede traer (código, caducidad) y suma a
+ese lote. Toda salida (delta < 0) descuenta de los lotes con existencia en
+orden FEFO (caduca antes, sale antes; sin fecha al final) y lo que no cubren
+sale de la existencia sin lote. Product.stock sigue siendo el total y
+products.fechacaducidad la caducidad más próxima de sus lotes con existencia
+(agregados mantenidos en la misma transacción: leerlos no suma lotes).
+inventory_movement_lots guarda qué lotes tocó cada movimiento.
+
+Consumo del mes: las salidas (Salida, Consumo) se acumulan en
+inventory_consumption_monthly (mes, producto -> unidades, costo) dentro de la
+misma transacción que el libro; el KPI del tablero lee ese acumulado.
+
+Consultas:
+  - stock_at(product_id, when)   saldo a una fecha: una búsqueda por índice
+                                 (último movimiento <= when trae su saldo)
+  - stock_levels_at(when)        todos los productos: foto diaria más reciente
+                                 + movimientos posteriores (acotado a un día)
+  - list_movements(filters, limit, cursor)  paginación keyset (fecha desc, id desc)
+  - dashboard_kpis()             KPIs del tablero en una sola consulta agregada
+  - low_stock_items() / expiring_items()    listas por recorrido de índice
+                                 (por caducar: por lote si el producto tiene lotes)
+  - list_products(filters, limit, after)    catálogo paginado por keyset
+                                 (nombre sin mayúsculas, id) con búsqueda por
+                                 prefijo de SKU o nombre
+
+Fotos: la primera escritura de cada día toma una foto de todo el stock
+(stock_snapshots) antes de aplicar el movimiento; take_snapshot() la fuerza.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    and_, bindparam, case, exists, func, literal, literal_column, or_, select, union_all, update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from data.db.session import session_scope
+from data.models.inventory import (
+    ConsumptionMonthly, InventoryMovement, InventoryMovementLot, MovementKind, OutflowKinds,
+    ProductLot, StockSnapshot,
+)
+from data.models.product import Product
+from data.models.user import User
+from services.contracts import get_current_user
+
+KINDS = set(MovementKind)
+PAGE_SIZE = 50
+EXPIRY_DAYS = 30      # "por caducar" = fecha de caducidad dentro de N días
+ALERT_LIMIT = 50      # filas por lista de alertas del tablero
+
+Cursor = Tuple[datetime, int]   # (created_at, id) de la última fila entregada
+ProductCursor = Tuple[str, int]  # (name, id) de la última fila de la página
+Lot = Tuple[str, Optional[date]]  # (código, caducidad) de una entrada por lote
+LotMoves = List[Tuple[int, int]]  # [(lot_id, qty con signo)] de un movimiento
+
+
+class StockError(ValueError):
+    """Movimiento inválido: producto inexistente, cantidad o stock insuficiente."""
+
+
+def _current_user_id() -> Optional[int]:
+    return (get_current_user() or {}).get("id")
+
+
+def product_id_for_sku(sku: str, db: Optional[Session] = None) -> Optional[int]:
+    with session_scope(db) as s:
+        return s.execute(select(Product.id).where(Product.sku == sku).limit(1)).scalar_one_or_none()
+
+
+# ------------------ Fotos de saldo ------------------
+
+def take_snapshot(db: Session, when: Optional[datetime] = None) -> int:
+    """Guarda el stock actual de todos los productos; devuelve cuántas filas."""
+    when = when or datetime.now()
+    last_id = db.execute(select(func.max(InventoryMovement.id))).scalar() or 0
+    rows = db.execute(select(Product.id, func.coalesce(Product.stock, 0))).all()
+    db.execute(
+        StockSnapshot.__table__.insert(),
+        [{"product_id": pid, "taken_at": when, "stock": int(stock), "last_movement_id": last_id}
+         for pid, stock in rows],
+    )
+    return len(rows)
+
+
+def snapshot_if_due(db: Session, when: Optional[datetime] = None) -> bool:
+    """Una foto por día: se toma antes de la primera escritura del día."""
+    when = when or datetime.now()
+    latest = db.execute(select(func.max(StockSnapshot.taken_at))).scalar()
+    if latest is not None and latest.date() >= when.date():
+        return False
+    take_snapshot(db, when)
+    return True
+
+
+# ------------------ Escritura ------------------
+
+def _validate(kind: str, qty: int) -> None:
+    if kind not in KINDS:
+        raise StockError(f"Tipo de movimiento desconocido: {kind}")
+    if kind in ("Entrada", "Salida", "Consumo") and qty <= 0:
+        raise StockError("La cantidad debe ser mayor que cero.")
+    if kind == "Conteo" and qty < 0:
+        raise StockError("El conteo no puede ser negativo.")
+    if kind == "Ajuste" and qty == 0:
+        raise StockError("El ajuste no puede ser cero.")
+
+
+def _apply(s: Session, product_id: int, kind: str, qty: int) -> Tuple[int, int]:
+    """UPDATE atómico del stock; devuelve (delta, saldo). No escribe el libro."""
+    stock = func.coalesce(Product.stock, 0)
+    if kind == "Conteo":
+        # RETURNING de SQLite sólo ve el valor nuevo: el UPDATE lleva en el WHERE el
+        # stock del que sale el delta y sólo escribe si sigue siendo ése; si otro
+        # movimiento lo cambió entre la lectura y la escritura, se relee y se reintenta.
+        while True:
+            before = s.execute(select(stock).where(Product.id == product_id)).scalar_one_or_none()
+            if before is None:
+                raise StockError("No se encontró el producto en la base de datos.")
+            balance = s.execute(
+                update(Product).where(Product.id == product_id, stock == before).values(stock=qty)
+                .returning(Product.stock).execution_options(synchronize_session=False)
+            ).scalar_one_or_none()
+            if balance is not None:
+                return qty - int(before), int(balance)
+    else:
+        delta = -qty if kind in OutflowKinds else qty
+        stmt = update(Product).where(Product.id == product_id).values(stock=stock + delta)
+        if delta < 0:
+            stmt = stmt.where(stock + delta >= 0)
+    balance = s.execute(
+        stmt.returning(Product.stock).execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if balance is None:
+        exists = s.execute(select(Product.id).where(Product.id == product_id)).first()
+        if not exists:
+            raise StockError("No se encontró el producto en la base de datos.")
+        raise StockError("No hay suficiente stock para realizar esta salida.")
+    return delta, int(balance)
+
+
+# ------------------ Lotes (FEFO) ------------------
+
+def _lot_in_stock():
+    # "qty > 0" literal (no parámetro): así SQLite puede usar los índices parciales de product_lots
+    return ProductLot.qty > literal_column("0")
+
+
+def pick_fefo(s: Session, needs: Dict[int, int]) -> Dict[int, LotMoves]:
+    """
+    Descuenta {product_id: unidades} de los lotes con existencia, el que caduca
+    antes primero: una consulta con suma acumulada por producto (ix_lots_fefo)
+    y un UPDATE por lote tocado (executemany). Lo que los lotes no cubren sale
+    de la existencia sin lote. Devuelve {product_id: [(lot_id, -unidades)]}.
+    """
+    needs = {pid: int(q) for pid, q in needs.items() if int(q) > 0}
+    if not needs:
+        return {}
+    running = func.sum(ProductLot.qty).over(
+        partition_by=ProductLot.product_id,
+        order_by=(ProductLot.expires_on.asc().nulls_last(), ProductLot.id.asc()),
+    )
+    q = select(ProductLot.id, ProductLot.product_id, ProductLot.qty, running).where(
+        ProductLot.product_id.in_(list(needs)), _lot_in_stock()
+    )
+    picks: Dict[int, LotMoves] = {}
+    params = []
+    for lot_id, pid, lot_qty, upto in s.execute(q):
+        before = int(upto) - int(lot_qty)   # lo que ya cubren los lotes anteriores
+        if before >= needs[pid]:
+            continue
+        take = min(int(lot_qty), needs[pid] - before)
+        picks.setdefault(pid, []).append((lot_id, -take))
+        params.append({"lot": lot_id, "take": take})
+    if params:
+        t = ProductLot.__table__
+        s.execute(t.update().where(t.c.id == bindparam("lot")).values(qty=t.c.qty - bindparam("take")), params)
+    return picks
+
+
+def receive_lot(s: Session, product_id: int, lot: Lot, qty: int) -> int:
+    """Suma qty al lote (lo crea si no existe; la caducidad nueva reemplaza a la anterior). Devuelve su id."""
+    code, expires_on = lot
+    code = (code or "").strip()
+    if not code:
+        raise StockError("El lote necesita un código.")
+    t = ProductLot.__table__
+    stmt = sqlite_insert(t).values(product_id=product_id, lot_code=code, expires_on=expires_on,
+                                   qty=qty, received_at=datetime.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[t.c.product_id, t.c.lot_code],
+        set_={"qty": t.c.qty + stmt.excluded.qty,
+              "expires_on": func.coalesce(stmt.excluded.expires_on, t.c.expires_on)},
+    )
+    return int(s.execute(stmt.returning(t.c.id)).scalar_one())
+
+
+def sync_lot_expiry(s: Session, product_ids: Iterable[int]) -> None:
+    """
+    products.fechacaducidad = caducidad más próxima de sus lotes con existencia
+    (NULL si se agotaron); un lote con fecha marca el producto como 'caduca'.
+    Sólo toca productos que tienen lotes: los demás conservan su fecha manual.
+    """
+    ids = list(set(product_ids))
+    if not ids:
+        return
+    nearest = (
+        select(func.min(ProductLot.expires_on))
+        .where(ProductLot.product_id == Product.id, _lot_in_stock())
+        .scalar_subquery()
+    )
+    s.execute(
+        update(Product)
+        .where(Product.id.in_(ids), exists().where(ProductLot.product_id == Product.id))
+        .values(fechacaducidad=nearest, caduca=case((nearest.isnot(None), True), else_=Product.caduca))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _lot_moves(s: Session, product_id: int, delta: int, lot: Optional[Lot]) -> LotMoves:
+    if delta < 0:
+        return pick_fefo(s, {product_id: -delta}).get(product_id, [])
+    if delta > 0 and lot is not None:
+        return [(receive_lot(s, product_id, lot, delta), delta)]
+    return []
+
+
+def post_movements(s: Session, rows: List[Dict], lot_moves: Optional[List[LotMoves]] = None) -> List[int]:
+    """
+    Asienta filas ya aplicadas al stock: un INSERT múltiple al libro (ids en el
+    orden de 'rows'), los lotes tocados por movimiento, la caducidad agregada
+    y el acumulado mensual. Devuelve los ids del libro.
+    """
+    if not rows:
+        return []
+    t = InventoryMovement.__table__
+    ids = list(s.execute(t.insert().returning(t.c.id, sort_by_parameter_order=True), rows).scalars())
+    links = [
+        {"movement_id": mid, "lot_id": lot_id, "qty": qty}
+        for mid, moves in zip(ids, lot_moves or [])
+        for lot_id, qty in moves
+    ]
+    if links:
+        s.execute(InventoryMovementLot.__table__.insert(), links)
+        sync_lot_expiry(s, (r["product_id"] for r, moves in zip(rows, lot_moves) if moves))
+    roll_up(s, rows)
+    return ids
+
+
+def record_movement(
+    product_id: int,
+    kind: str,
+    qty: int,
+    *,
+    lot: Optional[Lot] = None,
+    note: Optional[str] = None,
+    user_id: Optional[int] = None,
+    when: Optional[datetime] = None,
+    db: Optional[Session] = None,
+    commit: bool = True,
+) -> Dict:
+    """
+    Aplica un movimiento y lo asienta en el libro. qty:
+      Entrada/Salida/Consumo -> cantidad positiva (el signo lo pone el tipo)
+      Ajuste         -> delta con signo
+      Conteo         -> cantidad contada (>= 0)
+    lot=(código, caducidad) manda lo que entra a ese lote; las salidas siempre
+    van por FEFO. Con commit=False se puede componer dentro de una transacción mayor.
+    """
+    qty = int(qty)
+    _validate(kind, qty)
+    if lot is not None and (kind in OutflowKinds or (kind == "Ajuste" and qty < 0)):
+        raise StockError("El lote sólo aplica a entradas.")
+    when = when or datetime.now()
+    user_id = _current_user_id() if user_id is None else user_id
+
+    with session_scope(db) as s:
+        try:
+            snapshot_if_due(s, when)
+            delta, balance = _apply(s, product_id, kind, qty)
+            row = {"product_id": product_id, "kind": kind, "qty": delta, "balance": balance,
+                   "user_id": user_id, "note": note, "created_at": when}
+            moves = _lot_moves(s, product_id, delta, lot)
+            (mid,) = post_movements(s, [row], [moves])
+            if commit:
+                s.commit()
+        except Exception:
+            if commit:
+                s.rollback()
+            raise
+        return {"id": mid, "product_id": product_id, "kind": kind, "qty": delta,
+                "balance": balance, "created_at": when, "lots": moves}
+
+
+def record_movements(
+    items: Iterable[Tuple[int, str, int]],
+    *,
+    note: Optional[str] = None,
+    user_id: Optional[int] = None,
+    when: Optional[datetime] = None,
+    db: Optional[Session] = None,
+    commit: bool = True,
+) -> List[Dict]:
+    """
+    Varios movimientos (product_id, kind, qty) en UNA transacción: un UPDATE
+    atómico por producto y un solo INSERT múltiple al libro; las salidas van
+    por FEFO igual que en record_movement. Si alguno falla (p. ej. stock
+    insuficiente) no se aplica ninguno. commit=False igual que en record_movement.
+    """
+    items = [(int(pid), kind, int(qty)) for pid, kind, qty in items]
+    for _pid, kind, qty in items:
+        _validate(kind, qty)
+    if not items:
+        return []
+    when = when or datetime.now()
+    user_id = _current_user_id() if user_id is None else user_id
+
+    with session_scope(db) as s:
+        try:
+            snapshot_if_due(s, when)
+            rows, moves = [], []
+            for pid, kind, qty in items:
+                delta, balance = _apply(s, pid, kind, qty)
+                rows.append({"product_id": pid, "kind": kind, "qty": delta, "balance": balance,
+                             "user_id": user_id, "note": note, "created_at": when})
+                moves.append(_lot_moves(s, pid, delta, None))
+            for row, mid in zip(rows, post_movements(s, rows, moves)):
+                row["id"] = mid
+            if commit:
+                s.commit()
+        except Exception:
+            if commit:
+                s.rollback()
+            raise
+    return rows
+
+
+def month_key(when) -> str:
+    return when.strftime("%Y-%m")
+
+
+def roll_up(s: Session, rows: Iterable[Dict]) -> int:
+    """
+    Suma las salidas de 'rows' (product_id, kind, qty con signo, created_at)
+    al acumulado mensual; el costo sale de products.cost en ese momento.
+    Un solo executemany con upsert. Devuelve cuántas filas aplicó.
+    """
+    params = [
+        {"m": month_key(r["created_at"]), "pid": r["product_id"], "u": -int(r["qty"])}
+        for r in rows
+        if r["kind"] in OutflowKinds and int(r["qty"]) < 0
+    ]
+    if not params:
+        return 0
+    t = ConsumptionMonthly.__table__
+    unit_cost = (
+        select(func.coalesce(Product.cost, 0.0)).where(Product.id == bindparam("pid")).scalar_subquery()
+    )
+    stmt = sqlite_insert(t).values(
+        month=bindparam("m"), product_id=bindparam("pid"), units=bindparam("u"),
+        cost=bindparam("u") * unit_cost,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[t.c.month, t.c.product_id],
+        set_={"units": t.c.units + stmt.excluded.units, "cost": t.c.cost + stmt.excluded.cost},
+    )
+    s.execute(stmt, params)
+    return len(params)
+
+
+def rebuild_consumption(db: Session) -> int:
+    """
+    Recalcula el acumulado mensual desde el libro (migración / reparación).
+    El costo histórico no está en el libro: se usa el costo actual.
+    """
+    t = ConsumptionMonthly.__table__
+    db.execute(t.delete())
+    month = func.strftime("%Y-%m", InventoryMovement.created_at)
+    units = func.sum(-InventoryMovement.qty)
+    src = (
+        select(month, InventoryMovement.product_id, units,
+               units * func.coalesce(func.max(Product.cost), 0.0))
+        .join(Product, Product.id == InventoryMovement.product_id)
+        .where(InventoryMovement.kind.in_(OutflowKinds), InventoryMovement.qty < 0)
+        .group_by(month, InventoryMovement.product_id)
+    )
+    res = db.execute(t.insert().from_select(["month", "product_id", "units", "cost"], src))
+    return int(res.rowcount or 0)
+
+
+# ------------------ Lectura ------------------
+
+def stock_at(product_id: int, when: datetime, db: Optional[Session] = None) -> int:
+    """Stock del producto al instante 'when' (índice ix_invmov_product_time)."""
+    with session_scope(db) as s:
+        last = s.execute(
+            select(InventoryMovement.balance)
+            .where(InventoryMovement.product_id == product_id, InventoryMovement.created_at <= when)
+            .order_by(InventoryMovement.created_at.desc(), InventoryMovement.id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        if last is not None:
+            return int(last)
+        # Sin movimientos previos: saldo anterior al primer movimiento posterior,
+        # o el stock actual si nunca se movió
+        first_after = s.execute(
+            select(InventoryMovement.balance, InventoryMovement.qty)
+            .where(InventoryMovement.product_id == product_id, InventoryMovement.created_at > when)
+            .order_by(InventoryMovement.created_at.asc(), InventoryMovement.id.asc())
+            .limit(1)
+        ).first()
+        if first_after is not None:
+            return int(first_after[0]) - int(first_after[1])
+        current = s.execute(select(Product.stock).where(Product.id == product_id)).scalar_one_or_none()
+        return int(current or 0)
+
+
+def stock_levels_at(when: datetime, db: Optional[Session] = None) -> Dict[int, int]:
+    """{product_id: stock} al instante 'when': foto más reciente + movimientos posteriores."""
+    with session_scope(db) as s:
+        snap_at = s.execute(
+            select(func.max(StockSnapshot.taken_at)).where(StockSnapshot.taken_at <= when)
+        ).scalar()
+        levels: Dict[int, int] = {}
+        high_water = 0
+        if snap_at is not None:
+            for pid, stock, last_id in s.execute(
+                select(StockSnapshot.product_id, StockSnapshot.stock, StockSnapshot.last_movement_id)
+                .where(StockSnapshot.taken_at == snap_at)
+            ):
+                levels[pid] = int(stock)
+                high_water = max(high_water, int(last_id))
+
+        # Último saldo por producto entre la foto y 'when'
+        last_ids = (
+            select(func.max(InventoryMovement.id).label("id"))
+            .where(InventoryMovement.id > high_water, InventoryMovement.created_at <= when)
+            .group_by(InventoryMovement.product_id)
+            .subquery()
+        )
+        for pid, balance in s.execute(
+            select(InventoryMovement.product_id, InventoryMovement.balance)
+            .join(last_ids, last_ids.c.id == InventoryMovement.id)
+        ):
+            levels[pid] = int(balance)
+
+        # Productos sin foto ni movimientos en la ventana (p. ej. sin foto aún)
+        for (pid,) in s.execute(select(Product.id)):
+            if pid not in levels:
+                levels[pid] = stock_at(pid, when, db=s)
+        return levels
+
+
+def _filtered(q, filters: Dict):
+    kind = filters.get("kind")
+    if kind:
+        q = q.where(InventoryMovement.kind == kind)
+    if filters.get("product_id") is not None:
+        q = q.where(InventoryMovement.product_id == filters["product_id"])
+    if filters.get("from"):
+        q = q.where(InventoryMovement.created_at >= filters["from"])
+    if filters.get("to"):
+        q = q.where(InventoryMovement.created_at < filters["to"])
+    return q
+
+
+def list_movements(
+    filters: Optional[Dict] = None,
+    limit: int = PAGE_SIZE,
+    cursor: Optional[Cursor] = None,
+    db: Optional[Session] = None,
+) -> Tuple[List[Dict], Optional[Cursor]]:
+    """
+    Una página de movimientos, más recientes primero. filters: kind, product_id,
+    from (incl.), to (excl.). Devuelve (filas, cursor_siguiente | None).
+    """
+    filters = filters or {}
+    q = _filtered(
+        select(
+            InventoryMovement.id, InventoryMovement.created_at, InventoryMovement.kind,
+            Product.sku, Product.name, InventoryMovement.qty, InventoryMovement.balance,
+            User.username, InventoryMovement.note,
+        )
+        .join(Product, Product.id == InventoryMovement.product_id)
+        .outerjoin(User, User.id == InventoryMovement.user_id),
+        filters,
+    )
+    if cursor is not None:
+        at, last_id = cursor
+        q = q.where(
+            (InventoryMovement.created_at < at)
+            | ((InventoryMovement.created_at == at) & (InventoryMovement.id < last_id))
+        )
+    q = q.order_by(InventoryMovement.created_at.desc(), InventoryMovement.id.desc()).limit(limit)
+    with session_scope(db) as s:
+        rows = [
+            {"id": mid, "created_at": at, "kind": kind, "sku": sku or "", "name": name or "",
+             "qty": int(qty), "balance": int(balance), "user": username or "—", "note": note or ""}
+            for mid, at, kind, sku, name, qty, balance, username, note in s.execute(q)
+        ]
+    nxt = (rows[-1]["created_at"], rows[-1]["id"]) if len(rows) == limit else None
+    return rows, nxt
+
+
+def count_movements(filters: Optional[Dict] = None, db: Optional[Session] = None) -> int:
+    q = _filtered(select(func.count(InventoryMovement.id)), filters or {})
+    with session_scope(db) as s:
+        return int(s.execute(q).scalar() or 0)
+
+
+# ------------------ Tablero ------------------
+
+def _deficit():
+    # Misma expresión que ix_products_low_stock (stock - min_stock) WHERE activo = 1
+    return Product.stock - Product.min_stock
+
+
+def dashboard_kpis(
+    today: Optional[date] = None,
+    days: int = EXPIRY_DAYS,
+    db: Optional[Session] = None,
+) -> Dict[str, float]:
+    """
+    activos, bajo_stock, por_caducar (fecha <= hoy + days, incluye vencidos) y
+    consumo_mes (acumulado mensual de salidas y consumos) en un solo SELECT.
+    """
+    today = today or date.today()
+    consumo = (
+        select(func.coalesce(func.sum(ConsumptionMonthly.cost), 0.0))
+        .where(ConsumptionMonthly.month == month_key(today))
+        .scalar_subquery()
+    )
+
+    def _count(cond):
+        return func.coalesce(func.sum(case((cond, 1), else_=0)), 0)
+
+    q = select(
+        _count(Product.activo == True),  # noqa: E712
+        _count(and_(Product.activo == True, _deficit() < 0)),  # noqa: E712
+        _count(and_(Product.caduca == True, Product.fechacaducidad <= today + timedelta(days=days))),  # noqa: E712
+        consumo,
+    ).select_from(Product)
+    with session_scope(db) as s:
+        activos, bajo, caducar, consumo_mes = s.execute(q).one()
+    return {
+        "activos": int(activos),
+        "bajo_stock": int(bajo),
+        "por_caducar": int(caducar),
+        "consumo_mes": float(consumo_mes or 0.0),
+    }
+
+
+def consumption_by_month(
+    months: int = 6,
+    today: Optional[date] = None,
+    db: Optional[Session] = None,
+) -> List[Tuple[str, int, float]]:
+    """[(YYYY-MM, unidades, costo)] de los últimos 'months' meses con salidas, del más viejo al actual."""
+    today = today or date.today()
+    y, m = today.year, today.month - (months - 1)
+    while m <= 0:
+        y, m = y - 1, m + 12
+    q = (
+        select(ConsumptionMonthly.month, func.sum(ConsumptionMonthly.units), func.sum(ConsumptionMonthly.cost))
+        .where(ConsumptionMonthly.month >= f"{y:04d}-{m:02d}", ConsumptionMonthly.month <= month_key(today))
+        .group_by(ConsumptionMonthly.month)
+        .order_by(ConsumptionMonthly.month.asc())
+    )
+    with session_scope(db) as s:
+        return [(month, int(units or 0), float(cost or 0.0)) for month, units, cost in s.execute(q)]
+
+
+def low_stock_items(limit: int = ALERT_LIMIT, db: Optional[Session] = None) -> List[Tuple[str, int, int]]:
+    """(nombre, stock, mínimo) de activos bajo su mínimo, mayor déficit primero."""
+    q = (
+        select(Product.name, Product.stock, Product.min_stock)
+        .where(Product.activo == True, _deficit() < 0)  # noqa: E712
+        .order_by(_deficit().asc())
+        .limit(limit)
+    )
+    with session_scope(db) as s:
+        return [(name, int(stock or 0), int(mn or 0)) for name, stock, mn in s.execute(q)]
+
+
+def expiring_items(
+    today: Optional[date] = None,
+    days: int = EXPIRY_DAYS,
+    limit: int = ALERT_LIMIT,
+    db: Optional[Session] = None,
+) -> List[Tuple[str, date]]:
+    """
+    (nombre, fecha) de lo que caduca a más tardar hoy + days, por fecha: un
+    renglón por lote con existencia (rango sobre ix_lots_expiry) y uno por
+    producto sin lotes (ix_products_expiry).
+    """
+    today = today or date.today()
+    until = today + timedelta(days=days)
+    by_lot = (
+        select((Product.name + literal(" · lote ") + ProductLot.lot_code).label("name"),
+               ProductLot.expires_on.label("expires_on"))
+        .join(Product, Product.id == ProductLot.product_id)
+        .where(_lot_in_stock(), ProductLot.expires_on <= until)
+    )
+    by_product = (
+        select(Product.name.label("name"), Product.fechacaducidad.label("expires_on"))
+        .where(Product.caduca == True, Product.fechacaducidad <= until,  # noqa: E712
+               ~exists().where(ProductLot.product_id == Product.id))
+    )
+    both = union_all(by_lot, by_product).subquery()
+    q = select(both.c.name, both.c.expires_on).order_by(both.c.expires_on.asc()).limit(limit)
+    with session_scope(db) as s:
+        return [(name, fc) for name, fc in s.execute(q)]
+
+
+def list_lots(product_id: int, include_empty: bool = False, db: Optional[Session] = None) -> List[Dict]:
+    """Lotes del producto en orden FEFO: [{id, lot_code, expires_on, qty, received_at}]."""
+    q = select(ProductLot).where(ProductLot.product_id == product_id)
+    if not include_empty:
+        q = q.where(_lot_in_stock())
+    q = q.order_by(ProductLot.expires_on.asc().nulls_last(), ProductLot.id.asc())
+    with session_scope(db) as s:
+        return [
+            {"id": lot.id, "lot_code": lot.lot_code, "expires_on": lot.expires_on,
+             "qty": int(lot.qty), "received_at": lot.received_at}
+            for lot in s.execute(q).scalars()
+        ]
+
+
+def lot_mismatches(db: Optional[Session] = None) -> List[Tuple[int, int, int]]:
+    """
+    (product_id, stock, suma de lotes) donde los lotes exceden el stock: no
+    debería haber ninguno (stock = lotes + existencia sin lote). Para revisión.
+    """
+    total = func.sum(ProductLot.qty)
+    q = (
+        select(ProductLot.product_id, func.max(Product.stock), total)
+        .join(Product, Product.id == ProductLot.product_id)
+        .where(_lot_in_stock())
+        .group_by(ProductLot.product_id)
+        .having(total > func.max(func.coalesce(Product.stock, 0), 0))
+    )
+    with session_scope(db) as s:
+        return [(pid, int(stock or 0), int(lots)) for pid, stock, lots in s.execute(q)]
+
+
+# ------------------ Catálogo de productos ------------------
+
+def _like_prefix(text: str) -> str:
+    """Prefijo para LIKE con comodines escapados ('\\' como escape)."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _product_filters(q, filters: Dict):
+    """
+    filters: category, active (True/False/None), caduca (True/False/None),
+    text (prefijo de SKU o nombre; LIKE sin mayúsculas -> ix_products_*_nocase).
+    """
+    if filters.get("category"):
+        q = q.where(Product.category == filters["category"])
+    if filters.get("active") is not None:
+        q = q.where(Product.activo == bool(filters["active"]))
+    if filters.get("caduca") is not None:
+        q = q.where(Product.caduca == bool(filters["caduca"]))
+    text = (filters.get("text") or "").strip()
+    if text:
+        pattern = _like_prefix(text)
+        q = q.where(or_(Product.name.like(pattern, escape="\\"), Product.sku.like(pattern, escape="\\")))
+    return q
+
+
+def list_products(
+    filters: Optional[Dict] = None,
+    limit: int = PAGE_SIZE,
+    after: Optional[ProductCursor] = None,
+    db: Optional[Session] = None,
+) -> Tuple[List[Dict], Optional[ProductCursor]]:
+    """
+    Una página del catálogo ordenada por nombre (sin mayúsculas) e id.
+    Devuelve (filas, cursor_siguiente | None); las filas usan las llaves que
+    la UI pasa a detalle/entrada/ajuste.
+    """
+    name = Product.name.collate("NOCASE")
+    q = _product_filters(
+        select(
+            Product.id, Product.sku, Product.name, Product.category, Product.unidad,
+            Product.stock, Product.min_stock, Product.caduca, Product.proveedor, Product.activo,
+        ),
+        filters or {},
+    )
+    if after is not None:
+        # name >= :n AND (name > :n OR id > :id): forma que SQLite resuelve como
+        # rango sobre ix_products_name_nocase (la comparación de tuplas no)
+        at_name, at_id = after
+        q = q.where(name >= at_name, or_(name > at_name, Product.id > at_id))
+    q = q.order_by(name.asc(), Product.id.asc()).limit(limit + 1)
+    with session_scope(db) as s:
+        rows = [
+            {"id": pid, "sku": sku or "", "nombre": nombre or "", "categoria": cat or "",
+             "unidad": unidad or "", "stock": int(stock or 0), "minimo": int(mn or 0),
+             "caduca": bool(caduca), "proveedor": prov or "", "activo": bool(activo)}
+            for pid, sku, nombre, cat, unidad, stock, mn, caduca, prov, activo in s.execute(q)
+        ]
+    more = len(rows) > limit
+    rows = rows[:limit]
+    nxt = (rows[-1]["nombre"], rows[-1]["id"]) if more else None
+    return rows, nxt
+
+
+def count_products(filters: Optional[Dict] = None, db: Optional[Session] = None) -> int:
+    q = _product_filters(select(func.count(Product.id)), filters or {})
+    with session_scope(db) as s:
+        return int(s.execute(q).scalar() or 0)
@@ -0,0 +1,79 @@
+# services/lazyimport.py
+"""
+Imports diferidos para acortar el arranque.
+
+- lazy_import("PyQt5.QtChart")        -> proxy de módulo; importa al primer atributo
+- lazy_attr("ui.pages.agenda", "AgendaPage") -> callable que resuelve la clase al llamarla
+- is_available("PyQt5.QtChart")       -> ¿existe el módulo? (sin importarlo)
+
+El proxy guarda el módulo real tras el primer acceso; a partir de ahí cada
+atributo cuesta un getattr extra.
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+
+class LazyModule:
+    """Proxy que importa el módulo real en el primer acceso a un atributo."""
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self) -> ModuleType:
+        mod = self._module
+        if mod is None:
+            mod = importlib.import_module(self._name)
+            object.__setattr__(self, "_module", mod)
+        return mod
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "cargado" if self._module is not None else "diferido"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def lazy_attr(module: str, attr: str) -> Callable[..., Any]:
+    """
+    Devuelve un callable que importa module.attr y lo llama con los mismos
+    argumentos (útil como fábrica de páginas/diálogos).
+    """
+    def factory(*args, **kwargs):
+        return getattr(importlib.import_module(module), attr)(*args, **kwargs)
+    factory.__name__ = attr
+    factory.__qualname__ = f"lazy_attr({module}.{attr})"
+    return factory
+
+
+def is_available(name: str) -> bool:
+    """True si el módulo se puede importar (busca el spec, no ejecuta el módulo)."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def resolve(module: str, attr: str, default: Optional[Any] = None) -> Any:
+    """Importa module.attr; si falla devuelve default (dependencias opcionales)."""
+    try:
+        return getattr(importlib.import_module(module), attr)
+    except Exception:
+        return default
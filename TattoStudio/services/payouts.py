@@ -0,0 +1,257 @@
+# services/payouts.py
+"""
+Liquidación de comisiones por periodo de pago.
+
+Tasa de cada transacción (la misma regla que complete_session):
+  TattooSession.commission_override  ->  Artist.rate_commission  ->  DEFAULT_RATE
+Comisión = round(monto × tasa, 2); sólo transacciones vivas (deleted_flag = 0)
+y que no estén ya en otra liquidación.
+
+- settlement(start, end)      -> (period_id | None, filas por tatuador)
+    Periodo cerrado: lectura de payouts (congelado, sin recorrer transacciones).
+    Abierto: vista previa en UNA consulta agregada por tatuador.
+- close_period(start, end)    -> congela el periodo: payout_periods + payouts
+    (INSERT ... SELECT agrupado) + payout_lines (INSERT ... SELECT), todo en
+    una transacción. Los periodos no se traslapan; cerrar el mismo rango otra
+    vez devuelve el periodo existente.
+- period_lines(payout_id)     -> renglones congelados de una liquidación
+- compute_commission(tx_id)   -> comisión de una transacción (congelada si ya
+    se liquidó; si no, calculada con la regla de arriba)
+
+Fechas locales; un periodo es [start, end) por días completos.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from data.db.session import session_scope
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.payout import Payout, PayoutLine, PayoutPeriod
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services import archive
+from services.scoping import scope
+
+DEFAULT_RATE = 0.5   # tasa si ni la sesión ni el tatuador definen una
+
+
+def rate_for(override: Optional[float], artist_rate: Optional[float]) -> float:
+    """Tasa de comisión de una sesión (override de la sesión, luego la del tatuador)."""
+    if override is not None:
+        return float(override)
+    return float(artist_rate) if artist_rate is not None else DEFAULT_RATE
+
+
+def _rate():
+    return func.coalesce(TattooSession.commission_override, Artist.rate_commission, DEFAULT_RATE)
+
+
+def _bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    if start >= end:
+        raise ValueError("El periodo debe terminar después de iniciar.")
+    return datetime.combine(start, time.min), datetime.combine(end, time.min)
+
+
+def _unsettled(start: date, end: date):
+    """Filtro de las transacciones aún sin liquidar en [start, end)."""
+    lo, hi = _bounds(start, end)
+    return (
+        Transaction.deleted_flag == False,  # noqa: E712  (literal 0: usa los índices parciales)
+        Transaction.date >= lo,
+        Transaction.date < hi,
+        ~exists().where(PayoutLine.transaction_id == Transaction.id),
+    )
+
+
+def _tx_from(q):
+    return (
+        q.select_from(Transaction)
+        .join(Artist, Artist.id == Transaction.artist_id)
+        .outerjoin(TattooSession, TattooSession.id == Transaction.session_id)
+    )
+
+
+def _closed_period(s: Session, start: date, end: date) -> Optional[int]:
+    return s.execute(
+        select(PayoutPeriod.id).where(PayoutPeriod.start == start, PayoutPeriod.end == end)
+    ).scalar_one_or_none()
+
+
+# ------------------ Consultas ------------------
+
+def list_periods(limit: int = 24, db: Optional[Session] = None) -> List[Dict]:
+    """Periodos cerrados, más recientes primero: [{id, start, end, closed_at}]."""
+    with session_scope(db) as s:
+        rows = s.execute(
+            select(PayoutPeriod.id, PayoutPeriod.start, PayoutPeriod.end, PayoutPeriod.closed_at)
+            .order_by(PayoutPeriod.start.desc())
+            .limit(limit)
+        ).all()
+    return [{"id": pid, "start": a, "end": b, "closed_at": at} for pid, a, b, at in rows]
+
+
+def settlement(
+    start: date,
+    end: date,
+    *,
+    user: Optional[dict] = None,
+    db: Optional[Session] = None,
+) -> Tuple[Optional[int], List[Dict]]:
+    """
+    (period_id, [{payout_id, artist_id, artist, gross, commission, tx_count}])
+    ordenadas por tatuador. period_id es None si el rango aún no se cierra
+    (payout_id también). Acotado por RBAC reports.view (un artista ve lo suyo).
+    """
+    with session_scope(db) as s:
+        period_id = _closed_period(s, start, end)
+        if period_id is not None:
+            q = (
+                select(Payout.id, Payout.artist_id, Artist.name, Payout.gross, Payout.commission, Payout.tx_count)
+                .join(Artist, Artist.id == Payout.artist_id)
+                .where(Payout.period_id == period_id, *scope("reports", "view", Payout, user=user))
+            )
+        else:
+            q = _tx_from(
+                select(
+                    literal(None).label("payout_id"),
+                    Transaction.artist_id,
+                    Artist.name,
+                    func.sum(Transaction.amount),
+                    func.sum(func.round(Transaction.amount * _rate(), 2)),
+                    func.count(),
+                )
+            ).where(*_unsettled(start, end), *scope("reports", "view", Transaction, user=user)
+            ).group_by(Transaction.artist_id, Artist.name)
+        rows = s.execute(q.order_by(Artist.name.asc())).all()
+    return period_id, [
+        {"payout_id": pid, "artist_id": aid, "artist": name or "—", "gross": round(float(gross or 0.0), 2),
+         "commission": round(float(comm or 0.0), 2), "tx_count": int(n or 0)}
+        for pid, aid, name, gross, comm, n in rows
+    ]
+
+
+def _lines_select(lines, tx, sess, payout_id: int):
+    return (
+        select(lines.c.transaction_id, tx.c.date, Client.name.label("client"),
+               lines.c.amount, lines.c.rate, lines.c.commission)
+        .join_from(lines, tx, tx.c.id == lines.c.transaction_id)
+        .outerjoin(sess, sess.c.id == tx.c.session_id)
+        .outerjoin(Client, Client.id == sess.c.client_id)
+        .where(lines.c.payout_id == payout_id)
+    )
+
+
+def period_lines(payout_id: int, db: Optional[Session] = None) -> List[Dict]:
+    """
+    Renglones congelados: [{transaction_id, date, client, amount, rate, commission}]
+    por fecha (los de transacciones archivadas vienen de services/archive).
+    """
+    with session_scope(db) as s:
+        q = _lines_select(PayoutLine.__table__, Transaction.__table__, TattooSession.__table__, payout_id)
+        if archive.attach(s):
+            u = union_all(q, _lines_select(archive.payout_lines, archive.transactions, archive.sessions,
+                                           payout_id)).subquery()
+            q = select(u).order_by(u.c.date.asc(), u.c.transaction_id.asc())
+        else:
+            q = q.order_by(Transaction.date.asc(), PayoutLine.transaction_id.asc())
+        rows = s.execute(q).all()
+    return [
+        {"transaction_id": tid, "date": dt, "client": cli or "—", "amount": float(amount),
+         "rate": float(rate), "commission": float(comm)}
+        for tid, dt, cli, amount, rate, comm in rows
+    ]
+
+
+def compute_commission(transaction_id: int, db: Optional[Session] = None) -> float:
+    """Comisión de una transacción: la congelada si ya se liquidó; si no, monto × tasa."""
+    with session_scope(db) as s:
+        value = s.execute(
+            _tx_from(
+                select(func.coalesce(PayoutLine.commission, func.round(Transaction.amount * _rate(), 2)))
+            )
+            .outerjoin(PayoutLine, PayoutLine.transaction_id == Transaction.id)
+            .where(Transaction.id == transaction_id)
+        ).scalar_one_or_none()
+    if value is None:
+        raise ValueError("Transacción no encontrada.")
+    return float(value)
+
+
+# ------------------ Cierre ------------------
+
+def close_period(
+    start: date,
+    end: date,
+    *,
+    user_id: Optional[int] = None,
+    db: Optional[Session] = None,
+) -> int:
+    """
+    Congela las comisiones de [start, end) y devuelve el id del periodo.
+    ValueError si el rango se traslapa con otro periodo cerrado.
+    """
+    _bounds(start, end)
+    with session_scope(db) as s:
+        try:
+            existing = _closed_period(s, start, end)
+            if existing is not None:
+                return existing
+            overlap = s.execute(
+                select(PayoutPeriod.start, PayoutPeriod.end)
+                .where(PayoutPeriod.start < end, PayoutPeriod.end > start)
+                .limit(1)
+            ).first()
+            if overlap is not None:
+                raise ValueError(
+                    f"El periodo se traslapa con uno ya cerrado "
+                    f"({overlap[0]:%d/%m/%Y} – {overlap[1] - timedelta(days=1):%d/%m/%Y})."
+                )
+
+            period_id = s.execute(
+                insert(PayoutPeriod)
+                .values(start=start, end=end, closed_at=datetime.now(), closed_by=user_id)
+                .returning(PayoutPeriod.id)
+            ).scalar_one()
+
+            # 1) Totales por tatuador: una pasada agregada
+            s.execute(
+                insert(Payout).from_select(
+                    ["period_id", "artist_id", "gross", "commission", "tx_count"],
+                    _tx_from(
+                        select(
+                            literal(period_id),
+                            Transaction.artist_id,
+                            func.sum(Transaction.amount),
+                            func.sum(func.round(Transaction.amount * _rate(), 2)),
+                            func.count(),
+                        )
+                    ).where(*_unsettled(start, end)).group_by(Transaction.artist_id),
+                )
+            )
+            # 2) Renglones, ligados a la liquidación de su tatuador
+            s.execute(
+                insert(PayoutLine).from_select(
+                    ["transaction_id", "payout_id", "amount", "rate", "commission"],
+                    _tx_from(
+                        select(
+                            Transaction.id,
+                            Payout.id,
+                            Transaction.amount,
+                            _rate(),
+                            func.round(Transaction.amount * _rate(), 2),
+                        )
+                    )
+                    .join(Payout, and_(Payout.artist_id == Transaction.artist_id, Payout.period_id == period_id))
+                    .where(*_unsettled(start, end)),
+                )
+            )
+            s.commit()
+        except Exception:
+            s.rollback()
+            raise
+    return period_id
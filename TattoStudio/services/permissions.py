@@ -69,6 +69,7 @@ RBAC: Dict[Tuple[str, str], Dict[str, PolicyValue]] = {
     ("reports", "view_tx"):       {"admin": "allow", "assistant": "allow", "artist": "own"},
     ("reports", "refund_void"):   {"admin": "allow", "assistant": "locked", "artist": "deny"},
     ("reports", "cash_close"):    {"admin": "allow", "assistant": "locked", "artist": "deny"},
+    ("reports", "payouts"):       {"admin": "allow", "assistant": "locked", "artist": "deny"},  # cerrar periodo de comisiones
 
     # 5) Inventario
     ("inventory", "view"):        {"admin": "allow", "assistant": "allow", "artist": "allow"},
@@ -154,9 +155,18 @@ def verify_master_code(plain: str, db: Session) -> bool:
     if not row or not row.value:
         return False
     try:
-        return auth.verify_password(plain, row.value)
+        if not auth.verify_password(plain, row.value):
+            return False
     except Exception:
         return False
+    # Igual que en el login: rehash transparente si cambió el costo de bcrypt
+    try:
+        if auth.needs_rehash(row.value, db):
+            row.value = auth.hash_password(plain, rounds=auth.bcrypt_rounds(db))
+            db.commit()
+    except Exception:
+        db.rollback()
+    return True
 
 
 # ------------------ Helper de "defensa en profundidad" ------------------
@@ -0,0 +1,212 @@
+# services/reports.py
+"""
+Consultas de reportes (sin Qt): las usa ReportsPage y el warm-up.
+
+- transaction_rows(start, end, artist_id=None, method=None)
+    -> [(datetime, cliente, monto, método, artista, artist_id)] ordenadas por fecha/cliente
+    Acotadas por RBAC reports.view (un artista sólo recibe lo propio). Si el
+    rango empieza antes del corte del archivo, suma lo archivado (UNION ALL).
+- receivables_by_artist(now, limit, after)
+    -> cuentas por cobrar por tatuador y antigüedad (0–30, 31–60, 61–90, 90+
+       días) en una consulta agrupada, paginada por (nombre, id)
+- receivable_sessions(artist_id, bucket, now, limit, after)
+    -> detalle: sesiones con saldo, más viejas primero, paginado por (inicio, id)
+  Por cobrar = sesión ya ocurrida, no cancelada, con TattooSession.balance > 0.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from data.db.session import SessionLocal, session_scope
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services import archive
+from services.scoping import scope
+
+ReportRow = Tuple[datetime, str, float, str, str, int]
+
+AGE_BUCKETS = ("0–30", "31–60", "61–90", "90+")   # días desde la sesión
+BUCKET_DAYS = (30, 60, 90)                          # límites superiores de los tres primeros
+RECEIVABLES_PAGE = 50
+
+ArtistCursor = Tuple[str, int]          # (nombre, id) del último tatuador de la página
+SessionCursor = Tuple[datetime, int]    # (inicio, id) de la última sesión de la página
+
+
+def _rows_select(tx, sess, entity, start, end, artist_id, method):
+    q = (
+        select(
+            tx.c.date.label("date"),
+            Client.name.label("client"),
+            tx.c.amount.label("amount"),
+            tx.c.method.label("method"),
+            Artist.name.label("artist"),
+            tx.c.artist_id.label("artist_id"),
+        )
+        .join_from(tx, sess, sess.c.id == tx.c.session_id)
+        .join(Client, Client.id == sess.c.client_id)
+        .join(Artist, Artist.id == tx.c.artist_id)
+        .where(tx.c.date >= start, tx.c.date <= end, *scope("reports", "view", entity))
+    )
+    if artist_id is not None:
+        q = q.where(tx.c.artist_id == artist_id)
+    if method:
+        q = q.where(tx.c.method == method)
+    return q
+
+
+def transaction_rows(
+    start: datetime,
+    end: datetime,
+    artist_id: Optional[int] = None,
+    method: Optional[str] = None,
+) -> List[ReportRow]:
+    """Transacciones en [start, end] con cliente y tatuador (filtros opcionales)."""
+    with SessionLocal() as db:
+        q = _rows_select(Transaction.__table__, TattooSession.__table__, Transaction,
+                         start, end, artist_id, method)
+        if archive.reaches_back(db, start):
+            # el rango llega a lo archivado: mismas columnas desde archive.*
+            u = union_all(q, _rows_select(archive.transactions, archive.sessions, archive.transactions,
+                                          start, end, artist_id, method)).subquery()
+            q = select(u).order_by(u.c.date.asc(), u.c.client.asc())
+        else:
+            q = q.order_by(Transaction.date.asc(), Client.name.asc())
+        return [
+            (dt, cli or "—", float(amount or 0.0), m or "—", artist_name or "—", int(aid or 0))
+            for dt, cli, amount, m, artist_name, aid in db.execute(q).all()
+        ]
+
+
+# ------------------ Cuentas por cobrar ------------------
+
+def _receivables(now: datetime, user: Optional[dict]):
+    """
+    CTE con las sesiones ya ocurridas y no canceladas: saldo (SUM correlacionado)
+    y cubeta de antigüedad calculados una sola vez por sesión (MATERIALIZED).
+    """
+    bucket = case(
+        *((TattooSession.start >= now - timedelta(days=d), i) for i, d in enumerate(BUCKET_DAYS)),
+        else_=len(BUCKET_DAYS),
+    )
+    return (
+        select(
+            TattooSession.id, TattooSession.artist_id, TattooSession.client_id, TattooSession.start,
+            TattooSession.price, TattooSession.balance.label("balance"), bucket.label("bucket"),
+        )
+        .where(TattooSession.status != "Cancelada", TattooSession.start < now,
+               *scope("reports", "view", TattooSession, user=user))
+        .cte("receivable")
+        .prefix_with("MATERIALIZED")
+    )
+
+
+def receivables_by_artist(
+    now: Optional[datetime] = None,
+    limit: int = RECEIVABLES_PAGE,
+    after: Optional[ArtistCursor] = None,
+    *,
+    user: Optional[dict] = None,
+    db: Optional[Session] = None,
+) -> Tuple[List[Dict], Optional[ArtistCursor], Dict]:
+    """
+    Una página de tatuadores con saldo pendiente, por nombre:
+      [{artist_id, artist, buckets: [4 montos], total, sessions}]
+    más el cursor siguiente y los totales generales {buckets, total, sessions}
+    (ventana sobre el resultado agrupado; sólo son completos en la primera página).
+    """
+    now = now or datetime.now()
+    r = _receivables(now, user)
+
+    def _amount(k):
+        return func.coalesce(func.sum(case((r.c.bucket == k, r.c.balance), else_=0.0)), 0.0)
+
+    amounts = [_amount(k) for k in range(len(AGE_BUCKETS))]
+    total, count = func.sum(r.c.balance), func.count(r.c.id)
+    q = (
+        select(Artist.id, Artist.name, *amounts, total, count,
+               *(func.sum(a).over() for a in amounts), func.sum(total).over(), func.sum(count).over())
+        .join(Artist, Artist.id == r.c.artist_id)
+        .where(r.c.balance > 0)
+        .group_by(Artist.id, Artist.name)
+        .order_by(Artist.name.asc(), Artist.id.asc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        at_name, at_id = after
+        q = q.where(Artist.name >= at_name, or_(Artist.name > at_name, Artist.id > at_id))
+
+    n = len(AGE_BUCKETS)
+    rows: List[Dict] = []
+    totals = {"buckets": [0.0] * n, "total": 0.0, "sessions": 0}
+    with session_scope(db) as s:
+        for rec in s.execute(q):
+            aid, name = rec[0], rec[1]
+            rows.append({
+                "artist_id": int(aid), "artist": name or "—",
+                "buckets": [float(v or 0.0) for v in rec[2:2 + n]],
+                "total": float(rec[2 + n] or 0.0), "sessions": int(rec[3 + n] or 0),
+            })
+            grand = rec[4 + n:]
+            totals = {"buckets": [float(v or 0.0) for v in grand[:n]],
+                      "total": float(grand[n] or 0.0), "sessions": int(grand[n + 1] or 0)}
+    more = len(rows) > limit
+    rows = rows[:limit]
+    nxt = (rows[-1]["artist"], rows[-1]["artist_id"]) if more else None
+    return rows, nxt, totals
+
+
+def receivable_sessions(
+    artist_id: Optional[int] = None,
+    bucket: Optional[int] = None,
+    now: Optional[datetime] = None,
+    limit: int = RECEIVABLES_PAGE,
+    after: Optional[SessionCursor] = None,
+    *,
+    user: Optional[dict] = None,
+    db: Optional[Session] = None,
+) -> Tuple[List[Dict], Optional[SessionCursor]]:
+    """
+    Sesiones con saldo (más viejas primero), opcionalmente de un tatuador y de
+    una cubeta (índice en AGE_BUCKETS):
+      [{id, start, days, client, artist, price, paid, balance}]
+    """
+    now = now or datetime.now()
+    # Sin la CTE: recorre sesiones por inicio (índice de start) y corta al llenar la página
+    q = (
+        select(TattooSession.id, TattooSession.start, Client.name, Artist.name,
+               TattooSession.price, TattooSession.balance)
+        .outerjoin(Client, Client.id == TattooSession.client_id)
+        .outerjoin(Artist, Artist.id == TattooSession.artist_id)
+        .where(TattooSession.status != "Cancelada", TattooSession.start < now,
+               TattooSession.balance > 0, *scope("reports", "view", TattooSession, user=user))
+        .order_by(TattooSession.start.asc(), TattooSession.id.asc())
+        .limit(limit + 1)
+    )
+    if artist_id is not None:
+        q = q.where(TattooSession.artist_id == artist_id)
+    if bucket is not None:
+        hi = now if bucket == 0 else now - timedelta(days=BUCKET_DAYS[bucket - 1])
+        q = q.where(TattooSession.start < hi)
+        if bucket < len(BUCKET_DAYS):
+            q = q.where(TattooSession.start >= now - timedelta(days=BUCKET_DAYS[bucket]))
+    if after is not None:
+        at, last_id = after
+        q = q.where(TattooSession.start >= at, or_(TattooSession.start > at, TattooSession.id > last_id))
+    with session_scope(db) as s:
+        rows = [
+            {"id": sid, "start": st, "days": (now - st).days, "client": client or "—",
+             "artist": artist or "—", "price": float(price or 0.0),
+             "paid": float(price or 0.0) - float(bal or 0.0), "balance": float(bal or 0.0)}
+            for sid, st, client, artist, price, bal in s.execute(q)
+        ]
+    more = len(rows) > limit
+    rows = rows[:limit]
+    nxt = (rows[-1]["start"], rows[-1]["id"]) if more else None
+    return rows, nxt
@@ -0,0 +1,136 @@
+# services/scoping.py
+"""
+RBAC → SQL: filtros de visibilidad derivados de la matriz de permisos.
+
+can() responde por una acción sobre un registro; para listas eso obliga a
+traer todo y filtrar en Python. Aquí la misma política se traduce a
+cláusulas de SQLAlchemy para que la BD sólo devuelva lo permitido:
+
+  q = db.query(TattooSession).filter(*scope("agenda", "view"))
+  q = db.query(Client).filter(*scope("clients", "view", Client))
+
+Política del usuario actual (services.contracts.get_current_user):
+  allow   -> []                        (sin filtro)
+  own     -> [dueño == artist_id]      (ver OWNERS)
+  locked  -> [] si el assistant está elevado; si no, [false()]
+  deny    -> [false()]                 (también sin usuario o rol desconocido)
+
+scope_key(resource, action) resume el alcance efectivo en algo hashable
+(None = todo) para usarlo en llaves de caché (warm-up, etc.).
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import exists, false, or_, select
+from sqlalchemy.sql.elements import ColumnElement
+
+from data.models.client import Client
+from data.models.payout import Payout
+from data.models.portfolio import PortfolioItem
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services.contracts import get_current_user
+from services.permissions import _policy_for, can
+
+# ------------------ Dueño de cada entidad ------------------
+# entidad -> fn(artist_id, user_id) -> cláusula "es de este artista"
+OwnerFn = Callable[[Optional[int], Optional[int]], ColumnElement]
+
+
+def _own_session(artist_id, _user_id):
+    return TattooSession.artist_id == artist_id
+
+
+def _own_transaction(artist_id, _user_id):
+    return Transaction.artist_id == artist_id
+
+
+def _own_payout(artist_id, _user_id):
+    return Payout.artist_id == artist_id
+
+
+def _own_client(artist_id, _user_id):
+    # Cliente "propio": lo prefiere o tiene (o tuvo) citas con el artista
+    return or_(
+        Client.preferred_artist_id == artist_id,
+        exists(
+            select(TattooSession.id).where(
+                TattooSession.client_id == Client.id,
+                TattooSession.artist_id == artist_id,
+            )
+        ),
+    )
+
+
+def _own_portfolio(artist_id, user_id):
+    # Piezas nuevas se ligan por user_id; las viejas sólo traen artist_id
+    return or_(PortfolioItem.user_id == user_id, PortfolioItem.artist_id == artist_id)
+
+
+OWNERS: Dict[type, OwnerFn] = {
+    TattooSession: _own_session,
+    Transaction: _own_transaction,
+    Payout: _own_payout,
+    Client: _own_client,
+    PortfolioItem: _own_portfolio,
+}
+
+# Entidad que lista cada recurso por defecto
+DEFAULT_ENTITY: Dict[str, type] = {
+    "agenda": TattooSession,
+    "reports": Transaction,
+    "clients": Client,
+    "portfolio": PortfolioItem,
+}
+
+
+# ------------------ API ------------------
+
+def _effective(resource: str, action: str, user: Optional[dict]) -> Tuple[str, Optional[int], Optional[int]]:
+    """('all' | 'own' | 'none', artist_id, user_id) para el usuario dado."""
+    if not user:
+        return "none", None, None
+    role = user.get("role") or ""
+    uid, aid = user.get("id"), user.get("artist_id")
+    policy = _policy_for(role, resource, action)
+    if policy == "own":
+        if role == "artist" and aid is not None:
+            return "own", aid, uid
+        return "none", None, None
+    # allow / locked / deny: misma decisión que can() (incluye elevación del assistant)
+    if can(role, resource, action, user_artist_id=aid, user_id=uid):
+        return "all", None, None
+    return "none", None, None
+
+
+def scope(
+    resource: str,
+    action: str,
+    entity: Optional[type] = None,
+    user: Optional[dict] = None,
+) -> List[ColumnElement]:
+    """
+    Cláusulas para .filter(*...) / .where(*...) con lo que el usuario puede ver.
+    entity por defecto: DEFAULT_ENTITY[resource]. user por defecto: el actual.
+    """
+    user = get_current_user() if user is None else user
+    kind, aid, uid = _effective(resource, action, user)
+    if kind == "all":
+        return []
+    if kind == "none":
+        return [false()]
+    entity = entity or DEFAULT_ENTITY.get(resource)
+    owner = OWNERS.get(entity)
+    if owner is None:
+        return [false()]  # sin dueño conocido no se puede acotar: fail-safe
+    return [owner(aid, uid)]
+
+
+def scope_key(resource: str, action: str, user: Optional[dict] = None) -> Hashable:
+    """None = ve todo; ('own', artist_id) o 'none'. Sirve como parte de llaves de caché."""
+    user = get_current_user() if user is None else user
+    kind, aid, _uid = _effective(resource, action, user)
+    if kind == "all":
+        return None
+    return ("own", aid) if kind == "own" else "none"
@@ -1,14 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 from typing import Optional
 
-# Asegura que TODOS los modelos estén registrados (evita errores de mapeo diferido)
-from data.models import load_all_models
-load_all_models()
+from sqlalchemy import func, or_, select, union_all
 
+# Los demás modelos se registran al configurar los mappers (ver data/db/session.py)
 from data.db.session import SessionLocal
+from data.models.client import Client
 from data.models.session_tattoo import TattooSession
 from data.models.transaction import Transaction
 from data.models.artist import Artist
+from services import archive
+from services.scoping import scope
+from services import client_profile  # noqa: F401  (se suscribe a SessionChanged)
+from services.events import CANCELLED, COMPLETED, CREATED, UPDATED, SessionChanged, publish
+from services.cash_close import ensure_open
+from services.consumables import deduct_for_session
+from services.payouts import rate_for
 
 
 ALLOWED_METHODS = {"Efectivo", "Tarjeta", "Transferencia"}
@@ -65,7 +72,11 @@ def create_session(payload: dict) -> int:
             )
             db.add(s)
             db.flush()  # asigna s.id
-            return s.id
+            new_id = s.id
+    publish(SessionChanged(new_id, payload["client_id"], payload["artist_id"], CREATED))
+    return new_id
+
+
 def cancel_session(session_id: int, as_no_show: bool = False) -> None:
     """
     Marca la sesión como 'Cancelada'. Si as_no_show=True, antepone una nota para indicarlo.
@@ -85,6 +96,8 @@ def cancel_session(session_id: int, as_no_show: bool = False) -> None:
             if note_tag:
                 s.notes = (note_tag + (s.notes or "")).strip()
             db.add(s)
+            client_id, artist_id = s.client_id, s.artist_id
+    publish(SessionChanged(session_id, client_id, artist_id, CANCELLED))
 
 
 # ---------- API: actualizar sesión ----------
@@ -122,13 +135,18 @@ def update_session(session_id: int, payload: dict) -> None:
                     setattr(s, k, payload[k])
 
             db.add(s)  # commit del contexto guarda cambios
+            client_id, artist_id = s.client_id, s.artist_id
+    publish(SessionChanged(session_id, client_id, artist_id, UPDATED))
 
 
 # ---------- API: completar sesión (crea Transaction) ----------
-def complete_session(session_id: int, payment: dict) -> int:
+def complete_session(session_id: int, payment: dict, service_template_id: Optional[int] = None) -> int:
     """
     Marca la sesión como 'Completada' y crea una Transaction asociada.
     payment esperado: {'method': 'Efectivo'|'Tarjeta'|'Transferencia'}
+    En la misma transacción descuenta los insumos de la plantilla de consumo
+    del servicio (services/consumables; service_template_id la fuerza).
+    CashClosedError si el día del cobro ya tiene corte de caja.
     Devuelve el id de la Transaction creada.
     """
     method = payment.get("method")
@@ -148,39 +166,45 @@ def complete_session(session_id: int, payment: dict) -> int:
             if s.price is None:
                 s.price = 0.0
 
-            # Determinar comisión
+            # Determinar comisión (misma regla que la liquidación por periodo)
             artist = db.get(Artist, s.artist_id)
-            if s.commission_override is not None:
-                rate = s.commission_override
-            else:
-                rate = artist.rate_commission if artist and (artist.rate_commission is not None) else 0.5
+            rate = rate_for(s.commission_override, artist.rate_commission if artist else None)
 
             commission_amount = round((s.price or 0.0) * rate, 2)
 
-            # Marcar completada y crear transacción
+            # Marcar completada y crear transacción (no en un día con corte de caja)
+            paid_at = s.end or datetime.utcnow()
+            ensure_open(db, paid_at)
             s.status = "Completada"
             t = Transaction(
                 session_id=s.id,
                 artist_id=s.artist_id,
                 amount=s.price,
                 method=method,
-                date=s.end or datetime.utcnow(),
+                date=paid_at,
                 commission_amount=commission_amount,
             )
             db.add(s)
             db.add(t)
             db.flush()
-            return t.id
+
+            # Insumos: UPDATE por conjunto + INSERT múltiple al libro (sin commit propio)
+            deduct_for_session(db, s, template_id=service_template_id)
+            tx_id, client_id, artist_id = t.id, s.client_id, s.artist_id
+    publish(SessionChanged(session_id, client_id, artist_id, COMPLETED))
+    return tx_id
 
 
 # ---------- (Opcional) listar sesiones para Agenda ----------
 def list_sessions(filters: dict) -> list[dict]:
     """
     Devuelve sesiones como dicts para poblar la Agenda.
-    filters soporta: from (datetime), to (datetime), artist_id (int), status (str|list)
+    filters soporta: from (datetime), to (datetime), artist_id (int), status (str|list),
+                     ids (list[int]; p. ej. la Agenda al recibir un SessionChanged)
+    Sólo devuelve lo que el usuario actual puede ver (RBAC agenda.view, en SQL).
     """
     with SessionLocal() as db:
-        q = db.query(TattooSession)
+        q = db.query(TattooSession).filter(*scope("agenda", "view", TattooSession))
 
         f_from = filters.get("from")
         f_to = filters.get("to")
@@ -192,6 +216,9 @@ def list_sessions(filters: dict) -> list[dict]:
         if "artist_id" in filters:
             q = q.filter(TattooSession.artist_id == filters["artist_id"])
 
+        if "ids" in filters:
+            q = q.filter(TattooSession.id.in_(list(filters["ids"])))
+
         if "status" in filters:
             st = filters["status"]
             if isinstance(st, (list, tuple, set)):
@@ -213,3 +240,123 @@ def list_sessions(filters: dict) -> list[dict]:
                 "notes": s.notes,
             })
         return out
+
+
+# ---------- Selector de sesiones para Caja ----------
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    """[inicio, fin) del día local; las fechas de sesión se guardan en hora local sin zona."""
+    start = datetime.combine(day, time(0, 0))
+    return start, start + timedelta(days=1)
+
+
+def sessions_for_day(day: date, artist_id: Optional[int] = None, *, user: Optional[dict] = None,
+                     db=None) -> list[dict]:
+    """
+    Sesiones del día 'day' (de un artista o de todas) para el selector de la
+    caja, en UNA consulta proyectada: id, hora, estado, artista, cliente y saldo
+    (TattooSession.balance). Con artista es un rango sobre
+    ix_sessions_artist_time; el pagado usa ix_tx_live_session.
+    Respeta RBAC agenda.view igual que list_sessions.
+    """
+    start, end = day_bounds(day)
+    q = (
+        select(TattooSession.id, TattooSession.start, TattooSession.status, TattooSession.artist_id,
+               Client.name, TattooSession.balance)
+        .outerjoin(Client, Client.id == TattooSession.client_id)
+        .where(TattooSession.start >= start, TattooSession.start < end,
+               *scope("agenda", "view", TattooSession, user=user))
+        .order_by(TattooSession.start.asc())
+    )
+    if artist_id is not None:
+        q = q.where(TattooSession.artist_id == int(artist_id))
+
+    def _rows(s):
+        return [
+            {"id": sid, "start": st, "status": status or "", "artist_id": aid,
+             "client": client or "", "balance": float(bal or 0.0)}
+            for sid, st, status, aid, client, bal in s.execute(q)
+        ]
+
+    if db is not None:
+        return _rows(db)
+    with SessionLocal() as s:
+        return _rows(s)
+
+
+# ---------- Historial de citas por artista (StaffDetailPage) ----------
+HISTORY_PAGE = 50
+HistoryCursor = tuple[datetime, int]   # (inicio, id) de la última cita de la página
+
+
+def _history_select(sess, paid, entity, artist_id, limit, after, status, user):
+    q = (
+        select(sess.c.id, sess.c.start, Client.name.label("client"), sess.c.status, paid.label("paid"))
+        .join_from(sess, Client, Client.id == sess.c.client_id, isouter=True)
+        .where(sess.c.artist_id == int(artist_id),
+               *scope("agenda", "view", entity, user=user))
+        .order_by(sess.c.start.desc(), sess.c.id.desc())
+        .limit(limit + 1)
+    )
+    if status:
+        q = q.where(sess.c.status == status)
+    if after is not None:
+        at, last_id = after
+        q = q.where(sess.c.start <= at, or_(sess.c.start < at, sess.c.id < last_id))
+    return q
+
+
+def artist_history(artist_id: int, limit: int = HISTORY_PAGE, after: Optional[HistoryCursor] = None,
+                   status: Optional[str] = None, *, user: Optional[dict] = None,
+                   db=None) -> tuple[list[dict], Optional[HistoryCursor]]:
+    """
+    Página del historial del artista, más recientes primero, en UNA consulta
+    proyectada: id, inicio, cliente, estado y pagado (TattooSession.total_paid).
+    Keyset por (inicio, id) descendente sobre ix_sessions_artist_time: cada
+    página cuesta lo mismo sin importar cuántas citas tenga el artista.
+    Con archivo frío (services/archive) la página es un UNION ALL de las dos
+    páginas, cada una por su índice.
+    Devuelve (filas, cursor); cursor None = no hay más.
+    """
+    args = (artist_id, limit, after, status, user)
+
+    def _rows(s):
+        q = _history_select(TattooSession.__table__, TattooSession.total_paid, TattooSession, *args)
+        if archive.attach(s):
+            u = union_all(
+                select(q.subquery()),
+                select(_history_select(archive.sessions, archive.total_paid(), archive.sessions, *args).subquery()),
+            ).subquery()
+            q = select(u).order_by(u.c.start.desc(), u.c.id.desc()).limit(limit + 1)
+        return [
+            {"id": sid, "start": st, "client": client or "", "status": st_name or "",
+             "paid": float(paid or 0.0)}
+            for sid, st, client, st_name, paid in s.execute(q)
+        ]
+
+    if db is not None:
+        rows = _rows(db)
+    else:
+        with SessionLocal() as s:
+            rows = _rows(s)
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, ((rows[-1]["start"], rows[-1]["id"]) if more else None)
+
+
+def artist_status_counts(artist_id: int, *, user: Optional[dict] = None, db=None) -> dict[str, int]:
+    """{estado: citas} del artista en una consulta agrupada (con lo archivado, si hay archivo)."""
+    def _status(sess, entity):
+        return select(sess.c.status).where(sess.c.artist_id == int(artist_id),
+                                            *scope("agenda", "view", entity, user=user))
+
+    def _counts(s):
+        u = _status(TattooSession.__table__, TattooSession)
+        if archive.attach(s):
+            u = union_all(u, _status(archive.sessions, archive.sessions))
+        u = u.subquery()
+        return {st or "": int(n) for st, n in s.execute(select(u.c.status, func.count()).group_by(u.c.status))}
+
+    if db is not None:
+        return _counts(db)
+    with SessionLocal() as s:
+        return _counts(s)
\ No newline at end of file
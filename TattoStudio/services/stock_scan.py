@@ -0,0 +1,254 @@
+# services/stock_scan.py
+"""
+Modo escaneo para entradas de stock (sin Qt).
+
+- SkuIndex: SKU -> producto en memoria + trie de prefijos para entrada parcial.
+  Se carga una vez y se mantiene al día con sync(): compara una huella barata
+  de la tabla (count, max(id)) y sólo recarga si cambió. invalidate() fuerza
+  la recarga (p. ej. tras crear un ítem).
+- ScanBatch: acumula escaneos (un lector tipo teclado manda el SKU + Enter;
+  a mano se admite "12*SKU") por producto y los asienta en el libro con
+  inventory.record_movements(): una sola transacción por lote.
+
+Uso:
+  batch = ScanBatch(shared_index())
+  batch.add("TIN-NE-250")       -> ScanResult(status="ok", ...)
+  batch.add("TIN")              -> ScanResult(status="unknown", candidates=[...])
+  batch.commit()                -> filas del libro (saldo incluido)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from data.db.session import session_scope
+from data.models.product import Product
+from services import inventory
+
+MAX_CANDIDATES = 8
+
+
+@dataclass(frozen=True)
+class ProductRef:
+    id: int
+    sku: str
+    name: str
+
+
+def normalize_sku(code: str) -> str:
+    return (code or "").strip().upper()
+
+
+# ------------------ Trie de prefijos ------------------
+
+class _Node:
+    __slots__ = ("children", "ref")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.ref: Optional[ProductRef] = None
+
+
+class SkuTrie:
+    """Trie por carácter; complete() recorre en orden alfabético y corta en 'limit'."""
+
+    def __init__(self):
+        self._root = _Node()
+
+    def insert(self, key: str, ref: ProductRef) -> None:
+        node = self._root
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+        node.ref = ref
+
+    def remove(self, key: str) -> None:
+        path = [self._root]
+        for ch in key:
+            nxt = path[-1].children.get(ch)
+            if nxt is None:
+                return
+            path.append(nxt)
+        path[-1].ref = None
+        # Poda de ramas vacías
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.ref is None and not node.children:
+                del path[depth - 1].children[key[depth - 1]]
+            else:
+                break
+
+    def complete(self, prefix: str, limit: int = MAX_CANDIDATES) -> List[ProductRef]:
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        out: List[ProductRef] = []
+        stack = [node]
+        while stack and len(out) < limit:
+            cur = stack.pop()
+            if cur.ref is not None:
+                out.append(cur.ref)
+            # orden inverso para que pop() salga en orden alfabético
+            stack.extend(cur.children[k] for k in sorted(cur.children, reverse=True))
+        return out
+
+
+# ------------------ Índice SKU ------------------
+
+class SkuIndex:
+    def __init__(self):
+        self._by_sku: Dict[str, ProductRef] = {}
+        self._by_id: Dict[int, ProductRef] = {}
+        self._trie = SkuTrie()
+        self._fingerprint: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._by_sku)
+
+    @staticmethod
+    def _fingerprint_of(db: Session) -> Tuple[int, int]:
+        n, top = db.execute(select(func.count(Product.id), func.max(Product.id))).one()
+        return int(n or 0), int(top or 0)
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """Recarga completa: una consulta proyectada (id, sku, name)."""
+        with session_scope(db) as s:
+            fp = self._fingerprint_of(s)
+            rows = s.execute(select(Product.id, Product.sku, Product.name)).all()
+        self._by_sku.clear()
+        self._by_id.clear()
+        self._trie = SkuTrie()
+        for pid, sku, name in rows:
+            self.upsert(ProductRef(int(pid), sku or "", name or ""))
+        self._fingerprint = fp
+        return len(self._by_sku)
+
+    def sync(self, db: Optional[Session] = None) -> bool:
+        """Recarga si la tabla cambió desde la última carga; True si recargó."""
+        with session_scope(db) as s:
+            if self._fingerprint is not None and self._fingerprint_of(s) == self._fingerprint:
+                return False
+            self.load(s)
+        return True
+
+    def invalidate(self) -> None:
+        self._fingerprint = None
+
+    def upsert(self, ref: ProductRef) -> None:
+        old = self._by_id.get(ref.id)
+        if old is not None and normalize_sku(old.sku) != normalize_sku(ref.sku):
+            self.discard(old.id)
+        key = normalize_sku(ref.sku)
+        if not key:
+            return
+        self._by_sku[key] = ref
+        self._by_id[ref.id] = ref
+        self._trie.insert(key, ref)
+
+    def discard(self, product_id: int) -> None:
+        ref = self._by_id.pop(product_id, None)
+        if ref is not None:
+            key = normalize_sku(ref.sku)
+            self._by_sku.pop(key, None)
+            self._trie.remove(key)
+
+    def get(self, code: str) -> Optional[ProductRef]:
+        return self._by_sku.get(normalize_sku(code))
+
+    def by_id(self, product_id: int) -> Optional[ProductRef]:
+        return self._by_id.get(product_id)
+
+    def complete(self, prefix: str, limit: int = MAX_CANDIDATES) -> List[ProductRef]:
+        key = normalize_sku(prefix)
+        return self._trie.complete(key, limit) if key else []
+
+
+_shared: Optional[SkuIndex] = None
+
+
+def shared_index() -> SkuIndex:
+    """Índice compartido por la app (se sincroniza al abrir el modo escaneo)."""
+    global _shared
+    if _shared is None:
+        _shared = SkuIndex()
+    return _shared
+
+
+# ------------------ Lote de escaneo ------------------
+
+@dataclass
+class ScanResult:
+    status: str                                   # ok | unknown | invalid
+    code: str
+    qty: int = 0
+    product: Optional[ProductRef] = None
+    total: int = 0                                # acumulado del producto en el lote
+    candidates: List[ProductRef] = field(default_factory=list)
+
+
+def parse_code(raw: str) -> Tuple[int, str]:
+    """'SKU' -> (1, SKU); '12*SKU' -> (12, SKU)."""
+    text = (raw or "").strip()
+    head, found, tail = text.partition("*")
+    if found and head.strip().isdigit():
+        return int(head.strip()), tail.strip()
+    return 1, text
+
+
+class ScanBatch:
+    def __init__(self, index: SkuIndex):
+        self.index = index
+        self._qty: Dict[int, int] = {}            # product_id -> unidades (orden de primer escaneo)
+        self._history: List[Tuple[int, int]] = []  # (product_id, qty) para deshacer
+
+    def add(self, raw: str) -> ScanResult:
+        qty, code = parse_code(raw)
+        if not code or qty <= 0:
+            return ScanResult("invalid", code, qty)
+        ref = self.index.get(code)
+        if ref is None:
+            return ScanResult("unknown", code, qty, candidates=self.index.complete(code))
+        return self.add_product(ref, qty, code)
+
+    def add_product(self, ref: ProductRef, qty: int = 1, code: Optional[str] = None) -> ScanResult:
+        self._qty[ref.id] = self._qty.get(ref.id, 0) + qty
+        self._history.append((ref.id, qty))
+        return ScanResult("ok", code or ref.sku, qty, ref, self._qty[ref.id])
+
+    def undo_last(self) -> Optional[Tuple[ProductRef, int]]:
+        if not self._history:
+            return None
+        pid, qty = self._history.pop()
+        left = self._qty[pid] - qty
+        if left > 0:
+            self._qty[pid] = left
+        else:
+            del self._qty[pid]
+        return self.index.by_id(pid) or ProductRef(pid, "", ""), qty
+
+    def lines(self) -> Iterator[Tuple[ProductRef, int]]:
+        for pid, qty in self._qty.items():
+            yield self.index.by_id(pid) or ProductRef(pid, "", ""), qty
+
+    @property
+    def total_units(self) -> int:
+        return sum(self._qty.values())
+
+    def __len__(self) -> int:
+        return len(self._qty)
+
+    def clear(self) -> None:
+        self._qty.clear()
+        self._history.clear()
+
+    def commit(self, note: Optional[str] = "Entrada por escaneo", db: Optional[Session] = None) -> List[Dict]:
+        """Asienta el lote (una Entrada por producto) en una transacción y lo vacía."""
+        rows = inventory.record_movements(
+            [(pid, "Entrada", qty) for pid, qty in self._qty.items()], note=note, db=db,
+        )
+        self.clear()
+        return rows
@@ -0,0 +1,489 @@
+# services/studio_server.py
+"""
+Servidor del estudio (opcional): varias estaciones, un solo escritor.
+
+Abrir el mismo .db desde varias PCs por una carpeta compartida se traba con
+los bloqueos de archivo de SQLite (y arriesga corromperlo). En modo servidor
+una sola máquina abre la BD y las demás llaman a services/* por HTTP
+(services/transport, modo "server"):
+
+  POST /login  {"username", "password"}          -> {"token", "user"}
+  POST /elevate {"code"}                          -> {"result": bool} (código maestro)
+  POST /call   {"fn": "sessions.create_session",  -> {"result": ...} | {"error": {...}}
+                "args": [...], "kwargs": {...}}     (Authorization: Bearer <token>)
+  GET  /events                                    -> una línea JSON por evento de dominio
+  GET  /health                                    -> {"ok": true, "stats": {...}}
+
+- Lecturas: pool de hilos (READ_WORKERS) con el engine normal; la BD queda en
+  WAL para que lean mientras se escribe.
+- Escrituras: UNA conexión (engine propio, pool de 1) en UN hilo. Las que
+  llegan mientras se escribe se juntan (hasta BATCH_MAX) en una sola
+  transacción: cada llamada corre en su SAVEPOINT (si falla sólo se deshace
+  la suya) y el lote hace un solo COMMIT.
+- Cada llamada corre como el usuario de su token (contracts.acting_as) y antes
+  se revisa su (recurso, acción) de transport.API con permissions.enforce
+  (dueño para "own": el de la cita; en lecturas el filtro lo pone scoping).
+- Los eventos de un lote (services/events) se retienen hasta su COMMIT y se
+  empujan a todos los /events abiertos.
+
+  python -m services.studio_server --host 0.0.0.0 --port 8765
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, scoped_session
+
+from data.db.session import SessionLocal, session_scope
+from data.models.session_tattoo import TattooSession
+from data.models.user import User
+from services import auth, events, permissions
+from services.contracts import acting_as, get_current_user
+from services.transport import API, DIRECT, WRITE, configure, dumps, error_payload, loads, resolve
+
+BATCH_MAX = 64
+READ_WORKERS = 4
+MAX_BODY = 1 << 20          # 1 MiB por petición
+EVENTS_BACKLOG = 1000       # eventos pendientes por estación antes de cortarla
+ELEVATION_MINUTES = 5       # ventana tras /elevate (igual que ui.pages.common)
+# Argumentos que sólo pone el propio servidor: la sesión de BD y el usuario (sale del token)
+_LOCAL_ONLY = ("db", "user")
+
+_STATUS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+@dataclass
+class _Write:
+    fn: Any
+    args: list
+    kwargs: dict
+    user: Optional[Dict]
+    future: asyncio.Future = field(repr=False)
+
+
+def writer_engine(url) -> Engine:
+    """
+    Engine del escritor: una conexión, transacción explícita (BEGIN IMMEDIATE)
+    para que los SAVEPOINT del lote anidan de verdad bajo el COMMIT del lote.
+    """
+    eng = create_engine(url, future=True, pool_size=1, max_overflow=0)
+
+    @event.listens_for(eng, "connect")
+    def _connect(dbapi_connection, _record):
+        dbapi_connection.isolation_level = None   # pysqlite no abre transacciones por su cuenta
+        cur = dbapi_connection.cursor()
+        cur.execute("PRAGMA foreign_keys=ON")
+        cur.execute("PRAGMA busy_timeout=5000")
+        cur.execute("PRAGMA journal_mode=WAL")    # persiste en el archivo: las lecturas no esperan al escritor
+        cur.close()
+
+    @event.listens_for(eng, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return eng
+
+
+class StudioServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        *,
+        registry: scoped_session = SessionLocal,
+        batch_max: int = BATCH_MAX,
+        read_workers: int = READ_WORKERS,
+    ):
+        self.host, self.port = host, port
+        self.batch_max = batch_max
+        self._registry = registry
+        self._engine = writer_engine(registry.session_factory.kw["bind"].url)
+        self._readers = ThreadPoolExecutor(read_workers, thread_name_prefix="studio-read")
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="studio-write")
+        self._writer_ident: Optional[int] = None
+        self._tokens: Dict[str, Dict] = {}
+        self._streams: List[asyncio.Queue] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: List[asyncio.Task] = []
+        self._thread: Optional[threading.Thread] = None
+        self._unsubscribe = None
+        self.stats = {"reads": 0, "writes": 0, "batches": 0, "max_batch": 0, "events": 0}
+
+    # ------------------ Arranque / parada ------------------
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._engine.connect().close()   # abre ya la conexión escritora (y WAL)
+        self._writer_ident = await self._loop.run_in_executor(self._writer, threading.get_ident)
+        self._unsubscribe = events.subscribe(events.DomainEvent, self._on_event)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._tasks.append(asyncio.create_task(self._write_loop()))
+
+    async def stop(self) -> None:
+        if self._unsubscribe:
+            self._unsubscribe()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for q in list(self._streams):
+            _hang_up(q)
+        for t in self._tasks:
+            t.cancel()
+        self._readers.shutdown(wait=False)
+        self._writer.shutdown(wait=True)
+        self._engine.dispose()
+
+    def start_in_thread(self) -> "StudioServer":
+        """Corre el servidor en un hilo propio (pruebas, prueba de carga); vuelve ya escuchando."""
+        ready = threading.Event()
+        failure: List[BaseException] = []
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as e:
+                failure.append(e)
+                ready.set()
+                return
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="studio-server", daemon=True)
+        self._thread.start()
+        ready.wait(10)
+        if failure:
+            raise failure[0]
+        return self
+
+    def shutdown(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(10)
+
+    # ------------------ HTTP ------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                line, *raw_headers = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, _ = line.split(" ", 2)
+                except ValueError:
+                    return
+                headers = {k.strip().lower(): v.strip() for k, v in
+                           (h.split(":", 1) for h in raw_headers if ":" in h)}
+                try:
+                    size = int(headers.get("content-length") or 0)
+                except ValueError:
+                    size = -1
+                if size < 0:
+                    await self._respond(writer, 400, {"error": {"type": "ValueError", "message": "Content-Length inválido."}})
+                    return
+                if size > MAX_BODY:
+                    await self._respond(writer, 413, {"error": {"type": "ValueError", "message": "Petición demasiado grande."}})
+                    return
+                body = await reader.readexactly(size) if size else b""
+
+                if method == "GET" and path == "/events":
+                    await self._stream_events(headers, writer)
+                    return
+                status, payload = await self._dispatch(method, path, headers, body)
+                await self._respond(writer, status, payload)
+                if headers.get("connection", "").lower() == "close":
+                    return
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Any) -> None:
+        data = dumps(payload)
+        writer.write(
+            f"HTTP/1.1 {status} {_STATUS.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+
+    def _user_for(self, headers: Dict[str, str]) -> Dict:
+        token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+        user = self._tokens.get(token)
+        if user is None:
+            raise PermissionError("Sesión inválida: vuelve a iniciar sesión.")
+        return user
+
+    async def _dispatch(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        try:
+            if method == "GET" and path == "/health":
+                return 200, {"ok": True, "stats": dict(self.stats, stations=len(self._streams))}
+            if method != "POST" or path not in ("/login", "/elevate", "/call"):
+                raise LookupError(f"{method} {path}")
+            payload = loads(body) if body else {}
+            if path == "/login":
+                return 200, {"result": await self._login(payload.get("username") or "", payload.get("password") or "")}
+            user = self._user_for(headers)
+            if path == "/elevate":
+                return 200, {"result": await self._elevate(user, str(payload.get("code") or ""))}
+            name, args, kwargs = payload.get("fn") or "", payload.get("args") or [], payload.get("kwargs") or {}
+            fn = resolve(name)
+            for key in _LOCAL_ONLY:
+                if key in kwargs:
+                    raise ValueError(f"'{key}' no se puede pasar por red.")
+            fn = _guarded(name, fn)
+            if API[name][0] == WRITE:
+                return 200, {"result": await self._submit_write(fn, args, kwargs, user)}
+            return 200, {"result": await self._loop.run_in_executor(self._readers, self._run_read, fn, args, kwargs, user)}
+        except (PermissionError, permissions.PermissionError) as e:
+            return 403, {"error": error_payload(e)}
+        except LookupError as e:
+            return 404, {"error": error_payload(e)}
+        except ValueError as e:
+            return 400, {"error": error_payload(e)}
+        except Exception as e:
+            return 500, {"error": error_payload(e)}
+
+    # ------------------ Lecturas ------------------
+
+    def _run_read(self, fn, args, kwargs, user) -> Any:
+        self.stats["reads"] += 1
+        try:
+            with acting_as(user):
+                return fn(*args, **kwargs)
+        finally:
+            self._registry.remove()   # la sesión del hilo no guarda nada entre peticiones
+
+    def _check_credentials(self, username: str, password: str) -> Optional[Dict]:
+        """Como auth.authenticate pero sin escribir (last_login va por el escritor)."""
+        try:
+            with self._registry() as db:
+                u = db.execute(select(User).where(User.username == username)).scalar_one_or_none()
+                if u is None or not u.is_active or not auth.verify_password(password, u.password_hash):
+                    return None
+                return {"id": u.id, "username": u.username, "role": u.role, "artist_id": u.artist_id}
+        finally:
+            self._registry.remove()
+
+    async def _login(self, username: str, password: str) -> Dict:
+        user = await self._loop.run_in_executor(self._readers, self._check_credentials, username, password)
+        if user is None:
+            raise PermissionError("Usuario o contraseña incorrectos.")
+        await self._submit_write(_touch_login, [user["id"]], {}, user)
+        token = secrets.token_urlsafe(24)
+        self._tokens[token] = user
+        return {"token": token, "user": user}
+
+    async def _elevate(self, user: Dict, code: str) -> bool:
+        # por el escritor: verify_master_code puede re-hashear el código
+        if not code or not await self._submit_write(_check_master_code, [code], {}, user):
+            return False
+        permissions.elevate_for(user["id"], minutes=ELEVATION_MINUTES)
+        return True
+
+    # ------------------ Escritor único ------------------
+
+    async def _submit_write(self, fn, args, kwargs, user) -> Any:
+        fut = self._loop.create_future()
+        await self._queue.put(_Write(fn, args, kwargs, user, fut))
+        return await fut
+
+    async def _write_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # lo que se juntó mientras corría el lote anterior va en este
+            while len(batch) < self.batch_max and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                results = await self._loop.run_in_executor(self._writer, self._run_batch, batch)
+            except Exception as e:
+                results = [(False, e)] * len(batch)
+            for job, (ok, value) in zip(batch, results):
+                if not job.future.done():
+                    job.future.set_result(value) if ok else job.future.set_exception(value)
+
+    def _run_batch(self, batch: List[_Write]) -> List[Tuple[bool, Any]]:
+        results: List[Tuple[bool, Any]] = []
+        with self._engine.connect() as conn, events.deferred():
+            trans = conn.begin()
+            s = Session(bind=conn, join_transaction_mode="create_savepoint",
+                        autoflush=False, expire_on_commit=False)
+            self._registry.registry.set(s)   # SessionLocal() de los servicios -> esta sesión
+            try:
+                for job in batch:
+                    try:
+                        with acting_as(job.user):
+                            results.append((True, job.fn(*job.args, **job.kwargs)))
+                    except Exception as e:
+                        results.append((False, e))   # su SAVEPOINT ya se deshizo
+                    finally:
+                        s.close()
+                trans.commit()
+            except BaseException:
+                trans.rollback()
+                raise
+            finally:
+                self._registry.remove()
+        self.stats["writes"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        return results
+
+    # ------------------ Eventos ------------------
+
+    def _on_event(self, ev: events.DomainEvent) -> None:
+        # sólo lo que confirmó el escritor (en pruebas, cliente y servidor comparten bus)
+        if threading.get_ident() != self._writer_ident or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._broadcast, ev)
+
+    def _broadcast(self, ev: events.DomainEvent) -> None:
+        self.stats["events"] += 1
+        for q in list(self._streams):
+            try:
+                q.put_nowait(ev)
+            except asyncio.QueueFull:
+                _hang_up(q)
+                self._streams.remove(q)   # estación lenta: se corta y reconecta
+
+    async def _stream_events(self, headers: Dict[str, str], writer: asyncio.StreamWriter) -> None:
+        try:
+            self._user_for(headers)
+        except PermissionError as e:
+            await self._respond(writer, 403, {"error": error_payload(e)})
+            return
+        q: asyncio.Queue = asyncio.Queue(EVENTS_BACKLOG)
+        self._streams.append(q)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n"
+                         b'{"hello":true}\n')
+            await writer.drain()
+            while True:
+                ev = await q.get()
+                if ev is None:
+                    return
+                writer.write(dumps(ev) + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            return
+        finally:
+            if q in self._streams:
+                self._streams.remove(q)
+
+
+def _hang_up(q: asyncio.Queue) -> None:
+    """Descarta lo pendiente y deja sólo el aviso de cierre: el stream termina y la estación reconecta."""
+    while not q.empty():
+        q.get_nowait()
+    q.put_nowait(None)
+
+
+# ------------------ Permisos por llamada ------------------
+
+# inventory.record_movement: la acción depende del tipo de movimiento (el resto: stock_adj)
+_MOVE_ACTIONS = {"Entrada": "stock_in", "Conteo": "cycle_count"}
+
+
+def _session_owner(session_id: int) -> Optional[int]:
+    with session_scope() as db:
+        s = db.get(TattooSession, session_id)
+        return s.artist_id if s is not None else None
+
+
+def _update_owners(a: Dict) -> List[Optional[int]]:
+    # la cita es de quien la tiene hoy y, si se reasigna, también del nuevo artista
+    owners = [_session_owner(a["session_id"])]
+    if "artist_id" in a["payload"]:
+        owners.append(a["payload"]["artist_id"])
+    return owners
+
+
+# nombre -> fn(argumentos) -> artistas dueños de lo que se toca (política "own")
+_OWNERS: Dict[str, Callable[[Dict], List[Optional[int]]]] = {
+    "sessions.create_session": lambda a: [a["payload"].get("artist_id")],
+    "sessions.update_session": _update_owners,
+    "sessions.cancel_session": lambda a: [_session_owner(a["session_id"])],
+    "sessions.complete_session": lambda a: [_session_owner(a["session_id"])],
+}
+
+
+def _guarded(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    fn precedida por permissions.enforce con el usuario de la llamada (acting_as).
+    Corre dentro del lote/lectura, así el dueño se lee en la misma transacción.
+    Sin dueño explícito, "own" se toma sobre lo propio: las lecturas ya filtran
+    sus filas con scoping.
+    """
+    _, resource, action = API[name]
+
+    def run(*args, **kwargs):
+        try:
+            a = inspect.signature(fn).bind(*args, **kwargs).arguments
+        except TypeError as e:
+            raise ValueError(str(e)) from None
+        act = _MOVE_ACTIONS.get(a.get("kind"), action) if name == "inventory.record_movement" else action
+        owners = _OWNERS[name](a) if name in _OWNERS else [(get_current_user() or {}).get("artist_id")]
+        for owner in owners:
+            permissions.enforce(resource=resource, action=act, owner_id=owner)
+        return fn(*args, **kwargs)
+
+    return run
+
+
+def _check_master_code(code: str) -> bool:
+    with SessionLocal() as db:
+        return permissions.verify_master_code(code, db)
+
+
+def _touch_login(user_id: int) -> None:
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.id == user_id).values(last_login=datetime.utcnow()))
+        db.commit()
+
+
+# ------------------ CLI ------------------
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m services.studio_server")
+    ap.add_argument("--host", default="127.0.0.1", help="0.0.0.0 para aceptar otras estaciones")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--batch-max", type=int, default=BATCH_MAX)
+    args = ap.parse_args(argv)
+    configure(DIRECT)   # el servidor es quien abre el .db, aunque settings.json diga "server"
+
+    async def serve() -> None:
+        srv = StudioServer(args.host, args.port, batch_max=args.batch_max)
+        await srv.start()
+        print(f"[OK] servidor del estudio en {srv.host}:{srv.port} (escritor único, lotes de hasta {srv.batch_max})")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await srv.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,301 @@
+# services/tracing.py
+"""
+Trazas de tiempo (spans) para rutas calientes de la UI y los servicios.
+
+- span(name, **attrs)      -> context manager; mide el bloque
+- traced(name=None)        -> decorador; mide la función completa
+- record(name, ms)         -> registra una duración medida a mano
+- enable(path=None) / disable() / is_enabled()
+- summarize(path=None)     -> {span: {n, p50, p95, max, total}} en ms
+
+Los spans se anidan por hilo: cada registro guarda su 'parent' y 'depth'.
+Con el trazado apagado, span() devuelve un context manager compartido que no
+hace nada y traced() sólo evalúa un booleano antes de llamar a la función.
+
+Activación:
+  - variable de entorno TATTOO_TRACE=1 (opcional TATTOO_TRACE_FILE=ruta)
+  - o settings.json: {"tracing": {"enabled": true}}
+
+Salida: logs/traces.jsonl (una línea JSON por span, con rotación por tamaño).
+
+Visor:
+  python -m services.tracing [ruta.jsonl]
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+SETTINGS = ROOT / "settings.json"
+DEFAULT_TRACE_FILE = ROOT / "logs" / "traces.jsonl"
+
+MAX_BYTES = 2 * 1024 * 1024   # 2 MB por archivo
+BACKUP_COUNT = 3              # traces.jsonl.1 … .3
+
+_enabled: bool = False
+_logger: Optional[logging.Logger] = None
+_trace_file: Optional[Path] = None
+_local = threading.local()
+
+
+# ------------------ Configuración ------------------
+
+def _settings_tracing() -> Dict[str, Any]:
+    try:
+        data = json.loads(SETTINGS.read_text(encoding="utf-8"))
+        cfg = (data or {}).get("tracing") or {}
+        return cfg if isinstance(cfg, dict) else {}
+    except Exception:
+        return {}
+
+
+def _build_logger(path: Path) -> logging.Logger:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lg = logging.getLogger("tattoo.tracing")
+    for h in list(lg.handlers):
+        lg.removeHandler(h)
+        h.close()
+    handler = RotatingFileHandler(str(path), maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    lg.addHandler(handler)
+    lg.setLevel(logging.INFO)
+    lg.propagate = False
+    return lg
+
+
+def enable(path: Optional[os.PathLike] = None) -> None:
+    """Activa el trazado escribiendo en 'path' (por defecto logs/traces.jsonl)."""
+    global _enabled, _logger, _trace_file
+    _trace_file = Path(path) if path else DEFAULT_TRACE_FILE
+    _logger = _build_logger(_trace_file)
+    _enabled = True
+
+
+def disable() -> None:
+    """Apaga el trazado y cierra el archivo."""
+    global _enabled, _logger
+    _enabled = False
+    if _logger is not None:
+        for h in list(_logger.handlers):
+            _logger.removeHandler(h)
+            h.close()
+    _logger = None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def trace_file() -> Path:
+    return _trace_file or DEFAULT_TRACE_FILE
+
+
+def configure_from_env() -> None:
+    """Lee TATTOO_TRACE / settings.json y activa el trazado si corresponde."""
+    env = (os.getenv("TATTOO_TRACE") or "").strip().lower()
+    cfg = _settings_tracing()
+    if env in ("1", "true", "yes", "on") or (not env and cfg.get("enabled")):
+        enable(os.getenv("TATTOO_TRACE_FILE") or cfg.get("path") or None)
+
+
+# ------------------ Spans ------------------
+
+def _stack() -> List[str]:
+    st = getattr(_local, "stack", None)
+    if st is None:
+        st = _local.stack = []
+    return st
+
+
+class _NullSpan:
+    """Span vacío (trazado apagado): sin costo más allá de la llamada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _emit(name: str, ms: float, attrs: Dict[str, Any], ts: float, error: Optional[str] = None) -> None:
+    """Escribe un registro; 'parent'/'depth' salen de la pila del hilo actual."""
+    st = _stack()
+    rec = {
+        "span": name,
+        "ms": round(float(ms), 3),
+        "ts": round(ts, 3),
+        "parent": st[-1] if st else None,
+        "depth": len(st),
+        "thread": threading.current_thread().name,
+    }
+    if error is not None:
+        rec["error"] = error
+    if attrs:
+        rec["attrs"] = attrs
+    lg = _logger
+    if lg is not None:
+        try:
+            lg.info(json.dumps(rec, ensure_ascii=False, default=str))
+        except Exception:
+            pass
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "_t0", "_ts")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        """Agrega atributos al span en curso (p. ej. número de filas)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        st = _stack()
+        self._ts = time.time()
+        st.append(self.name)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        dur_ms = (time.perf_counter() - self._t0) * 1000.0
+        st = _stack()
+        if st:
+            st.pop()
+        _emit(self.name, dur_ms, self.attrs, self._ts, exc_type.__name__ if exc_type is not None else None)
+        return False
+
+
+def span(name: str, **attrs):
+    """
+    Mide un bloque:
+        with span("agenda.fetch", view="week") as sp:
+            ...
+            sp.set(rows=len(rows))
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def record(name: str, ms: float, **attrs) -> None:
+    """Registra una duración ya medida (bloques que no caben en un 'with')."""
+    if not _enabled:
+        return
+    _emit(name, ms, attrs, time.time() - ms / 1000.0)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorador: mide cada llamada. Nombre por defecto: módulo.Clase.función."""
+    def deco(fn: Callable) -> Callable:
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+# ------------------ Visor / resumen ------------------
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(pct / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+def _iter_records(paths: Iterable[Path]):
+    for p in paths:
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except OSError:
+            continue
+
+
+def _rotated_files(path: Path) -> List[Path]:
+    files = [path.with_name(f"{path.name}.{i}") for i in range(BACKUP_COUNT, 0, -1)]
+    files.append(path)
+    return [p for p in files if p.exists()]
+
+
+def summarize(path: Optional[os.PathLike] = None) -> Dict[str, Dict[str, float]]:
+    """Agrupa por nombre de span (incluye archivos rotados) y calcula p50/p95."""
+    base = Path(path) if path else trace_file()
+    by_span: Dict[str, List[float]] = {}
+    for rec in _iter_records(_rotated_files(base)):
+        name = rec.get("span")
+        ms = rec.get("ms")
+        if name is None or ms is None:
+            continue
+        by_span.setdefault(name, []).append(float(ms))
+
+    out: Dict[str, Dict[str, float]] = {}
+    for name, vals in by_span.items():
+        vals.sort()
+        out[name] = {
+            "n": len(vals),
+            "p50": _percentile(vals, 50),
+            "p95": _percentile(vals, 95),
+            "max": vals[-1],
+            "total": sum(vals),
+        }
+    return out
+
+
+def format_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    if not summary:
+        return "Sin spans registrados."
+    width = max(len("span"), *(len(k) for k in summary))
+    lines = [f"{'span':<{width}}  {'n':>6}  {'p50 ms':>9}  {'p95 ms':>9}  {'max ms':>9}  {'total ms':>10}"]
+    for name, s in sorted(summary.items(), key=lambda kv: kv[1]["p95"], reverse=True):
+        lines.append(
+            f"{name:<{width}}  {s['n']:>6}  {s['p50']:>9.2f}  {s['p95']:>9.2f}  {s['max']:>9.2f}  {s['total']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    path = Path(argv[0]) if argv else DEFAULT_TRACE_FILE
+    print(f"Trazas: {path}")
+    print(format_summary(summarize(path)))
+    return 0
+
+
+configure_from_env()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
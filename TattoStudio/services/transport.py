@@ -0,0 +1,424 @@
+# services/transport.py
+"""
+Cómo llega la app a los servicios: directo a la BD o vía servidor del estudio.
+
+Modo directo (por defecto): cada estación abre el .db como siempre.
+Modo servidor: las llamadas a services/* viajan por HTTP a
+services/studio_server (una sola conexión escritora) y los cambios de
+otras estaciones llegan como eventos de dominio al bus local
+(services/events), así las páginas se parchean igual que con un cambio propio.
+
+Se elige con la variable STUDIO_SERVER=http://host:puerto o en settings.json:
+    "server": {"mode": "server", "url": "http://192.168.1.10:8765"}
+
+En modo servidor la estación no abre su .db local: lo que aún no pasa por
+aquí (pantallas sin migrar) falla con RuntimeError en vez de leer o escribir
+en silencio un archivo que no es el del estudio.
+
+- service("sessions").create_session(...)  mismo nombre y firma en ambos modos
+- call("sessions.list_sessions", {...})     idem, por nombre
+- login(usuario, clave) -> dict | None      en modo servidor además abre el
+                                            canal de eventos (/events)
+- API: nombre -> (READ | WRITE, recurso, acción); sólo eso se expone por red
+  (sin 'db=' ni 'user=') y el servidor lo revisa contra permissions
+- encode()/decode(): JSON con fechas, tuplas y dataclasses (eventos, fichas)
+"""
+from __future__ import annotations
+
+import http.client
+import importlib
+import json
+import os
+import socket
+import threading
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from sqlalchemy import event
+
+from services import events
+from services.contracts import set_current_user
+
+DIRECT, SERVER = "direct", "server"
+READ, WRITE = "read", "write"
+
+# Lo que se puede llamar por red: nombre -> (tipo, recurso, acción). Las escrituras
+# pasan por el escritor único; el servidor revisa (recurso, acción) con
+# permissions antes de correr nada (inventario ajusta la acción al tipo de movimiento).
+API: Dict[str, Tuple[str, str, str]] = {
+    # agenda / sesiones
+    "sessions.create_session": (WRITE, "agenda", "create"),
+    "sessions.update_session": (WRITE, "agenda", "edit"),
+    "sessions.cancel_session": (WRITE, "agenda", "cancel"),
+    "sessions.complete_session": (WRITE, "agenda", "complete"),
+    "sessions.list_sessions": (READ, "agenda", "view"),
+    "sessions.sessions_for_day": (READ, "agenda", "view"),
+    "sessions.artist_history": (READ, "agenda", "view"),
+    "sessions.artist_status_counts": (READ, "agenda", "view"),
+    # clientes
+    "client_profile.get_profile": (READ, "clients", "view"),
+    "client_prefs.get_preferences": (READ, "clients", "view"),
+    "client_prefs.segment": (READ, "clients", "view"),
+    "client_prefs.preference_counts": (READ, "clients", "view"),
+    # transacciones / caja
+    "reports.transaction_rows": (READ, "reports", "view_tx"),
+    "reports.receivables_by_artist": (READ, "reports", "view"),
+    "reports.receivable_sessions": (READ, "reports", "view"),
+    "cash_close.is_closed": (READ, "agenda", "view"),
+    "cash_close.day_totals": (READ, "reports", "cash_close"),
+    "cash_close.get_close": (READ, "reports", "cash_close"),
+    "cash_close.list_closes": (READ, "reports", "cash_close"),
+    "cash_close.close_day": (WRITE, "reports", "cash_close"),
+    # inventario
+    "inventory.product_id_for_sku": (READ, "inventory", "view"),
+    "inventory.list_products": (READ, "inventory", "view"),
+    "inventory.count_products": (READ, "inventory", "view"),
+    "inventory.list_movements": (READ, "inventory", "view"),
+    "inventory.count_movements": (READ, "inventory", "view"),
+    "inventory.list_lots": (READ, "inventory", "view"),
+    "inventory.low_stock_items": (READ, "inventory", "view"),
+    "inventory.expiring_items": (READ, "inventory", "view"),
+    "inventory.dashboard_kpis": (READ, "inventory", "view"),
+    "inventory.record_movement": (WRITE, "inventory", "stock_adj"),
+}
+
+
+def is_read(name: str) -> bool:
+    return name in API and API[name][0] == READ
+
+
+def resolve(name: str) -> Callable[..., Any]:
+    """'modulo.funcion' de API -> la función de services/<modulo>."""
+    if name not in API:
+        raise LookupError(f"Operación no disponible: {name}")
+    module, fn = name.split(".", 1)
+    return getattr(importlib.import_module(f"services.{module}"), fn)
+
+
+# ------------------ Formato en el cable ------------------
+
+def _wire_types() -> Dict[str, type]:
+    from services.client_profile import ClientProfile
+    return {
+        cls.__name__: cls
+        for cls in (events.SessionChanged, events.ClientSaved, events.UserSaved,
+                    events.PortfolioUploaded, ClientProfile)
+    }
+
+
+def encode(obj: Any) -> Any:
+    """Valor de Python -> algo que json.dumps acepta (reversible con decode)."""
+    if isinstance(obj, datetime):
+        return {"$dt": obj.isoformat()}
+    if isinstance(obj, date):
+        return {"$d": obj.isoformat()}
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {"$dc": type(obj).__name__, "f": {f.name: encode(getattr(obj, f.name)) for f in fields(obj)}}
+    if isinstance(obj, tuple):
+        return {"$t": [encode(v) for v in obj]}
+    if isinstance(obj, list):
+        return [encode(v) for v in obj]
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj):
+            return {k: encode(v) for k, v in obj.items()}
+        return {"$map": [[encode(k), encode(v)] for k, v in obj.items()]}
+    return obj
+
+
+def decode(obj: Any, types: Optional[Dict[str, type]] = None) -> Any:
+    if isinstance(obj, list):
+        return [decode(v, types) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    if "$d" in obj:
+        return date.fromisoformat(obj["$d"])
+    if "$t" in obj:
+        return tuple(decode(v, types) for v in obj["$t"])
+    if "$map" in obj:
+        return {decode(k, types): decode(v, types) for k, v in obj["$map"]}
+    if "$dc" in obj:
+        cls = (types or _wire_types()).get(obj["$dc"])
+        if cls is None:
+            raise ValueError(f"Tipo desconocido en la respuesta: {obj['$dc']}")
+        return cls(**{k: decode(v, types) for k, v in obj["f"].items()})
+    return {k: decode(v, types) for k, v in obj.items()}
+
+
+def dumps(obj: Any) -> bytes:
+    return json.dumps(encode(obj), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(raw: bytes) -> Any:
+    return decode(json.loads(raw.decode("utf-8")))
+
+
+# ------------------ Errores ------------------
+
+class RemoteError(RuntimeError):
+    """El servidor falló con algo que no es un error de negocio conocido."""
+
+
+def _error_types() -> Dict[str, type]:
+    from services.cash_close import CashClosedError
+    from services.inventory import StockError
+    return {
+        cls.__name__: cls
+        for cls in (ValueError, PermissionError, LookupError, KeyError, CashClosedError, StockError)
+    }
+
+
+def error_payload(exc: BaseException) -> Dict[str, str]:
+    name = type(exc).__name__
+    return {"type": name if name in _error_types() else "RemoteError", "message": str(exc)}
+
+
+def raise_remote(err: Dict[str, str]) -> None:
+    raise _error_types().get(err.get("type"), RemoteError)(err.get("message") or "Error del servidor")
+
+
+# ------------------ Cliente HTTP ------------------
+
+class RemoteClient:
+    """Cliente del servidor del estudio (una conexión keep-alive por hilo)."""
+
+    def __init__(self, url: str, timeout: float = 15.0):
+        parts = urlsplit(url if "//" in url else f"http://{url}")
+        self.host, self.port = parts.hostname or "127.0.0.1", parts.port or 8765
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self.user: Optional[Dict] = None
+        self._local = threading.local()
+        self._listener: Optional[EventListener] = None
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def _headers(self) -> Dict[str, str]:
+        h = {"Content-Type": "application/json"}
+        if self.token:
+            h["Authorization"] = f"Bearer {self.token}"
+        return h
+
+    def request(self, path: str, payload: Any, idempotent: bool = False) -> Any:
+        """
+        POST a 'path'. Si un keep-alive reutilizado resulta cerrado por el servidor,
+        se repite una vez en una conexión nueva sólo cuando es seguro: el envío falló
+        (la petición no salió completa) o la operación es de lectura ('idempotent').
+        Si se cae esperando la respuesta de una escritura, el servidor pudo haberla
+        aplicado: se propaga el error y decide quien llama.
+        """
+        body = dumps(payload)
+        while True:
+            conn = self._conn()
+            reused = conn.sock is not None
+            sent = False
+            try:
+                conn.request("POST", path, body=body, headers=self._headers())
+                sent = True
+                resp = conn.getresponse()
+                data = loads(resp.read())
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                self._local.conn = None
+                if not reused or (sent and not idempotent):
+                    raise
+            except Exception:
+                conn.close()
+                self._local.conn = None
+                raise
+        if isinstance(data, dict) and "error" in data:
+            raise_remote(data["error"])
+        return data.get("result") if isinstance(data, dict) else data
+
+    def login(self, username: str, password: str) -> Optional[Dict]:
+        try:
+            out = self.request("/login", {"username": username, "password": password})
+        except PermissionError:
+            return None
+        self.token, self.user = out["token"], out["user"]
+        return self.user
+
+    def elevate(self, code: str) -> bool:
+        """Código maestro validado en el servidor: la elevación vale allá, donde se revisan los permisos."""
+        if self.token is None:
+            raise PermissionError("Sin sesión en el servidor del estudio.")
+        return bool(self.request("/elevate", {"code": code}))
+
+    def call(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        if self.token is None:
+            raise PermissionError("Sin sesión en el servidor del estudio.")
+        return self.request("/call", {"fn": name, "args": list(args), "kwargs": kwargs},
+                            idempotent=is_read(name))
+
+    def listen(self) -> "EventListener":
+        """Abre (una vez) el canal de eventos: lo de otras estaciones llega al bus local."""
+        if self._listener is None or not self._listener.is_alive():
+            self._listener = EventListener(self)
+            self._listener.start()
+        return self._listener
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+
+
+class EventListener(threading.Thread):
+    """Lee /events (una línea JSON por evento) y lo publica en services.events."""
+
+    RETRY_S = (0.5, 1.0, 2.0, 5.0)
+
+    def __init__(self, client: RemoteClient):
+        super().__init__(name="studio-events", daemon=True)
+        self.client = client
+        self.ready = threading.Event()
+        self._stop = threading.Event()
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def stop(self) -> None:
+        self._stop.set()
+        sock = self._conn.sock if self._conn is not None else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)   # desbloquea la lectura en curso
+            except OSError:
+                pass
+
+    def run(self) -> None:
+        fails = 0
+        types = _wire_types()
+        while not self._stop.is_set():
+            try:
+                self._conn = http.client.HTTPConnection(self.client.host, self.client.port)
+                self._conn.request("GET", "/events", headers=self.client._headers())
+                resp = self._conn.getresponse()
+                if resp.status != 200:
+                    raise ConnectionError(f"/events respondió {resp.status}")
+                fails = 0
+                for line in resp:
+                    if not line.strip():
+                        continue
+                    msg = json.loads(line)
+                    if msg.get("hello"):
+                        self.ready.set()
+                        continue
+                    events.publish(decode(msg, types))
+            except Exception:
+                pass
+            finally:
+                if self._conn is not None:
+                    self._conn.close()
+            if not self._stop.is_set():
+                self._stop.wait(self.RETRY_S[min(fails, len(self.RETRY_S) - 1)])
+                fails += 1
+
+
+# ------------------ Selección de transporte ------------------
+
+_lock = threading.Lock()
+_mode: Optional[str] = None
+_client: Optional[RemoteClient] = None
+
+
+def _settings_path() -> Path:
+    return Path(__file__).resolve().parents[1] / "settings.json"
+
+
+def _configured_url() -> Optional[str]:
+    url = os.getenv("STUDIO_SERVER")
+    if url:
+        return url
+    try:
+        srv = json.loads(_settings_path().read_text(encoding="utf-8")).get("server") or {}
+    except Exception:
+        return None
+    return srv.get("url") if srv.get("mode") == SERVER else None
+
+
+def _refuse_local(conn, *_) -> None:
+    raise RuntimeError(
+        f"Modo servidor: esta pantalla todavía abre la BD local ({conn.engine.url.database}). "
+        "Sólo lo que está en transport.API va al servidor del estudio; "
+        "usa el modo directo en esta estación mientras tanto."
+    )
+
+
+def _guard_local_db(on: bool) -> None:
+    """En modo servidor, cualquier conexión al .db local de la estación lanza RuntimeError."""
+    from data.db import session as db_session
+    engine = db_session.engine
+    if on and not event.contains(engine, "engine_connect", _refuse_local):
+        event.listen(engine, "engine_connect", _refuse_local)
+    elif not on and event.contains(engine, "engine_connect", _refuse_local):
+        event.remove(engine, "engine_connect", _refuse_local)
+
+
+def configure(mode: Optional[str] = None, url: Optional[str] = None) -> str:
+    """Fija el transporte (sin argumentos: lo que digan STUDIO_SERVER / settings.json)."""
+    global _mode, _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+        url = url or (_configured_url() if mode in (None, SERVER) else None)
+        _mode = SERVER if (mode == SERVER or (mode is None and url)) else DIRECT
+        _client = RemoteClient(url or "http://127.0.0.1:8765") if _mode == SERVER else None
+        _guard_local_db(_mode == SERVER)
+        return _mode
+
+
+def mode() -> str:
+    if _mode is None:
+        configure()
+    return _mode
+
+
+def is_remote() -> bool:
+    return mode() == SERVER
+
+
+def client() -> Optional[RemoteClient]:
+    mode()
+    return _client
+
+
+def call(name: str, *args: Any, **kwargs: Any) -> Any:
+    if is_remote():
+        return _client.call(name, *args, **kwargs)
+    return resolve(name)(*args, **kwargs)
+
+
+def login(username: str, password: str) -> Optional[Dict]:
+    """Sólo modo servidor: autentica contra el servidor y abre el canal de eventos."""
+    user = client().login(username, password)
+    if user is not None:
+        set_current_user(user)
+        _client.listen()
+    return user
+
+
+class _Service:
+    def __init__(self, module: str):
+        self._module = module
+
+    def __getattr__(self, fn: str) -> Callable[..., Any]:
+        name = f"{self._module}.{fn}"
+        if name not in API:
+            raise AttributeError(name)
+        # el modo se decide en cada llamada: la página puede importarse antes del login
+        return lambda *args, **kwargs: call(name, *args, **kwargs)
+
+
+def service(module: str) -> _Service:
+    return _Service(module)
+
@@ -0,0 +1,346 @@
+# services/warmup.py
+"""
+Warm-up en segundo plano tras el login.
+
+Con la ventana principal ya visible, un hilo de baja prioridad aprovecha el
+tiempo ocioso para precalcular lo que las páginas piden en su primera visita:
+
+  agenda.today     sesiones de hoy (vista inicial de la Agenda) + nombres de cliente
+  lookups.artists  artistas activos (id, nombre)
+  lookups.clients  clientes (id, nombre) para los diálogos de cita
+  reports.month    transacciones del mes en curso (Reportes toma hoy/semana de aquí)
+  avatars          avatares de staff ya decodificados (QImage)
+
+Reglas:
+  - Cede ante el usuario: notify_user_activity() interrumpe la consulta en
+    curso (sqlite3 interrupt) y el task se reintenta tras `idle_ms` sin actividad.
+  - Resultados de un solo uso: take(key) los entrega y los borra. Se descartan
+    si tienen más de `max_age_s` o si hubo un commit en la BD después de
+    empezar a calcularlos (nunca se muestra algo más viejo que la BD).
+  - Cada task se mide (span "warmup.<task>" y WarmupScheduler.stats) y se puede apagar:
+      settings.json: {"warmup": {"enabled": true, "idle_ms": 400,
+                                  "tasks": {"avatars": false}}}
+      TATTOO_WARMUP=0 apaga todo.
+  - En modo servidor (services/transport) no corre: todo lo de aquí sale del .db local.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy import event
+
+from data.db.session import SessionLocal, engine
+from services import transport
+from services.tracing import span
+
+ROOT = Path(__file__).resolve().parents[1]
+SETTINGS = ROOT / "settings.json"
+AVATARS_DIR = ROOT / "assets" / "avatars"
+
+DEFAULT_IDLE_MS = 400
+DEFAULT_MAX_AGE_S = 120.0
+MAX_RETRIES = 3
+
+TaskFn = Callable[[], Dict[Hashable, Any]]
+TASKS: "OrderedDict[str, TaskFn]" = OrderedDict()
+
+
+# ------------------ Resultados precalculados ------------------
+
+_lock = threading.Lock()
+_results: Dict[Hashable, tuple] = {}   # key -> (monotonic_ts, write_gen, value)
+_write_gen = 0
+
+
+@event.listens_for(engine, "commit")
+def _on_commit(_conn) -> None:
+    global _write_gen
+    _write_gen += 1
+
+
+def put(key: Hashable, value: Any, gen: Optional[int] = None) -> None:
+    with _lock:
+        _results[key] = (time.monotonic(), _write_gen if gen is None else gen, value)
+
+
+def take(key: Hashable, max_age_s: float = DEFAULT_MAX_AGE_S, default: Any = None, consume: bool = True) -> Any:
+    """
+    Entrega el resultado de 'key' si sigue vigente; si no, default.
+    consume=False lo deja disponible para otras páginas (p. ej. listas de artistas).
+    """
+    with _lock:
+        item = _results.pop(key, None) if consume else _results.get(key)
+    if item is None:
+        return default
+    ts, gen, value = item
+    if gen != _write_gen or time.monotonic() - ts > max_age_s:
+        return default
+    return value
+
+
+def clear() -> None:
+    with _lock:
+        _results.clear()
+
+
+# ------------------ Configuración ------------------
+
+def config() -> Dict[str, Any]:
+    """{'enabled': bool, 'idle_ms': int, 'tasks': {nombre: bool}} (settings.json + entorno)."""
+    cfg: Dict[str, Any] = {}
+    try:
+        data = json.loads(SETTINGS.read_text(encoding="utf-8"))
+        cfg = (data or {}).get("warmup") or {}
+        if not isinstance(cfg, dict):
+            cfg = {}
+    except Exception:
+        pass
+    env = (os.getenv("TATTOO_WARMUP") or "").strip().lower()
+    enabled = bool(cfg.get("enabled", True))
+    if env in ("0", "false", "no", "off"):
+        enabled = False
+    elif env in ("1", "true", "yes", "on"):
+        enabled = True
+    toggles = cfg.get("tasks") if isinstance(cfg.get("tasks"), dict) else {}
+    return {
+        "enabled": enabled,
+        "idle_ms": int(cfg.get("idle_ms", DEFAULT_IDLE_MS)),
+        "tasks": {name: bool(toggles.get(name, True)) for name in TASKS},
+    }
+
+
+def task(name: str) -> Callable[[TaskFn], TaskFn]:
+    """Registra un task: fn() -> {key: valor} que se guarda con put()."""
+    def deco(fn: TaskFn) -> TaskFn:
+        TASKS[name] = fn
+        return fn
+    return deco
+
+
+# ------------------ Scheduler ------------------
+
+class Interrupted(Exception):
+    """El usuario empezó a trabajar: el task se suspende y se reintenta luego."""
+
+
+_active: Optional["WarmupScheduler"] = None
+
+
+def checkpoint() -> None:
+    """Para tasks con bucles largos: cede si hubo actividad del usuario."""
+    sch = _active
+    if sch is not None and sch._activity_since(sch._task_started):
+        raise Interrupted()
+
+
+class WarmupScheduler:
+    """
+    Hilo daemon que corre los tasks habilitados, uno a la vez y sólo tras
+    `idle_ms` sin actividad del usuario.
+    """
+
+    def __init__(self, tasks: Optional[List[str]] = None, idle_ms: int = DEFAULT_IDLE_MS,
+                 max_retries: int = MAX_RETRIES):
+        self.names = list(tasks if tasks is not None else TASKS)
+        self.idle_s = max(0, idle_ms) / 1000.0
+        self.max_retries = max_retries
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._last_activity = 0.0
+        self._task_started = 0.0
+        self._conn = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._done = threading.Event()
+
+    # --- API (hilo de UI) ---
+    @classmethod
+    def from_config(cls) -> Optional["WarmupScheduler"]:
+        cfg = config()
+        if not cfg["enabled"] or transport.is_remote():
+            return None
+        names = [n for n, on in cfg["tasks"].items() if on]
+        return cls(names, idle_ms=cfg["idle_ms"]) if names else None
+
+    def start(self) -> "WarmupScheduler":
+        global _active
+        _active = self
+        self._last_activity = time.monotonic()  # primer task tras idle_ms: deja pintar la ventana
+        event.listen(engine, "checkout", self._on_checkout)
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def notify_user_activity(self) -> None:
+        """Marca actividad y corta la consulta que esté corriendo el warm-up."""
+        self._last_activity = time.monotonic()
+        conn = self._conn
+        if conn is not None:
+            try:
+                conn.interrupt()
+            except Exception:
+                pass
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.notify_user_activity()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and not self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    # --- Hilo de warm-up ---
+    def _on_checkout(self, dbapi_conn, _record, _proxy) -> None:
+        if threading.current_thread() is self._thread:
+            self._conn = dbapi_conn
+
+    def _activity_since(self, t: float) -> bool:
+        return self._last_activity > t
+
+    def _wait_idle(self) -> bool:
+        """Espera a que pasen idle_s sin actividad. False si hay que detenerse."""
+        while not self._stop.is_set():
+            idle_for = time.monotonic() - self._last_activity
+            if idle_for >= self.idle_s:
+                return True
+            self._stop.wait(self.idle_s - idle_for)
+        return False
+
+    def _run(self) -> None:
+        global _active
+        queue = deque((name, 0) for name in self.names if name in TASKS)
+        try:
+            while queue and self._wait_idle():
+                name, attempt = queue.popleft()
+                gen = _write_gen
+                self._task_started = time.monotonic()
+                t0 = time.perf_counter()
+                status = "ok"
+                try:
+                    with span(f"warmup.{name}", attempt=attempt):
+                        values = TASKS[name]()
+                    for key, value in (values or {}).items():
+                        put(key, value, gen)
+                except Exception as ex:
+                    if isinstance(ex, Interrupted) or self._activity_since(self._task_started):
+                        status = "interrupted"
+                        if attempt + 1 < self.max_retries and not self._stop.is_set():
+                            queue.appendleft((name, attempt + 1))
+                    else:
+                        status = f"error: {type(ex).__name__}"
+                finally:
+                    self._conn = None
+                self.stats[name] = {
+                    "status": status,
+                    "ms": round((time.perf_counter() - t0) * 1000.0, 3),
+                    "attempts": attempt + 1,
+                }
+        finally:
+            try:
+                event.remove(engine, "checkout", self._on_checkout)
+            except Exception:
+                pass
+            if _active is self:
+                _active = None
+            self._done.set()
+
+
+def stats_text(sch: "WarmupScheduler") -> str:
+    lines = [f"{'task':<16} {'estado':<14} {'ms':>9} {'intentos':>8}"]
+    for name, s in sch.stats.items():
+        lines.append(f"{name:<16} {s['status']:<14} {s['ms']:>9.1f} {s['attempts']:>8}")
+    return "\n".join(lines)
+
+
+# ------------------ Tasks ------------------
+
+def agenda_day_key(day: date) -> tuple:
+    from services.scoping import scope_key
+    return ("agenda.sessions", day.isoformat(), scope_key("agenda", "view"))
+
+
+def _day_bounds(day: date):
+    return datetime.combine(day, datetime.min.time()), datetime.combine(day, datetime.max.time().replace(microsecond=0))
+
+
+@task("agenda.today")
+def _warm_agenda_today() -> Dict[Hashable, Any]:
+    from data.models.client import Client
+    from services.sessions import list_sessions
+
+    today = date.today()
+    start, end = _day_bounds(today)
+    rows = list_sessions({"from": start, "to": end})
+    ids = {r["client_id"] for r in rows if r.get("client_id") is not None}
+    names: Dict[int, str] = {}
+    if ids:
+        with SessionLocal() as db:
+            names = dict(db.query(Client.id, Client.name).filter(Client.id.in_(ids)).all())
+    return {agenda_day_key(today): (rows, names)}
+
+
+@task("lookups.artists")
+def _warm_artists() -> Dict[Hashable, Any]:
+    from data.models.artist import Artist
+
+    with SessionLocal() as db:
+        rows = db.query(Artist.id, Artist.name).filter(Artist.active == True).order_by(Artist.name.asc()).all()  # noqa: E712
+    return {"lookups.artists": [(int(a), str(n)) for a, n in rows]}
+
+
+@task("lookups.clients")
+def _warm_clients() -> Dict[Hashable, Any]:
+    from data.models.client import Client
+
+    with SessionLocal() as db:
+        rows = db.query(Client.id, Client.name).order_by(Client.name.asc()).all()
+    return {"lookups.clients": [(int(c), n) for c, n in rows]}
+
+
+def month_bounds(day: date):
+    first = day.replace(day=1)
+    nxt = (first + timedelta(days=32)).replace(day=1)
+    return datetime.combine(first, datetime.min.time()), datetime.combine(nxt, datetime.min.time()) - timedelta(seconds=1)
+
+
+@task("reports.month")
+def _warm_reports_month() -> Dict[Hashable, Any]:
+    from services.reports import transaction_rows
+    from services.scoping import scope_key
+
+    start, end = month_bounds(date.today())
+    return {("reports.rows", scope_key("reports", "view")): (start, end, transaction_rows(start, end))}
+
+
+def avatar_key(path: Path) -> tuple:
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        mtime = None
+    return ("avatar", str(path), mtime)
+
+
+@task("avatars")
+def _warm_avatars() -> Dict[Hashable, Any]:
+    from PyQt5.QtGui import QImage  # QImage (a diferencia de QPixmap) se puede usar fuera del hilo de UI
+    from data.models.user import User
+
+    with SessionLocal() as db:
+        ids = [uid for (uid,) in db.query(User.id).filter(User.is_active == True).all()]  # noqa: E712
+    out: Dict[Hashable, Any] = {}
+    for uid in ids:
+        checkpoint()
+        p = AVATARS_DIR / f"{uid}.png"
+        if p.exists():
+            img = QImage(str(p))
+            if not img.isNull():
+                out[avatar_key(p)] = img
+    return out
@@ -0,0 +1,65 @@
+"""
+Piezas comunes de las pruebas:
+  - new_db()             sesión sobre una BD SQLite en memoria nueva (todas las tablas)
+  - sql_log(db)          context manager: lista de sentencias que se ejecutaron dentro
+  - load_migration(name) módulo de data/tools/<name>.py (los nombres empiezan con fecha)
+  - db_factory           sessionmaker sobre un archivo en tmp_path
+Cada archivo de pruebas arma su propio fixture 'db' con sus filas.
+"""
+import importlib.util
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from data.db.base import Base
+from data.models import load_all_models
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="session")
+def new_db():
+    def make():
+        load_all_models()
+        eng = create_engine("sqlite://", future=True)
+        Base.metadata.create_all(eng)
+        return sessionmaker(bind=eng, expire_on_commit=False)()
+    return make
+
+
+@pytest.fixture(scope="session")
+def sql_log():
+    @contextmanager
+    def capture(db):
+        statements = []
+        listener = lambda *a: statements.append(a[2])  # noqa: E731
+        bind = db.get_bind()
+        event.listen(bind, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(bind, "before_cursor_execute", listener)
+    return capture
+
+
+@pytest.fixture(scope="session")
+def load_migration():
+    def load(name):
+        spec = importlib.util.spec_from_file_location(name, ROOT / "data" / "tools" / f"{name}.py")
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod
+    return load
+
+
+@pytest.fixture()
+def db_factory(tmp_path):
+    """sessionmaker sobre un .db en tmp_path: para servicios que abren sus propias sesiones (o hilos)."""
+    load_all_models()
+    eng = create_engine(f"sqlite:///{tmp_path / 'studio.db'}", future=True)
+    Base.metadata.create_all(eng)
+    yield sessionmaker(bind=eng, expire_on_commit=False)
+    eng.dispose()
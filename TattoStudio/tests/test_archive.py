@@ -0,0 +1,117 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from data.db import session as db_session
+from data.models.artist import Artist
+from data.models.cash_close import CashClose
+from data.models.client import Client
+from data.models.payout import Payout, PayoutLine, PayoutPeriod
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services import archive, client_profile, payouts, reports, sessions
+from services.contracts import set_current_user
+
+NOW = datetime(2026, 6, 15, 12)
+ADMIN = {"id": 1, "username": "admin", "role": "admin", "artist_id": None}
+TABLES = ("sessions", "transactions", "payout_lines")
+
+
+def at(y, m, d, h=10):
+    return datetime(y, m, d, h)
+
+
+@pytest.fixture()
+def eng(db_factory, monkeypatch):
+    factory, eng = db_factory, db_factory.kw["bind"]
+    for mod in (db_session, reports, sessions):
+        monkeypatch.setattr(mod, "SessionLocal", factory)
+    set_current_user(ADMIN)
+
+    def ses(sid, client, artist, start, status):
+        return TattooSession(id=sid, client_id=client, artist_id=artist, start=start,
+                             end=start.replace(hour=start.hour + 2), status=status, price=800.0)
+
+    with factory() as s:
+        s.add_all([Artist(id=1, name="Ana"), Artist(id=2, name="Beto")])
+        s.add_all([Client(id=1, name="Carla"), Client(id=2, name="Dani")])
+        s.add_all([
+            ses(1, 1, 1, at(2024, 3, 10), "Completada"),
+            ses(2, 1, 2, at(2024, 5, 1), "Cancelada"),
+            ses(3, 2, 1, at(2024, 4, 1), "Completada"),   # pago tardío: se queda
+            ses(4, 2, 1, at(2024, 2, 1), "Activa"),       # no está cerrada: se queda
+            ses(5, 2, 2, at(2026, 5, 1), "Completada"),   # reciente
+        ])
+        s.add_all([
+            Transaction(id=1, session_id=1, artist_id=1, amount=500.0, method="Efectivo", date=at(2024, 3, 10, 12)),
+            Transaction(id=2, session_id=3, artist_id=1, amount=300.0, method="Tarjeta", date=at(2024, 4, 1, 12)),
+            Transaction(id=3, session_id=3, artist_id=1, amount=200.0, method="Efectivo", date=at(2025, 8, 1)),
+            Transaction(id=4, session_id=None, artist_id=2, amount=50.0, method="Efectivo", date=at(2024, 1, 15)),
+            Transaction(id=5, session_id=5, artist_id=2, amount=800.0, method="Tarjeta", date=at(2026, 5, 1, 12)),
+        ])
+        s.flush()
+        s.add(PayoutPeriod(id=1, start=date(2024, 3, 1), end=date(2024, 4, 1)))
+        s.add(Payout(id=1, period_id=1, artist_id=1, gross=500.0, commission=250.0, tx_count=1))
+        s.add(PayoutLine(transaction_id=1, payout_id=1, amount=500.0, rate=0.5, commission=250.0))
+        s.add(CashClose(day=date(2024, 3, 10), window_start=at(2024, 3, 10, 0), window_end=at(2024, 3, 11, 0),
+                        expected_total=500.0, counted_total=500.0, tx_count=1))
+        s.commit()
+    yield eng
+    client_profile.invalidate()
+
+
+def _dump(eng):
+    with eng.connect() as c:
+        return {t: c.exec_driver_sql(f"SELECT * FROM main.{t} ORDER BY 1").all() for t in TABLES}
+
+
+def _reads():
+    return (
+        reports.transaction_rows(datetime(2024, 1, 1), datetime(2026, 12, 31)),
+        sessions.artist_history(1, limit=2),
+        sessions.artist_history(1, limit=2, after=sessions.artist_history(1, limit=2)[1]),
+        sessions.artist_status_counts(1),
+        payouts.period_lines(1),
+        client_profile.get_profile(1, refresh=True).owner_artist_id,
+    )
+
+
+def test_archive_and_restore_round_trip(eng):
+    before, reads = _dump(eng), _reads()
+
+    assert archive.archive_old(12, now=NOW) == (2, 2)
+    with eng.connect() as c:
+        assert [r[0] for r in c.exec_driver_sql("SELECT id FROM sessions ORDER BY id")] == [3, 4, 5]
+        assert [r[0] for r in c.exec_driver_sql("SELECT id FROM transactions ORDER BY id")] == [2, 3, 5]
+    assert [r["id"] for r in sessions.list_sessions({})] == [4, 3, 5]   # el día a día sólo ve lo caliente
+    assert _reads() == reads                                            # lo que mira atrás, igual
+
+    with sessionmaker(bind=eng)() as s:
+        assert archive.horizon(s) == datetime(2025, 6, 15)
+        assert not archive.reaches_back(s, datetime(2026, 1, 1))
+        assert archive.has_client_sessions(s, 1) and not archive.has_client_sessions(s, 2)
+
+    assert archive.restore() == (2, 2)
+    assert _dump(eng) == before
+    assert _reads() == reads
+
+
+def test_closed_day_stays_locked_and_restore_is_partial(eng):
+    archive.archive_old(12, now=NOW)
+    with eng.begin() as c:
+        names = {r[0] for r in c.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert set(archive.TX_LOCKS) <= names
+    with pytest.raises(IntegrityError, match="Caja cerrada"):
+        with eng.begin() as c:
+            c.execute(text("INSERT INTO transactions (artist_id, amount, method, concept, date, deleted_flag, "
+                           "created_at, updated_at) VALUES (1, 9, 'Efectivo', '', '2024-03-10 15:00:00.000000', "
+                           "0, '2024-03-10', '2024-03-10')"))
+
+    assert archive.restore(datetime(2024, 4, 1)) == (1, 0)          # sólo la sesión de mayo (sin cobros)
+    assert archive.restore(session_ids=[1]) == (1, 1)               # la suelta de enero sigue archivada
+    with eng.connect() as c:
+        assert c.exec_driver_sql("SELECT count(*) FROM transactions").scalar() == 4
+    assert archive.archive_old(12, now=NOW) == (2, 1)               # otra vez, sin duplicar
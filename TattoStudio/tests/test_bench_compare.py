@@ -0,0 +1,12 @@
+from bench.compare import compare
+
+
+def _run(**medians):
+    return {"results": {"1k": {k: {"median_ms": v} for k, v in medians.items()}}}
+
+
+def test_compare_flags_regressions_above_threshold():
+    old = _run(fast=10.0, slow=100.0, noisy=0.2, gone=5.0)
+    new = _run(fast=5.0, slow=130.0, noisy=0.5, added=1.0)
+    rows = {r["case"]: r["status"] for r in compare(old, new, threshold=0.15, min_ms=1.0)}
+    assert rows == {"fast": "mejora", "slow": "REGRESIÓN", "noisy": "="}
@@ -0,0 +1,98 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.exc import IntegrityError
+
+from data.db.base import Base
+from data.models import load_all_models
+from data.models.artist import Artist
+from data.models.cash_close import CashClose
+from data.models.transaction import Transaction
+from services import cash_close
+
+DAY = date(2025, 3, 14)
+
+
+@pytest.fixture()
+def db(new_db):
+    at = lambda h, d=DAY: datetime(d.year, d.month, d.day, h)
+    with new_db() as s:
+        s.add_all([Artist(id=1, name="Beto"), Artist(id=2, name="Ana")])
+        s.add_all([
+            Transaction(id=1, artist_id=1, amount=500.0, method="Efectivo", date=at(10)),
+            Transaction(id=2, artist_id=1, amount=300.0, method="Tarjeta", date=at(12)),
+            Transaction(id=3, artist_id=2, amount=200.0, method="Efectivo", date=at(23)),
+            Transaction(id=4, artist_id=2, amount=999.0, method="Efectivo", date=at(11), deleted_flag=True),
+            Transaction(id=5, artist_id=2, amount=50.0, method="Efectivo", date=at(0, date(2025, 3, 15))),
+        ])
+        s.commit()
+        yield s
+
+
+def test_day_totals_fold_one_aggregate_by_method_and_artist(db, sql_log):
+    with sql_log(db) as statements:
+        totals = cash_close.day_totals(DAY, db=db)
+
+    assert len(statements) == 1
+    assert totals["expected_total"] == 1000.0 and totals["tx_count"] == 3
+    assert [(m["method"], m["expected"], m["tx_count"]) for m in totals["by_method"]] == [
+        ("Efectivo", 700.0, 2), ("Tarjeta", 300.0, 1), ("Transferencia", 0.0, 0),
+    ]
+    assert [(a["artist"], a["expected"]) for a in totals["by_artist"]] == [("Ana", 200.0), ("Beto", 800.0)]
+
+
+def test_close_stores_snapshot_with_difference_and_reads_it_back(db):
+    cash_close.close_day(DAY, {"Efectivo": 650.0}, note=" faltan 50 ", user_id=None, db=db)
+    snap = cash_close.get_close(DAY, db=db)
+    assert (snap["expected_total"], snap["counted_total"], snap["difference"]) == (1000.0, 950.0, -50.0)
+    assert snap["note"] == "faltan 50"
+    assert [(m["method"], m["counted"]) for m in snap["by_method"]] == [
+        ("Efectivo", 650.0), ("Tarjeta", 300.0), ("Transferencia", 0.0),
+    ]
+    assert [(a["artist_id"], a["expected"]) for a in snap["by_artist"]] == [(2, 200.0), (1, 800.0)]
+    assert cash_close.list_closes(db=db)[0]["day"] == DAY
+    assert cash_close.get_close(date(2025, 3, 15), db=db) is None
+
+    with pytest.raises(cash_close.CashClosedError):
+        cash_close.close_day(DAY, {}, db=db)
+    with pytest.raises(IntegrityError):
+        db.execute(update(CashClose).values(difference=0.0))
+    db.rollback()
+
+
+def test_closed_window_locks_transactions(db):
+    cash_close.close_day(DAY, {}, db=db)
+
+    with pytest.raises(cash_close.CashClosedError):
+        cash_close.ensure_open(db, datetime(2025, 3, 14, 18))
+    cash_close.ensure_open(db, datetime(2025, 3, 15, 0))   # el día siguiente sigue abierto
+
+    for sql in (
+        "INSERT INTO transactions (artist_id, amount, method, concept, date, deleted_flag, created_at, updated_at) "
+        "VALUES (1, 10, 'Efectivo', '', '2025-03-14 15:00:00.000000', 0, '2025-03-14', '2025-03-14')",
+        "UPDATE transactions SET amount = 1 WHERE id = 1",
+        "UPDATE transactions SET date = '2025-03-14 09:00:00.000000' WHERE id = 5",   # mover hacia el día cerrado
+        "DELETE FROM transactions WHERE id = 2",
+    ):
+        with pytest.raises(IntegrityError, match="Caja cerrada"):
+            db.execute(text(sql))
+        db.rollback()
+
+    db.execute(update(Transaction).where(Transaction.id == 5).values(amount=60.0))
+    db.commit()
+    assert cash_close.get_close(DAY, db=db)["expected_total"] == 1000.0
+
+
+def test_migration_installs_lock_triggers(tmp_path, load_migration):
+    mod = load_migration("2025_10_27_add_cash_closes")
+
+    load_all_models()
+    eng = create_engine(f"sqlite:///{tmp_path / 'old.db'}", future=True)
+    for table in ("users", "artists", "clients", "sessions", "transactions", "cash_closes", "cash_close_lines"):
+        Base.metadata.tables[table].create(eng)
+    with eng.begin() as conn:
+        mod.apply_triggers(conn)
+        mod.apply_triggers(conn)   # idempotente
+        names = {r[0] for r in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))}
+    assert {"trg_tx_closed_insert", "trg_tx_closed_update", "trg_tx_closed_delete"} <= names
@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services.sessions import day_bounds, sessions_for_day
+
+DAY = date(2025, 5, 6)
+ADMIN = {"id": 1, "role": "admin", "artist_id": None}
+UNKNOWN = {"id": 7, "role": "intruso", "artist_id": None}
+
+
+@pytest.fixture(scope="module")
+def db(new_db):
+    at = lambda h, d=DAY: datetime(d.year, d.month, d.day, h, 0)
+    with new_db() as s:
+        s.add_all([Artist(id=1, name="Uno"), Artist(id=2, name="Dos")])
+        s.add_all([Client(id=1, name="Ana"), Client(id=2, name="Beto")])
+        s.add_all([
+            TattooSession(id=1, client_id=1, artist_id=1, start=at(16), end=at(18), price=1000.0, status="Activa"),
+            TattooSession(id=2, client_id=2, artist_id=2, start=at(10), end=at(12), price=500.0, status="Completada"),
+            TattooSession(id=3, client_id=2, artist_id=1, start=at(0), end=at(1), price=300.0, status="Activa"),
+            # Fuera del día (límites): 23:00 del día anterior y 00:00 del siguiente
+            TattooSession(id=4, client_id=1, artist_id=1, start=at(23, DAY - timedelta(days=1)),
+                          end=at(23, DAY - timedelta(days=1)), price=1.0, status="Activa"),
+            TattooSession(id=5, client_id=1, artist_id=1, start=at(0, DAY + timedelta(days=1)),
+                          end=at(1, DAY + timedelta(days=1)), price=1.0, status="Activa"),
+        ])
+        s.add_all([
+            Transaction(session_id=1, artist_id=1, amount=400.0, method="Efectivo", date=at(16)),
+            Transaction(session_id=1, artist_id=1, amount=999.0, method="Efectivo", date=at(16), deleted_flag=True),
+            Transaction(session_id=2, artist_id=2, amount=600.0, method="Tarjeta", date=at(12)),
+        ])
+        s.commit()
+        yield s
+
+
+def test_day_bounds_are_half_open_local_day():
+    assert day_bounds(DAY) == (datetime(2025, 5, 6), datetime(2025, 5, 7))
+
+
+def test_projects_client_and_live_balance_in_one_statement(db, sql_log):
+    with sql_log(db) as statements:
+        rows = sessions_for_day(DAY, user=ADMIN, db=db)
+
+    assert len(statements) == 1
+    assert [(r["id"], r["client"], r["balance"]) for r in rows] == [
+        (3, "Beto", 300.0),
+        (2, "Beto", 0.0),      # sobrepagada: el saldo no es negativo
+        (1, "Ana", 600.0),     # el cobro borrado no cuenta
+    ]
+    assert rows[0]["start"].strftime("%H:%M") == "00:00"
+
+
+def test_filters_by_artist_and_respects_scope(db):
+    assert [r["id"] for r in sessions_for_day(DAY, 1, user=ADMIN, db=db)] == [3, 1]
+    assert [r["id"] for r in sessions_for_day(DAY, 2, user=ADMIN, db=db)] == [2]
+    assert sessions_for_day(DAY, user=UNKNOWN, db=db) == []
@@ -0,0 +1,67 @@
+import pytest
+
+from data.models.artist import Artist
+from data.models.client import Client
+from services import client_prefs, client_profile
+
+ADMIN = {"id": 1, "role": "admin", "artist_id": None}
+UNKNOWN = {"id": 7, "role": "intruso", "artist_id": None}
+
+
+@pytest.fixture()
+def db(new_db):
+    with new_db() as s:
+        s.add(Artist(id=1, name="Ana"))
+        s.add_all([Client(id=i, name=n) for i, n in enumerate(("Ana", "Beto", "Cami", "Dani"), start=1)])
+        s.flush()
+        client_prefs.set_preferences(s, 1, styles=["Línea fina", "Realismo"], zones=["Antebrazo"], source="Instagram")
+        client_prefs.set_preferences(s, 2, styles=["Línea fina"], zones=["Espalda"], source="TikTok")
+        client_prefs.set_preferences(s, 3, styles=["Realismo", " ", "Realismo"], zones=["Antebrazo"])
+        s.commit()
+        yield s
+
+
+def test_segment_ands_criteria_and_ors_values(db, sql_log):
+    with sql_log(db) as statements:
+        ids = client_prefs.segment(styles=["Línea fina"], zones=["Antebrazo"], user=ADMIN, db=db)
+    assert ids == [1] and len(statements) == 1
+
+    assert client_prefs.segment(styles=["Línea fina", "Realismo"], user=ADMIN, db=db) == [1, 2, 3]
+    assert client_prefs.segment(zones=["Antebrazo"], source="Instagram", user=ADMIN, db=db) == [1]
+    assert client_prefs.segment(source="Google", user=ADMIN, db=db) == []
+    assert client_prefs.segment(styles=["Realismo"], user=UNKNOWN, db=db) == []
+
+
+def test_set_replaces_and_counts_group_by_value(db):
+    assert client_prefs.get_preferences(3, db=db) == {"style": ("Realismo",), "zone": ("Antebrazo",), "source": None}
+    client_prefs.set_preferences(db, 3, zones=["Pierna"], source="Google")
+    db.commit()
+    assert client_prefs.get_preferences(3, db=db) == {"style": (), "zone": ("Pierna",), "source": "Google"}
+
+    counts = client_prefs.preference_counts(db=db)
+    assert counts["style"] == {"Línea fina": 2, "Realismo": 1}
+    assert counts["zone"] == {"Antebrazo": 1, "Espalda": 1, "Pierna": 1}
+
+    client_profile.invalidate()
+    p = client_profile.get_profile(1, db=db)
+    assert (p.styles, p.zones, p.source) == (("Línea fina", "Realismo"), ("Antebrazo",), "Instagram")
+    client_profile.invalidate()
+
+
+def test_migration_moves_meta_prefs_out_of_notes(db, load_migration):
+    mod = load_migration("2025_10_29_add_client_preferences")
+
+    db.get(Client, 4).notes = "Le gusta el negro.\nMETA_PREFS|styles=Blackwork,Anime;zones=;source=Referido"
+    db.get(Client, 2).notes = "Sin preferencias guardadas"
+    db.commit()
+
+    with db.get_bind().begin() as conn:
+        assert mod.backfill(conn) == (1, 3)
+        assert mod.backfill(conn) == (0, 0)   # idempotente: la línea ya no está
+
+    db.expire_all()
+    assert db.get(Client, 4).notes == "Le gusta el negro."
+    assert db.get(Client, 2).notes == "Sin preferencias guardadas"
+    assert client_prefs.get_preferences(4, db=db) == {"style": ("Anime", "Blackwork"), "zone": (), "source": "Referido"}
+    assert client_prefs.parse_meta_prefs("sin línea") is None
+    assert client_prefs.get_preferences(2, db=db)["source"] == "TikTok"   # lo ya migrado no se toca
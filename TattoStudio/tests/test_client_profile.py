@@ -0,0 +1,104 @@
+import dataclasses
+from datetime import datetime, timedelta
+
+import pytest
+
+from data.db import session as db_session
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.session_tattoo import TattooSession
+from services import client_profile, sessions
+
+NOW = datetime.now().replace(microsecond=0)
+
+
+@pytest.fixture()
+def db(db_factory, monkeypatch):
+    # prefetch (hilo propio) y services/sessions abren sus sesiones con SessionLocal
+    monkeypatch.setattr(db_session, "SessionLocal", db_factory)
+    monkeypatch.setattr(sessions, "SessionLocal", db_factory)
+    client_profile.invalidate()
+    with db_factory() as s:
+        s.add_all([Artist(id=1, name="Zoe"), Artist(id=2, name="Beto"), Artist(id=3, name="Ana")])
+        s.add_all([
+            Client(id=1, name="Cami", phone="555", preferred_artist_id=3, notes="META_PREFS|styles=Fine",
+                   health_diabetes=True, consent_image=True, emergency_name="Mamá"),
+            Client(id=2, name="Dani", preferred_artist_id=3),
+            Client(id=3, name="Eli"),
+        ])
+        s.add_all([
+            TattooSession(client_id=1, artist_id=2, start=NOW - timedelta(days=30),
+                          end=NOW - timedelta(days=30, hours=-2), price=100.0, status="Completada"),
+            TattooSession(client_id=1, artist_id=1, start=NOW + timedelta(days=3),
+                          end=NOW + timedelta(days=3, hours=2), price=100.0, status="Activa"),
+            TattooSession(client_id=2, artist_id=2, start=NOW - timedelta(days=5),
+                          end=NOW - timedelta(days=5, hours=-1), price=80.0, status="Completada"),
+        ])
+        s.commit()
+        yield s
+    client_profile.invalidate()
+
+
+def test_profile_in_two_statements_is_immutable(db, sql_log):
+    with sql_log(db) as statements:
+        p = client_profile.get_profile(1, db=db)
+    assert len(statements) == 2
+    assert (p.name, p.phone, p.notes) == ("Cami", "555", "META_PREFS|styles=Fine")
+    assert p.next_start == NOW + timedelta(days=3)
+    assert (p.owner_artist_id, p.owner_artist, p.preferred_artist) == (1, "Zoe", "Ana")
+    assert p.artists == ((3, "Ana"), (2, "Beto"), (1, "Zoe"))
+    assert p.health[client_profile.HEALTH_FLAGS.index("health_diabetes")] and sum(p.health) == 1
+    assert p.consent == (False, True, False) and p.emergency_name == "Mamá"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        p.name = "Otra"
+
+    # sin próxima cita: dueño = última cita; sin citas: el preferido
+    assert client_profile.get_profile(2, db=db).owner_artist_id == 2
+    p3 = client_profile.get_profile(3, db=db)
+    assert p3.owner_artist_id is None and p3.next_start is None
+    assert client_profile.get_profile(99, db=db) is None
+
+
+def test_cache_hits_until_invalidated(db, sql_log):
+    first = client_profile.get_profile(1, db=db)
+    with sql_log(db) as statements:
+        again = client_profile.get_profile(1, db=db)
+    assert again is first and statements == []
+
+    db.get(Client, 1).phone = "777"
+    db.commit()
+    assert client_profile.get_profile(1, db=db).phone == "555"   # quien edita invalida
+    client_profile.invalidate(1)
+    assert client_profile.get_profile(1, db=db).phone == "777"
+
+
+def test_new_session_invalidates_and_prefetch_warms(db, sql_log):
+    assert client_profile.get_profile(3, db=db).next_start is None
+    start = NOW + timedelta(days=1)
+    sessions.create_session({"client_id": 3, "artist_id": 3, "start": start, "end": start + timedelta(hours=1)})
+    p = client_profile.get_profile(3, db=db)
+    assert (p.next_start, p.owner_artist) == (start, "Ana")
+
+    client_profile.invalidate()
+    t = client_profile.prefetch(2)
+    t.join(5)
+    with sql_log(db) as statements:
+        client_profile.get_profile(2, db=db)
+    assert statements == []
+    assert client_profile.prefetch(2) is None   # ya en caché
+
+
+def test_load_started_before_invalidate_is_not_stored(db, monkeypatch, sql_log):
+    real_fetch = client_profile._fetch
+
+    def racing_fetch(s, cid, now):
+        profile = real_fetch(s, cid, now)
+        client_profile.invalidate(cid)   # llega una edición mientras se consultaba
+        return profile
+
+    monkeypatch.setattr(client_profile, "_fetch", racing_fetch)
+    client_profile.get_profile(1, db=db)
+    monkeypatch.setattr(client_profile, "_fetch", real_fetch)
+    with sql_log(db) as statements:
+        client_profile.get_profile(1, db=db)
+    assert len(statements) == 2
@@ -0,0 +1,96 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import select
+
+from data.models.inventory import ConsumptionMonthly, InventoryMovement
+from data.models.product import Product
+from data.models.session_tattoo import TattooSession
+from services import consumables, inventory
+
+WHEN = datetime(2025, 3, 14, 18, 0)
+
+
+@pytest.fixture()
+def db(new_db):
+    with new_db() as s:
+        s.add_all([
+            Product(id=1, sku="TIN-NE", name="Tinta negra", category="consumibles", unidad="pz", proveedor="X", stock=10, cost=50.0),
+            Product(id=2, sku="GUA-M", name="Guantes M", category="consumibles", unidad="par", proveedor="X", stock=1, cost=4.0),
+            Product(id=3, sku="FILM", name="Film", category="consumibles", unidad="pz", proveedor="X", stock=20, cost=2.0),
+        ])
+        s.commit()
+        yield s
+
+
+def _stock(db, pid):
+    return db.get(Product, pid, populate_existing=True).stock
+
+
+def _session(notes):
+    return TattooSession(id=7, client_id=1, artist_id=1, notes=notes)
+
+
+def test_template_resolution_order(db):
+    base = consumables.save_template("Básico", [(2, 2), (3, 1)], is_default=True, db=db)
+    cover = consumables.save_template("Cover-up", [(1, 2)], db=db)
+    consumables.save_template("Inactiva", [(1, 1)], active=False, db=db)
+
+    assert consumables.resolve_template(db, _session("cover-up\nZona: brazo")) == cover
+    assert consumables.resolve_template(db, _session("Lettering")) == base
+    assert consumables.resolve_template(db, _session("Inactiva")) == base
+    assert consumables.resolve_template(db, _session("Lettering"), template_id=cover) == cover
+
+
+def test_only_one_default_and_unique_names(db):
+    a = consumables.save_template("A", [(1, 1)], is_default=True, db=db)
+    consumables.save_template("B", [(1, 1), (1, 2)], is_default=True, db=db)
+    rows = {t["name"]: t for t in consumables.list_templates(db)}
+    assert rows["B"]["is_default"] and not rows["A"]["is_default"]
+    assert rows["B"]["items"] == [{"product_id": 1, "sku": "TIN-NE", "name": "Tinta negra", "qty": 3}]
+    with pytest.raises(ValueError):
+        consumables.save_template("a", [], db=db)
+    consumables.save_template("A", [(3, 5)], template_id=a, db=db)
+    assert {t["name"]: t for t in consumables.list_templates(db)}["A"]["items"][0]["qty"] == 5
+
+
+def test_deduction_is_one_update_and_feeds_ledger_and_rollup(db, sql_log):
+    consumables.save_template("Cover-up", [(1, 2), (2, 2), (3, 1)], db=db)
+
+    with sql_log(db) as statements:
+        with db.begin():
+            rows = consumables.deduct_for_session(db, _session("Cover-up"), user_id=1, when=WHEN)
+
+    assert sum(1 for sql in statements if sql.lstrip().upper().startswith("UPDATE PRODUCTS")) == 1
+    assert {r["product_id"]: (r["qty"], r["balance"]) for r in rows} == {1: (-2, 8), 2: (-2, -1), 3: (-1, 19)}
+    # El consumo no bloquea el cierre: el stock puede quedar negativo
+    assert _stock(db, 2) == -1
+
+    moves = db.execute(select(InventoryMovement.kind, InventoryMovement.note)).all()
+    assert set(moves) == {("Consumo", "Sesión #7")}
+    monthly = {r.product_id: (r.units, r.cost) for r in db.execute(select(ConsumptionMonthly)).scalars()}
+    assert monthly == {1: (2, 100.0), 2: (2, 8.0), 3: (1, 2.0)}
+    assert inventory.dashboard_kpis(today=date(2025, 3, 20), db=db)["consumo_mes"] == 110.0
+
+
+def test_no_template_means_no_deduction(db):
+    with db.begin():
+        assert consumables.deduct_for_session(db, _session("Lettering"), user_id=1, when=WHEN) == []
+    assert _stock(db, 1) == 10
+
+
+def test_rebuild_consumption_matches_incremental_rollup(db):
+    consumables.save_template("Cover-up", [(1, 2)], db=db)
+    with db.begin():
+        consumables.deduct_for_session(db, _session("Cover-up"), user_id=1, when=WHEN)
+    inventory.record_movement(1, "Salida", 1, user_id=1, when=datetime(2025, 4, 2), db=db)
+    before = sorted((r.month, r.product_id, r.units) for r in db.execute(select(ConsumptionMonthly)).scalars())
+
+    inventory.rebuild_consumption(db)
+    db.commit()
+    after = sorted((r.month, r.product_id, r.units) for r in db.execute(select(ConsumptionMonthly)).scalars())
+    assert before == after == [("2025-03", 1, 2), ("2025-04", 1, 1)]
+    assert inventory.consumption_by_month(months=2, today=date(2025, 4, 10), db=db) == [
+        ("2025-03", 2, 100.0),
+        ("2025-04", 1, 50.0),
+    ]
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+from data.models.user import User
+from services import auth, credentials
+
+
+@pytest.fixture
+def rounds(monkeypatch):
+    """Costo fijo y bajo (rápido); devuelve un setter para simular cambios de costo."""
+    def set_rounds(n):
+        monkeypatch.setenv("TATTOO_BCRYPT_ROUNDS", str(n))
+        auth.reset_rounds_cache()
+    set_rounds(4)
+    yield set_rounds
+    auth.reset_rounds_cache()
+
+
+@pytest.fixture
+def db(new_db):
+    with new_db() as s:
+        yield s
+
+
+def test_calibration_stays_within_bounds():
+    n = auth.calibrate(target=1.0, samples=1)
+    assert n == auth.MIN_ROUNDS
+    assert auth.MIN_ROUNDS <= auth.calibrate(target=1e9, samples=1) <= auth.MAX_ROUNDS
+    assert auth.hash_rounds(auth.hash_password("x", rounds=5)) == 5
+    assert auth.hash_rounds("no-es-bcrypt") is None
+
+
+def test_calibrated_cost_stays_in_memory_and_never_rehashes(monkeypatch, db):
+    from data.models.setting import Setting
+    monkeypatch.delenv("TATTOO_BCRYPT_ROUNDS", raising=False)
+    monkeypatch.setattr(auth, "_auth_config", lambda: {})
+    auth.reset_rounds_cache()
+    try:
+        stored = auth.hash_password("clave", rounds=5)
+        db.add(User(username="ana", role="admin", password_hash=stored))
+        db.commit()
+        for calibrated in (4, 6):                      # ruido de medición / otra estación
+            monkeypatch.setattr(auth, "calibrate", lambda *a, n=calibrated, **k: n)
+            auth.reset_rounds_cache()
+            assert auth.authenticate(db, "ana", "clave") is not None
+            assert auth.bcrypt_rounds(db) == calibrated
+            assert db.query(User).filter_by(username="ana").one().password_hash == stored
+        assert db.query(Setting).count() == 0          # ni el login ni el hash guardan el costo
+
+        auth.save_rounds(db, 6)                        # sólo la acción explícita (--calibrate)
+        auth.reset_rounds_cache()
+        assert auth.bcrypt_rounds(db) == 6
+        auth.authenticate(db, "ana", "clave")
+        assert auth.hash_rounds(db.query(User).filter_by(username="ana").one().password_hash) == 6
+    finally:
+        auth.reset_rounds_cache()
+
+
+def test_login_rehashes_when_cost_changes(rounds, db):
+    db.add(User(username="ana", role="admin", password_hash=auth.hash_password("clave")))
+    db.commit()
+
+    rounds(5)
+    assert auth.authenticate(db, "ana", "clave")["username"] == "ana"
+    stored = db.query(User).filter_by(username="ana").one().password_hash
+    assert auth.hash_rounds(stored) == 5
+    assert auth.verify_password("clave", stored)
+
+    assert auth.authenticate(db, "ana", "mala") is None
+    assert db.query(User).filter_by(username="ana").one().password_hash == stored
+
+    rounds(4)                                          # bajar el costo fijado no reescribe
+    auth.authenticate(db, "ana", "clave")
+    assert db.query(User).filter_by(username="ana").one().password_hash == stored
+
+
+def test_async_jobs_report_through_signals(rounds):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    got = []
+    job = credentials.hash_password_async("secreto")
+    job.done.connect(got.append)
+    assert job.wait(10_000)
+    assert auth.verify_password("secreto", got[0])
+
+    errors = []
+    bad = credentials.submit(lambda: 1 / 0)
+    bad.failed.connect(errors.append)
+    assert bad.wait(10_000)
+    assert errors and isinstance(bad.error, ZeroDivisionError)
+    with pytest.raises(ZeroDivisionError):
+        credentials.run_blocking(lambda: 1 / 0)
+    assert credentials.run_blocking(auth.verify_password, "secreto", got[0]) is True
+    app.processEvents()
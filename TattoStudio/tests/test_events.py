@@ -0,0 +1,98 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from data.db import session as db_session
+from data.models.artist import Artist
+from data.models.client import Client
+from services import client_profile, events, sessions
+from services.contracts import set_current_user
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+NOW = datetime.now().replace(microsecond=0)
+
+
+@pytest.fixture()
+def factory(db_factory, monkeypatch):
+    for mod in (db_session, sessions):
+        monkeypatch.setattr(mod, "SessionLocal", db_factory)
+    set_current_user({"id": 1, "username": "admin", "role": "admin", "artist_id": None})
+    with db_factory() as s:
+        s.add(Artist(id=1, name="Ana"))
+        s.add_all([Client(id=1, name="Beto"), Client(id=2, name="Dani"), Client(id=3, name="Fer")])
+        s.commit()
+    yield db_factory
+    client_profile.invalidate()
+
+
+def test_publish_dispatches_by_type_and_isolates_failures():
+    got = []
+
+    def boom(ev):
+        raise RuntimeError("handler roto")
+
+    unsubs = [
+        events.subscribe(events.ClientSaved, boom),
+        events.subscribe(events.ClientSaved, lambda ev: got.append(("client", ev.client_id))),
+        events.subscribe(events.DomainEvent, lambda ev: got.append(("all", type(ev).__name__))),
+    ]
+    try:
+        assert events.publish(events.ClientSaved(7, events.CREATED)) >= 3
+        events.publish(events.UserSaved(1, None, events.UPDATED))
+    finally:
+        for u in unsubs:
+            u()
+    assert got == [("client", 7), ("all", "ClientSaved"), ("all", "UserSaved")]
+
+    events.publish(events.ClientSaved(8, events.UPDATED))   # ya dados de baja
+    assert len(got) == 3
+
+
+def test_session_services_publish_after_commit(factory):
+    seen = []
+    unsub = events.subscribe(events.SessionChanged, seen.append)
+    try:
+        start = NOW + timedelta(days=1)
+        sid = sessions.create_session({"client_id": 2, "artist_id": 1, "start": start,
+                                       "end": start + timedelta(hours=1)})
+        sessions.update_session(sid, {"notes": "Retoque"})
+        sessions.cancel_session(sid)
+    finally:
+        unsub()
+    assert [(e.session_id, e.client_id, e.artist_id, e.action) for e in seen] == [
+        (sid, 2, 1, events.CREATED), (sid, 2, 1, events.UPDATED), (sid, 2, 1, events.CANCELLED),
+    ]
+    assert sessions.list_sessions({"ids": [sid]})[0]["status"] == "Cancelada"
+
+
+def test_clients_page_patches_one_row(factory, monkeypatch):
+    QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    from ui.pages import clients
+
+    monkeypatch.setattr(clients, "SessionLocal", factory)
+    page = clients.ClientsPage()
+    try:
+        names = lambda: [page.table.item(r, 0).text() for r in range(page.table.rowCount())]
+        assert names() == ["Beto", "Dani", "Fer"]
+        reloads = []
+        monkeypatch.setattr(page, "_reload_from_db", lambda: reloads.append(1))
+
+        with factory() as s:
+            s.add(Client(id=4, name="Carla"))
+            s.commit()
+        events.publish(events.ClientSaved(4, events.CREATED))
+        assert names() == ["Beto", "Carla", "Dani", "Fer"]
+
+        start = NOW + timedelta(days=2)
+        sessions.create_session({"client_id": 3, "artist_id": 1, "start": start,
+                                 "end": start + timedelta(hours=1)})
+        fer = page.table.rowCount() - 1
+        assert (page.table.item(fer, 2).text(), page.table.item(fer, 4).text()) == ("Ana", "Activo")
+
+        events.publish(events.ClientSaved(1, events.DELETED))
+        assert names() == ["Carla", "Dani", "Fer"] and reloads == []
+    finally:
+        page.deleteLater()
+        app.processEvents()
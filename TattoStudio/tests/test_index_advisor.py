@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from data.db.base import Base
+from data.models import load_all_models
+from data.tools import index_advisor
+
+
+# consulta del catálogo -> índice que su plan debe usar tras la migración
+EXPECTED = {
+    "clients.next_session": "ix_sessions_client_start",
+    "clients.last_session": "ix_sessions_client_start",
+    "lookups.clients": "ix_clients_name",
+    "portfolio.for_user": "ix_portfolio_user_created",
+    "reports.rows.method": "ix_tx_method_date",
+    "sessions.paid": "ix_tx_live_session",
+    "inventory.by_sku": "ix_products_sku",
+}
+
+
+@pytest.fixture(scope="module")
+def migration(load_migration):
+    return load_migration("2025_10_20_add_query_indexes")
+
+
+@pytest.fixture
+def old_db(tmp_path, migration):
+    """BD con el esquema actual pero sin los índices nuevos (como una dev.db vieja)."""
+    load_all_models()
+    path = tmp_path / "old.db"
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    Base.metadata.create_all(engine)
+    con = sqlite3.connect(path)
+    for name in migration.NEEDED_INDEXES:
+        con.execute(f"DROP INDEX IF EXISTS {name}")
+    con.commit()
+    con.close()
+    engine.dispose()  # conexiones nuevas: el planificador ve el esquema actual
+    yield path, engine
+    engine.dispose()
+
+
+def _plans(engine):
+    return {r["name"]: r for r in index_advisor.analyze(engine, min_rows=0)}
+
+
+def test_models_declare_the_migrated_indexes(migration):
+    load_all_models()
+    declared = {ix.name for t in Base.metadata.tables.values() for ix in t.indexes}
+    assert set(migration.NEEDED_INDEXES) <= declared
+
+
+def test_advisor_flags_missing_indexes_and_migration_fixes_them(old_db, migration):
+    path, engine = old_db
+    before = _plans(engine)
+    assert before["clients.next_session"]["unexpected"]
+    assert before["portfolio.for_user"]["unexpected"]
+    assert before["inventory.by_sku"]["unexpected"]
+
+    con = sqlite3.connect(path)
+    try:
+        assert sorted(migration.apply(con)) == sorted(migration.NEEDED_INDEXES)
+        assert migration.apply(con) == []  # idempotente
+    finally:
+        con.close()
+
+    engine.dispose()
+    after = _plans(engine)
+    for name, index in EXPECTED.items():
+        assert any(index in d for d in after[name]["plan"]), (name, after[name]["plan"])
+    assert not [r["name"] for r in after.values() if r["unexpected"]]
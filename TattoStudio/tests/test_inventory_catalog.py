@@ -0,0 +1,56 @@
+import pytest
+
+from data.models.product import Product
+from data.tools import index_advisor
+from services import inventory
+
+NAMES = ["agujas 3RL", "Agujas 5RM", "Alcohol", "Guantes M", "guantes L", "Tinta negra",
+         "Tinta roja", "tinta_blanca", "Toallas", "Vaselina", "Film", "Jabón verde"]
+
+
+@pytest.fixture()
+def db(new_db):
+    with new_db() as s:
+        s.add_all([
+            Product(id=i, sku=f"{n[:3].upper()}-{i:03d}", name=n, unidad="pz", proveedor="X",
+                    category="Tintas" if n.lower().startswith("tinta") else "Consumibles",
+                    stock=i, min_stock=5, caduca=i % 2 == 0, activo=i != 3)
+            for i, n in enumerate(NAMES, start=1)
+        ])
+        s.commit()
+        yield s
+
+
+def _all_pages(db, filters, limit=3):
+    out, after = [], None
+    while True:
+        rows, after = inventory.list_products(filters, limit=limit, after=after, db=db)
+        out.extend(rows)
+        if after is None:
+            return out
+
+
+def test_keyset_pages_match_the_full_ordering(db):
+    rows = _all_pages(db, {"active": True})
+    names = [r["nombre"] for r in rows]
+    assert names == sorted((n for i, n in enumerate(NAMES, 1) if i != 3), key=str.lower)
+    assert len({r["id"] for r in rows}) == len(rows) == inventory.count_products({"active": True}, db=db)
+
+
+def test_filters_and_prefix_search(db):
+    assert {r["nombre"] for r in _all_pages(db, {"text": "guan"})} == {"Guantes M", "guantes L"}
+    assert [r["nombre"] for r in _all_pages(db, {"text": "tin-006"})] == ["Tinta negra"]
+    # el comodín del usuario es literal
+    assert [r["nombre"] for r in _all_pages(db, {"text": "tinta_"})] == ["tinta_blanca"]
+    assert _all_pages(db, {"text": "ajas"}) == []   # prefijo, no subcadena
+    tintas = _all_pages(db, {"category": "Tintas", "caduca": False})
+    assert [r["nombre"] for r in tintas] == ["Tinta roja"]
+    assert [r["nombre"] for r in _all_pages(db, {"active": False})] == ["Alcohol"]
+
+
+def test_catalog_queries_use_the_nocase_indexes(db):
+    rows = {r["name"]: r for r in index_advisor.analyze(db.get_bind(), min_rows=0)}
+    page = rows["inventory.catalog"]["plan"]
+    assert any("SEARCH" in d and "ix_products_name_nocase" in d for d in page), page
+    assert not rows["inventory.catalog"]["unexpected"]
+    assert not rows["inventory.search"]["unexpected"]
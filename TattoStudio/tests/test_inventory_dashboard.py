@@ -0,0 +1,73 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from data.models.product import Product
+from services import inventory
+
+TODAY = date(2025, 3, 15)
+
+
+def _product(i, **kw):
+    base = dict(id=i, sku=f"P-{i}", name=f"Producto {i}", unidad="pz", proveedor="X",
+                cost=10.0, stock=10, min_stock=5, caduca=False, activo=True)
+    base.update(kw)
+    return Product(**base)
+
+
+@pytest.fixture()
+def db(new_db):
+    with new_db() as s:
+        s.add_all([
+            _product(1, stock=1, min_stock=5),                                   # bajo (−4)
+            _product(2, stock=4, min_stock=5),                                   # bajo (−1)
+            _product(3, stock=0, min_stock=5, activo=False),                     # inactivo: no cuenta
+            _product(4, caduca=True, fechacaducidad=TODAY + timedelta(days=10)),
+            _product(5, caduca=True, fechacaducidad=TODAY - timedelta(days=2)),  # vencido: cuenta
+            _product(6, caduca=True, fechacaducidad=TODAY + timedelta(days=90)),
+        ])
+        s.commit()
+        yield s
+
+
+def test_kpis_come_from_one_statement(db, sql_log):
+    inventory.record_movement(4, "Salida", 3, when=datetime(2025, 3, 2), db=db)
+    inventory.record_movement(4, "Salida", 1, when=datetime(2025, 2, 27), db=db)   # mes anterior
+    inventory.record_movement(6, "Conteo", 7, when=datetime(2025, 3, 3), db=db)    # no es consumo
+
+    with sql_log(db) as statements:
+        kpis = inventory.dashboard_kpis(today=TODAY, days=30, db=db)
+
+    assert len(statements) == 1
+    assert kpis == {"activos": 5, "bajo_stock": 2, "por_caducar": 2, "consumo_mes": 30.0}
+
+
+def test_alert_lists_are_ordered(db):
+    assert [n for n, _s, _m in inventory.low_stock_items(db=db)] == ["Producto 1", "Producto 2"]
+    assert inventory.expiring_items(today=TODAY, days=30, db=db) == [
+        ("Producto 5", TODAY - timedelta(days=2)),
+        ("Producto 4", TODAY + timedelta(days=10)),
+    ]
+    assert len(inventory.expiring_items(today=TODAY, days=365, limit=1, db=db)) == 1
+
+
+def test_migration_converts_text_dates(tmp_path, load_migration):
+    migration = load_migration("2025_10_22_expiry_date_column")
+    path = tmp_path / "legacy.db"
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE products (id INTEGER PRIMARY KEY, stock INTEGER, min_stock INTEGER,"
+                " caduca BOOLEAN, activo BOOLEAN, fechacaducidad TEXT)")
+    con.executemany("INSERT INTO products VALUES (?, 1, 0, 1, 1, ?)",
+                    [(1, "2025-04-01"), (2, "31/12/2025"), (3, "pronto"), (4, None)])
+    try:
+        summary = migration.apply(con)
+        assert summary["converted"] and summary["invalid"] == 1
+        assert sorted(summary["indexes"]) == sorted(migration.NEEDED_INDEXES)
+        assert migration._column_type(con.cursor()) == "DATE"
+        rows = con.execute("SELECT id, fechacaducidad FROM products ORDER BY id").fetchall()
+        assert rows == [(1, "2025-04-01"), (2, "2025-12-31"), (3, None), (4, None)]
+        again = migration.apply(con)
+        assert not again["converted"] and again["indexes"] == []
+    finally:
+        con.close()
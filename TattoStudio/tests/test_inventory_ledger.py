@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from data.models.inventory import InventoryMovement, StockSnapshot
+from data.models.product import Product
+from services import inventory
+from services.inventory import StockError
+
+DAY1 = datetime(2025, 3, 1, 10, 0)
+DAY2 = DAY1 + timedelta(days=1)
+
+
+@pytest.fixture()
+def db(new_db):
+    with new_db() as s:
+        s.add_all([
+            Product(id=1, sku="TIN-NE", name="Tinta negra", category="consumibles", unidad="pz", proveedor="X", stock=10),
+            Product(id=2, sku="GUA-M", name="Guantes M", category="consumibles", unidad="caja", proveedor="X", stock=3),
+        ])
+        s.commit()
+        yield s
+
+
+def _stock(db, pid):
+    return db.get(Product, pid, populate_existing=True).stock
+
+
+def test_entry_and_exit_keep_running_balance(db):
+    a = inventory.record_movement(1, "Entrada", 5, user_id=1, when=DAY1, db=db)
+    b = inventory.record_movement(1, "Salida", 12, user_id=1, when=DAY1 + timedelta(hours=1), db=db)
+    assert (a["qty"], a["balance"]) == (5, 15)
+    assert (b["qty"], b["balance"]) == (-12, 3)
+    assert _stock(db, 1) == 3
+
+
+def test_insufficient_stock_is_rejected_without_side_effects(db):
+    with pytest.raises(StockError):
+        inventory.record_movement(2, "Salida", 4, when=DAY1, db=db)
+    with pytest.raises(StockError):
+        inventory.record_movement(2, "Ajuste", -4, when=DAY1, db=db)
+    assert _stock(db, 2) == 3
+    assert db.query(InventoryMovement).count() == 0
+    with pytest.raises(StockError):
+        inventory.record_movement(99, "Entrada", 1, when=DAY1, db=db)
+
+
+def test_count_records_delta_against_current_stock(db):
+    mv = inventory.record_movement(1, "Conteo", 7, when=DAY1, db=db)
+    assert (mv["qty"], mv["balance"]) == (-3, 7)
+    assert _stock(db, 1) == 7
+
+
+def test_count_delta_matches_the_stock_it_replaced(db):
+    bumped = []
+
+    def concurrent_entry(conn, cursor, statement, *args):
+        # otra estación suma 2 justo entre la lectura del conteo y su UPDATE
+        if statement.startswith("UPDATE products SET stock") and not bumped:
+            bumped.append(True)
+            cursor.execute("UPDATE products SET stock = stock + 2 WHERE id = 1")
+
+    event.listen(db.get_bind(), "before_cursor_execute", concurrent_entry)
+    try:
+        mv = inventory.record_movement(1, "Conteo", 7, when=DAY1, db=db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", concurrent_entry)
+    assert bumped and (mv["qty"], mv["balance"]) == (-5, 7)     # 12 -> 7, no 10 -> 7
+    assert _stock(db, 1) == 7
+
+
+def test_stock_at_and_levels_with_daily_snapshot(db):
+    inventory.record_movement(1, "Entrada", 5, when=DAY1, db=db)          # 15
+    inventory.record_movement(1, "Salida", 2, when=DAY2, db=db)           # 13
+    inventory.record_movement(2, "Entrada", 1, when=DAY2 + timedelta(hours=2), db=db)  # 4
+
+    # Una foto por día, tomada antes de la primera escritura
+    assert db.query(StockSnapshot.taken_at).distinct().count() == 2
+    assert inventory.stock_at(1, DAY1 - timedelta(hours=1), db=db) == 10
+    assert inventory.stock_at(1, DAY1 + timedelta(hours=1), db=db) == 15
+    assert inventory.stock_at(1, DAY2 + timedelta(hours=1), db=db) == 13
+    assert inventory.stock_at(2, DAY1, db=db) == 3
+
+    assert inventory.stock_levels_at(DAY2 + timedelta(hours=1), db=db) == {1: 13, 2: 3}
+    assert inventory.stock_levels_at(DAY2 + timedelta(hours=3), db=db) == {1: 13, 2: 4}
+
+
+def test_list_movements_keyset_pages(db):
+    for i in range(7):
+        inventory.record_movement(1, "Entrada", 1, when=DAY1 + timedelta(minutes=i), db=db)
+    inventory.record_movement(2, "Salida", 1, when=DAY2, db=db)
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = inventory.list_movements({"kind": "Entrada"}, limit=3, cursor=cursor, db=db)
+        seen.extend(r["id"] for r in rows)
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 7
+    assert seen == sorted(seen, reverse=True)
+    assert inventory.count_movements({"from": DAY2, "to": DAY2 + timedelta(days=1)}, db=db) == 1
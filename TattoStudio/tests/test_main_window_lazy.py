@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+
+def test_pages_are_built_on_first_visit():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    from services.contracts import set_current_user
+    from ui.main_window import MainWindow
+
+    set_current_user({"id": 1, "username": "admin", "role": "admin", "artist_id": None})
+    w = MainWindow(login=False)
+    try:
+        assert all(w._built(attr) is None for attr in w._page_specs)
+        count = w.stack.count()
+
+        w._ir(w.idx_staff)
+        assert w._built("staff_page") is not None
+        assert w.stack.currentWidget() is w.staff_page
+        assert w.stack.indexOf(w.staff_page) == w.idx_staff
+        assert w.stack.count() == count
+        assert w._built("agenda_page") is None
+
+        # Acceso directo (p. ej. load_client antes de _ir) también construye
+        assert w.stack.indexOf(w.client_detail) == w.idx_cliente_det
+    finally:
+        w.deleteLater()
+        app.processEvents()
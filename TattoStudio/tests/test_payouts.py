@@ -0,0 +1,100 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from data.db import session as db_session
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.payout import Payout, PayoutLine
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services import contracts, payouts
+
+MAY, JUNE, JULY = date(2025, 5, 1), date(2025, 6, 1), date(2025, 7, 1)
+ADMIN = {"id": 1, "role": "admin", "artist_id": None}
+ARTIST_1 = {"id": 5, "role": "artist", "artist_id": 1}
+
+
+@pytest.fixture()
+def db(new_db):
+    with new_db() as s:
+        s.add_all([
+            Artist(id=1, name="Beto", rate_commission=0.6),
+            Artist(id=2, name="Ana", rate_commission=None),   # sin tasa: la predeterminada
+        ])
+        s.add(Client(id=1, name="Cliente"))
+        at = lambda d, h=12: datetime(d.year, d.month, d.day, h)
+        s.add_all([
+            TattooSession(id=1, client_id=1, artist_id=1, start=at(date(2025, 5, 3)), end=at(date(2025, 5, 3), 14),
+                          price=1000.0, status="Completada"),
+            TattooSession(id=2, client_id=1, artist_id=1, start=at(date(2025, 5, 9)), end=at(date(2025, 5, 9), 14),
+                          price=500.0, status="Completada", commission_override=0.4),
+        ])
+        s.add_all([
+            Transaction(id=1, session_id=1, artist_id=1, amount=1000.0, method="Efectivo", date=at(date(2025, 5, 3))),
+            Transaction(id=2, session_id=2, artist_id=1, amount=500.0, method="Tarjeta", date=at(date(2025, 5, 9))),
+            Transaction(id=3, session_id=None, artist_id=2, amount=333.33, method="Efectivo", date=at(date(2025, 5, 31), 23)),
+            Transaction(id=4, session_id=1, artist_id=1, amount=999.0, method="Efectivo", date=at(date(2025, 5, 4)),
+                        deleted_flag=True),
+            Transaction(id=5, session_id=None, artist_id=2, amount=100.0, method="Efectivo", date=at(date(2025, 6, 1), 0)),
+        ])
+        s.commit()
+        yield s
+
+
+def test_preview_is_one_aggregate_honouring_override_and_artist_rate(db, sql_log):
+    with sql_log(db) as statements:
+        period_id, rows = payouts.settlement(MAY, JUNE, user=ADMIN, db=db)
+    # una lectura para saber si el periodo está cerrado + el agregado
+    assert period_id is None and len(statements) == 2
+    assert [(r["artist"], r["gross"], r["commission"], r["tx_count"]) for r in rows] == [
+        ("Ana", 333.33, 166.67, 1),            # 333.33 × 0.5 (predeterminada), redondeado
+        ("Beto", 1500.0, 800.0, 2),            # 1000 × 0.6 + 500 × 0.4 (override)
+    ]
+    assert payouts.compute_commission(2, db=db) == 200.0
+
+
+def test_contract_commission_delegates_to_payouts(db, monkeypatch):
+    monkeypatch.setattr(db_session, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    assert contracts.compute_commission(2) == 200.0
+
+
+def test_close_freezes_totals_and_lines(db, sql_log):
+    period_id = payouts.close_period(MAY, JUNE, user_id=1, db=db)
+    assert db.execute(select(func.count()).select_from(Payout)).scalar() == 2
+    lines = {l.transaction_id: (l.rate, l.commission) for l in db.execute(select(PayoutLine)).scalars()}
+    assert lines == {1: (0.6, 600.0), 2: (0.4, 200.0), 3: (0.5, 166.67)}
+
+    # Cambiar tasas después del cierre no mueve lo congelado
+    db.get(Artist, 1).rate_commission = 0.9
+    db.commit()
+    with sql_log(db) as statements:
+        pid, rows = payouts.settlement(MAY, JUNE, user=ADMIN, db=db)
+    assert pid == period_id and len(statements) == 2
+    assert not any("FROM transactions" in sql for sql in statements)
+    assert {r["artist"]: r["commission"] for r in rows} == {"Ana": 166.67, "Beto": 800.0}
+    beto = next(r for r in rows if r["artist"] == "Beto")
+    assert [l["transaction_id"] for l in payouts.period_lines(beto["payout_id"], db=db)] == [1, 2]
+    assert payouts.compute_commission(1, db=db) == 600.0
+
+
+def test_periods_do_not_overlap_and_closing_again_is_idempotent(db):
+    period_id = payouts.close_period(MAY, JUNE, db=db)
+    assert payouts.close_period(MAY, JUNE, db=db) == period_id
+    with pytest.raises(ValueError):
+        payouts.close_period(date(2025, 5, 15), date(2025, 6, 15), db=db)
+    with pytest.raises(ValueError):
+        payouts.close_period(JUNE, JUNE, db=db)
+
+    payouts.close_period(JUNE, JULY, db=db)
+    assert [(p["start"], p["end"]) for p in payouts.list_periods(db=db)] == [(JUNE, JULY), (MAY, JUNE)]
+    _, june = payouts.settlement(JUNE, JULY, user=ADMIN, db=db)
+    assert [(r["artist"], r["tx_count"]) for r in june] == [("Ana", 1)]
+
+
+def test_artist_only_sees_own_payouts(db):
+    assert [r["artist"] for r in payouts.settlement(MAY, JUNE, user=ARTIST_1, db=db)[1]] == ["Beto"]
+    payouts.close_period(MAY, JUNE, db=db)
+    assert [r["artist"] for r in payouts.settlement(MAY, JUNE, user=ARTIST_1, db=db)[1]] == ["Beto"]
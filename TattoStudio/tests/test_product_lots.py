@@ -0,0 +1,111 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import select
+
+from data.models.inventory import InventoryMovementLot, ProductLot
+from data.models.product import Product
+from data.models.session_tattoo import TattooSession
+from services import consumables, inventory
+from services.inventory import StockError
+
+WHEN = datetime(2025, 3, 1, 10, 0)
+
+
+@pytest.fixture()
+def db(new_db):
+    with new_db() as s:
+        s.add_all([
+            # 4 unidades sin lote (existencia anterior a los lotes)
+            Product(id=1, sku="TIN-NE", name="Tinta negra", category="consumibles", unidad="pz",
+                    proveedor="X", stock=4, caduca=False),
+            Product(id=2, sku="ANE", name="Anestésico", category="consumibles", unidad="pz",
+                    proveedor="X", stock=3, caduca=True, fechacaducidad=date(2025, 3, 20)),
+        ])
+        s.commit()
+        yield s
+
+
+def _lots(db, pid):
+    return [(l["lot_code"], l["qty"]) for l in inventory.list_lots(pid, db=db)]
+
+
+def _receive(db, code, expires, qty, pid=1):
+    return inventory.record_movement(pid, "Entrada", qty, lot=(code, expires), user_id=1, when=WHEN, db=db)
+
+
+def test_outflows_pick_first_expired_first(db):
+    _receive(db, "B", date(2025, 9, 1), 5)
+    _receive(db, "SIN-FECHA", None, 5)
+    _receive(db, "A", date(2025, 6, 1), 5)
+    assert _lots(db, 1) == [("A", 5), ("B", 5), ("SIN-FECHA", 5)]
+
+    out = inventory.record_movement(1, "Salida", 7, user_id=1, when=WHEN, db=db)
+    assert out["balance"] == 12
+    assert _lots(db, 1) == [("B", 3), ("SIN-FECHA", 5)]
+    links = db.execute(
+        select(ProductLot.lot_code, InventoryMovementLot.qty)
+        .join(ProductLot, ProductLot.id == InventoryMovementLot.lot_id)
+        .where(InventoryMovementLot.movement_id == out["id"])
+    ).all()
+    assert sorted(links) == [("A", -5), ("B", -2)]
+
+    # Lo que los lotes no cubren sale de la existencia sin lote
+    inventory.record_movement(1, "Salida", 10, user_id=1, when=WHEN, db=db)
+    assert _lots(db, 1) == []
+    assert db.get(Product, 1, populate_existing=True).stock == 2
+    assert inventory.lot_mismatches(db=db) == []
+
+
+def test_same_lot_code_accumulates_and_expiry_aggregate_follows_lots(db):
+    first = _receive(db, "L1", date(2025, 5, 1), 2)
+    again = _receive(db, "L1", date(2025, 5, 1), 3)
+    assert first["lots"][0][0] == again["lots"][0][0]
+    assert _lots(db, 1) == [("L1", 5)]
+
+    p = db.get(Product, 1, populate_existing=True)
+    assert (p.caduca, p.fechacaducidad) == (True, date(2025, 5, 1))
+
+    _receive(db, "L0", date(2025, 4, 1), 1)
+    assert db.get(Product, 1, populate_existing=True).fechacaducidad == date(2025, 4, 1)
+    inventory.record_movement(1, "Salida", 6, user_id=1, when=WHEN, db=db)
+    assert db.get(Product, 1, populate_existing=True).fechacaducidad is None
+
+
+def test_lot_only_applies_to_inflows(db):
+    with pytest.raises(StockError):
+        inventory.record_movement(1, "Salida", 1, lot=("L1", None), user_id=1, when=WHEN, db=db)
+    with pytest.raises(StockError):
+        inventory.record_movement(1, "Entrada", 1, lot=("  ", None), user_id=1, when=WHEN, db=db)
+    assert db.get(Product, 1, populate_existing=True).stock == 4
+
+
+def test_count_down_and_session_consumption_use_fefo(db):
+    _receive(db, "A", date(2025, 6, 1), 3)
+    _receive(db, "B", date(2025, 7, 1), 3)
+    inventory.record_movement(1, "Conteo", 8, user_id=1, when=WHEN, db=db)   # 10 -> 8
+    assert _lots(db, 1) == [("A", 1), ("B", 3)]
+
+    consumables.save_template("Cover-up", [(1, 3)], db=db)
+    with db.begin():
+        consumables.deduct_for_session(db, TattooSession(id=9, notes="Cover-up"), user_id=1, when=WHEN)
+    assert _lots(db, 1) == [("B", 1)]
+    assert db.get(Product, 1, populate_existing=True).stock == 5
+
+
+def test_expiring_items_lists_lots_and_products_without_lots(db):
+    _receive(db, "L9", date(2025, 3, 10), 2)
+    _receive(db, "L10", date(2025, 12, 1), 2)
+    rows = inventory.expiring_items(today=date(2025, 3, 1), days=30, db=db)
+    assert rows == [("Tinta negra · lote L9", date(2025, 3, 10)), ("Anestésico", date(2025, 3, 20))]
+
+
+def test_migration_backfills_initial_lots_once(db, load_migration):
+    mod = load_migration("2025_10_25_add_product_lots")
+
+    assert mod.backfill(db) == 1
+    assert mod.backfill(db) == 0
+    db.commit()
+    assert _lots(db, 2) == [("INICIAL", 3)]
+    inventory.record_movement(2, "Salida", 1, user_id=1, when=WHEN, db=db)
+    assert _lots(db, 2) == [("INICIAL", 2)]
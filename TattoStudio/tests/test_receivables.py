@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services.reports import receivable_sessions, receivables_by_artist
+
+NOW = datetime(2025, 6, 30, 12, 0)
+ADMIN = {"id": 1, "role": "admin", "artist_id": None}
+
+
+def _ago(days):
+    return NOW - timedelta(days=days)
+
+
+@pytest.fixture(scope="module")
+def db(new_db):
+    with new_db() as s:
+        s.add_all([Artist(id=1, name="Beto"), Artist(id=2, name="Ana"), Artist(id=3, name="Caro")])
+        s.add(Client(id=1, name="Cliente"))
+
+        def sess(sid, artist, days, price, status="Completada"):
+            start = _ago(days)
+            return TattooSession(id=sid, client_id=1, artist_id=artist, start=start,
+                                 end=start + timedelta(hours=1), price=price, status=status)
+
+        s.add_all([
+            sess(1, 1, 5, 1000.0),      # debe 600 (0–30)
+            sess(2, 1, 45, 500.0),      # debe 500 (31–60)
+            sess(3, 1, 200, 300.0),     # debe 300 (90+)
+            sess(4, 2, 70, 800.0),      # debe 200 (61–90)
+            sess(5, 2, 10, 400.0),      # pagada de más: saldo 0
+            sess(6, 3, 20, 900.0, status="Cancelada"),
+            sess(7, 3, -3, 700.0, status="Activa"),   # futura: aún no se cobra
+        ])
+        s.add_all([
+            Transaction(session_id=1, artist_id=1, amount=400.0, method="Efectivo", date=_ago(5)),
+            Transaction(session_id=1, artist_id=1, amount=600.0, method="Efectivo", date=_ago(5), deleted_flag=True),
+            Transaction(session_id=4, artist_id=2, amount=600.0, method="Tarjeta", date=_ago(70)),
+            Transaction(session_id=5, artist_id=2, amount=450.0, method="Tarjeta", date=_ago(10)),
+        ])
+        s.commit()
+        yield s
+
+
+def test_hybrid_balance_works_on_instances_and_in_sql(db):
+    s1 = db.get(TattooSession, 1)
+    assert (s1.total_paid, s1.balance) == (400.0, 600.0)
+    assert db.get(TattooSession, 5).balance == 0.0
+
+    owed = db.execute(
+        select(TattooSession.id, TattooSession.balance)
+        .where(TattooSession.balance > 0, TattooSession.status != "Cancelada", TattooSession.start < NOW)
+        .order_by(TattooSession.balance.desc())
+    ).all()
+    assert owed == [(1, 600.0), (2, 500.0), (3, 300.0), (4, 200.0)]
+    assert db.execute(select(TattooSession.total_paid).where(TattooSession.id == 5)).scalar() == 450.0
+
+
+def test_receivables_by_artist_is_one_grouped_statement(db, sql_log):
+    with sql_log(db) as statements:
+        rows, nxt, totals = receivables_by_artist(NOW, user=ADMIN, db=db)
+
+    assert len(statements) == 1 and nxt is None
+    assert [(r["artist"], r["buckets"], r["total"], r["sessions"]) for r in rows] == [
+        ("Ana", [0.0, 0.0, 200.0, 0.0], 200.0, 1),
+        ("Beto", [600.0, 500.0, 0.0, 300.0], 1400.0, 3),
+    ]
+    assert totals == {"buckets": [600.0, 500.0, 200.0, 300.0], "total": 1600.0, "sessions": 4}
+
+
+def test_receivables_by_artist_pages_by_name(db):
+    page1, nxt, _ = receivables_by_artist(NOW, limit=1, user=ADMIN, db=db)
+    page2, end, _ = receivables_by_artist(NOW, limit=1, after=nxt, user=ADMIN, db=db)
+    assert [r["artist"] for r in page1 + page2] == ["Ana", "Beto"]
+    assert nxt == ("Ana", 2) and end is None
+
+
+def test_receivable_sessions_oldest_first_with_bucket_filter_and_keyset(db):
+    rows, nxt = receivable_sessions(now=NOW, limit=2, user=ADMIN, db=db)
+    more, end = receivable_sessions(now=NOW, limit=2, after=nxt, user=ADMIN, db=db)
+    assert [r["id"] for r in rows + more] == [3, 4, 2, 1] and end is None
+    assert (rows[0]["days"], rows[0]["paid"], rows[0]["balance"]) == (200, 0.0, 300.0)
+
+    assert [r["id"] for r in receivable_sessions(1, 1, now=NOW, user=ADMIN, db=db)[0]] == [2]
+    assert [r["id"] for r in receivable_sessions(1, 3, now=NOW, user=ADMIN, db=db)[0]] == [3]
+    assert [r["id"] for r in receivable_sessions(None, 0, now=NOW, user=ADMIN, db=db)[0]] == [1]
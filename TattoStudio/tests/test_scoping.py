@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.portfolio import PortfolioItem
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services.permissions import RBAC, can, clear_elevation, elevate_for
+from services.scoping import DEFAULT_ENTITY, scope, scope_key
+
+USERS = {
+    "admin": {"id": 1, "role": "admin", "artist_id": None},
+    "assistant": {"id": 2, "role": "assistant", "artist_id": None},
+    "assistant_elevated": {"id": 3, "role": "assistant", "artist_id": None},
+    "artist_1": {"id": 4, "role": "artist", "artist_id": 1},
+    "artist_2": {"id": 5, "role": "artist", "artist_id": 2},
+    "artist_sin_ficha": {"id": 6, "role": "artist", "artist_id": None},
+    "desconocido": {"id": 7, "role": "intruso", "artist_id": None},
+}
+
+
+@pytest.fixture(scope="module")
+def db(new_db):
+    now = datetime(2025, 1, 10, 12, 0)
+    with new_db() as s:
+        s.add_all([Artist(id=1, name="Uno"), Artist(id=2, name="Dos")])
+        s.add_all([
+            Client(id=1, name="Prefiere a 1", preferred_artist_id=1),
+            Client(id=2, name="Cita con 2"),
+            Client(id=3, name="Sin relación"),
+        ])
+        s.add_all([
+            TattooSession(id=1, client_id=2, artist_id=2, start=now, end=now + timedelta(hours=2), status="Completada"),
+            TattooSession(id=2, client_id=1, artist_id=1, start=now, end=now + timedelta(hours=1), status="Activa"),
+        ])
+        s.add_all([
+            Transaction(id=1, session_id=1, artist_id=2, amount=100.0, method="Efectivo", date=now),
+            Transaction(id=2, session_id=2, artist_id=1, amount=50.0, method="Tarjeta", date=now),
+        ])
+        s.add_all([
+            PortfolioItem(id=1, artist_id=1, path="a.png"),
+            PortfolioItem(id=2, user_id=5, path="b.png"),   # pieza nueva: sólo user_id (artista 2)
+            PortfolioItem(id=3, artist_id=2, path="c.png"),
+        ])
+        s.commit()
+        yield s
+
+
+def _owners(db, row, user):
+    """Artistas dueños de la fila (oráculo en Python, como lo vería can())."""
+    if isinstance(row, (TattooSession, Transaction)):
+        return {row.artist_id}
+    if isinstance(row, Client):
+        owners = {row.preferred_artist_id} - {None}
+        owners |= {a for (a,) in db.query(TattooSession.artist_id).filter(TattooSession.client_id == row.id)}
+        return owners
+    owners = {row.artist_id} - {None}
+    if row.user_id is not None and row.user_id == user["id"] and user["artist_id"] is not None:
+        owners.add(user["artist_id"])
+    return owners
+
+
+def _expected(db, rows, resource, action, user):
+    out = set()
+    for row in rows:
+        owners = _owners(db, row, user) or {None}
+        if any(can(user["role"], resource, action, owner_id=o,
+                   user_artist_id=user["artist_id"], user_id=user["id"]) for o in owners):
+            out.add(row.id)
+    return out
+
+
+MATRIX = [(res, act) for (res, act) in RBAC if res in DEFAULT_ENTITY]
+
+
+@pytest.mark.parametrize("who", sorted(USERS))
+@pytest.mark.parametrize("resource,action", MATRIX)
+def test_sql_scope_matches_can(db, who, resource, action):
+    user = USERS[who]
+    entity = DEFAULT_ENTITY[resource]
+    elevate_for(USERS["assistant_elevated"]["id"], minutes=5)
+    try:
+        got = {r.id for r in db.query(entity).filter(*scope(resource, action, entity, user=user))}
+        expected = _expected(db, db.query(entity).all(), resource, action, user)
+    finally:
+        clear_elevation(USERS["assistant_elevated"]["id"])
+    assert got == expected
+
+
+def test_own_scope_examples(db):
+    artist_2 = USERS["artist_2"]
+    tx = {t.id for t in db.query(Transaction).filter(*scope("reports", "view", user=artist_2))}
+    assert tx == {1}
+    items = {p.id for p in db.query(PortfolioItem).filter(*scope("portfolio", "edit", user=artist_2))}
+    assert items == {2, 3}
+    clients = {c.id for c in db.query(Client).filter(*scope("clients", "notes", Client, user=USERS["artist_1"]))}
+    assert clients == {1}
+
+
+def test_scope_key_and_missing_user():
+    assert scope_key("reports", "view", user=USERS["admin"]) is None
+    assert scope_key("reports", "view", user=USERS["artist_1"]) == ("own", 1)
+    assert scope_key("reports", "export", user=USERS["artist_1"]) == "none"
+    assert len(scope("agenda", "view", user={})) == 1  # sin sesión: nada
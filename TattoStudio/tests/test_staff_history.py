@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.session_tattoo import TattooSession
+from data.models.transaction import Transaction
+from services.sessions import artist_history, artist_status_counts
+
+ADMIN = {"id": 1, "role": "admin", "artist_id": None}
+UNKNOWN = {"id": 7, "role": "intruso", "artist_id": None}
+BASE = datetime(2025, 1, 1, 10, 0)
+STATUSES = ("Completada", "Completada", "Activa", "Cancelada")
+
+
+@pytest.fixture(scope="module")
+def db(new_db):
+    with new_db() as s:
+        s.add_all([Artist(id=1, name="Uno"), Artist(id=2, name="Dos")])
+        s.add_all([Client(id=1, name="Ana"), Client(id=2, name="Beto")])
+        sessions = []
+        for i in range(1, 11):
+            # 9 y 10 comparten inicio: el desempate por id también es descendente
+            start = BASE + timedelta(days=min(i, 9))
+            sessions.append(TattooSession(id=i, client_id=1 + i % 2, artist_id=1, start=start,
+                                          end=start + timedelta(hours=2), price=100.0,
+                                          status=STATUSES[i % len(STATUSES)]))
+        sessions.append(TattooSession(id=11, client_id=1, artist_id=2, start=BASE, end=BASE + timedelta(hours=1),
+                                      price=50.0, status="Activa"))
+        s.add_all(sessions)
+        s.add_all([
+            Transaction(session_id=10, artist_id=1, amount=60.0, method="Efectivo", date=BASE),
+            Transaction(session_id=10, artist_id=1, amount=40.0, method="Tarjeta", date=BASE),
+            Transaction(session_id=10, artist_id=1, amount=500.0, method="Tarjeta", date=BASE, deleted_flag=True),
+        ])
+        s.commit()
+        yield s
+
+
+def test_pages_newest_first_with_projected_client_and_paid(db, sql_log):
+    with sql_log(db) as statements:
+        rows, cursor = artist_history(1, limit=4, user=ADMIN, db=db)
+
+    assert len(statements) == 1
+    assert [r["id"] for r in rows] == [10, 9, 8, 7]
+    assert (rows[0]["client"], rows[0]["paid"]) == ("Ana", 100.0)
+    assert cursor == (rows[-1]["start"], 7)
+
+    seen = [r["id"] for r in rows]
+    while cursor is not None:
+        rows, cursor = artist_history(1, limit=4, after=cursor, user=ADMIN, db=db)
+        seen += [r["id"] for r in rows]
+    assert seen == list(range(10, 0, -1))
+
+
+def test_status_filter_and_grouped_counts(db):
+    assert artist_status_counts(1, user=ADMIN, db=db) == {"Completada": 5, "Activa": 3, "Cancelada": 2}
+    rows, cursor = artist_history(1, status="Cancelada", user=ADMIN, db=db)
+    assert [r["id"] for r in rows] == [7, 3] and cursor is None
+    assert artist_history(1, user=UNKNOWN, db=db) == ([], None)
+    assert artist_status_counts(1, user=UNKNOWN, db=db) == {}
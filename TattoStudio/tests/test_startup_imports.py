@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from bench import importtime
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Se importan al usarse, no al arrancar (ver ui/pages/__init__.py, services/lazyimport.py)
+DEFERRED = (
+    "bcrypt",
+    "dotenv",
+    "PyQt5.QtChart",
+    "ui.pages.agenda",
+    "ui.pages.clients",
+    "ui.pages.reports",
+    "ui.pages.portfolios",
+    "ui.pages.inventory_dashboard",
+)
+
+# Presupuesto holgado para máquinas lentas/CI; hoy ronda 0.5 s
+BUDGET_MS = float(os.getenv("TATTOO_STARTUP_BUDGET_MS", "3000"))
+
+
+def _env():
+    return dict(os.environ, QT_QPA_PLATFORM="offscreen")
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    code = "import json, sys, ui.main_window; print(json.dumps(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_env(),
+                         capture_output=True, text=True, check=True).stdout
+    loaded = set(json.loads(out.strip().splitlines()[-1]))
+    assert not [m for m in DEFERRED if m in loaded]
+
+
+def test_main_window_import_within_budget():
+    modules = importtime.measure("ui.main_window", repeat=2)
+    assert modules["ui.main_window"]["cum_ms"] < BUDGET_MS
+    assert importtime.rank(modules)[0]["name"] == "ui.main_window"
@@ -0,0 +1,262 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import scoped_session
+
+from data.db import session as db_session
+from data.models.artist import Artist
+from data.models.client import Client
+from data.models.setting import Setting
+from data.models.session_tattoo import TattooSession
+from data.models.user import User
+from services import auth, client_profile, events, permissions, sessions, studio_server, transport
+from services.contracts import set_current_user
+
+START = (datetime.now() + timedelta(days=3)).replace(hour=9, minute=0, second=0, microsecond=0)
+STATIONS, PER_STATION = 6, 8
+
+
+@pytest.fixture()
+def server(db_factory, monkeypatch):
+    registry = scoped_session(db_factory)
+    for mod in (db_session, sessions, studio_server):
+        monkeypatch.setattr(mod, "SessionLocal", registry)
+    with registry() as s:
+        s.add_all([Artist(id=i, name=f"Artista {i}") for i in range(1, STATIONS + 1)])
+        s.add(Client(id=1, name="Beto"))
+        s.add(User(id=1, username="recepcion", role="admin", is_active=True,
+                   password_hash=auth.hash_password("clave", rounds=4)))
+        s.add(User(id=2, username="artista1", role="artist", artist_id=1, is_active=True,
+                   password_hash=auth.hash_password("clave", rounds=4)))
+        s.add(User(id=3, username="asistente", role="assistant", is_active=True,
+                   password_hash=auth.hash_password("clave", rounds=4)))
+        s.commit()
+    registry.remove()
+    set_current_user(None)
+
+    srv = studio_server.StudioServer(port=0, registry=registry).start_in_thread()
+    yield srv, registry
+    srv.shutdown()
+    client_profile.invalidate()
+
+
+def _station(port, username="recepcion"):
+    c = transport.RemoteClient(f"http://127.0.0.1:{port}")
+    assert c.login(username, "clave")["username"] == username
+    return c
+
+
+def test_stations_share_one_writer_and_get_every_event(server):
+    srv, registry = server
+    clients = [_station(srv.port) for _ in range(STATIONS)]
+    seen = []
+
+    def on_change(ev):
+        # el servidor comparte el bus con la prueba: sólo cuenta lo que llegó por /events
+        if threading.current_thread().name == "studio-events":
+            seen.append(ev.session_id)
+
+    unsub = events.subscribe(events.SessionChanged, on_change)
+    listeners = [c.listen() for c in clients]
+    try:
+        assert all(li.ready.wait(5) for li in listeners)
+        errors = []
+
+        def work(i, c):
+            # cada estación agenda a su artista: citas seguidas, sin traslapes
+            try:
+                for k in range(PER_STATION):
+                    start = START + timedelta(hours=k)
+                    c.call("sessions.create_session", {"client_id": 1, "artist_id": i + 1,
+                                                       "start": start, "end": start + timedelta(hours=1)})
+                    c.call("sessions.list_sessions", {"artist_id": i + 1})
+            except Exception as e:   # pragma: no cover - se reporta abajo
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(i, c)) for i, c in enumerate(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(60)
+        assert errors == []
+
+        total = STATIONS * PER_STATION
+        with registry() as s:
+            assert s.scalar(select(func.count(TattooSession.id))) == total
+        registry.remove()
+        assert srv.stats["writes"] == total + STATIONS            # + last_login de cada login
+        assert srv.stats["batches"] < srv.stats["writes"]           # hubo escrituras agrupadas
+
+        for _ in range(100):
+            if len(seen) >= total * STATIONS:
+                break
+            threading.Event().wait(0.05)
+        assert len(seen) == total * STATIONS                       # cada estación recibió todo
+        assert len(set(seen)) == total
+
+        rows = clients[0].call("sessions.list_sessions", {"artist_id": 1})
+        assert len(rows) == PER_STATION and isinstance(rows[0]["start"], datetime)
+    finally:
+        unsub()
+        for c in clients:
+            c.close()
+
+
+def test_failed_write_only_rolls_back_itself(server):
+    srv, registry = server
+    c = _station(srv.port)
+    try:
+        payload = {"client_id": 1, "artist_id": 1, "start": START, "end": START + timedelta(hours=2)}
+        sid = c.call("sessions.create_session", payload)
+        with pytest.raises(ValueError):
+            c.call("sessions.create_session", dict(payload, start=START + timedelta(hours=1)))
+        c.call("sessions.cancel_session", sid)
+        assert c.call("sessions.list_sessions", {"ids": [sid]})[0]["status"] == "Cancelada"
+
+        with pytest.raises(LookupError):
+            c.call("inventory.delete_everything")
+        with pytest.raises(ValueError):
+            c.call("sessions.list_sessions", {}, db=None)
+
+        intruder = transport.RemoteClient(f"http://127.0.0.1:{srv.port}")
+        assert intruder.login("recepcion", "otra") is None
+        intruder.token = "inventado"
+        with pytest.raises(PermissionError):
+            intruder.call("sessions.list_sessions", {})
+    finally:
+        c.close()
+
+
+def test_station_cannot_claim_another_user(server):
+    srv, registry = server
+    with registry() as s:
+        s.add_all([TattooSession(client_id=1, artist_id=aid, start=START - timedelta(days=10, hours=aid),
+                                 end=START - timedelta(days=10, hours=aid - 1), price=500.0, status="Activa")
+                   for aid in (1, 2)])
+        s.commit()
+    registry.remove()
+    c = _station(srv.port, "artista1")
+    try:
+        rows, _, _ = c.call("reports.receivables_by_artist", now=START)
+        assert [r["artist_id"] for r in rows] == [1]                # el token dice quién es
+        with pytest.raises(ValueError):
+            c.call("reports.receivables_by_artist", now=START, user={"role": "admin"})
+        with pytest.raises(ValueError):
+            c.call("sessions.sessions_for_day", START.date(), user={"role": "admin", "id": 1})
+    finally:
+        c.close()
+
+
+def test_token_role_is_checked_before_every_call(server, monkeypatch):
+    srv, registry = server
+    with registry() as s:
+        s.add(Setting(key=permissions.SETTING_KEY, value=auth.hash_password("maestro", rounds=4)))
+        s.commit()
+    registry.remove()
+    monkeypatch.setattr(permissions, "_elevations", {})
+    admin, artist, assistant = (_station(srv.port, u) for u in ("recepcion", "artista1", "asistente"))
+    try:
+        def book(c, artist_id, hour):
+            start = START + timedelta(hours=hour)
+            return c.call("sessions.create_session", {"client_id": 1, "artist_id": artist_id,
+                                                      "start": start, "end": start + timedelta(hours=1)})
+
+        mine, theirs = book(artist, 1, 0), book(admin, 2, 0)
+        artist.call("sessions.update_session", mine, {"notes": "retoque"})
+        for call in (lambda: book(artist, 2, 1),
+                     lambda: artist.call("sessions.update_session", theirs, {"notes": "mía"}),
+                     lambda: artist.call("sessions.update_session", mine, {"artist_id": 2}),
+                     lambda: artist.call("sessions.cancel_session", theirs),
+                     lambda: artist.call("cash_close.close_day", START.date(), {}),
+                     lambda: artist.call("inventory.record_movement", 1, "Entrada", 5)):
+            with pytest.raises(PermissionError):
+                call()
+        rows = admin.call("sessions.list_sessions", {"ids": [mine, theirs]})
+        assert {r["id"]: (r["artist_id"], r["notes"]) for r in rows} == {mine: (1, "retoque"), theirs: (2, None)}
+
+        # el assistant necesita el código maestro, validado y recordado por el servidor
+        with pytest.raises(PermissionError):
+            assistant.call("cash_close.close_day", START.date(), {})
+        assert assistant.elevate("otro") is False
+        assert assistant.elevate("maestro") is True
+        assert assistant.call("cash_close.close_day", START.date(), {}) > 0
+    finally:
+        for c in (admin, artist, assistant):
+            c.close()
+
+
+def test_server_mode_refuses_the_local_db(monkeypatch, tmp_path):
+    from services.warmup import WarmupScheduler
+    local = create_engine(f"sqlite:///{tmp_path / 'estacion.db'}")
+    monkeypatch.setattr(db_session, "engine", local)
+    monkeypatch.setattr(transport, "_mode", transport._mode)
+    monkeypatch.setattr(transport, "_client", None)
+    try:
+        transport.configure(transport.SERVER, "http://127.0.0.1:1")
+        with pytest.raises(RuntimeError, match="Modo servidor"):
+            local.connect()                     # pantalla sin migrar: falla, no lee otro archivo
+        assert WarmupScheduler.from_config() is None
+    finally:
+        transport.configure(transport.DIRECT)
+    local.connect().close()
+    local.dispose()
+
+
+def test_slow_station_is_hung_up_and_bad_headers_get_400(server):
+    srv, _ = server
+
+    async def slow_station():
+        q = asyncio.Queue(2)
+        srv._streams.append(q)
+        for sid in range(3):
+            srv._broadcast(events.SessionChanged(session_id=sid, client_id=1, artist_id=1, action="CREATED"))
+        # la cola llena se vacía y sólo queda el aviso de cierre
+        return q.qsize(), await asyncio.wait_for(q.get(), 1), q in srv._streams
+
+    assert asyncio.run_coroutine_threadsafe(slow_station(), srv._loop).result(5) == (1, None, False)
+
+    with socket.create_connection(("127.0.0.1", srv.port), timeout=5) as sock:
+        sock.sendall(b"POST /call HTTP/1.1\r\nContent-Length: mucho\r\n\r\n")
+        assert sock.recv(64).startswith(b"HTTP/1.1 400 ")
+
+
+def test_dropped_keepalive_only_retries_reads():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        served = 0
+
+        def do_POST(self):
+            received.append(transport.loads(self.rfile.read(int(self.headers["Content-Length"])))["fn"])
+            self.served += 1
+            if self.served > 1:              # el servidor aplica la petición y se cae sin responder
+                self.close_connection = True
+                return
+            data = transport.dumps({"result": "ok"})
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    c = transport.RemoteClient(f"http://127.0.0.1:{httpd.server_address[1]}")
+    c.token = "t"
+    try:
+        c.call("sessions.list_sessions", {})
+        assert c.call("sessions.list_sessions", {}) == "ok"         # lectura: se repite sola
+        with pytest.raises(ConnectionError):
+            c.call("sessions.create_session", {})                   # escritura: decide quien llama
+        assert received == ["sessions.list_sessions"] * 3 + ["sessions.create_session"]
+    finally:
+        c.close()
+        httpd.shutdown()
@@ -0,0 +1,40 @@
+import json
+
+from services import tracing
+
+
+def test_spans_nest_and_summarize(tmp_path):
+    out = tmp_path / "traces.jsonl"
+    tracing.enable(out)
+    try:
+        @tracing.traced("outer")
+        def outer():
+            with tracing.span("inner", rows=3):
+                pass
+
+        for _ in range(5):
+            outer()
+    finally:
+        tracing.disable()
+
+    recs = [json.loads(l) for l in out.read_text(encoding="utf-8").splitlines()]
+    inner = [r for r in recs if r["span"] == "inner"]
+    assert len(inner) == 5
+    assert inner[0]["parent"] == "outer" and inner[0]["depth"] == 1
+    assert inner[0]["attrs"] == {"rows": 3}
+
+    summary = tracing.summarize(out)
+    assert summary["outer"]["n"] == 5
+    assert summary["outer"]["p50"] <= summary["outer"]["p95"] <= summary["outer"]["max"]
+
+
+def test_disabled_span_writes_nothing(tmp_path):
+    out = tmp_path / "traces.jsonl"
+    tracing.enable(out)
+    tracing.disable()
+    with tracing.span("noop") as sp:
+        sp.set(x=1)
+    tracing.record("noop", 1.0)
+    assert not tracing.is_enabled()
+    assert not out.exists() or out.read_text(encoding="utf-8") == ""
+    assert tracing.summarize(tmp_path / "missing.jsonl") == {}
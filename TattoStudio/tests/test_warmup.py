@@ -0,0 +1,49 @@
+import time
+
+from sqlalchemy import text
+
+from data.db.session import engine
+from services import warmup
+
+
+def test_tasks_run_and_results_are_one_shot():
+    warmup.clear()
+    sch = warmup.WarmupScheduler(["lookups.artists", "lookups.clients"], idle_ms=0).start()
+    assert sch.wait(30)
+    assert sch.stats["lookups.artists"]["status"] == "ok"
+    assert sch.stats["lookups.clients"]["ms"] >= 0
+
+    assert warmup.take("lookups.artists", consume=False) is not None
+    assert warmup.take("lookups.clients") is not None
+    assert warmup.take("lookups.clients") is None  # ya consumido
+
+
+def test_commit_discards_precomputed_results():
+    warmup.clear()
+    warmup.put("k", 1)
+    with engine.begin() as conn:
+        conn.execute(text("SELECT 1"))
+    assert warmup.take("k") is None
+
+
+def test_user_activity_interrupts_and_retries():
+    calls = []
+
+    @warmup.task("test.slow")
+    def _slow():
+        calls.append(1)
+        for _ in range(200):
+            warmup.checkpoint()
+            time.sleep(0.005)
+        return {"test.slow": True}
+
+    try:
+        sch = warmup.WarmupScheduler(["test.slow"], idle_ms=50, max_retries=2).start()
+        time.sleep(0.2)
+        sch.notify_user_activity()
+        assert sch.wait(30)
+        assert len(calls) == 2
+        assert sch.stats["test.slow"]["attempts"] == 2
+    finally:
+        warmup.TASKS.pop("test.slow", None)
+        warmup.clear()
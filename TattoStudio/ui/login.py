@@ -7,8 +7,7 @@ from PyQt5.QtWidgets import (
     QMessageBox, QFrame, QGraphicsDropShadowEffect, QToolButton
 )
 
-from data.db.session import SessionLocal
-from services.auth import authenticate
+from services.credentials import authenticate_async
 
 
 class LoginDialog(QDialog):
@@ -30,6 +29,7 @@ class LoginDialog(QDialog):
             pass
 
         self.user = None  # (no tocamos la lógica)
+        self._job = None   # validación en curso (bcrypt corre fuera del hilo de UI)
         self._drag_pos = None  # para arrastrar la ventana
 
         # ---------- UI ----------
@@ -146,8 +146,11 @@ class LoginDialog(QDialog):
 
         self.in_user.setFocus()
 
-    # ---------- Lógica (SIN cambios) ----------
+    # ---------- Lógica ----------
     def _do_login(self):
+        if self._job is not None:
+            return  # ya se está validando
+
         username = self.in_user.text().strip()
         password = self.in_code.text()
 
@@ -155,20 +158,34 @@ class LoginDialog(QDialog):
             QMessageBox.information(self, "Login", "Escribe usuario y contraseña.")
             return
 
-        try:
-            with SessionLocal() as db:
-                u = authenticate(db, username, password)
-        except Exception as ex:
-            QMessageBox.critical(self, "Login", f"Error al validar credenciales:\n{ex}")
-            return
+        # bcrypt tarda cientos de ms a propósito: se valida en segundo plano
+        self._set_busy(True)
+        self._job = authenticate_async(username, password)
+        self._job.done.connect(self._on_login_done)
+        self._job.failed.connect(self._on_login_failed)
 
+    def _on_login_done(self, u):
+        self._job = None
+        self._set_busy(False)
         if not u:
             QMessageBox.warning(self, "Login", "Credenciales inválidas o usuario inactivo.")
+            self.in_code.setFocus()
             return
 
         self.user = u
         self.accept()
 
+    def _on_login_failed(self, msg: str):
+        self._job = None
+        self._set_busy(False)
+        QMessageBox.critical(self, "Login", f"Error al validar credenciales:\n{msg}")
+
+    def _set_busy(self, busy: bool):
+        self.btn_login.setEnabled(not busy)
+        self.btn_login.setText("Validando…" if busy else "Entrar")
+        self.in_user.setEnabled(not busy)
+        self.in_code.setEnabled(not busy)
+
     # ---------- Estilos (solo visual) ----------
     def _apply_styles(self):
         # Ventana sin fondo (transparente). La card define el color.
@@ -1,43 +1,46 @@
 from pathlib import Path
 import json
 import sqlite3
+import time
 
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QObject, QEvent, QTimer
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QToolButton,
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QToolButton,
     QFrame, QStatusBar, QStackedWidget, QSizePolicy, QDialog, QVBoxLayout as QVBL,
     QFormLayout, QDialogButtonBox, QComboBox, QTimeEdit
 )
 
 from ui.widgets.user_panel import PanelUsuario
 from ui.styles.themes import apply_theme
-from ui.pages.new_item import NewItemPage
-from ui.pages.common import FramelessPopup
+from ui.pages.common import FramelessPopup, ensure_permission, make_simple_page
+from ui.pages.studio import StudioPage
 
 # Login / sesión actual
 from services.contracts import set_current_user, get_current_user
+from services.lazyimport import lazy_attr, resolve
+from services.tracing import span, record
+from services.warmup import WarmupScheduler
 from ui.login import LoginDialog
 
-# Portafolios
-from ui.pages.portfolios import PortfoliosPage
-
-# Páginas exportadas por ui/pages/__init__.py
-from ui.pages import (
-    StudioPage, NewClientPage, ClientsPage, ClientDetailPage,
-    StaffPage, StaffDetailPage, ReportsPage, make_simple_page,
-    InventoryDashboardPage, InventoryItemsPage, InventoryItemDetailPage, InventoryMovementsPage,
-    AgendaPage
-)
-
-from ui.pages.nueva_entrada import EntradaProductoWidget
-from data.models.product import Product
-
-# Caja (opcional)
-try:
-    from ui.pages.cash_register import CashRegisterDialog
-except Exception:
-    CashRegisterDialog = None  # fallback si aún no existe
+# Páginas y diálogos: se importan al construirlos (ver _register_page)
+AgendaPage              = lazy_attr("ui.pages.agenda", "AgendaPage")
+ClientsPage             = lazy_attr("ui.pages.clients", "ClientsPage")
+ClientDetailPage        = lazy_attr("ui.pages.client_detail", "ClientDetailPage")
+NewClientPage           = lazy_attr("ui.pages.new_client", "NewClientPage")
+StaffPage               = lazy_attr("ui.pages.staff", "StaffPage")
+StaffDetailPage         = lazy_attr("ui.pages.staff_detail", "StaffDetailPage")
+ReportsPage             = lazy_attr("ui.pages.reports", "ReportsPage")
+InventoryDashboardPage  = lazy_attr("ui.pages.inventory_dashboard", "InventoryDashboardPage")
+InventoryItemsPage      = lazy_attr("ui.pages.inventory_items", "InventoryItemsPage")
+InventoryItemDetailPage = lazy_attr("ui.pages.inventory_item_detail", "InventoryItemDetailPage")
+InventoryMovementsPage  = lazy_attr("ui.pages.inventory_movements", "InventoryMovementsPage")
+PortfoliosPage          = lazy_attr("ui.pages.portfolios", "PortfoliosPage")
+NewItemPage             = lazy_attr("ui.pages.new_item", "NewItemPage")
+EntradaProductoWidget   = lazy_attr("ui.pages.nueva_entrada", "EntradaProductoWidget")
+ScanEntradaWidget       = lazy_attr("ui.pages.scan_entrada", "ScanEntradaWidget")
+ServiceTemplatesWidget  = lazy_attr("ui.pages.service_templates", "ServiceTemplatesWidget")
+Product                 = lazy_attr("data.models.product", "Product")
 
 SETTINGS = Path(__file__).parents[1] / "settings.json"
 
@@ -47,12 +50,36 @@ def _save_theme(mode: str) -> None:
     SETTINGS.write_text(json.dumps({"theme": mode}, indent=2), encoding="utf-8")
 
 
+class _UserActivityFilter(QObject):
+    """Filtro de eventos de la app: avisa al warm-up cuando el usuario hace algo."""
+    _TYPES = {QEvent.MouseButtonPress, QEvent.KeyPress, QEvent.Wheel, QEvent.TouchBegin}
+
+    def __init__(self, scheduler: WarmupScheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+
+    def eventFilter(self, obj, ev):
+        if ev.type() in self._TYPES:
+            if self.scheduler.is_running():
+                self.scheduler.notify_user_activity()
+            else:
+                # Warm-up terminado: el filtro se retira solo (desde el hilo de UI)
+                app = QApplication.instance()
+                if app is not None:
+                    app.removeEventFilter(self)
+        return False
+
+
 class MainWindow(QMainWindow):
     """Ventana principal: topbar (logo+marca, navegación centrada, usuario) y stack de páginas."""
     solicitar_switch_user = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, login: bool = True):
+        """login=False omite el LoginDialog (usa el usuario actual); para benchmarks/pruebas."""
+        t_build = time.perf_counter()
         super().__init__()
+        self._warmup = None          # WarmupScheduler activo (ver _start_warmup)
+        self._warmup_filter = None
         self.setWindowTitle("InkLink OS")
         self.setMinimumSize(1200, 720)
 
@@ -130,79 +157,46 @@ class MainWindow(QMainWindow):
         # =========================
         #  Stack de páginas
         # =========================
+        # Sólo la portada se construye aquí; el resto se registra con un
+        # placeholder que reserva su índice (idx_* estables) y se crea en la
+        # primera visita vía _ir() (ver _register_page/_ensure_page).
         self.stack = QStackedWidget()
+        self._page_specs = {}        # attr -> (idx, factory, wire)
+        self._page_attr_by_idx = {}  # idx  -> attr
 
         # Portada
         self.studio_page = StudioPage(studio_name="InkLink OS")
         self.stack.addWidget(self.studio_page)  # idx 0
 
         # Agenda
-        self.agenda_page = AgendaPage()
-        self.idx_agenda  = self.stack.addWidget(self.agenda_page)
+        self.idx_agenda = self._register_page("agenda_page", AgendaPage)
 
         # Clientes
-        self.clients_page    = ClientsPage()
-        self.idx_clientes    = self.stack.addWidget(self.clients_page)
-        self.client_detail   = ClientDetailPage()
-        self.idx_cliente_det = self.stack.addWidget(self.client_detail)
-        self.client_detail.back_to_list.connect(self._show_clients_and_refresh)
-        self.client_detail.cliente_cambiado.connect(self._refresh_clients_table)
-
-        # Señales clientes
-        self.clients_page.crear_cliente.connect(self._abrir_nuevo_cliente_popup)
-        self.clients_page.abrir_cliente.connect(self._open_client_detail)
+        self.idx_clientes    = self._register_page("clients_page", ClientsPage, self._wire_clients)
+        self.idx_cliente_det = self._register_page("client_detail", ClientDetailPage, self._wire_client_detail)
 
         # Staff
-        self.staff_page     = StaffPage()
-        self.idx_staff      = self.stack.addWidget(self.staff_page)
-        self.staff_detail   = StaffDetailPage()
-        self.idx_staff_det  = self.stack.addWidget(self.staff_detail)
+        self.idx_staff      = self._register_page("staff_page", StaffPage, self._wire_staff)
+        self.idx_staff_det  = self._register_page("staff_detail", StaffDetailPage, self._wire_staff_detail)
         self.idx_staff_new  = self.stack.addWidget(make_simple_page("Nuevo staff"))  # placeholder
 
-        self.staff_page.agregar_staff.connect(self._open_staff_create)
-        self.staff_page.abrir_staff.connect(self._open_staff_detail)
-        self.staff_detail.back_requested.connect(self._back_to_staff_list)
-        self.staff_detail.staff_saved.connect(self._refresh_staff_list)
-
         # Reportes
-        self.reports_page = ReportsPage()
-        self.idx_reportes = self.stack.addWidget(self.reports_page)
+        self.idx_reportes = self._register_page("reports_page", ReportsPage)
 
         # Inventario
-        self.inventory_dash   = InventoryDashboardPage()
-        self.idx_inventory    = self.stack.addWidget(self.inventory_dash)
-        self.inventory_items  = InventoryItemsPage()
-        self.idx_inv_items    = self.stack.addWidget(self.inventory_items)
-        self.inventory_detail = InventoryItemDetailPage()
-        self.idx_inv_detail   = self.stack.addWidget(self.inventory_detail)
-        self.inventory_moves  = InventoryMovementsPage()
-        self.idx_inv_moves    = self.stack.addWidget(self.inventory_moves)
-
-        # Wiring Inventario
-        self.inventory_dash.ir_items        = lambda: self._ir(self.idx_inv_items)
-        self.inventory_dash.ir_movimientos  = lambda: self._ir(self.idx_inv_moves)
-        self.inventory_dash.nuevo_item      = self._abrir_popup_nuevo_item
-
-        self.inventory_items.abrir_item     = lambda it: (self.inventory_detail.load_item(it),
-                                                          self._ir(self.idx_inv_detail))
-        self.inventory_items.nuevo_item     = self._abrir_popup_nuevo_item
+        self.idx_inventory  = self._register_page("inventory_dash", InventoryDashboardPage, self._wire_inventory_dash)
+        self.idx_inv_items  = self._register_page("inventory_items", InventoryItemsPage, self._wire_inventory_items)
+        self.idx_inv_detail = self._register_page("inventory_detail", InventoryItemDetailPage, self._wire_inventory_detail)
+        self.idx_inv_moves  = self._register_page("inventory_moves", InventoryMovementsPage, self._wire_inventory_moves)
         # Placeholders hasta que existan diálogos reales:
         self.idx_inv_entry    = self.stack.addWidget(make_simple_page("Nueva entrada"))
         self.idx_inv_adjust   = self.stack.addWidget(make_simple_page("Ajuste de inventario"))
-        self.inventory_items.nueva_entrada  = self._abrir_entrada_producto
-        self.inventory_items.nuevo_ajuste   = self._abrir_ajuste_producto
-
-        self.inventory_detail.volver.connect(lambda: self._ir(self.idx_inv_items))
-        self.inventory_moves.volver.connect(lambda: self._ir(self.idx_inventory))
 
         # Nuevo cliente (en popup)
-        self.new_client_page = NewClientPage()
-        self.idx_nuevo_cliente = self.stack.addWidget(self.new_client_page)
-        self.new_client_page.volver_atras.connect(lambda: self._ir(self.idx_clientes))
+        self.idx_nuevo_cliente = self._register_page("new_client_page", NewClientPage, self._wire_new_client)
 
         # Portafolios (página real)
-        self.portfolios_page = PortfoliosPage()
-        self.idx_portafolios = self.stack.addWidget(self.portfolios_page)
+        self.idx_portafolios = self._register_page("portfolios_page", PortfoliosPage)
         if hasattr(self.studio_page, "ir_portafolios"):
             self.studio_page.ir_portafolios.connect(lambda: self._ir(self.idx_portafolios))
 
@@ -249,14 +243,17 @@ class MainWindow(QMainWindow):
         # =========================
         #  LOGIN + RBAC
         # =========================
-        dlg = LoginDialog(self)
-        if dlg.exec_() != QDialog.Accepted or not dlg.user:
-            self.close()
-            return
-
-        set_current_user(dlg.user)
+        # Tiempo hasta tener la ventana lista (sin contar lo que tarde el usuario en el login)
+        record("main.build_ui", (time.perf_counter() - t_build) * 1000.0)
+        if login:
+            dlg = LoginDialog(self)
+            if dlg.exec_() != QDialog.Accepted or not dlg.user:
+                self.close()
+                return
+            set_current_user(dlg.user)
+        user = get_current_user() or {}
         # Inyecta datos reales al panel (evita “—”)
-        profile = self._merge_user_profile(dlg.user)
+        profile = self._merge_user_profile(user)
         self.user_panel.set_user(profile, is_dark=self.user_panel.chk_dark.isChecked())
         self.btn_user.setText(profile.get('username') or profile.get('name') or 'Usuario')
         # Aplica gates de rol (ocultar menús/páginas y fijar páginas permitidas)
@@ -264,6 +261,9 @@ class MainWindow(QMainWindow):
         # Asegura que la página inicial sea válida para el rol actual
         if not self._is_allowed_index(self.stack.currentIndex()):
             self._ir(0)  # portada
+        # Warm-up de consultas/avatares cuando la ventana ya esté pintada
+        if login:
+            QTimer.singleShot(0, self._start_warmup)
 
     # =========================
     #  Helpers de marca/tema
@@ -287,6 +287,108 @@ class MainWindow(QMainWindow):
         from PyQt5.QtWidgets import QApplication
         return QApplication.instance()
 
+    # =========================
+    #  Warm-up post-login
+    # =========================
+    def _start_warmup(self) -> None:
+        """Lanza (o relanza tras cambio de usuario) el warm-up en segundo plano."""
+        self._stop_warmup()
+        sch = WarmupScheduler.from_config()
+        if sch is None:
+            return
+        self._warmup = sch.start()
+        self._warmup_filter = _UserActivityFilter(sch, self)
+        QApplication.instance().installEventFilter(self._warmup_filter)
+
+    def _stop_warmup(self) -> None:
+        if self._warmup is not None:
+            self._warmup.stop()
+            self._warmup = None
+        if self._warmup_filter is not None:
+            QApplication.instance().removeEventFilter(self._warmup_filter)
+            self._warmup_filter = None
+
+    # =========================
+    #  Registro de páginas (construcción perezosa)
+    # =========================
+    def _register_page(self, attr: str, factory, wire=None) -> int:
+        """
+        Reserva el índice de una página con un placeholder vacío.
+        La página real se crea con factory() y se conecta con wire(page) en su
+        primera visita; a partir de ahí queda en self.<attr>.
+        """
+        idx = self.stack.addWidget(QWidget())
+        self._page_specs[attr] = (idx, factory, wire)
+        self._page_attr_by_idx[idx] = attr
+        return idx
+
+    def _ensure_page(self, idx: int):
+        """Construye (una vez) la página registrada en idx y la deja en su lugar de la stack."""
+        attr = self._page_attr_by_idx.get(idx)
+        if attr is None or attr in self.__dict__:
+            return self.stack.widget(idx)
+        _idx, factory, wire = self._page_specs[attr]
+        with span("main.build_page", page=attr):
+            page = factory()
+            setattr(self, attr, page)
+            if wire is not None:
+                wire(page)
+        # insertWidget desplaza el placeholder a idx+1; al quitarlo, los índices quedan igual
+        placeholder = self.stack.widget(idx)
+        self.stack.insertWidget(idx, page)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        return page
+
+    def _built(self, attr: str):
+        """Devuelve la página si ya existe (sin construirla), o None."""
+        return self.__dict__.get(attr)
+
+    def __getattr__(self, name):
+        # self.<página> construye la página al primer acceso (p. ej. load_client antes de _ir)
+        specs = self.__dict__.get("_page_specs")
+        if specs and name in specs:
+            return self._ensure_page(specs[name][0])
+        raise AttributeError(f"{type(self).__name__!s} no tiene el atributo {name!r}")
+
+    # ---------- Wiring por página (se ejecuta al construirla) ----------
+    def _wire_clients(self, page) -> None:
+        page.crear_cliente.connect(self._abrir_nuevo_cliente_popup)
+        page.abrir_cliente.connect(self._open_client_detail)
+
+    def _wire_client_detail(self, page) -> None:
+        page.back_to_list.connect(self._show_clients)
+
+    def _wire_staff(self, page) -> None:
+        page.agregar_staff.connect(self._open_staff_create)
+        page.abrir_staff.connect(self._open_staff_detail)
+
+    def _wire_staff_detail(self, page) -> None:
+        page.back_requested.connect(self._back_to_staff_list)
+
+    def _wire_inventory_dash(self, page) -> None:
+        page.ir_items        = lambda: self._ir(self.idx_inv_items)
+        page.ir_movimientos  = lambda: self._ir(self.idx_inv_moves)
+        page.nuevo_item      = self._abrir_popup_nuevo_item
+        page.plantillas      = self._abrir_plantillas_consumo
+
+    def _wire_inventory_items(self, page) -> None:
+        page.abrir_item     = lambda it: (self.inventory_detail.load_item(it),
+                                          self._ir(self.idx_inv_detail))
+        page.nuevo_item     = self._abrir_popup_nuevo_item
+        page.nueva_entrada  = self._abrir_entrada_producto
+        page.nuevo_ajuste   = self._abrir_ajuste_producto
+        page.escanear       = self._abrir_scan_entrada
+
+    def _wire_inventory_detail(self, page) -> None:
+        page.volver.connect(lambda: self._ir(self.idx_inv_items))
+
+    def _wire_inventory_moves(self, page) -> None:
+        page.volver.connect(lambda: self._ir(self.idx_inventory))
+
+    def _wire_new_client(self, page) -> None:
+        page.volver_atras.connect(lambda: self._ir(self.idx_clientes))
+
     # =========================
     #  Navegación / utilidades
     # =========================
@@ -366,6 +468,8 @@ class MainWindow(QMainWindow):
             return True  # fallback seguro
 
     def _ir(self, idx: int) -> None:
+        if self._warmup is not None:
+            self._warmup.notify_user_activity()  # la navegación manda sobre el warm-up
         # Si la página no es permitida para el rol, redirigimos a portada
         if not self._is_allowed_index(idx):
             self.statusBar().showMessage("Tu rol no tiene acceso a esa sección.", 3000)
@@ -405,7 +509,10 @@ class MainWindow(QMainWindow):
         if idx in mapping:
             mapping[idx].setChecked(True)
 
-        self.stack.setCurrentIndex(idx)
+        # El cambio de página dispara showEvent (y recargas) de forma síncrona
+        page = self._ensure_page(idx)
+        with span("main.ir", idx=idx, page=type(page).__name__ if page is not None else None):
+            self.stack.setCurrentIndex(idx)
 
     # ====== Clientes ======
     def _abrir_nuevo_cliente_popup(self):
@@ -415,7 +522,6 @@ class MainWindow(QMainWindow):
 
         page = NewClientPage()
         page.volver_atras.connect(dlg.reject)
-        page.cliente_creado.connect(lambda _id: self.clients_page.reload_from_db_and_refresh(keep_page=False))
 
         lay = QVBL(dlg)
         lay.setContentsMargins(0, 0, 0, 0)
@@ -424,23 +530,14 @@ class MainWindow(QMainWindow):
         dlg.resize(900, 700)
         dlg.exec_()
 
+    # Las listas ya construidas se parchean solas con los eventos de dominio
+    # (services/events); las que aún no existen cargan datos frescos al construirse.
     def _on_cliente_creado(self, cid: int):
-        try:
-            self.clients_page.reload_from_db_and_refresh(keep_page=True)
-        except Exception:
-            pass
         self._ir(self.idx_clientes)
 
-    def _show_clients_and_refresh(self):
-        self._refresh_clients_table()
+    def _show_clients(self):
         self._ir(self.idx_clientes)
 
-    def _refresh_clients_table(self):
-        try:
-            self.clients_page.reload_from_db_and_refresh(keep_page=True)
-        except Exception:
-            pass
-
     # ====== Staff ======
     def _open_staff_create(self):
         self.staff_detail.start_create_mode()
@@ -451,17 +548,12 @@ class MainWindow(QMainWindow):
         self._ir(self.idx_staff_det)
 
     def _back_to_staff_list(self):
-        self._refresh_staff_list()
         self._ir(self.idx_staff)
 
-    def _refresh_staff_list(self):
-        try:
-            self.staff_page.reload_from_db_and_refresh()
-        except Exception:
-            pass
-
     # ====== Caja ======
     def _open_cash_dialog(self):
+        # Caja (opcional): fallback a placeholder si el módulo no existe/no importa
+        CashRegisterDialog = resolve("ui.pages.cash_register", "CashRegisterDialog")
         if CashRegisterDialog is None:
             try:
                 return self._ir(self._ensure_cash_page())
@@ -477,8 +569,7 @@ class MainWindow(QMainWindow):
         dlg.exec_()
 
         # Refrescar vistas afectadas por transacciones
-        for refresher in (getattr(self, "reports_page", None),
-                          getattr(self, "agenda_page", None)):
+        for refresher in (self._built("reports_page"), self._built("agenda_page")):
             try:
                 if hasattr(refresher, "reload_from_db_and_refresh"):
                     refresher.reload_from_db_and_refresh()
@@ -506,6 +597,7 @@ class MainWindow(QMainWindow):
             self._apply_role_gates()
             if not self._is_allowed_index(self.stack.currentIndex()):
                 self._ir(0)
+            self._start_warmup()  # precalcula con el alcance del nuevo rol
 
     def _toggle_user_panel(self, checked: bool) -> None:
         if checked:
@@ -533,9 +625,21 @@ class MainWindow(QMainWindow):
     # ====== Inventario: popup y refrescos ======
     def _on_item_creado(self, sku: str):
         print(f"Producto creado")  
-        self.inventory_items._seed_mock()
-        self.inventory_items._refresh() 
-        self.inventory_dash.refrescar_datos()# <- actualizar KPIs
+        from services.stock_scan import shared_index
+        shared_index().invalidate()  # el modo escaneo recarga el catálogo
+        self._refresh_inventory_views()
+
+    def _refresh_inventory_views(self):
+        """Recarga tabla y KPIs de inventario (sólo las páginas ya construidas)."""
+        items = self._built("inventory_items")
+        if items is not None:
+            items.reload()
+        dash = self._built("inventory_dash")
+        if dash is not None:
+            dash.refrescar_datos()  # <- actualizar KPIs
+        moves = self._built("inventory_moves")
+        if moves is not None:
+            moves.reload()
 
     def _abrir_popup_nuevo_item(self):
          # Crear instancia de NewItemPage
@@ -648,8 +752,11 @@ class MainWindow(QMainWindow):
             except Exception:
                 pass
             # Notificar/agregar en vivo a la Agenda
+            # (si aún no se construyó, leerá settings.json al crearse)
             try:
-                self.agenda_page.apply_hours_from_settings()
+                agenda = self._built("agenda_page")
+                if agenda is not None:
+                    agenda.apply_hours_from_settings()
             except Exception:
                 pass
             dlg.accept()
@@ -723,6 +830,7 @@ class MainWindow(QMainWindow):
         return profile
         
     def _logout(self):
+        self._stop_warmup()
         self.btn_user.setChecked(False)
         self.user_panel.hide()
         self.hide()  # efecto cerrar
@@ -746,6 +854,7 @@ class MainWindow(QMainWindow):
                 self._ir(0)
 
             self.show()  # reabrimos la ventana tras login
+            QTimer.singleShot(0, self._start_warmup)
         else:
             # Si cancelan el login, sí cerramos la app
             self.close()
@@ -784,9 +893,36 @@ class MainWindow(QMainWindow):
 
     def _on_entrada_creada(self, nombre):
         print(f"✅ Entrada creada para el producto: {nombre}")
-        self.inventory_items._seed_mock()
-        self.inventory_items._refresh()
-        self.inventory_dash.refrescar_datos()
+        self._refresh_inventory_views()
+
+    def _abrir_scan_entrada(self):
+        """Modo escaneo: varias entradas en un lote, registradas en una transacción."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Entrada por escaneo")
+        dialog.setModal(True)
+        dialog.resize(720, 560)
+
+        layout = QVBoxLayout(dialog)
+        form = ScanEntradaWidget()
+        form.entradas_registradas.connect(lambda _units: (self._refresh_inventory_views(), dialog.accept()))
+        form.cancelado.connect(dialog.reject)
+        layout.addWidget(form)
+        dialog.exec_()
+
+    def _abrir_plantillas_consumo(self):
+        """Plantillas de insumos por servicio (se descuentan al completar la sesión)."""
+        if not ensure_permission(self, "inventory", "edit_item"):
+            return
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Plantillas de consumo")
+        dialog.setModal(True)
+        dialog.resize(860, 560)
+
+        layout = QVBoxLayout(dialog)
+        form = ServiceTemplatesWidget()
+        form.cerrar.connect(dialog.accept)
+        layout.addWidget(form)
+        dialog.exec_()
 
     def _abrir_ajuste_producto(self, item_dict):
         """
@@ -824,6 +960,4 @@ class MainWindow(QMainWindow):
         """Callback cuando se completa un ajuste"""
         print(f"✅ Ajuste realizado para el producto: {nombre}")
         # Actualizar las vistas de inventario
-        self.inventory_items._seed_mock()
-        self.inventory_items._refresh()
-        self.inventory_dash.refrescar_datos()
\ No newline at end of file
+        self._refresh_inventory_views()
\ No newline at end of file
@@ -1,15 +1,37 @@
 # Páginas de la app (estudio, clientes, agenda, etc.).
-from .studio import StudioPage
-from .new_client import NewClientPage
-from .common import make_simple_page
-from .clients import ClientsPage
-from .client_detail import ClientDetailPage
-from .staff import StaffPage
-from .staff_detail import StaffDetailPage
-from .reports import ReportsPage
-from .inventory_dashboard import InventoryDashboardPage
-from .inventory_items import InventoryItemsPage
-from .inventory_item_detail import InventoryItemDetailPage
-from .inventory_movements import InventoryMovementsPage
-from .agenda import AgendaPage
-from .portfolios import PortfoliosPage
+# Los módulos se importan al primer acceso al nombre (PEP 562): importar
+# 'ui.pages' o 'ui.pages.common' ya no arrastra todas las páginas al arranque.
+# 'from ui.pages import ClientsPage' sigue funcionando igual.
+import importlib
+
+_EXPORTS = {
+    "StudioPage": ".studio",
+    "NewClientPage": ".new_client",
+    "make_simple_page": ".common",
+    "ClientsPage": ".clients",
+    "ClientDetailPage": ".client_detail",
+    "StaffPage": ".staff",
+    "StaffDetailPage": ".staff_detail",
+    "ReportsPage": ".reports",
+    "InventoryDashboardPage": ".inventory_dashboard",
+    "InventoryItemsPage": ".inventory_items",
+    "InventoryItemDetailPage": ".inventory_item_detail",
+    "InventoryMovementsPage": ".inventory_movements",
+    "AgendaPage": ".agenda",
+    "PortfoliosPage": ".portfolios",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    mod = _EXPORTS.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(mod, __name__), name)
+    globals()[name] = value  # siguientes accesos: sin pasar por aquí
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -19,21 +19,25 @@ from PyQt5.QtWidgets import (
 )
 
 # === BD / servicios ===
-from services.sessions import (
-    list_sessions, update_session, complete_session, cancel_session, create_session
-)
-# delete_session es opcional
-try:
-    from services.sessions import delete_session  # type: ignore
-except Exception:
-    delete_session = None  # fallback
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+_sessions = service("sessions")
+list_sessions = _sessions.list_sessions
+update_session = _sessions.update_session
+complete_session = _sessions.complete_session
+cancel_session = _sessions.cancel_session
+create_session = _sessions.create_session
 
 from data.db.session import SessionLocal
 from data.models.client import Client
 from data.models.artist import Artist as DBArtist
+from services.events import DELETED, ClientSaved, SessionChanged, UserSaved
 
 # Permisos + menús
-from ui.pages.common import ensure_permission, make_styled_menu
+from ui.pages.common import ensure_permission, make_styled_menu, subscribe_events
+from services.tracing import traced
+from services import warmup
 
 # Helpers compartidos
 from ui.pages.common import (
@@ -842,9 +846,19 @@ class AgendaPage(QWidget):
 
     def showEvent(self, e):
         super().showEvent(e)
-        self._load_artists_from_db()
-        self._rebuild_sidebar_artists()
-        self._refresh_all()
+        # Las citas llegan por eventos (SessionChanged); sólo se relee la
+        # lista de tatuadores si un UserSaved la marcó como vieja
+        self._fresh_from_init = False
+        if self._artists_dirty:
+            self._reload_artists()
+        if hasattr(self, "_reload_colors_timer"):
+            self._reload_colors_timer.start()
+
+    def hideEvent(self, e):
+        # Oculta: deja de vigilar el JSON de colores
+        super().hideEvent(e)
+        if hasattr(self, "_reload_colors_timer"):
+            self._reload_colors_timer.stop()
 
     def _reload_colors_if_changed(self):
         try:
@@ -855,7 +869,7 @@ class AgendaPage(QWidget):
                 self._load_artists_from_db()
                 if hasattr(self, "artists_checks_box"):
                     self._rebuild_sidebar_artists()
-                self._refresh_all()
+                self._render()
         except Exception:
             pass
 
@@ -882,6 +896,8 @@ class AgendaPage(QWidget):
         self.artists: List[Artist] = []
         self.appts: List[Appt] = []
         self._clients_cache: List[Tuple[int, str]] = []
+        self._fetched_range: Optional[Tuple[datetime, datetime]] = None   # lo que hay en self.appts
+        self._artists_dirty = False
 
         self._load_artists_from_db()
         self._load_clients_minimal()
@@ -933,10 +949,28 @@ class AgendaPage(QWidget):
         self._reload_colors_timer.timeout.connect(self._reload_colors_if_changed)
         self._reload_colors_timer.start()
         self._colors_mtime = None
+        self._fresh_from_init = True
+
+        # Parches por eventos de dominio; varios seguidos se pintan una sola vez
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(0)
+        self._render_timer.timeout.connect(self._render)
+        subscribe_events(self, {
+            SessionChanged: self._on_session_changed,
+            ClientSaved: self._on_client_saved,
+            UserSaved: self._on_user_saved,
+        })
 
     def apply_hours_from_settings(self):
         s, e, step = _load_agenda_hours()
         self.day_start, self.day_end, self.step_min = s, e, step
+        self._render()
+
+    def reload_from_db_and_refresh(self):
+        """Recarga completa (tatuadores, clientes y citas); sólo cuando se pide explícitamente."""
+        self._load_clients_minimal()
+        self._reload_artists()
         self._refresh_all()
 
     def _on_view_menu(self, txt: str):
@@ -1251,21 +1285,32 @@ class AgendaPage(QWidget):
         cbo = getattr(self, "cbo_status", None)
         self.selected_status = cbo.currentText() if cbo else "Todos"
         self.search_text = (self.search.text() or "").strip().lower()
-        self._refresh_all()
+        self._render()   # filtros en memoria: no hace falta volver a la BD
 
     # ---------- Carga de datos ----------
+    def _reload_artists(self):
+        self._artists_dirty = False
+        self._load_artists_from_db()
+        self._rebuild_sidebar_artists()
+
     def _load_artists_from_db(self):
         self.artists.clear()
-        with SessionLocal() as db:
-            try:
-                rows = db.query(DBArtist.id, DBArtist.name).filter(getattr(DBArtist, "active", True) == True).order_by(DBArtist.name.asc()).all()  # noqa: E712
-            except Exception:
-                rows = db.query(DBArtist.id, DBArtist.name).order_by(DBArtist.name.asc()).all()
+        rows = warmup.take("lookups.artists", consume=False)
+        if rows is None:
+            with SessionLocal() as db:
+                try:
+                    rows = db.query(DBArtist.id, DBArtist.name).filter(getattr(DBArtist, "active", True) == True).order_by(DBArtist.name.asc()).all()  # noqa: E712
+                except Exception:
+                    rows = db.query(DBArtist.id, DBArtist.name).order_by(DBArtist.name.asc()).all()
         for idx, (aid, name) in enumerate(rows):
             color = _artist_color_for(int(aid), idx)
             self.artists.append(Artist(id=str(aid), name=name, color=color))
 
     def _load_clients_minimal(self):
+        warm = warmup.take("lookups.clients")
+        if warm is not None:
+            self._clients_cache = warm
+            return
         with SessionLocal() as db:
             rows = db.query(Client.id, Client.name).order_by(Client.name.asc()).all()
             self._clients_cache = [(int(cid), nm) for cid, nm in rows]
@@ -1282,41 +1327,81 @@ class AgendaPage(QWidget):
             return first, last
         return self.current_date.addDays(-365), self.current_date.addDays(365)
 
+    @traced("agenda.fetch_sessions")
     def _fetch_sessions_from_db(self):
         q_from, q_to = self._current_visible_range()
         start_dt = datetime.combine(q_from.toPyDate(), time(0, 0, 0))
         end_dt   = datetime.combine(q_to.toPyDate(),   time(23, 59, 59))
 
-        rows = list_sessions({"from": start_dt, "to": end_dt})
+        # Vista de un día: puede venir precalculada por el warm-up post-login
+        warm = warmup.take(warmup.agenda_day_key(q_from.toPyDate())) if q_from == q_to else None
+        if warm is not None:
+            rows, client_name_by_id = warm
+        else:
+            rows = list_sessions({"from": start_dt, "to": end_dt})
+            client_name_by_id = {}
 
         client_ids = {r["client_id"] for r in rows if r.get("client_id") is not None}
-        client_name_by_id: Dict[int, str] = {}
-        if client_ids:
-            with SessionLocal() as db:
-                for cid, name in db.query(Client.id, Client.name).filter(Client.id.in_(client_ids)).all():
-                    client_name_by_id[cid] = name
-
-        appts: List[Appt] = []
-        for r in rows:
-            start: datetime = r["start"]
-            end: Optional[datetime] = r.get("end") or (start + timedelta(minutes=60))
-            qd = QDate(start.year, start.month, start.day)
-            qt = QTime(start.hour, start.minute)
-            duration = max(1, int((end - start).total_seconds() // 60))
-            appts.append(
-                Appt(
-                    id=str(r["id"]),
-                    client_id=r.get("client_id"),
-                    client_name=client_name_by_id.get(r["client_id"], r.get("client_name") or "Cliente"),
-                    artist_id=str(r["artist_id"]),
-                    date=qd,
-                    start=qt,
-                    duration_min=duration,
-                    service=r.get("notes") or "Tatuaje",
-                    status=r.get("status") or "Activa",
-                )
-            )
-        self.appts = appts
+        if client_ids and warm is None:
+            client_name_by_id.update(self._client_names(client_ids))
+
+        self.appts = [self._to_appt(r, client_name_by_id) for r in rows]
+        self._fetched_range = (start_dt, end_dt)
+
+    @staticmethod
+    def _client_names(client_ids) -> Dict[int, str]:
+        with SessionLocal() as db:
+            return dict(db.query(Client.id, Client.name).filter(Client.id.in_(list(client_ids))).all())
+
+    @staticmethod
+    def _to_appt(r: dict, client_name_by_id: Dict[int, str]) -> Appt:
+        start: datetime = r["start"]
+        end: Optional[datetime] = r.get("end") or (start + timedelta(minutes=60))
+        duration = max(1, int((end - start).total_seconds() // 60))
+        return Appt(
+            id=str(r["id"]),
+            client_id=r.get("client_id"),
+            client_name=client_name_by_id.get(r["client_id"], r.get("client_name") or "Cliente"),
+            artist_id=str(r["artist_id"]),
+            date=QDate(start.year, start.month, start.day),
+            start=QTime(start.hour, start.minute),
+            duration_min=duration,
+            service=r.get("notes") or "Tatuaje",
+            status=r.get("status") or "Activa",
+        )
+
+    # ---------- Eventos de dominio: parches sobre self.appts ----------
+    def _on_session_changed(self, ev: SessionChanged):
+        """Relee sólo esa cita y la mueve/reemplaza/quita en memoria."""
+        sid = str(ev.session_id)
+        self.appts = [a for a in self.appts if a.id != sid]
+        rows = list_sessions({"ids": [ev.session_id]})
+        rng = self._fetched_range
+        if rows and rng and rng[0] <= rows[0]["start"] <= rng[1]:
+            r = rows[0]
+            self.appts.append(self._to_appt(r, self._client_names([r["client_id"]])))
+            self.appts.sort(key=lambda a: (a.date.toJulianDay(), a.start.hour(), a.start.minute()))
+        self._render_timer.start()
+
+    def _on_client_saved(self, ev: ClientSaved):
+        """Nombre del cliente en sus citas y en el combo de los diálogos."""
+        name = None if ev.action == DELETED else self._client_names([ev.client_id]).get(ev.client_id)
+        cache = [(cid, nm) for cid, nm in self._clients_cache if cid != ev.client_id]
+        if name is not None:
+            cache.append((ev.client_id, name))
+            cache.sort(key=lambda c: (c[1] or "").lower())
+        self._clients_cache = cache
+        if name is not None and any(a.client_id == ev.client_id for a in self.appts):
+            for a in self.appts:
+                if a.client_id == ev.client_id:
+                    a.client_name = name
+            self._render_timer.start()
+
+    def _on_user_saved(self, ev: UserSaved):
+        # altas/bajas o renombres de tatuadores: la barra lateral se rehace al mostrarse
+        self._artists_dirty = True
+        if self.isVisible():
+            self._reload_artists()
 
     # ---------- Helpers ----------
     def _artist_by_id(self, aid: str) -> Optional[Artist]:
@@ -1325,8 +1410,6 @@ class AgendaPage(QWidget):
         return None
 
     def _filter_appts(self) -> List[Appt]:
-        self._fetch_sessions_from_db()
-
         rows: List[Appt] = []
         for ap in self.appts:
             if self.selected_artist_ids and ap.artist_id not in self.selected_artist_ids:
@@ -1379,7 +1462,6 @@ class AgendaPage(QWidget):
                 "status": val.get("status", "Activa"),
             })
             QMessageBox.information(self, "Cita", "Cita creada.")
-            self._refresh_all()
         except Exception as e:
             QMessageBox.critical(self, "Agenda", f"No se pudo crear la cita: {e}")
 
@@ -1482,7 +1564,6 @@ class AgendaPage(QWidget):
             QMessageBox.information(self, "Cita", "Cambios guardados.")
         except Exception as e:
             QMessageBox.critical(self, "Agenda", f"No se pudo guardar: {e}")
-        self._refresh_all()
 
     def _set_status(self, ap: Appt, status: str):
         owner_id = int(ap.artist_id)
@@ -1498,7 +1579,6 @@ class AgendaPage(QWidget):
             QMessageBox.information(self, "Cita", "Estado actualizado.")
         except Exception as e:
             QMessageBox.critical(self, "Agenda", f"No se pudo actualizar: {e}")
-        self._refresh_all()
 
     def _show_appt_context_menu(self, ap: Appt, global_pos: QPoint):
         m = make_styled_menu(self)
@@ -1551,7 +1631,6 @@ class AgendaPage(QWidget):
                                 QMessageBox.critical(self, "Cita", f"No se pudo actualizar: {e2}")
                     else:
                         QMessageBox.critical(self, "Cita", f"No se pudo completar: {e}")
-                self._refresh_all()
             return
 
         if chosen is act_cancel:
@@ -1562,7 +1641,7 @@ class AgendaPage(QWidget):
                 QMessageBox.information(self, "Cita", "Cita cancelada.")
             except Exception as e:
                 QMessageBox.critical(self, "Agenda", f"No se pudo cancelar: {e}")
-            self._refresh_all(); return
+            return
         if chosen is act_delete:
             self._open_appt_detail(ap)
             return
@@ -1624,7 +1703,17 @@ class AgendaPage(QWidget):
             QMessageBox.critical(self, "Exportar", f"No se pudo exportar: {e}")
 
     # ---------- Render ----------
+    @traced("agenda.refresh_all")
     def _refresh_all(self):
+        """Relee de la BD el rango visible (cambió la fecha/vista) y pinta."""
+        self._fetch_sessions_from_db()
+        self._render()
+
+    @traced("agenda.render")
+    def _render(self):
+        """Pinta self.appts con los filtros actuales, sin ir a la BD."""
+        if hasattr(self, "_render_timer"):   # (el primer pintado ocurre antes de crearlo)
+            self._render_timer.stop()
         rows = self._filter_appts()
 
         counts: Dict[str, int] = {}
@@ -12,18 +12,22 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QComboBox
 )
-from data.db.session import SessionLocal
-from data.models.product import Product
+from services import inventory
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+_inventory = service("inventory")
 
 class AjusteProductoWidget(QWidget):
     """
     Ventana (QWidget) para realizar ajustes de inventario a un producto existente.
-    Permite seleccionar tipo de ajuste (entrada/salida) y la cantidad.
+    Permite seleccionar tipo de ajuste (entrada/salida) y la cantidad, o
+    registrar un conteo físico (la cantidad contada reemplaza al stock).
     """
 
     ajuste_realizado = pyqtSignal(str)
 
-    def __init__(self, producto: Product, parent=None):
+    def __init__(self, producto, parent=None):
         super().__init__(parent)
         self.producto = producto
         self.setWindowTitle("Ajuste de inventario")
@@ -114,8 +118,9 @@ class AjusteProductoWidget(QWidget):
 
         # Tipo de ajuste
         self.combo_tipo = QComboBox()
-        self.combo_tipo.addItems(["Entrada", "Salida"])
+        self.combo_tipo.addItems(["Entrada", "Salida", "Conteo"])
         self.combo_tipo.setFont(fuente_input)
+        self.combo_tipo.currentTextChanged.connect(self._on_tipo_changed)
 
         # Cantidad del ajuste
         self.in_cantidad = QSpinBox()
@@ -159,53 +164,49 @@ class AjusteProductoWidget(QWidget):
 
         layout.addLayout(self.btn_box)
 
+    def _on_tipo_changed(self, tipo: str):
+        # En un conteo la cantidad es lo contado (puede ser 0)
+        self.in_cantidad.setMinimum(0 if tipo == "Conteo" else 1)
+
     def guardar(self):
-        """Guarda el ajuste en la base de datos."""
+        """Registra el ajuste en el libro de movimientos (actualización atómica del stock)."""
         cantidad = self.in_cantidad.value()
         tipo_ajuste = self.combo_tipo.currentText()
-        
-        if cantidad <= 0:
+
+        if cantidad <= 0 and tipo_ajuste != "Conteo":
             QMessageBox.warning(self, "Cantidad inválida", 
                               "La cantidad debe ser mayor que cero.")
             return
 
-        # Convertir a número negativo si es una salida
-        if tipo_ajuste == "Salida":
-            cantidad = -cantidad
-
-        session = SessionLocal()
         try:
-            producto_db = session.query(Product).filter(
-                Product.sku == self.producto.sku).first()
-            
-            if producto_db:
-                # Verificar que no quede stock negativo
-                if producto_db.stock + cantidad < 0:
-                    QMessageBox.warning(self, "Error", 
-                        "No hay suficiente stock para realizar esta salida.")
-                    return
-                
-                producto_db.stock += cantidad
-                session.commit()
-                
-                msg = "entrada" if tipo_ajuste == "Entrada" else "salida"
-                QMessageBox.information(
-                    self,
-                    "Ajuste registrado",
-                    f"Se ha registrado la {msg} de {abs(cantidad)} unidades.",
-                )
-                self.ajuste_realizado.emit(self.producto.name)
-                self.close()
-            else:
+            product_id = _inventory.product_id_for_sku(self.producto.sku)
+            if product_id is None:
                 QMessageBox.critical(
                     self, "Error", 
                     "No se encontró el producto en la base de datos."
                 )
+                return
+            if tipo_ajuste == "Conteo":
+                mv = _inventory.record_movement(product_id, "Conteo", cantidad)
+            else:
+                # Convertir a número negativo si es una salida
+                delta = -cantidad if tipo_ajuste == "Salida" else cantidad
+                mv = _inventory.record_movement(product_id, "Ajuste", delta)
+        except inventory.StockError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
         except Exception as e:
-            session.rollback()
             QMessageBox.critical(
                 self, "Error", 
                 f"Ocurrió un error al guardar: {str(e)}"
             )
-        finally:
-            session.close()
\ No newline at end of file
+            return
+
+        if tipo_ajuste == "Conteo":
+            msg = f"Conteo registrado: stock {mv['balance']} (diferencia {mv['qty']:+d})."
+        else:
+            msg = "entrada" if tipo_ajuste == "Entrada" else "salida"
+            msg = f"Se ha registrado la {msg} de {abs(cantidad)} unidades."
+        QMessageBox.information(self, "Ajuste registrado", msg)
+        self.ajuste_realizado.emit(self.producto.name)
+        self.close()
@@ -0,0 +1,208 @@
+# ui/pages/cash_close.py
+from datetime import date
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QDate, Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QDateEdit, QDoubleSpinBox,
+    QLineEdit, QTableWidget, QTableWidgetItem, QMessageBox
+)
+
+from services.cash_close import CashClosedError
+from services.contracts import get_current_user
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+_cash_close = service("cash_close")
+close_day = _cash_close.close_day
+day_totals = _cash_close.day_totals
+get_close = _cash_close.get_close
+list_closes = _cash_close.list_closes
+
+
+def _money(v: float) -> str:
+    return f"${v:,.2f}"
+
+
+def _num_item(text: str) -> QTableWidgetItem:
+    it = QTableWidgetItem(text)
+    it.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    return it
+
+
+def _to_date(q: QDate) -> date:
+    return date(q.year(), q.month(), q.day())
+
+
+class CashCloseWidget(QWidget):
+    """
+    Corte de caja del día:
+    - Día abierto: esperado por método (con "Contado" editable) y por
+      tatuador, calculados en una consulta agregada; "Cerrar caja" guarda la
+      foto y bloquea los cobros de ese día
+    - Día cerrado: se lee la foto guardada (sin volver a sumar transacciones)
+    Señales: cerrar()
+    """
+    cerrar = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumWidth(720)
+        self._totals: Optional[Dict] = None
+        self._closed = False
+        self._spins: List[QDoubleSpinBox] = []
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(16, 16, 16, 16)
+        root.setSpacing(10)
+
+        title = QLabel("Corte de caja"); title.setObjectName("H1")
+        root.addWidget(title)
+
+        bar = QHBoxLayout(); bar.setSpacing(6)
+        self.dt_day = QDateEdit(QDate.currentDate()); self.dt_day.setCalendarPopup(True)
+        self.dt_day.dateChanged.connect(lambda _: self.reload())
+        self.cbo_history = QComboBox(); self.cbo_history.setMinimumWidth(260)
+        self.cbo_history.activated.connect(self._on_history)
+        bar.addWidget(QLabel("Día:")); bar.addWidget(self.dt_day)
+        bar.addSpacing(12)
+        bar.addWidget(QLabel("Cortes anteriores:")); bar.addWidget(self.cbo_history)
+        bar.addStretch(1)
+        root.addLayout(bar)
+
+        self.lbl_status = QLabel("")
+        root.addWidget(self.lbl_status)
+
+        self.tbl_methods = QTableWidget(0, 5)
+        self.tbl_methods.setHorizontalHeaderLabels(["Método", "Esperado", "Contado", "Diferencia", "Movimientos"])
+        self.tbl_methods.horizontalHeader().setStretchLastSection(True)
+        self.tbl_methods.setEditTriggers(QTableWidget.NoEditTriggers)
+        root.addWidget(self.tbl_methods, 1)
+
+        self.tbl_artists = QTableWidget(0, 3)
+        self.tbl_artists.setHorizontalHeaderLabels(["Tatuador", "Cobrado", "Movimientos"])
+        self.tbl_artists.horizontalHeader().setStretchLastSection(True)
+        self.tbl_artists.horizontalHeader().resizeSection(0, 220)
+        self.tbl_artists.setEditTriggers(QTableWidget.NoEditTriggers)
+        root.addWidget(self.tbl_artists, 1)
+
+        self.lbl_total = QLabel(""); self.lbl_total.setStyleSheet("font-weight:800;")
+        root.addWidget(self.lbl_total)
+
+        self.txt_note = QLineEdit(); self.txt_note.setPlaceholderText("Nota del corte (opcional)")
+        self.txt_note.setMaxLength(200)
+        root.addWidget(self.txt_note)
+
+        bottom = QHBoxLayout()
+        self.btn_close_day = QPushButton("Cerrar caja")
+        self.btn_close_day.clicked.connect(self._close_day)
+        btn_close = QPushButton("Cerrar"); btn_close.setObjectName("GhostSmall")
+        btn_close.clicked.connect(self.cerrar.emit)
+        bottom.addWidget(self.btn_close_day); bottom.addStretch(1); bottom.addWidget(btn_close)
+        root.addLayout(bottom)
+
+        self._load_history()
+        self.reload()
+
+    # ---------- datos ----------
+    def _load_history(self):
+        self.cbo_history.clear()
+        self.cbo_history.addItem("—", None)
+        try:
+            closes = list_closes()
+        except Exception:
+            closes = []
+        for c in closes:
+            diff = c["difference"]
+            tag = "cuadrado" if abs(diff) < 0.005 else f"dif. {_money(diff)}"
+            self.cbo_history.addItem(f"{c['day']:%d/%m/%Y} · {_money(c['expected_total'])} · {tag}", c["day"])
+
+    def _on_history(self, idx: int):
+        d = self.cbo_history.itemData(idx)
+        if d:
+            self.dt_day.setDate(QDate(d.year, d.month, d.day))
+
+    def reload(self):
+        day = _to_date(self.dt_day.date())
+        try:
+            snap = get_close(day)
+            data = snap if snap is not None else day_totals(day)
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudo calcular el corte: {e}")
+            return
+        self._closed = snap is not None
+        self._totals = data
+
+        self.tbl_methods.setRowCount(0)
+        self._spins = []
+        for m in data["by_method"]:
+            i = self.tbl_methods.rowCount(); self.tbl_methods.insertRow(i)
+            self.tbl_methods.setItem(i, 0, QTableWidgetItem(m["method"]))
+            self.tbl_methods.setItem(i, 1, _num_item(_money(m["expected"])))
+            if self._closed:
+                counted = m["counted"] if m["counted"] is not None else m["expected"]
+                self.tbl_methods.setItem(i, 2, _num_item(_money(counted)))
+                self.tbl_methods.setItem(i, 3, _num_item(_money(counted - m["expected"])))
+            else:
+                sp = QDoubleSpinBox(); sp.setRange(0, 10_000_000); sp.setDecimals(2); sp.setPrefix("$ ")
+                sp.setValue(m["expected"])
+                sp.valueChanged.connect(self._refresh_differences)
+                self._spins.append(sp)
+                self.tbl_methods.setCellWidget(i, 2, sp)
+                self.tbl_methods.setItem(i, 3, _num_item(_money(0.0)))
+            self.tbl_methods.setItem(i, 4, _num_item(str(m["tx_count"])))
+
+        self.tbl_artists.setRowCount(0)
+        for a in data["by_artist"]:
+            i = self.tbl_artists.rowCount(); self.tbl_artists.insertRow(i)
+            self.tbl_artists.setItem(i, 0, QTableWidgetItem(a["artist"]))
+            self.tbl_artists.setItem(i, 1, _num_item(_money(a["expected"])))
+            self.tbl_artists.setItem(i, 2, _num_item(str(a["tx_count"])))
+
+        self.txt_note.setEnabled(not self._closed)
+        self.txt_note.setText((data.get("note") or "") if self._closed else "")
+        self.btn_close_day.setEnabled(not self._closed)
+        if self._closed:
+            self.lbl_status.setText(f"Caja cerrada el {data['closed_at']:%d/%m/%Y %H:%M} · los cobros de este día están bloqueados")
+            self.lbl_total.setText(
+                f"Esperado {_money(data['expected_total'])} · Contado {_money(data['counted_total'])} · "
+                f"Diferencia {_money(data['difference'])}"
+            )
+        else:
+            self.lbl_status.setText("Caja abierta · captura lo contado por método")
+            self._refresh_differences()
+
+    def _counted(self) -> Dict[str, float]:
+        return {m["method"]: sp.value() for m, sp in zip(self._totals["by_method"], self._spins)}
+
+    def _refresh_differences(self, *_):
+        if self._closed or not self._totals:
+            return
+        counted = self._counted()
+        for i, m in enumerate(self._totals["by_method"]):
+            self.tbl_methods.setItem(i, 3, _num_item(_money(counted[m["method"]] - m["expected"])))
+        total = sum(counted.values())
+        expected = self._totals["expected_total"]
+        self.lbl_total.setText(
+            f"Esperado {_money(expected)} · Contado {_money(total)} · Diferencia {_money(total - expected)}"
+        )
+
+    # ---------- cierre ----------
+    def _close_day(self):
+        day = _to_date(self.dt_day.date())
+        ok = QMessageBox.question(
+            self, "Cerrar caja",
+            f"¿Cerrar la caja del {day:%d/%m/%Y}?\nDespués no se podrán registrar ni editar cobros de ese día.",
+        )
+        if ok != QMessageBox.Yes:
+            return
+        try:
+            close_day(day, self._counted(), note=self.txt_note.text(),
+                      user_id=(get_current_user() or {}).get("id"))
+        except CashClosedError as e:
+            QMessageBox.warning(self, "Corte de caja", str(e))
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudo cerrar la caja: {e}")
+            return
+        self._load_history()
+        self.reload()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime, date, time, timedelta
-from typing import Optional, List, Tuple
+from datetime import datetime, date
+from typing import Dict, Optional, List, Tuple
 
 from PyQt5.QtCore import Qt, QDate, QPoint
 from PyQt5.QtGui import QDoubleValidator
@@ -15,6 +15,11 @@ from data.db.session import SessionLocal
 from data.models.artist import Artist
 from data.models.session_tattoo import TattooSession
 from data.models.transaction import Transaction
+from services.cash_close import CashClosedError, ensure_open
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+sessions_for_day = service("sessions").sessions_for_day
 
 
 # =======================
@@ -98,7 +103,9 @@ class CashRegisterDialog(FramelessPanel):
       - Sesiones del día elegido (todas si no hay tatuador elegido, filtradas si lo hay)
       - Monto y Comisión con QLineEdit (sin flechas), validación numérica
       - Sin "Fecha/hora del cobro": se usa datetime.now()
-      - En el combo de sesiones se muestra el NOMBRE DEL CLIENTE (no el ID)
+      - En el combo de sesiones se muestra el NOMBRE DEL CLIENTE (no el ID) y el saldo
+      - Sesiones por (día, tatuador): una consulta proyectada, en caché mientras
+        el diálogo está abierto
     """
     def __init__(self, parent=None):
         super().__init__("Registrar pago", parent)
@@ -151,6 +158,8 @@ class CashRegisterDialog(FramelessPanel):
         # 7) Fecha (para cargar sesiones del día) — sin el texto “(sesiones del día)”
         #    Se usa QDate en memoria; no se muestra un control con calendario para mantener el diseño simple.
         self._date_for_sessions = QDate.currentDate()
+        self._sessions_cache: Dict[Tuple[date, Optional[int]], List[dict]] = {}
+        self._session_rows: Dict[int, dict] = {}   # id -> fila mostrada en el combo
 
         # 8) Flag completar sesión
         self.chk_complete = QCheckBox("Marcar la sesión como Completada")
@@ -196,17 +205,17 @@ class CashRegisterDialog(FramelessPanel):
         self.cbo_artist.blockSignals(False)
 
     # === Sesiones del día ===
-    def _day_utc_bounds(self, qd: QDate) -> Tuple[datetime, datetime]:
-        """Devuelve (start, end) UTC aproximado para el día de QDate (asumiendo timestamps en UTC)."""
-        # Usamos hora local -> UTC para conformarnos con DB en UTC naive
-        d_py = date(qd.year(), qd.month(), qd.day())
-        local_start = datetime.combine(d_py, time(0, 0, 0)).astimezone()  # local tz
-        local_end = (local_start + timedelta(days=1)) - timedelta(microseconds=1)
-        start_utc = local_start.astimezone().astimezone().astimezone().astimezone().astimezone()
-        # lo anterior mantiene tz local; para DB naive/UTC convertimos a “naive” en UTC:
-        start_utc = local_start.astimezone(datetime.now().astimezone().tzinfo).astimezone().replace(tzinfo=None)
-        end_utc = local_end.astimezone(datetime.now().astimezone().tzinfo).astimezone().replace(tzinfo=None)
-        return start_utc, end_utc
+    def _sessions(self, day: date, artist_id: Optional[int]) -> List[dict]:
+        """Sesiones de (día, tatuador); se consultan una vez por combinación."""
+        key = (day, artist_id)
+        if key not in self._sessions_cache:
+            whole_day = self._sessions_cache.get((day, None))
+            if artist_id is not None and whole_day is not None:
+                # El día completo ya está en memoria: basta filtrarlo
+                self._sessions_cache[key] = [r for r in whole_day if r["artist_id"] == artist_id]
+            else:
+                self._sessions_cache[key] = sessions_for_day(day, artist_id)
+        return self._sessions_cache[key]
 
     def _reload_sessions(self):
         """Rellena el combo de 'Sesión' para el día y artista seleccionados."""
@@ -215,73 +224,28 @@ class CashRegisterDialog(FramelessPanel):
         self.cbo_session.addItem("Sin sesión (cobro suelto)", None)
 
         artist_id = self.cbo_artist.currentData()  # puede ser None
-        day = self._date_for_sessions
-        start, end = self._day_utc_bounds(day)
-
-        with SessionLocal() as db:
-            q = db.query(TattooSession)
-            # Campo de fecha/hora: intentamos resolver nombres comunes
-            dt_attr = None
-            for cand in ("start_time", "start_at", "scheduled_at", "datetime", "date"):
-                if hasattr(TattooSession, cand):
-                    dt_attr = getattr(TattooSession, cand)
-                    break
-            if dt_attr is None:
-                # no sabemos el nombre; mostramos sin filtrar por día (peor caso)
-                sessions = q.all()
-            else:
-                q = q.filter(dt_attr >= start, dt_attr <= end)
-                if artist_id:
-                    if hasattr(TattooSession, "artist_id"):
-                        q = q.filter(TattooSession.artist_id == int(artist_id))
-                sessions = q.order_by(dt_attr.asc()).all()
+        qd = self._date_for_sessions
+        day = date(qd.year(), qd.month(), qd.day())
+        try:
+            rows = self._sessions(day, int(artist_id) if artist_id else None)
+        except Exception as e:
+            rows = []
+            QMessageBox.warning(self, "Sesiones", f"No se pudieron cargar las sesiones del día:\n{e}")
 
-            # Construir etiqueta: CLIENTE (no ID) + hora + estado + monto si existe
-            for s in sessions:
-                label = self._session_label(db, s)
-                self.cbo_session.addItem(label, int(getattr(s, "id", 0) or 0))
+        for r in rows:
+            self._session_rows[r["id"]] = r
+            self.cbo_session.addItem(self._session_label(r), r["id"])
 
         self.cbo_session.blockSignals(False)
 
-    def _session_label(self, db, s) -> str:
-        # Cliente
-        client_name = ""
-        try:
-            c = getattr(s, "client", None)
-            if c is not None:
-                client_name = getattr(c, "name", "") or getattr(c, "full_name", "") or ""
-            if not client_name:
-                client_name = getattr(s, "client_name", "") or getattr(s, "customer_name", "") or ""
-        except Exception:
-            pass
-
-        # Hora
-        hhmm = ""
-        for cand in ("start_time", "start_at", "scheduled_at", "datetime", "date"):
-            if hasattr(s, cand):
-                v = getattr(s, cand)
-                try:
-                    if v:
-                        if isinstance(v, datetime):
-                            hhmm = v.strftime("%H:%M")
-                        else:
-                            # si fuera date
-                            hhmm = str(v)
-                except Exception:
-                    pass
-                break
-
-        status = getattr(s, "status", "") or getattr(s, "state", "") or ""
-        amount = getattr(s, "amount", None)
-        amount_txt = f"$ {amount:.2f}" if isinstance(amount, (int, float)) else ""
-
-        parts: List[str] = []
-        if client_name: parts.append(client_name)
-        if hhmm: parts.append(hhmm)
-        if status: parts.append(status)
-        if amount_txt: parts.append(amount_txt)
-
-        return " · ".join(parts) if parts else "Sesión"
+    @staticmethod
+    def _session_label(row: dict) -> str:
+        """CLIENTE · HH:MM · estado · saldo."""
+        parts: List[str] = [row["client"] or "Sin cliente", row["start"].strftime("%H:%M")]
+        if row["status"]:
+            parts.append(row["status"])
+        parts.append(f"saldo $ {row['balance']:.2f}" if row["balance"] > 0 else "pagada")
+        return " · ".join(parts)
 
     # ===== Guardar cobro
     def _save(self):
@@ -319,13 +283,15 @@ class CashRegisterDialog(FramelessPanel):
 
         # Si eligió sesión pero dejó artista en blanco, intentamos deducir el artista de esa sesión
         if session_id is not None and artist_id is None:
-            with SessionLocal() as db:
-                s = db.query(TattooSession).get(int(session_id))
-                if s and hasattr(s, "artist_id") and getattr(s, "artist_id", None):
-                    artist_id = int(getattr(s, "artist_id"))
+            row = self._session_rows.get(int(session_id))
+            if row and row["artist_id"]:
+                artist_id = int(row["artist_id"])
 
         try:
             with SessionLocal() as db:
+                # Día con corte de caja: la BD lo rechaza igual; aquí con mensaje claro
+                ensure_open(db, now)
+
                 # Crear transacción
                 t = Transaction(
                     session_id=int(session_id) if session_id else None,
@@ -358,5 +324,7 @@ class CashRegisterDialog(FramelessPanel):
             QMessageBox.information(self, "Pago", "Pago registrado correctamente.")
             self.accept()
 
+        except CashClosedError as e:
+            QMessageBox.warning(self, "Caja cerrada", str(e))
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo registrar el pago:\n{e}")
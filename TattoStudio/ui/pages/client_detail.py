@@ -5,7 +5,7 @@ from datetime import datetime
 import os, json
 from pathlib import Path
 
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QPixmap, QPainter, QColor, QKeySequence
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTabWidget,
@@ -15,16 +15,19 @@ from PyQt5.QtWidgets import (
 )
 
 from sqlalchemy.orm import Session
-from sqlalchemy import asc
 from sqlalchemy.exc import IntegrityError
 
 from data.db.session import SessionLocal
 from data.models.client import Client
-from data.models.artist import Artist
 from data.models.session_tattoo import TattooSession
 
+from services import archive
+from services.client_profile import HEALTH_FLAGS, ClientProfile
+from services.events import ARCHIVED, DELETED, UPDATED, ClientSaved, publish
 from services.permissions import can
 from services.contracts import get_current_user
+from services.tracing import traced
+from services.transport import service
 from ui.pages.common import (
     ensure_permission,
     request_elevation_if_needed,
@@ -39,6 +42,9 @@ from ui.pages.portfolios import (
     PortfolioService,        # consultas reutilizables
 )
 
+# directo a la BD o vía servidor del estudio (services/transport)
+get_profile = service("client_profile").get_profile
+
 class ClientDetailPage(QWidget):
     back_to_list = pyqtSignal()
     cliente_cambiado = pyqtSignal()  # para refrescar tabla/lista
@@ -48,7 +54,7 @@ class ClientDetailPage(QWidget):
         self.setStyleSheet("QLabel { background: transparent; }")
 
         self._client: dict = {}
-        self._client_db: Optional[Client] = None
+        self._client_db: Optional[ClientProfile] = None
         self._owner_artist_id: Optional[int] = None
         self._notes_dirty: bool = False
         self._any_dirty: bool = False
@@ -344,6 +350,7 @@ class ClientDetailPage(QWidget):
     # --------------------------------------------------------
     # Carga de datos
     # --------------------------------------------------------
+    @traced("client_detail.load_client")
     def load_client(self, client: dict):
         self._client = client or {}
         cid = client.get("id")
@@ -377,103 +384,73 @@ class ClientDetailPage(QWidget):
             return
 
         try:
-            with SessionLocal() as db:  # type: Session
-                self._client_db = db.query(Client).filter(Client.id == cid).one_or_none()
-                if not self._client_db:
-                    QMessageBox.warning(self, "Cliente", f"Cliente id={cid} no encontrado.")
-                    self._apply_notes_permissions(owner_artist_id=None)
-                    self._set_avatar_perm(None)
-                    return
+            # Una sola foto (2 consultas, o ninguna si está en caché); ver services/client_profile
+            profile = get_profile(cid)
+            self._client_db = profile
+            if profile is None:
+                QMessageBox.warning(self, "Cliente", f"Cliente id={cid} no encontrado.")
+                self._apply_notes_permissions(owner_artist_id=None)
+                self._set_avatar_perm(None)
+                return
 
-                name = getattr(self._client_db, "name", None) or name_hint
-                self.name_lbl.setText(name); self.name_edit.setText(name)
+            name = profile.name or name_hint
+            self.name_lbl.setText(name); self.name_edit.setText(name)
+            if name != name_hint:
                 self.avatar.setPixmap(self._load_avatar_or_initials(cid, name))
-                phone = getattr(self._client_db, "phone", None)
-                email = getattr(self._client_db, "email", None)
-                ig    = getattr(self._client_db, "instagram", None)
-                self.phone_lbl.setText(phone or "—"); self.phone_edit.setText(phone or "")
-                self.email_lbl.setText(email or "—"); self.email_edit.setText(email or "")
-                self.ig_lbl.setText(render_instagram(ig) if ig else "—")
-                self.ig_edit.setText(render_instagram(ig) if ig else "")
-                self._perfil_name.setText(name)
-                self._perfil_contact.setText(f"{phone or '—'}  ·  {email or '—'}")
-
-                now = datetime.now()
-                next_session: Optional[TattooSession] = (
-                    db.query(TattooSession)
-                    .filter(TattooSession.client_id == cid, TattooSession.start >= now)
-                    .order_by(asc(TattooSession.start))
-                    .first()
-                )
-                last_session: Optional[TattooSession] = (
-                    db.query(TattooSession)
-                    .filter(TattooSession.client_id == cid, TattooSession.start < now)
-                    .order_by(TattooSession.start.desc())
-                    .first()
-                )
-
-                self._owner_artist_id = (
-                    getattr(next_session, "artist_id", None)
-                    if next_session else getattr(last_session, "artist_id", None)
-                ) or getattr(self._client_db, "preferred_artist_id", None)
-
-                artist_name = "—"
-                if self._owner_artist_id:
-                    a = db.query(Artist).filter(Artist.id == self._owner_artist_id).one_or_none()
-                    if a and getattr(a, "name", None):
-                        artist_name = a.name
-                self.artist_lbl.setText(artist_name)
-                self._load_artists_combo(db, preselect_id=getattr(self._client_db, "preferred_artist_id", None))
-
-                def fmt_dt(dt: Optional[datetime]) -> str:
-                    return dt.strftime("%d %b %H:%M") if dt else "—"
-                self.next_lbl.setText(fmt_dt(getattr(next_session, "start", None)))
-
-                existing_notes = getattr(self._client_db, "notes", None)
-                self._perfil_notes.blockSignals(True)
-                self._perfil_notes.setPlainText(existing_notes or "")
-                self._perfil_notes.blockSignals(False)
-                self._notes_dirty = False
-                self._perfil_notes.textChanged.connect(self._on_notes_changed)
-
-                styles, zones, source = self._extract_prefs_from_notes(existing_notes or "")
-                self._pref_styles_lbl.setText(styles or "—")
-                self._pref_zones_lbl.setText(zones or "—")
-                self._pref_source_lbl.setText(source or "—")
-
-                pref_id = getattr(self._client_db, "preferred_artist_id", None)
-                if pref_id:
-                    pa = db.query(Artist).filter(Artist.id == pref_id).one_or_none()
-                    if pa and getattr(pa, "name", None):
-                        self._pref_artist_lbl.setText(pa.name)
-                self._pref_city_lbl.setText(getattr(self._client_db, "city", None) or "—")
-                self._pref_state_lbl.setText(getattr(self._client_db, "state", None) or "—")
-                self._pref_city_edit.setText(getattr(self._client_db, "city", "") or "")
-                self._pref_state_edit.setText(getattr(self._client_db, "state", "") or "")
-
-                flags = [
-                    "health_allergies","health_diabetes","health_coagulation","health_epilepsy",
-                    "health_cardiac","health_anticoagulants","health_preg_lact","health_substances","health_derm"
-                ]
-                for cb, attr in zip(self._health_checks, flags):
-                    cb.setChecked(bool(getattr(self._client_db, attr, False)))
-                self._health_obs.setPlainText(getattr(self._client_db, "health_obs", None) or "")
-
-                self._consent_checks[0].setChecked(bool(getattr(self._client_db, "consent_info", False)))
-                self._consent_checks[1].setChecked(bool(getattr(self._client_db, "consent_image", False)))
-                self._consent_checks[2].setChecked(bool(getattr(self._client_db, "consent_data", False)))
-
-                self._emerg_name.setText(getattr(self._client_db, "emergency_name", None) or "—")
-                self._emerg_rel.setText(getattr(self._client_db, "emergency_relation", None) or "—")
-                self._emerg_tel.setText(getattr(self._client_db, "emergency_phone", None) or "—")
-                self._emerg_name_edit.setText(getattr(self._client_db, "emergency_name", "") or "")
-                self._emerg_rel_edit.setText(getattr(self._client_db, "emergency_relation", "") or "")
-                self._emerg_tel_edit.setText(getattr(self._client_db, "emergency_phone", "") or "")
-
-                self._apply_notes_permissions(owner_artist_id=self._owner_artist_id)
-                self._set_avatar_perm(cid)
-                self._refresh_edit_buttons()
-                self._refresh_client_gallery(cid)
+            phone, email, ig = profile.phone, profile.email, profile.instagram
+            self.phone_lbl.setText(phone or "—"); self.phone_edit.setText(phone or "")
+            self.email_lbl.setText(email or "—"); self.email_edit.setText(email or "")
+            self.ig_lbl.setText(render_instagram(ig) if ig else "—")
+            self.ig_edit.setText(render_instagram(ig) if ig else "")
+            self._perfil_name.setText(name)
+            self._perfil_contact.setText(f"{phone or '—'}  ·  {email or '—'}")
+
+            self._owner_artist_id = profile.owner_artist_id
+            self.artist_lbl.setText(profile.owner_artist or "—")
+            self._load_artists_combo(profile.artists, preselect_id=profile.preferred_artist_id)
+
+            def fmt_dt(dt: Optional[datetime]) -> str:
+                return dt.strftime("%d %b %H:%M") if dt else "—"
+            self.next_lbl.setText(fmt_dt(profile.next_start))
+
+            existing_notes = profile.notes
+            self._perfil_notes.blockSignals(True)
+            self._perfil_notes.setPlainText(existing_notes or "")
+            self._perfil_notes.blockSignals(False)
+            self._notes_dirty = False
+            self._perfil_notes.textChanged.connect(self._on_notes_changed)
+
+            self._pref_styles_lbl.setText(", ".join(profile.styles) or "—")
+            self._pref_zones_lbl.setText(", ".join(profile.zones) or "—")
+            self._pref_source_lbl.setText(profile.source or "—")
+
+            if profile.preferred_artist:
+                self._pref_artist_lbl.setText(profile.preferred_artist)
+            self._pref_city_lbl.setText(profile.city or "—")
+            self._pref_state_lbl.setText(profile.state or "—")
+            self._pref_city_edit.setText(profile.city or "")
+            self._pref_state_edit.setText(profile.state or "")
+
+            for cb, flag in zip(self._health_checks, profile.health):
+                cb.setChecked(flag)
+            self._health_obs.setPlainText(profile.health_obs or "")
+
+            for cb, flag in zip(self._consent_checks, profile.consent):
+                cb.setChecked(flag)
+
+            self._emerg_name.setText(profile.emergency_name or "—")
+            self._emerg_rel.setText(profile.emergency_relation or "—")
+            self._emerg_tel.setText(profile.emergency_phone or "—")
+            self._emerg_name_edit.setText(profile.emergency_name or "")
+            self._emerg_rel_edit.setText(profile.emergency_relation or "")
+            self._emerg_tel_edit.setText(profile.emergency_phone or "")
+
+            self._apply_notes_permissions(owner_artist_id=self._owner_artist_id)
+            self._set_avatar_perm(cid)
+            self._refresh_edit_buttons()
+            # La galería (miniaturas en disco) se pinta después de la ficha
+            self._clear_client_gallery()
+            QTimer.singleShot(0, lambda c=cid: self._client.get("id") == c and self._refresh_client_gallery(c))
 
         except Exception as ex:
             QMessageBox.critical(self, "BD", f"Error al cargar cliente: {ex}")
@@ -624,11 +601,11 @@ class ClientDetailPage(QWidget):
     # Artistas / avatar / permisos / edición / guardado
     # (todo SIN CAMBIOS respecto a tu versión anterior)
     # --------------------------------------------------------
-    def _load_artists_combo(self, db: Session, preselect_id: Optional[int]):
+    def _load_artists_combo(self, artists: Tuple[Tuple[int, str], ...], preselect_id: Optional[int]):
         self.artist_combo.clear()
         items: List[Tuple[str, Optional[int]]] = [("Sin preferencia", None)]
-        for a in db.query(Artist).order_by(Artist.name.asc()).all():
-            items.append((a.name, a.id))
+        for aid, name in artists:
+            items.append((name, aid))
         for name, _id in items:
             self.artist_combo.addItem(name, _id)
         if preselect_id is None:
@@ -749,22 +726,6 @@ class ClientDetailPage(QWidget):
         p.end()
         return pm
 
-    def _extract_prefs_from_notes(self, notes: str) -> Tuple[str, str, str]:
-        if not notes:
-            return "", "", ""
-        line = next((ln for ln in notes.splitlines() if ln.strip().startswith("META_PREFS|")), "")
-        if not line:
-            return "", "", ""
-        try:
-            payload = line.split("|", 1)[1]
-            parts = dict(kv.split("=", 1) for kv in payload.split(";") if "=" in kv)
-            styles = (parts.get("styles") or "").strip()
-            zones  = (parts.get("zones")  or "").strip()
-            source = (parts.get("source") or "").strip()
-            return styles, zones, source
-        except Exception:
-            return "", "", ""
-
     def _apply_notes_permissions(self, owner_artist_id: Optional[int]) -> None:
         user = get_current_user()
         if not user:
@@ -881,11 +842,7 @@ class ClientDetailPage(QWidget):
                 obj.state = self._pref_state_edit.text().strip() or None
                 obj.preferred_artist_id = self._selected_artist_id()
 
-                flags = [
-                    "health_allergies","health_diabetes","health_coagulation","health_epilepsy",
-                    "health_cardiac","health_anticoagulants","health_preg_lact","health_substances","health_derm"
-                ]
-                for cb, attr in zip(self._health_checks, flags):
+                for cb, attr in zip(self._health_checks, HEALTH_FLAGS):
                     setattr(obj, attr, bool(cb.isChecked()))
                 obj.health_obs = self._health_obs.toPlainText().strip() or None
 
@@ -899,6 +856,7 @@ class ClientDetailPage(QWidget):
 
                 self._save_notes_if_needed(db)
                 db.commit()
+            publish(ClientSaved(self._client_db.id, UPDATED))
 
             QMessageBox.information(self, "Cliente", "Cambios guardados.")
             self._exit_edit_mode()
@@ -922,7 +880,8 @@ class ClientDetailPage(QWidget):
         try:
             with SessionLocal() as db:
                 cnt = db.query(TattooSession).filter(TattooSession.client_id == self._client_db.id).count()
-                has_sessions = cnt > 0
+                # las archivadas también cuentan: borrarlo las dejaría sin cliente
+                has_sessions = cnt > 0 or archive.has_client_sessions(db, self._client_db.id)
         except Exception:
             has_sessions = False
 
@@ -946,8 +905,10 @@ class ClientDetailPage(QWidget):
                 obj = db.query(Client).filter(Client.id == self._client_db.id).one_or_none()
                 if not obj:
                     QMessageBox.information(self, "Cliente", "El registro ya no existe.")
+                    publish(ClientSaved(self._client_db.id, DELETED))
                     self.cliente_cambiado.emit(); self.back_to_list.emit(); return
                 db.delete(obj); db.commit()
+            publish(ClientSaved(self._client_db.id, DELETED))
             QMessageBox.information(self, "Cliente", "Cliente eliminado.")
             self.cliente_cambiado.emit(); self.back_to_list.emit()
         except IntegrityError:
@@ -961,6 +922,7 @@ class ClientDetailPage(QWidget):
                 obj = db.query(Client).filter(Client.id == self._client_db.id).one_or_none()
                 if not obj:
                     QMessageBox.information(self, "Cliente", "El registro ya no existe.")
+                    publish(ClientSaved(self._client_db.id, DELETED))
                     self.cliente_cambiado.emit(); self.back_to_list.emit(); return
                 if hasattr(obj, "is_active"):
                     obj.is_active = False
@@ -968,6 +930,7 @@ class ClientDetailPage(QWidget):
                     notes = (obj.notes or "").rstrip()
                     obj.notes = (notes + ("\n" if notes else "") + "ARCHIVED: true")
                 db.commit()
+            publish(ClientSaved(self._client_db.id, ARCHIVED))
             QMessageBox.information(self, "Cliente", "Cliente archivado.")
             self.cliente_cambiado.emit(); self.back_to_list.emit()
         except Exception as ex:
@@ -1010,6 +973,7 @@ class ClientDetailPage(QWidget):
                 with SessionLocal() as db:
                     self._save_notes_if_needed(db)
                     db.commit()
+                publish(ClientSaved(self._client_db.id, UPDATED))
             except Exception:
                 pass
         self.back_to_list.emit()
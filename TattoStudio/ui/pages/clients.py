@@ -1,4 +1,5 @@
 from __future__ import annotations
+from bisect import bisect_left
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -10,7 +11,7 @@ from PyQt5.QtWidgets import (
 )
 
 # DB & modelos
-from sqlalchemy import asc
+from sqlalchemy import asc, func, select
 from sqlalchemy.orm import Session
 
 from data.db.session import SessionLocal
@@ -19,8 +20,18 @@ from data.models.artist import Artist
 from data.models.session_tattoo import TattooSession
 
 # Helpers centralizados
-from ui.pages.common import ensure_permission, NoStatusTipMenu, render_instagram
+from ui.pages.common import ensure_permission, NoStatusTipMenu, render_instagram, subscribe_events
+from services.client_prefs import SOURCE, SOURCES, STYLE, STYLES, ZONE, ZONES
+from services.client_profile import prefetch as prefetch_profile, session_value
+from services.events import DELETED, ClientSaved, SessionChanged
 from services.contracts import get_current_user
+from services.scoping import scope
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+_prefs = service("client_prefs")
+preference_counts = _prefs.preference_counts
+segment = _prefs.segment
 
 
 class ClientsPage(QWidget):
@@ -38,6 +49,9 @@ class ClientsPage(QWidget):
         self._all: List[Dict[str, Any]] = []
         self._filtered: List[Dict[str, Any]] = []
 
+        # Segmento por preferencias (ids que cumplen los filtros; None = sin filtro)
+        self._segment_ids: Optional[set] = None
+
         # Lazy load
         self._batch_size = 50
         self._rendered_rows = 0
@@ -97,6 +111,14 @@ class ClientsPage(QWidget):
         self.cbo_order.setFixedHeight(36)
         filters.addWidget(self.cbo_order)
 
+        # Filtros por preferencia (tabla client_preferences)
+        self.cbo_style = self._mk_pref_combo("Todos los estilos")
+        self.cbo_zone = self._mk_pref_combo("Todas las zonas")
+        self.cbo_source = self._mk_pref_combo("Cualquier origen")
+        for cb in (self.cbo_style, self.cbo_zone, self.cbo_source):
+            filters.addWidget(cb)
+        self._fill_pref_combos()
+
         root.addLayout(filters)
 
         # ========== Tabla ==========
@@ -134,112 +156,177 @@ class ClientsPage(QWidget):
         tv.addWidget(self.table)
         root.addWidget(table_box, stretch=1)
 
-        # Carga inicial desde BD
+        # Carga inicial desde BD; después sólo parches por eventos de dominio
         self._reload_from_db()
         self._apply_and_reset_render()
+        subscribe_events(self, {ClientSaved: self._on_client_saved, SessionChanged: self._on_session_changed})
 
     # ---------- Datos ----------
+    def _query_rows(self, db: Session, *where) -> List[Dict[str, Any]]:
+        """
+        Filas de la tabla en UNA consulta: próxima/última cita y el artista a
+        mostrar (próxima cita > última cita > preferido) como subconsultas
+        correlacionadas sobre ix_sessions_client_start.
+        """
+        now = datetime.now()
+        artist_id = func.coalesce(
+            session_value(TattooSession.artist_id, now, upcoming=True),
+            session_value(TattooSession.artist_id, now, upcoming=False),
+            Client.preferred_artist_id,
+        )
+        q = (
+            select(
+                Client.id, Client.name, Client.phone, Client.email, Client.instagram, Client.created_at,
+                session_value(TattooSession.start, now, upcoming=True).label("next_start"),
+                session_value(TattooSession.start, now, upcoming=False).label("last_start"),
+                artist_id.label("artist_id"),
+            )
+            .where(*scope("clients", "view", Client), *where)
+            .order_by(asc(Client.id))
+        )
+        artist_names = dict(db.execute(select(Artist.id, Artist.name)).all())
+        return [self._row(r, artist_names.get(r.artist_id)) for r in db.execute(q)]
+
+    @staticmethod
+    def _row(r, artist_name: Optional[str]) -> Dict[str, Any]:
+        cid: int = r.id
+        phone, email, instagram = r.phone, r.email, r.instagram
+
+        def fmt_dt(dt: Optional[datetime]) -> str:
+            return dt.strftime("%d %b %H:%M") if dt else "—"
+
+        # Contacto: prefer Tel + @ig; si falta IG, usar email (si no duplicamos)
+        parts: List[str] = []
+        primary = phone or email
+        if primary:
+            parts.append(str(primary))
+        if instagram:
+            parts.append(render_instagram(str(instagram)))  # ← muestra siempre con @
+        else:
+            if email and email != primary:
+                parts.append(str(email))
+        contacto_str = "  ·  ".join([p for p in parts if p])[:200]
+
+        return {
+            "id": cid,
+            "nombre": r.name or f"Cliente {cid}",
+            "tel": phone,
+            "email": email,
+            "ig": instagram,
+            "artista": artist_name or "—",
+            "proxima": fmt_dt(r.next_start),
+            "estado": "Activo" if r.next_start else "—",
+            "_created_at": r.created_at,
+            "_last_session": r.last_start,
+            "_next_session": r.next_start,
+            "contacto": contacto_str,
+        }
+
     def _reload_from_db(self) -> None:
         try:
             with SessionLocal() as db:  # type: Session
-                clients: List[Client] = (
-                    db.query(Client)
-                    .order_by(asc(Client.id))
-                    .all()
-                )
-
-                now = datetime.now()
-                rows: List[Dict[str, Any]] = []
-
-                for cl in clients:
-                    cid: int = getattr(cl, "id", None)
-                    name: str = getattr(cl, "name", None) or f"Cliente {cid}"
-                    phone: Optional[str] = getattr(cl, "phone", None)
-                    email: Optional[str] = getattr(cl, "email", None)
-                    instagram: Optional[str] = getattr(cl, "instagram", None)
-                    created_at: Optional[datetime] = getattr(cl, "created_at", None)
-
-                    # Próxima y última cita
-                    next_session = (
-                        db.query(TattooSession)
-                        .filter(TattooSession.client_id == cid, TattooSession.start >= now)
-                        .order_by(asc(TattooSession.start))
-                        .first()
-                    )
-                    last_session = (
-                        db.query(TattooSession)
-                        .filter(TattooSession.client_id == cid, TattooSession.start < now)
-                        .order_by(TattooSession.start.desc())
-                        .first()
-                    )
-
-                    # Artista a mostrar (sesiones → fallback preferred_artist_id)
-                    artist_name = "—"
-                    artist_id = None
-                    if next_session:
-                        artist_id = getattr(next_session, "artist_id", None)
-                    elif last_session:
-                        artist_id = getattr(last_session, "artist_id", None)
-                    if not artist_id:
-                        artist_id = getattr(cl, "preferred_artist_id", None)
-
-                    if artist_id:
-                        a = db.query(Artist).filter(Artist.id == artist_id).one_or_none()
-                        if a and getattr(a, "name", None):
-                            artist_name = a.name
-
-                    def fmt_dt(dt: Optional[datetime]) -> str:
-                        return dt.strftime("%d %b %H:%M") if dt else "—"
-
-                    proxima_str = fmt_dt(getattr(next_session, "start", None))
-                    estado = "Activo" if getattr(next_session, "start", None) else "—"
-
-                    # Contacto: prefer Tel + @ig; si falta IG, usar email (si no duplicamos)
-                    parts: List[str] = []
-                    primary = phone or email
-                    if primary:
-                        parts.append(str(primary))
-                    if instagram:
-                        parts.append(render_instagram(str(instagram)))  # ← muestra siempre con @
-                    else:
-                        if email and email != primary:
-                            parts.append(str(email))
-                    contacto_str = "  ·  ".join([p for p in parts if p])[:200]
-
-                    rows.append({
-                        "id": cid,
-                        "nombre": name,
-                        "tel": phone,
-                        "email": email,
-                        "ig": instagram,
-                        "artista": artist_name,
-                        "proxima": proxima_str,
-                        "estado": estado,
-                        "_created_at": created_at,
-                        "_last_session": getattr(last_session, "start", None),
-                        "_next_session": getattr(next_session, "start", None),
-                        "contacto": contacto_str,
-                    })
-
-                self._all = rows
-
+                self._all = self._query_rows(db)
         except Exception as ex:
             QMessageBox.critical(self, "BD", f"Error al cargar clientes: {ex}")
             self._all = []
 
+    # ---------- Eventos de dominio: parche de una fila ----------
+    def _on_client_saved(self, ev: ClientSaved) -> None:
+        self._patch_client(ev.client_id, removed=ev.action == DELETED)
+        self._fill_pref_combos()   # los conteos por preferencia cambian
+
+    def _on_session_changed(self, ev: SessionChanged) -> None:
+        if ev.client_id is not None:   # próxima cita / artista de ese cliente
+            self._patch_client(ev.client_id)
+
+    def _patch_client(self, cid: int, removed: bool = False) -> None:
+        """Relee (o quita) sólo el cliente 'cid' y mueve/inserta su fila en la tabla."""
+        row = None
+        if not removed:
+            try:
+                with SessionLocal() as db:
+                    row = next(iter(self._query_rows(db, Client.id == cid)), None)
+            except Exception:
+                return
+        i = next((k for k, c in enumerate(self._all) if c["id"] == cid), None)
+        if i is not None:
+            self._all.pop(i)
+        if row is not None:
+            self._all.insert(bisect_left([c["id"] for c in self._all], cid), row)
+        if self._segment_ids is not None:
+            self._reload_segment()   # sus preferencias pudieron cambiar
+
+        # La tabla muestra self._filtered[:_rendered_rows]: quitar la fila vieja
+        # y poner la nueva en su lugar (si cae dentro de lo ya pintado)
+        old = next((k for k, c in enumerate(self._filtered) if c["id"] == cid), None)
+        self._filtered = self._apply_filters()
+        new = next((k for k, c in enumerate(self._filtered) if c["id"] == cid), None)
+        if old is not None and old < self._rendered_rows:
+            self.table.removeRow(old)
+            self._rendered_rows -= 1
+        if new is not None and new <= self._rendered_rows:
+            self.table.insertRow(new)
+            self._set_row(new, self._filtered[new])
+            self._rendered_rows += 1
+
+    # ---------- Filtro por preferencias ----------
+    def _mk_pref_combo(self, all_label: str) -> QComboBox:
+        cb = QComboBox()
+        cb.addItem(all_label, None)
+        cb.setFixedHeight(36)
+        cb.currentIndexChanged.connect(self._on_pref_filter)
+        return cb
+
+    def _fill_pref_combos(self) -> None:
+        """Catálogo + valores guardados, con cuántos clientes tiene cada uno."""
+        try:
+            counts = preference_counts()
+        except Exception:
+            counts = {}
+        for cb, kind, catalog in ((self.cbo_style, STYLE, STYLES), (self.cbo_zone, ZONE, ZONES),
+                                  (self.cbo_source, SOURCE, SOURCES)):
+            by_value = counts.get(kind, {})
+            current = cb.currentData()
+            cb.blockSignals(True)
+            while cb.count() > 1:
+                cb.removeItem(1)
+            for value in list(catalog) + sorted(v for v in by_value if v not in catalog):
+                cb.addItem(f"{value} ({by_value.get(value, 0)})", value)
+            idx = cb.findData(current)
+            cb.setCurrentIndex(idx if idx >= 0 else 0)
+            cb.blockSignals(False)
+
+    def _reload_segment(self) -> None:
+        style, zone, source = (self.cbo_style.currentData(), self.cbo_zone.currentData(),
+                               self.cbo_source.currentData())
+        if style is None and zone is None and source is None:
+            self._segment_ids = None
+            return
+        try:
+            self._segment_ids = set(segment(
+                styles=[style] if style else (), zones=[zone] if zone else (), source=source))
+        except Exception as ex:
+            QMessageBox.critical(self, "BD", f"Error al filtrar por preferencias: {ex}")
+            self._segment_ids = None
+
+    def _on_pref_filter(self, *_):
+        self._reload_segment()
+        self._apply_and_reset_render()
+
     # ---------- Filtro/orden ----------
     def _apply_filters(self) -> List[Dict[str, Any]]:
         txt = self.search_text.lower().strip()
+        base = self._all if self._segment_ids is None else [c for c in self._all if c["id"] in self._segment_ids]
         if txt:
             rows = [
-                c for c in self._all
+                c for c in base
                 if (txt in c["nombre"].lower()
                     or (c.get("tel") and txt in str(c["tel"]).lower())
                     or (c.get("email") and txt in str(c["email"]).lower())
                     or (c.get("ig") and txt in str(c["ig"]).lower()))
             ]
         else:
-            rows = list(self._all)
+            rows = list(base)
 
         if self.order_by == "A–Z":
             rows.sort(key=lambda c: c["nombre"].lower())
@@ -266,21 +353,25 @@ class ClientsPage(QWidget):
         end = min(start + self._batch_size, len(self._filtered))
         self.table.setRowCount(end)
         for r in range(start, end):
-            c = self._filtered[r]
-            it0 = QTableWidgetItem(c["nombre"])
-            it0.setData(Qt.UserRole, c["id"])
-            self.table.setItem(r, 0, it0)
-
-            self.table.setItem(r, 1, QTableWidgetItem(c.get("contacto") or "—"))
-            self.table.setItem(r, 2, QTableWidgetItem(c.get("artista") or "—"))
-            self.table.setItem(r, 3, QTableWidgetItem(c.get("proxima") or "—"))
-            self.table.setItem(r, 4, QTableWidgetItem(c.get("estado") or "—"))
+            self._set_row(r, self._filtered[r])
 
         self._rendered_rows = end
 
-    # ---------- Público: refresco inmediato ----------
+    def _set_row(self, r: int, c: Dict[str, Any]) -> None:
+        it0 = QTableWidgetItem(c["nombre"])
+        it0.setData(Qt.UserRole, c["id"])
+        self.table.setItem(r, 0, it0)
+
+        self.table.setItem(r, 1, QTableWidgetItem(c.get("contacto") or "—"))
+        self.table.setItem(r, 2, QTableWidgetItem(c.get("artista") or "—"))
+        self.table.setItem(r, 3, QTableWidgetItem(c.get("proxima") or "—"))
+        self.table.setItem(r, 4, QTableWidgetItem(c.get("estado") or "—"))
+
+    # ---------- Público: recarga completa (sólo si se pide explícitamente) ----------
     def reload_from_db_and_refresh(self, keep_page: bool = False) -> None:
         self._reload_from_db()
+        self._fill_pref_combos()
+        self._reload_segment()
         self._apply_and_reset_render()
 
     # ---------- Eventos UI ----------
@@ -303,7 +394,21 @@ class ClientsPage(QWidget):
         cid = item.data(Qt.UserRole)
         data = next((c for c in self._filtered if c["id"] == cid), None)
         if data:
-            self.abrir_cliente.emit(data)
+            self._open_client(data)
+
+    def _open_client(self, data: Dict[str, Any]):
+        self.abrir_cliente.emit(data)
+        # Quien abre una ficha suele seguir con la siguiente: se precalcula en segundo plano
+        prefetch_profile(self.next_client_id(data.get("id")))
+
+    def next_client_id(self, cid: Optional[int]) -> Optional[int]:
+        """Id del cliente que sigue a 'cid' en la lista filtrada/ordenada (o None)."""
+        ids = [c.get("id") for c in self._filtered]
+        try:
+            i = ids.index(cid)
+        except ValueError:
+            return None
+        return ids[i + 1] if i + 1 < len(ids) else None
 
     def _on_scroll(self, value: int):
         sb = self.table.verticalScrollBar()
@@ -332,7 +437,7 @@ class ClientsPage(QWidget):
             return
 
         if chosen == act_open:
-            self.abrir_cliente.emit(data)
+            self._open_client(data)
         elif chosen == act_copy_phone:
             if data.get("tel"):
                 QApplication.clipboard().setText(str(data["tel"]))
@@ -26,28 +26,30 @@ from __future__ import annotations
 #    - FlowLayout  (flujo horizontal con salto de línea)
 # 8) Tiempo (opcional, para uso futuro):
 #    - fmt_dt_local(value, fmt="%d/%m/%Y %H:%M") -> str
+# 9) Eventos de dominio (services/events):
+#    - subscribe_events(widget, {Evento: handler}) (entrega en el hilo de Qt)
 #
 # NOTA: Sólo centraliza helpers. No modifica lógicas existentes.
 # ============================================================
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 import os, json, math
+from pathlib import Path
 from datetime import datetime, timezone
 
-from PyQt5.QtCore import Qt, QPoint, QRect, QSize, QEvent, QRectF
+from PyQt5 import sip
+from PyQt5.QtCore import Qt, QPoint, QRect, QSize, QEvent, QRectF, QObject, pyqtSignal
 from PyQt5.QtGui import QPainter, QPixmap, QBrush, QPen, QColor, QPainterPath
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QInputDialog, QLineEdit, QMessageBox,
-    QMenu, QDialog, QLayout, QSizePolicy, QFrame, 
+    QMenu, QDialog, QLayout, QSizePolicy, QFrame, QWidgetItem,
 )
 
-# SQLAlchemy / sesión
-from sqlalchemy.orm import Session
-from data.db.session import SessionLocal
-
 # RBAC & sesión actual (ya presentes en tu proyecto)
-from services.permissions import assistant_needs_code, verify_master_code, elevate_for, can
+from services.permissions import assistant_needs_code, elevate_for, can
+from services.credentials import check_master_code, run_blocking
 from services.contracts import get_current_user
+from services.events import subscribe
 
 # ------------------------------------------------------------
 # Configuración
@@ -106,14 +108,14 @@ def request_elevation_if_needed(parent: QWidget, resource: str, action: str) ->
         QMessageBox.warning(parent, "Código maestro", "El código no puede estar vacío.")
         return False
 
-    with SessionLocal() as db:  # type: Session
-        if verify_master_code(code, db):
-            elevate_for(user.get("id"), minutes=ELEVATION_MINUTES)
-            QMessageBox.information(
-                parent, "Permiso concedido",
-                f"Permisos elevados por {ELEVATION_MINUTES} minutos."
-            )
-            return True
+    # bcrypt en segundo plano: la ventana sigue pintando mientras se valida
+    if run_blocking(check_master_code, code):
+        elevate_for(user.get("id"), minutes=ELEVATION_MINUTES)
+        QMessageBox.information(
+            parent, "Permiso concedido",
+            f"Permisos elevados por {ELEVATION_MINUTES} minutos."
+        )
+        return True
 
     QMessageBox.critical(parent, "Código inválido", "El código maestro no es correcto.")
     return False
@@ -287,6 +289,15 @@ def fallback_color_for(index: Optional[int]) -> str:
 # ------------------------------------------------------------
 # Imagen / Avatares
 # ------------------------------------------------------------
+def load_pixmap(path) -> QPixmap:
+    """QPixmap desde disco; usa la imagen ya decodificada por el warm-up si la hay."""
+    from services import warmup
+    img = warmup.take(warmup.avatar_key(Path(path)))
+    if img is not None:
+        return QPixmap.fromImage(img)
+    return QPixmap(str(path))
+
+
 def round_pixmap(src: QPixmap, size: int, border_px: int = 0, border_hex: str = "#000000") -> QPixmap:
     """Hace un pixmap circular con borde opcional."""
     out = QPixmap(size, size)
@@ -366,6 +377,12 @@ class FlowLayout(QLayout):
     def expandingDirections(self): return Qt.Orientations(Qt.Orientation(0))
     def hasHeightForWidth(self): return True
 
+    def insertWidget(self, index: int, w: QWidget):
+        """Como addWidget pero en la posición 'index' (parches de una tarjeta)."""
+        self.addChildWidget(w)
+        self._items.insert(max(0, min(index, len(self._items))), QWidgetItem(w))
+        self.invalidate()
+
     def heightForWidth(self, width):
         return self._do_layout(QRect(0, 0, width, 0), True)
 
@@ -389,6 +406,41 @@ class FlowLayout(QLayout):
         return y + line_height - rect.y()
 
 
+# ------------------------------------------------------------
+# Eventos de dominio
+# ------------------------------------------------------------
+class _EventBridge(QObject):
+    received = pyqtSignal(object)
+
+
+def subscribe_events(widget: QWidget, handlers: Dict[type, Callable[[Any], None]]) -> None:
+    """
+    Suscribe 'widget' a eventos de services/events. Los handlers corren en el
+    hilo de Qt aunque el servicio publique desde otro hilo (señal encolada)
+    y se dan de baja solos cuando el widget se destruye.
+    """
+    bridge = _EventBridge(widget)
+
+    def dispatch(ev) -> None:
+        for t in type(ev).__mro__:
+            if t in handlers:
+                handlers[t](ev)
+                return
+
+    def forward(ev) -> None:
+        # si Python libera la página, 'destroyed' puede no llegar a este lado:
+        # emitir sobre el puente ya borrado tumba el proceso
+        if sip.isdeleted(bridge):
+            for u in unsubs:
+                u()
+            return
+        bridge.received.emit(ev)
+
+    bridge.received.connect(dispatch)
+    unsubs = [subscribe(t, forward) for t in handlers]
+    widget.destroyed.connect(lambda *_: [u() for u in unsubs])
+
+
 # ------------------------------------------------------------
 # Tiempo (opcional — para centralizar formatos locales)
 # ------------------------------------------------------------
@@ -3,24 +3,26 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QFrame, QSizePolicy, QSpacerItem, QListWidget, QListWidgetItem
 )
-from datetime import date, timedelta, datetime
+from services import inventory
+from services.transport import service
 
-from data.db.session import SessionLocal
-from data.models.product import Product
+# directo a la BD o vía servidor del estudio (services/transport)
+_inventory = service("inventory")
 
 
 class InventoryDashboardPage(QWidget):
     """
     Dashboard de Inventario
     - KPIs: Ítems activos, Bajo stock, Por caducar, Consumo (mes)
-    - Accesos rápidos: Nuevo ítem / Ver ítems / Movimientos
+    - Accesos rápidos: Nuevo ítem / Ver ítems / Movimientos / Plantillas de consumo
     - Listas: Bajo stock y Por caducar (≤30 días)
     Señales (callables que MainWindow debe asignar):
-      ir_items, ir_movimientos, nuevo_item
+      ir_items, ir_movimientos, nuevo_item, plantillas
     """
     ir_items = None
     ir_movimientos = None
     nuevo_item = None
+    plantillas = None
 
     def __init__(self):
         super().__init__()
@@ -28,6 +30,7 @@ class InventoryDashboardPage(QWidget):
         self.ir_items = lambda: None
         self.ir_movimientos = lambda: None
         self.nuevo_item = lambda: None
+        self.plantillas = lambda: None
 
         self.setStyleSheet("QLabel { background: transparent; }")
 
@@ -66,18 +69,22 @@ class InventoryDashboardPage(QWidget):
         btn_new = QPushButton("Nuevo ítem"); btn_new.setObjectName("CTA")
         btn_list = QPushButton("Ver ítems");  btn_list.setObjectName("GhostSmall")
         btn_mov  = QPushButton("Movimientos"); btn_mov.setObjectName("GhostSmall")
+        btn_bom  = QPushButton("Plantillas de consumo"); btn_bom.setObjectName("GhostSmall")
 
         btn_new.setMinimumHeight(34)
         btn_list.setMinimumHeight(34)
         btn_mov.setMinimumHeight(34)
+        btn_bom.setMinimumHeight(34)
 
         btn_new.clicked.connect(lambda: self.nuevo_item())
         btn_list.clicked.connect(lambda: self.ir_items())
         btn_mov.clicked.connect(lambda: self.ir_movimientos())
+        btn_bom.clicked.connect(lambda: self.plantillas())
 
         tb.addWidget(btn_new)
         tb.addWidget(btn_list)
         tb.addWidget(btn_mov)
+        tb.addWidget(btn_bom)
         tb.addSpacerItem(QSpacerItem(20, 10, QSizePolicy.Expanding, QSizePolicy.Minimum))
         root.addWidget(toolbar)
 
@@ -92,7 +99,7 @@ class InventoryDashboardPage(QWidget):
         alerts_box.addWidget(low)
 
         # Por caducar
-        exp = self._card("Por caducar (≤30 días)")
+        exp = self._card(f"Por caducar (≤{inventory.EXPIRY_DAYS} días)")
         self.exp_list = self._clean_list()
         exp.layout().addWidget(self.exp_list)
         alerts_box.addWidget(exp)
@@ -151,66 +158,26 @@ class InventoryDashboardPage(QWidget):
 
     # ---------- Datos ----------
     def refrescar_datos(self):
-        """Consulta la BD y actualiza KPIs + listas. Tolera ausencia de 'fechacaducidad'."""
-        session = SessionLocal()
+        """KPIs en una consulta agregada; listas por recorrido de índice (services/inventory)."""
         try:
-            # Ítems activos
-            activos = session.query(Product).filter(Product.activo == True).count()
-
-            # Bajo stock (solo activos)
-            bajo_stock = session.query(Product).filter(
-                Product.activo == True,
-                Product.stock < Product.min_stock
-            ).count()
-
-            # Por caducar (≤30 días) — solo si el modelo/tabla trae 'fechacaducidad'
-            fecha_limite = date.today() + timedelta(days=30)
-            por_caducar_list = []
-            try:
-                productos_caducables = session.query(Product).filter(Product.caduca == True).all()
-                for p in productos_caducables:
-                    fc = getattr(p, "fechacaducidad", None)
-                    if fc and self._esta_por_caducar(fc, fecha_limite):
-                        por_caducar_list.append((p.name, fc))
-            except Exception:
-                # Si no existe la columna o hay error de parseo, dejamos lista vacía
-                por_caducar_list = []
-
-            # Consumo (mes) — placeholder hasta que tengamos movimientos
-            consumo_mes = 0
-
-            # KPIs
-            self.lbl_activos.value_label.setText(str(activos))
-            self.lbl_bajo_stock.value_label.setText(str(bajo_stock))
-            self.lbl_por_caducar.value_label.setText(str(len(por_caducar_list)))
-            self.lbl_consumo.value_label.setText(f"${consumo_mes:,}")
-
-            # Listas
-            self.low_list.clear()
-            for p in session.query(Product).filter(
-                Product.activo == True,
-                Product.stock < Product.min_stock
-            ).order_by(Product.stock.asc()).all():
-                QListWidgetItem(f"{p.name} (stock: {p.stock}/{p.min_stock})", self.low_list)
-
-            self.exp_list.clear()
-            for name, fecha_str in sorted(por_caducar_list, key=lambda x: x[1]):
-                try:
-                    fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date()
-                    text = f"{name} — {fecha.strftime('%d/%m/%Y')}"
-                except Exception:
-                    text = f"{name} — {fecha_str}"
-                QListWidgetItem(text, self.exp_list)
-
+            kpis = _inventory.dashboard_kpis()
+            bajo_stock = _inventory.low_stock_items()
+            por_caducar = _inventory.expiring_items()
         except Exception as e:
             print(f"⚠️ Error al refrescar datos del inventario: {e}")
-        finally:
-            session.close()
-
-    def _esta_por_caducar(self, fecha_str, fecha_limite):
-        """Devuelve True si fecha_str (YYYY-MM-DD) es <= fecha_limite."""
-        try:
-            fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date()
-            return fecha <= fecha_limite
-        except Exception:
-            return False
+            return
+
+        # KPIs
+        self.lbl_activos.value_label.setText(str(kpis["activos"]))
+        self.lbl_bajo_stock.value_label.setText(str(kpis["bajo_stock"]))
+        self.lbl_por_caducar.value_label.setText(str(kpis["por_caducar"]))
+        self.lbl_consumo.value_label.setText(f"${kpis['consumo_mes']:,.2f}")
+
+        # Listas (las primeras N; el KPI trae el total)
+        self.low_list.clear()
+        for name, stock, min_stock in bajo_stock:
+            QListWidgetItem(f"{name} (stock: {stock}/{min_stock})", self.low_list)
+
+        self.exp_list.clear()
+        for name, fecha in por_caducar:
+            QListWidgetItem(f"{name} — {fecha.strftime('%d/%m/%Y')}", self.exp_list)
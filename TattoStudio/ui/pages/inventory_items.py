@@ -1,28 +1,73 @@
-from PyQt5.QtCore import Qt
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import Qt, QEvent, QRect, QTimer, pyqtSignal
 from PyQt5.QtGui import QBrush, QColor
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox,
-    QPushButton, QTableWidget, QTableWidgetItem, QFrame, QSizePolicy, QSpacerItem, QMessageBox
+    QPushButton, QTableWidget, QTableWidgetItem, QFrame, QSizePolicy, QSpacerItem, QMessageBox,
+    QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
 )
-from sqlalchemy.orm import Session
 
-from data.db.session import SessionLocal
-from data.models.product import Product
-from typing import List
+from services import inventory
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+_inventory = service("inventory")
+
+
+class _ActionsDelegate(QStyledItemDelegate):
+    """
+    Pinta Ver | Entrada | Ajuste como botones dentro de la celda (sin widgets
+    por fila) y emite triggered(fila, acción) al soltar el clic sobre uno.
+    """
+    ACTIONS = (("ver", "Ver"), ("entrada", "Entrada"), ("ajuste", "Ajuste"))
+    triggered = pyqtSignal(int, str)
+
+    SPACING = 6
+    MARGIN = 2
+
+    def _rects(self, rect: QRect):
+        n = len(self.ACTIONS)
+        inner = rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        w = max(1, (inner.width() - self.SPACING * (n - 1)) // n)
+        for i, (key, label) in enumerate(self.ACTIONS):
+            yield key, label, QRect(inner.x() + i * (w + self.SPACING), inner.y(), w, inner.height())
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        for _key, label, r in self._rects(option.rect):
+            btn = QStyleOptionButton()
+            btn.rect = r
+            btn.text = label
+            btn.state = QStyle.State_Enabled | QStyle.State_Raised
+            style.drawControl(QStyle.CE_PushButton, btn, painter, widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            for key, _label, r in self._rects(option.rect):
+                if r.contains(event.pos()):
+                    self.triggered.emit(index.row(), key)
+                    return True
+        return False
+
 
 class InventoryItemsPage(QWidget):
     """
-    Lista de ítems (mock):
+    Lista de ítems:
     - CTA "Nuevo ítem"
     - Toolbar (pastilla) con Buscar + Filtros (Categoría, Estado, Caducidad)
-    - Tabla con acciones: Ver | Entrada | Ajuste
-    - Paginación simple
-    Señales: abrir_item(dict), nuevo_item(), nueva_entrada(dict), nuevo_ajuste(dict)
+    - Tabla con acciones: Ver | Entrada | Ajuste (pintadas por delegate)
+    - Paginación keyset en SQL (services/inventory.list_products); la búsqueda
+      es por prefijo de SKU o nombre
+    Señales: abrir_item(dict), nuevo_item(), nueva_entrada(dict), nuevo_ajuste(dict),
+             escanear() -> modo escaneo (entradas en lote)
     """
     abrir_item = None
     nuevo_item = None
     nueva_entrada = None
     nuevo_ajuste = None
+    escanear = None
 
     def __init__(self):
         super().__init__()
@@ -31,12 +76,16 @@ class InventoryItemsPage(QWidget):
         self.nuevo_item = lambda: None
         self.nueva_entrada = lambda: None
         self.nuevo_ajuste = lambda item: None
+        self.escanear = lambda: None
 
         # Estado de filtros/paginación
         self.page_size = 20
-        self.current_page = 1
         self.search_text = ""
         self.f_cat = "Todas"; self.f_state = "Activos"; self.f_exp = "Todos"
+        self._cursors: List[Optional[inventory.ProductCursor]] = [None]  # inicio de cada página visitada
+        self._next_cursor: Optional[inventory.ProductCursor] = None
+        self._total = 0
+        self._rows: List[Dict] = []
 
         # Fondo transparente para labels/headers
         self.setStyleSheet(
@@ -59,6 +108,10 @@ class InventoryItemsPage(QWidget):
         self.btn_new.setMinimumHeight(34)
         self.btn_new.clicked.connect(lambda: self.nuevo_item())
         row_cta.addWidget(self.btn_new)
+        self.btn_scan = QPushButton("Modo escaneo"); self.btn_scan.setObjectName("GhostSmall")
+        self.btn_scan.setMinimumHeight(34)
+        self.btn_scan.clicked.connect(lambda: self.escanear())
+        row_cta.addWidget(self.btn_scan)
         row_cta.addSpacerItem(QSpacerItem(20, 10, QSizePolicy.Expanding, QSizePolicy.Minimum))
         root.addLayout(row_cta)
 
@@ -66,8 +119,11 @@ class InventoryItemsPage(QWidget):
         tb_frame = QFrame(); tb_frame.setObjectName("Toolbar")
         tb = QHBoxLayout(tb_frame); tb.setContentsMargins(10, 8, 10, 8); tb.setSpacing(8)
 
-        self.search = QLineEdit(); self.search.setPlaceholderText("Buscar por nombre, SKU o marca…")
+        self.search = QLineEdit(); self.search.setPlaceholderText("Buscar por inicio de nombre o SKU…")
         self.search.textChanged.connect(self._on_search)
+        # Una consulta por pausa al teclear, no por tecla
+        self._search_timer = QTimer(self); self._search_timer.setSingleShot(True); self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self.reload)
         tb.addWidget(self.search, stretch=1)
 
         tb.addWidget(QLabel("Categoría:"))
@@ -104,6 +160,10 @@ class InventoryItemsPage(QWidget):
         self.tbl.horizontalHeader().resizeSection(5, 80)   # Mínimo
         self.tbl.horizontalHeader().resizeSection(6, 90)   # Caduca
         self.tbl.horizontalHeader().resizeSection(8, 220)  # Acciones
+        # Acciones pintadas: un delegate para toda la columna
+        self._actions = _ActionsDelegate(self.tbl)
+        self._actions.triggered.connect(self._on_action)
+        self.tbl.setItemDelegateForColumn(8, self._actions)
         root.addWidget(self.tbl, stretch=1)
 
         # ===== Paginación =====
@@ -117,68 +177,46 @@ class InventoryItemsPage(QWidget):
         pager.addSpacerItem(QSpacerItem(20, 10, QSizePolicy.Expanding, QSizePolicy.Minimum))
         root.addLayout(pager)
 
-        # Datos mock + render
-        self._seed_mock()
-        self._refresh()
+        self.reload()
+
+    # ---------- datos ----------
+    @property
+    def current_page(self) -> int:
+        return len(self._cursors)
 
-    # ---------- datos mock ----------
-    def _seed_mock(self):
-        # (sku, nombre, cat, unidad, stock, minimo, caduca(bool), proveedor, activo(bool))
-        self._all = []
+    def _filters(self) -> Dict:
+        return {
+            "category": None if self.f_cat == "Todas" else self.f_cat,
+            "active": {"Activos": True, "Archivados": False}.get(self.f_state),
+            "caduca": {"Con caducidad": True, "Sin caducidad": False}.get(self.f_exp),
+            "text": self.search_text,
+        }
+
+    def reload(self):
+        """Vuelve a la primera página con los filtros actuales (p. ej. tras crear un ítem)."""
+        self._cursors = [None]
         try:
-            with SessionLocal() as db:
-                products: List[Product] = (
-                    db.query(Product)
-                    .all()
-                )
-                for p in products:
-                    self._all.append((
-                        p.sku,
-                        p.name,
-                        p.category ,
-                        p.unidad,
-                        p.stock,
-                        p.min_stock,
-                        p.caduca,
-                        p.proveedor,
-                        p.activo
-                    ))
+            self._total = _inventory.count_products(self._filters())
         except Exception as ex:
             QMessageBox.critical(self, "BD", f"Error al cargar productos: {ex}")
-            self._all = []
-
-
-    # ---------- lógica UI ----------
-    def _apply_filters(self):
-        txt = self.search_text.lower().strip()
-
-        def keep(r):
-            sku, nombre, cat, _, _, _, caduca, _,activo= r
-            if self.f_cat != "Todas" and cat != self.f_cat: return False
-            if self.f_state == "Activos" and not activo: return False
-            if self.f_state == "Archivados" and activo: return False
-            if self.f_exp == "Con caducidad" and not caduca: return False
-            if self.f_exp == "Sin caducidad" and caduca: return False
-            if txt and txt not in (sku + " " + nombre + " " + cat).lower(): return False
-            return True
-
-        rows = [r for r in self._all if keep(r)]
-        rows.sort(key=lambda x: x[1].lower())  # por nombre
-        return rows
+            self._total = 0
+        self._refresh()
 
     def _refresh(self):
-        rows = self._apply_filters()
-        total = max(1, (len(rows) + self.page_size - 1) // self.page_size)
-        self.current_page = min(self.current_page, total)
-        start = (self.current_page - 1) * self.page_size
-        page = rows[start:start + self.page_size]
+        try:
+            self._rows, self._next_cursor = _inventory.list_products(
+                self._filters(), limit=self.page_size, after=self._cursors[-1]
+            )
+        except Exception as ex:
+            QMessageBox.critical(self, "BD", f"Error al cargar productos: {ex}")
+            self._rows, self._next_cursor = [], None
 
         self.tbl.setRowCount(0)
-        for r in page:
-            row = self.tbl.rowCount(); self.tbl.insertRow(row)
-            for col, val in enumerate(r[:8]):
-                if col == 6:  # caduca bool → Sí/No
-                    val = "Sí" if val else "No"
+        self.tbl.setRowCount(len(self._rows))
+        for row, it in enumerate(self._rows):
+            values = (it["sku"], it["nombre"], it["categoria"], it["unidad"], it["stock"],
+                      it["minimo"], "Sí" if it["caduca"] else "No", it["proveedor"])
+            for col, val in enumerate(values):
                 item = QTableWidgetItem(str(val))
                 # Alineaciones útiles
                 if col in (4, 5):  # Stock / Mínimo
@@ -186,54 +224,45 @@ class InventoryItemsPage(QWidget):
                 self.tbl.setItem(row, col, item)
 
             # Señal de bajo stock: Stock < Mínimo → rojo
-            stock_item = self.tbl.item(row, 4)
-            min_item   = self.tbl.item(row, 5)
-            try:
-                stk = int(stock_item.text()); mn = int(min_item.text())
-                if stk < mn:
-                    stock_item.setForeground(QBrush(QColor("#b91c1c")))  # rojo oscuro
-            except Exception:
-                pass
-
-            # Acciones
-            w = QWidget(); box = QHBoxLayout(w); box.setContentsMargins(0, 0, 0, 0); box.setSpacing(6)
-            b_ver = QPushButton("Ver"); b_ent = QPushButton("Entrada"); b_adj = QPushButton("Ajuste")
-            for b in (b_ver, b_ent, b_adj):
-                b.setObjectName("GhostSmall"); b.setMinimumHeight(26)
-                box.addWidget(b)
-
-            item_dict = {
-                "sku": r[0], "nombre": r[1], "categoria": r[2], "unidad": r[3],
-                "stock": r[4], "minimo": r[5], "caduca": r[6], "proveedor": r[7], "activo": r[8]
-            }
-            b_ver.clicked.connect(lambda _, it=item_dict: self.abrir_item(it))
-            b_ent.clicked.connect(lambda _, it=item_dict: self.nueva_entrada(it))
-            b_adj.clicked.connect(lambda _, it=item_dict: self.nuevo_ajuste(it))
-
-            self.tbl.setCellWidget(row, 8, w)
+            if it["stock"] < it["minimo"]:
+                self.tbl.item(row, 4).setForeground(QBrush(QColor("#b91c1c")))  # rojo oscuro
 
+            # Celda de acciones: la pinta el delegate
+            self.tbl.setItem(row, 8, QTableWidgetItem(""))
+
+        total = max(1, (self._total + self.page_size - 1) // self.page_size)
         self.lbl_page.setText(f"Página {self.current_page}/{total}")
         self.btn_prev.setEnabled(self.current_page > 1)
-        self.btn_next.setEnabled(self.current_page < total)
+        self.btn_next.setEnabled(self._next_cursor is not None)
 
     # ---------- eventos ----------
+    def _on_action(self, row: int, action: str):
+        if not (0 <= row < len(self._rows)):
+            return
+        it = dict(self._rows[row])
+        if action == "ver":
+            self.abrir_item(it)
+        elif action == "entrada":
+            self.nueva_entrada(it)
+        elif action == "ajuste":
+            self.nuevo_ajuste(it)
+
     def _on_search(self, t):
         self.search_text = t
-        self.current_page = 1
-        self._refresh()
+        self._search_timer.start()
 
     def _on_filter(self, _):
         self.f_cat = self.cbo_cat.currentText()
         self.f_state = self.cbo_state.currentText()
         self.f_exp = self.cbo_exp.currentText()
-        self.current_page = 1
-        self._refresh()
+        self.reload()
 
     def _prev(self):
         if self.current_page > 1:
-            self.current_page -= 1
+            self._cursors.pop()
             self._refresh()
 
     def _next(self):
-        self.current_page += 1
-        self._refresh()
\ No newline at end of file
+        if self._next_cursor is not None:
+            self._cursors.append(self._next_cursor)
+            self._refresh()
@@ -1,17 +1,26 @@
 # ui/pages/inventory_movements.py
+from datetime import datetime, time, timedelta
+
 from PyQt5.QtCore import Qt, QDate, pyqtSignal
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox,
     QDateEdit, QTableWidget, QTableWidgetItem, QSizePolicy, QSpacerItem,
-    QFrame
+    QFrame, QMessageBox
 )
 
+from services import inventory
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+_inventory = service("inventory")
+
 class InventoryMovementsPage(QWidget):
     """
     Movimientos de inventario (estilo unificado):
       - Acciones: Nueva entrada / Nueva salida / Ajuste
       - Filtros en una tira (tipo toolbar): Tipo y rango de fechas
-      - Tabla con filas alternadas y datos mock suficientes para que luzca
+      - Tabla del libro de movimientos (services/inventory), más recientes
+        primero, paginada por keyset: "Cargar más" o al llegar al fondo
     Señales/Callbacks:
       - volver (opcional) para regresar al dashboard si lo conectas
       - nueva_entrada(), nueva_salida(), nuevo_ajuste() -> placeholders
@@ -63,7 +72,7 @@ class InventoryMovementsPage(QWidget):
         fb = QHBoxLayout(filt_box); fb.setContentsMargins(10, 8, 10, 8); fb.setSpacing(8)
 
         fb.addWidget(QLabel("Tipo:"))
-        self.cbo_tipo = QComboBox(); self.cbo_tipo.addItems(["Todos", "Entrada", "Salida", "Ajuste"])
+        self.cbo_tipo = QComboBox(); self.cbo_tipo.addItems(["Todos", "Entrada", "Salida", "Ajuste", "Conteo", "Consumo"])
         fb.addWidget(self.cbo_tipo)
 
         fb.addSpacing(12)
@@ -80,8 +89,8 @@ class InventoryMovementsPage(QWidget):
         root.addWidget(filt_box)
 
         # ====== Tabla ======
-        self.tbl = QTableWidget(0, 6)
-        self.tbl.setHorizontalHeaderLabels(["Fecha", "Tipo", "SKU", "Nombre", "Cantidad", "Usuario"])
+        self.tbl = QTableWidget(0, 7)
+        self.tbl.setHorizontalHeaderLabels(["Fecha", "Tipo", "SKU", "Nombre", "Cantidad", "Saldo", "Usuario"])
         self.tbl.horizontalHeader().setStretchLastSection(True)
         self.tbl.setAlternatingRowColors(True)
         self.tbl.setEditTriggers(QTableWidget.NoEditTriggers)
@@ -91,62 +100,95 @@ class InventoryMovementsPage(QWidget):
         bottom = QHBoxLayout(); bottom.setSpacing(8)
         self.lbl_count = QLabel("Mostrando 0 movimientos"); self.lbl_count.setStyleSheet("color:#6C757D;")
         bottom.addWidget(self.lbl_count); bottom.addStretch(1)
+        self.btn_more = QPushButton("Cargar más"); self.btn_more.setObjectName("GhostSmall")
+        self.btn_more.clicked.connect(self._load_more)
+        bottom.addWidget(self.btn_more)
         root.addLayout(bottom)
 
+        # Estado de paginación
+        self._cursor = None
+        self._total = 0
+        self._loading = False
+
         # Datos y wiring
-        self._seed_mock()
         self._refresh()
+        self.tbl.verticalScrollBar().valueChanged.connect(self._on_scroll)
         self.cbo_tipo.currentTextChanged.connect(lambda _: self._refresh())
         self.dt_from.dateChanged.connect(lambda _: self._refresh())
         self.dt_to.dateChanged.connect(lambda _: self._refresh())
 
-    # ---------- Mock data ----------
-    def _seed_mock(self):
-        """Genera ~30 movimientos variados en el último mes para que la vista luzca llena."""
-        base = QDate.currentDate()
-        rows = []
-        users = ["Pablo", "Dylan", "Alex", "Jesus"]
-        items = [
-            ("TIN-NE-250", "Tinta Negra 250ml"),
-            ("TIN-RJ-30",  "Tinta Roja 30ml"),
-            ("AGJ-3RL",    "Cartucho 3RL"),
-            ("EPP-GUA-M",  "Guantes M"),
-            ("LIM-ALC",    "Alcohol Isopropílico"),
-        ]
-        # alternamos tipos y cantidades
-        for i in range(30):
-            d = base.addDays(-i)
-            sku, nom = items[i % len(items)]
-            t = ["Entrada", "Salida", "Ajuste"][i % 3]
-            qty = (50 + (i % 5) * 10) if t == "Entrada" else (-(i % 7 + 1) * 3 if t == "Salida" else ((-1) ** i) * 5)
-            user = users[i % len(users)]
-            rows.append((d, t, sku, nom, qty, user))
-        self._rows = rows
+    # ---------- Datos ----------
+    def _filters(self) -> dict:
+        """Tipo y rango [desde 00:00, hasta+1 día 00:00) para el servicio."""
+        tipo = self.cbo_tipo.currentText()
+        d_from = self.dt_from.date().toPyDate()
+        d_to = self.dt_to.date().toPyDate() + timedelta(days=1)
+        return {
+            "kind": None if tipo == "Todos" else tipo,
+            "from": datetime.combine(d_from, time.min),
+            "to": datetime.combine(d_to, time.min),
+        }
+
+    def reload(self):
+        """Recarga desde la primera página (p. ej. tras una entrada o ajuste)."""
+        self._refresh()
 
     # ---------- Render ----------
     def _refresh(self):
-        tipo = self.cbo_tipo.currentText()
-        d_from, d_to = self.dt_from.date(), self.dt_to.date()
-
-        def keep(r):
-            if not (d_from <= r[0] <= d_to): return False
-            if tipo != "Todos" and r[1] != tipo: return False
-            return True
-
-        rows = [r for r in self._rows if keep(r)]
-        rows.sort(key=lambda r: r[0].toJulianDay(), reverse=True)
-
         self.tbl.setRowCount(0)
+        self._cursor = None
+        filters = self._filters()
+        try:
+            self._total = _inventory.count_movements(filters)
+        except Exception as e:
+            self._total = 0
+            QMessageBox.critical(self, "Movimientos", f"No se pudieron cargar los movimientos:\n{e}")
+            self._update_footer()
+            return
+        self._fetch(filters)
+
+    def _load_more(self):
+        if self._cursor is not None:
+            self._fetch(self._filters())
+
+    def _on_scroll(self, value: int):
+        # Al llegar al fondo se pide la siguiente página
+        if value >= self.tbl.verticalScrollBar().maximum() and self._cursor is not None:
+            self._load_more()
+
+    def _fetch(self, filters: dict):
+        if self._loading:
+            return
+        self._loading = True
+        try:
+            rows, self._cursor = _inventory.list_movements(filters, cursor=self._cursor)
+        except Exception as e:
+            rows, self._cursor = [], None
+            QMessageBox.critical(self, "Movimientos", f"No se pudieron cargar los movimientos:\n{e}")
+        finally:
+            self._loading = False
+        self._append(rows)
+        self._update_footer()
+
+    def _append(self, rows):
         for r in rows:
             row = self.tbl.rowCount(); self.tbl.insertRow(row)
-            self.tbl.setItem(row, 0, QTableWidgetItem(r[0].toString("dd/MM/yyyy")))
-            self.tbl.setItem(row, 1, QTableWidgetItem(r[1]))
-            self.tbl.setItem(row, 2, QTableWidgetItem(r[2]))
-            self.tbl.setItem(row, 3, QTableWidgetItem(r[3]))
+            self.tbl.setItem(row, 0, QTableWidgetItem(r["created_at"].strftime("%d/%m/%Y %H:%M")))
+            self.tbl.setItem(row, 1, QTableWidgetItem(r["kind"]))
+            self.tbl.setItem(row, 2, QTableWidgetItem(r["sku"]))
+            self.tbl.setItem(row, 3, QTableWidgetItem(r["name"]))
             # Cantidad: ponemos signo visible y alineamos al centro
-            qty_item = QTableWidgetItem(("{:+d}".format(int(r[4]))))
+            qty_item = QTableWidgetItem("{:+d}".format(r["qty"]))
             qty_item.setTextAlignment(Qt.AlignCenter)
+            if r["note"]:
+                qty_item.setToolTip(r["note"])
             self.tbl.setItem(row, 4, qty_item)
-            self.tbl.setItem(row, 5, QTableWidgetItem(r[5]))
-
-        self.lbl_count.setText(f"Mostrando {len(rows)} movimientos")
+            bal_item = QTableWidgetItem(str(r["balance"]))
+            bal_item.setTextAlignment(Qt.AlignCenter)
+            self.tbl.setItem(row, 5, bal_item)
+            self.tbl.setItem(row, 6, QTableWidgetItem(r["user"]))
+
+    def _update_footer(self):
+        shown = self.tbl.rowCount()
+        self.lbl_count.setText(f"Mostrando {shown} de {self._total} movimientos")
+        self.btn_more.setVisible(self._cursor is not None)
@@ -17,6 +17,8 @@ from datetime import datetime
 
 # RBAC (UI helper)
 from ui.pages.common import ensure_permission, normalize_instagram
+from services.client_prefs import SOURCES, STYLES, ZONES, set_preferences
+from services.events import CREATED, ClientSaved, publish
 
 import unicodedata
 
@@ -170,15 +172,15 @@ class NewClientPage(QWidget):
         self.cb_artista.addItem("Sin preferencia", None)  # se llena desde BD en showEvent()
 
         self.lst_estilos = QListWidget(); self.lst_estilos.setSelectionMode(QListWidget.MultiSelection)
-        for estilo in ["Línea fina", "Realismo", "Tradicional", "Acuarela", "Geométrico", "Blackwork", "Anime"]:
+        for estilo in STYLES:
             QListWidgetItem(estilo, self.lst_estilos)
 
         self.lst_zonas = QListWidget(); self.lst_zonas.setSelectionMode(QListWidget.MultiSelection)
-        for zona in ["Brazo", "Antebrazo", "Pierna", "Espalda", "Pecho", "Muñeca", "Tobillo"]:
+        for zona in ZONES:
             QListWidgetItem(zona, self.lst_zonas)
 
         self.cb_origen = QComboBox()
-        self.cb_origen.addItems(["Instagram", "TikTok", "Google", "Referido", "Otro"])
+        self.cb_origen.addItems(list(SOURCES))
 
         form_p.addRow("Artista preferido:", self.cb_artista)
         form_p.addRow("Estilos favoritos:", self.lst_estilos)
@@ -315,16 +317,7 @@ class NewClientPage(QWidget):
         ap2 = self.in_ap2.text().strip()
         full_name = " ".join([p for p in [nombres, ap1, ap2] if p]).strip()
 
-        # Preferencias → serializar como metadatos en notas
-        estilos = [self.lst_estilos.item(i).text() for i in range(self.lst_estilos.count()) if self.lst_estilos.item(i).isSelected()]
-        zonas   = [self.lst_zonas.item(i).text()   for i in range(self.lst_zonas.count())   if self.lst_zonas.item(i).isSelected()]
-        source  = self.cb_origen.currentText()
-        meta_line = ""
-        if estilos or zonas or source:
-            meta_line = f"\nMETA_PREFS|styles={','.join(estilos)};zones={','.join(zonas)};source={source}"
-
-        notes_user = self.txt_notas.toPlainText().strip()
-        notes = (notes_user + meta_line).strip() if (notes_user or meta_line) else None
+        notes = self.txt_notas.toPlainText().strip() or None
 
         payload = {
             "name": full_name,
@@ -357,6 +350,14 @@ class NewClientPage(QWidget):
         }
         return payload
 
+    def _collect_prefs(self) -> dict:
+        """Preferencias (tabla client_preferences): estilos, zonas y origen."""
+        return {
+            "styles": [self.lst_estilos.item(i).text() for i in range(self.lst_estilos.count()) if self.lst_estilos.item(i).isSelected()],
+            "zones": [self.lst_zonas.item(i).text() for i in range(self.lst_zonas.count()) if self.lst_zonas.item(i).isSelected()],
+            "source": self.cb_origen.currentText() or None,
+        }
+
     def _find_artist_id_by_name(self, db, name: str) -> int | None:
         if not name or _norm(name) == "sin preferencia":
             return None
@@ -371,7 +372,8 @@ class NewClientPage(QWidget):
                     winner_id = aid
         return winner_id
 
-    def _save_client(self, db: Session, payload: dict, preferred_artist_name: str | None) -> int:
+    def _save_client(self, db: Session, payload: dict, preferred_artist_name: str | None,
+                     prefs: dict | None = None) -> int:
         """
         Inserta un Client con los campos que existan en el modelo.
         Usa hasattr para asignar solo lo que tu esquema soporte.
@@ -409,8 +411,12 @@ class NewClientPage(QWidget):
                 pass
 
         db.add(obj)
+        db.flush()  # asigna obj.id
+        if prefs:
+            set_preferences(db, obj.id, **prefs)
         db.commit()
         db.refresh(obj)
+        publish(ClientSaved(obj.id, CREATED))   # la lista inserta sólo esta fila
         return getattr(obj, "id")
 
     def _on_guardar(self, open_schedule: bool):
@@ -418,7 +424,7 @@ class NewClientPage(QWidget):
         Handler de 'Guardar' y 'Guardar y agendar':
         - Gate de permisos (clients.create).
         - Inserción en BD.
-        - Emite cliente_creado(id) y deja que MainWindow refresque/navegue.
+        - Emite cliente_creado(id); la lista se actualiza sola (evento ClientSaved).
         """
         if not ensure_permission(self, "clients", "create"):
             return
@@ -437,7 +443,7 @@ class NewClientPage(QWidget):
         self._set_buttons_enabled(False)
         try:
             with SessionLocal() as db:  # type: Session
-                client_id = self._save_client(db, payload, pref_name)
+                client_id = self._save_client(db, payload, pref_name, self._collect_prefs())
         except Exception as ex:
             QMessageBox.critical(self, "BD", f"No se pudo guardar el cliente:\n{ex}")
             self._set_buttons_enabled(True)
@@ -1,4 +1,5 @@
 # ui/pages/new_item.py
+from datetime import date
 from typing import Optional
 import random
 
@@ -10,6 +11,7 @@ from PyQt5.QtWidgets import (
 )
 
 from data.db.session import SessionLocal
+from data.models.inventory import ProductLot
 from data.models.product import Product
 
 
@@ -24,7 +26,7 @@ def crear_producto(
     caduca: bool,
     proveedor: str,
     activo: bool,
-    fechacaducidad: Optional[str] = None,
+    fechacaducidad: Optional[date] = None,
 ) -> Product:
     """Inserta un nuevo producto en la base de datos y lo retorna."""
     session = SessionLocal()
@@ -43,6 +45,11 @@ def crear_producto(
             fechacaducidad=fechacaducidad,    # <- nuevo campo opcional
         )
         session.add(nuevo)
+        if caduca and fechacaducidad is not None and stock > 0:
+            # La existencia inicial con caducidad entra como lote para que las salidas vayan por FEFO
+            session.flush()
+            session.add(ProductLot(product_id=nuevo.id, lot_code="INICIAL",
+                                   expires_on=fechacaducidad, qty=stock))
         session.commit()
         session.refresh(nuevo)
         return nuevo
@@ -278,7 +285,10 @@ class NewItemPage(QWidget):
                 caduca=self.chk_caduca.isChecked(),
                 proveedor=self.in_proveedor.text().strip(),           # <- nombre correcto
                 activo=self.chk_activo.isChecked(),
-                fechacaducidad=self.in_fechacaducidad.text() or None  # <- opcional
+                fechacaducidad=(                                     # <- opcional
+                    date.fromisoformat(self.in_fechacaducidad.text())
+                    if self.in_fechacaducidad.text() else None
+                ),
             )
             msg = QMessageBox(self)
             msg.setWindowTitle("Éxito")
@@ -1,3 +1,5 @@
+from datetime import date
+
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import (
@@ -12,8 +14,11 @@ from PyQt5.QtWidgets import (
     QMessageBox,
 )
 from PyQt5.QtCore import pyqtSignal
-from data.db.session import SessionLocal
-from data.models.product import Product
+from services import inventory
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+_inventory = service("inventory")
 
 
 class EntradaProductoWidget(QWidget):
@@ -24,7 +29,7 @@ class EntradaProductoWidget(QWidget):
 
     entrada_creada = pyqtSignal(str)
 
-    def __init__(self, producto: Product, parent=None):
+    def __init__(self, producto, parent=None):
         super().__init__(parent)
         self.producto = producto
         self.setWindowTitle("Nueva entrada de producto")
@@ -117,6 +122,17 @@ class EntradaProductoWidget(QWidget):
         self.in_cantidad.setFont(fuente_input)
         self.in_cantidad.setFixedHeight(32)
 
+        # Lote (opcional): lo que entra se suma a ese lote; las salidas van por FEFO
+        self.in_lote = QLineEdit()
+        self.in_lote.setPlaceholderText("Opcional")
+        self.in_lote.setFont(fuente_input)
+
+        self.in_caducidad = QLineEdit()
+        self.in_caducidad.setPlaceholderText("AAAA-MM-DD (opcional)")
+        self.in_caducidad.setFont(fuente_input)
+        self.in_caducidad.setEnabled(False)
+        self.in_lote.textChanged.connect(lambda t: self.in_caducidad.setEnabled(bool(t.strip())))
+
         # Añadir campos al formulario
         def add_row(label_text, widget):
             label = QLabel(label_text)
@@ -128,6 +144,8 @@ class EntradaProductoWidget(QWidget):
         add_row("Categoría:", self.in_categoria)
         add_row("Unidad:", self.in_unidad)
         add_row("Cantidad a añadir:", self.in_cantidad)
+        add_row("Lote:", self.in_lote)
+        add_row("Caducidad del lote:", self.in_caducidad)
 
         layout.addLayout(form)
 
@@ -153,32 +171,41 @@ class EntradaProductoWidget(QWidget):
         layout.addLayout(self.btn_box)
 
     def guardar(self):
-        """Guarda la nueva cantidad en la base de datos."""
+        """Registra la entrada en el libro de movimientos (suma atómica al stock)."""
         cantidad = self.in_cantidad.value()
         if cantidad <= 0:
             QMessageBox.warning(self, "Cantidad inválida", "La cantidad debe ser mayor que cero.")
             return
+        lot = None
+        if self.in_lote.text().strip():
+            caducidad = None
+            if self.in_caducidad.text().strip():
+                try:
+                    caducidad = date.fromisoformat(self.in_caducidad.text().strip())
+                except ValueError:
+                    QMessageBox.warning(self, "Caducidad inválida", "Usa el formato AAAA-MM-DD.")
+                    return
+            lot = (self.in_lote.text().strip(), caducidad)
 
-        # Actualizar la cantidad en la base de datos
-        session = SessionLocal()
         try:
-            producto_db = session.query(Product).filter(Product.sku == self.producto.sku).first()
-            if producto_db:
-                producto_db.stock += cantidad
-                session.commit()
-                QMessageBox.information(
-                    self,
-                    "Entrada registrada",
-                    f"Se han añadido {cantidad} unidades a '{self.producto.name}'.",
-                )
-                self.entrada_creada.emit(self.producto.name)
-                self.close()
-            else:
+            product_id = _inventory.product_id_for_sku(self.producto.sku)
+            if product_id is None:
                 QMessageBox.critical(
                     self, "Error", "No se encontró el producto en la base de datos."
                 )
+                return
+            _inventory.record_movement(product_id, "Entrada", cantidad, lot=lot)
+        except inventory.StockError as e:
+            QMessageBox.warning(self, "Entrada", str(e))
+            return
         except Exception as e:
-            session.rollback()
             QMessageBox.critical(self, "Error", f"Ocurrió un error al guardar: {str(e)}")
-        finally:
-            session.close()
\ No newline at end of file
+            return
+
+        QMessageBox.information(
+            self,
+            "Entrada registrada",
+            f"Se han añadido {cantidad} unidades a '{self.producto.name}'.",
+        )
+        self.entrada_creada.emit(self.producto.name)
+        self.close()
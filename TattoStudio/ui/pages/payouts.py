@@ -0,0 +1,205 @@
+# ui/pages/payouts.py
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QDate, Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QDateEdit,
+    QTableWidget, QTableWidgetItem, QMessageBox
+)
+
+from services.contracts import get_current_user
+from services.payouts import close_period, list_periods, period_lines, settlement
+from ui.pages.common import ensure_permission
+
+
+def _money(v: float) -> str:
+    return f"${v:,.2f}"
+
+
+def _num_item(text: str) -> QTableWidgetItem:
+    it = QTableWidgetItem(text)
+    it.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    return it
+
+
+def _to_date(q: QDate) -> date:
+    return date(q.year(), q.month(), q.day())
+
+
+def _last_month() -> tuple:
+    first = date.today().replace(day=1)
+    prev = (first - timedelta(days=1)).replace(day=1)
+    return prev, first
+
+
+class PayoutsWidget(QWidget):
+    """
+    Comisiones por periodo de pago:
+    - Rango De/Hasta (días completos) o un periodo ya cerrado del combo
+    - Periodo abierto: vista previa por tatuador (una consulta agregada)
+    - Periodo cerrado: liquidación congelada; clic en un tatuador muestra
+      sus renglones (transacción, tasa aplicada, comisión)
+    - "Cerrar periodo" congela el rango (RBAC reports.payouts)
+    Señales: cerrar()
+    """
+    cerrar = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumWidth(760)
+        self._rows: List[Dict] = []
+        self._period_id: Optional[int] = None
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(16, 16, 16, 16)
+        root.setSpacing(10)
+
+        title = QLabel("Comisiones"); title.setObjectName("H1")
+        root.addWidget(title)
+
+        bar = QHBoxLayout(); bar.setSpacing(6)
+        self.cbo_periods = QComboBox(); self.cbo_periods.setMinimumWidth(220)
+        self.cbo_periods.activated.connect(self._on_period_picked)
+        start, end = _last_month()
+        self.dt_from = QDateEdit(QDate(start.year, start.month, start.day)); self.dt_from.setCalendarPopup(True)
+        last = end - timedelta(days=1)
+        self.dt_to = QDateEdit(QDate(last.year, last.month, last.day)); self.dt_to.setCalendarPopup(True)
+        self.dt_from.dateChanged.connect(lambda _: self.reload())
+        self.dt_to.dateChanged.connect(lambda _: self.reload())
+        bar.addWidget(QLabel("Periodo:")); bar.addWidget(self.cbo_periods)
+        bar.addSpacing(12)
+        bar.addWidget(QLabel("De:")); bar.addWidget(self.dt_from)
+        bar.addWidget(QLabel("Hasta:")); bar.addWidget(self.dt_to)
+        bar.addStretch(1)
+        root.addLayout(bar)
+
+        self.lbl_status = QLabel("")
+        root.addWidget(self.lbl_status)
+
+        self.tbl = QTableWidget(0, 4)
+        self.tbl.setHorizontalHeaderLabels(["Tatuador", "Cobrado", "Comisión", "Movimientos"])
+        self.tbl.horizontalHeader().setStretchLastSection(True)
+        self.tbl.horizontalHeader().resizeSection(0, 220)
+        self.tbl.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tbl.setSelectionBehavior(QTableWidget.SelectRows)
+        self.tbl.cellClicked.connect(self._on_row)
+        root.addWidget(self.tbl, 1)
+
+        self.lbl_lines = QLabel("")
+        root.addWidget(self.lbl_lines)
+        self.tbl_lines = QTableWidget(0, 5)
+        self.tbl_lines.setHorizontalHeaderLabels(["Fecha", "Cliente", "Monto", "Tasa", "Comisión"])
+        self.tbl_lines.horizontalHeader().setStretchLastSection(True)
+        self.tbl_lines.setEditTriggers(QTableWidget.NoEditTriggers)
+        root.addWidget(self.tbl_lines, 1)
+
+        bottom = QHBoxLayout()
+        self.btn_close_period = QPushButton("Cerrar periodo")
+        self.btn_close_period.clicked.connect(self._close_period)
+        btn_close = QPushButton("Cerrar"); btn_close.setObjectName("GhostSmall")
+        btn_close.clicked.connect(self.cerrar.emit)
+        bottom.addWidget(self.btn_close_period); bottom.addStretch(1); bottom.addWidget(btn_close)
+        root.addLayout(bottom)
+
+        self._load_periods()
+        self.reload()
+
+    # ---------- datos ----------
+    def _range(self):
+        start = _to_date(self.dt_from.date())
+        end = _to_date(self.dt_to.date()) + timedelta(days=1)   # "Hasta" incluye el día
+        return start, end
+
+    def _load_periods(self):
+        self.cbo_periods.clear()
+        self.cbo_periods.addItem("Rango personalizado", None)
+        try:
+            periods = list_periods()
+        except Exception:
+            periods = []
+        for p in periods:
+            last = p["end"] - timedelta(days=1)
+            self.cbo_periods.addItem(f"{p['start']:%d/%m/%Y} – {last:%d/%m/%Y}", (p["start"], last))
+
+    def _on_period_picked(self, idx: int):
+        picked = self.cbo_periods.itemData(idx)
+        if not picked:
+            return
+        start, last = picked
+        for w, d in ((self.dt_from, start), (self.dt_to, last)):
+            w.blockSignals(True); w.setDate(QDate(d.year, d.month, d.day)); w.blockSignals(False)
+        self.reload()
+
+    def reload(self):
+        start, end = self._range()
+        self.tbl.setRowCount(0)
+        self.tbl_lines.setRowCount(0)
+        self.lbl_lines.setText("")
+        if start >= end:
+            self._rows, self._period_id = [], None
+            self.lbl_status.setText("El periodo debe terminar después de iniciar.")
+            self.btn_close_period.setEnabled(False)
+            return
+        try:
+            self._period_id, self._rows = settlement(start, end)
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudieron calcular las comisiones: {e}")
+            return
+
+        for r in self._rows:
+            i = self.tbl.rowCount(); self.tbl.insertRow(i)
+            self.tbl.setItem(i, 0, QTableWidgetItem(r["artist"]))
+            self.tbl.setItem(i, 1, _num_item(_money(r["gross"])))
+            self.tbl.setItem(i, 2, _num_item(_money(r["commission"])))
+            self.tbl.setItem(i, 3, _num_item(str(r["tx_count"])))
+
+        total = sum(r["commission"] for r in self._rows)
+        if self._period_id is not None:
+            self.lbl_status.setText(f"Periodo cerrado · comisiones {_money(total)} · clic en un tatuador para el detalle")
+        else:
+            self.lbl_status.setText(f"Vista previa (sin cerrar) · comisiones {_money(total)}")
+        self.btn_close_period.setEnabled(self._period_id is None and bool(self._rows))
+
+    def _on_row(self, row: int, _col: int):
+        if self._period_id is None or not (0 <= row < len(self._rows)):
+            return
+        r = self._rows[row]
+        try:
+            lines = period_lines(r["payout_id"])
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudo cargar el detalle: {e}")
+            return
+        self.lbl_lines.setText(f"Detalle · {r['artist']}")
+        self.tbl_lines.setRowCount(0)
+        for ln in lines:
+            i = self.tbl_lines.rowCount(); self.tbl_lines.insertRow(i)
+            self.tbl_lines.setItem(i, 0, QTableWidgetItem(ln["date"].strftime("%d/%m/%Y %H:%M")))
+            self.tbl_lines.setItem(i, 1, QTableWidgetItem(ln["client"]))
+            self.tbl_lines.setItem(i, 2, _num_item(_money(ln["amount"])))
+            self.tbl_lines.setItem(i, 3, _num_item(f"{ln['rate'] * 100:.0f}%"))
+            self.tbl_lines.setItem(i, 4, _num_item(_money(ln["commission"])))
+
+    # ---------- cierre ----------
+    def _close_period(self):
+        if not ensure_permission(self, "reports", "payouts"):
+            return
+        start, end = self._range()
+        last = end - timedelta(days=1)
+        ok = QMessageBox.question(
+            self, "Cerrar periodo",
+            f"¿Cerrar las comisiones del {start:%d/%m/%Y} al {last:%d/%m/%Y}?\n"
+            "Las liquidaciones quedan congeladas.",
+        )
+        if ok != QMessageBox.Yes:
+            return
+        try:
+            close_period(start, end, user_id=(get_current_user() or {}).get("id"))
+        except ValueError as e:
+            QMessageBox.warning(self, "Comisiones", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudo cerrar el periodo: {e}")
+            return
+        self._load_periods()
+        self.reload()
@@ -20,13 +20,15 @@ from data.models.portfolio import PortfolioItem
 from data.models.session_tattoo import TattooSession
 from data.models.client import Client
 from data.models.transaction import Transaction
+from services.events import PortfolioUploaded, publish
+from services.scoping import scope
 
 import shutil
 from PyQt5.QtWidgets import QFileDialog, QToolButton, QComboBox
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, noload
 from data.models.user import User
 from ui.pages.common import (
-    make_styled_menu, role_to_label, load_artist_colors, fallback_color_for, round_pixmap
+    make_styled_menu, role_to_label, load_artist_colors, fallback_color_for, round_pixmap, subscribe_events
 )
 
 
@@ -106,7 +108,7 @@ class PortfolioService:
             try:
                 counts_user = dict(
                     db.query(PortfolioItem.user_id, func.count(PortfolioItem.id))
-                      .filter(PortfolioItem.user_id.isnot(None))
+                      .filter(PortfolioItem.user_id.isnot(None), *scope("portfolio", "view", PortfolioItem))
                       .group_by(PortfolioItem.user_id).all()
                 )
             except Exception:
@@ -115,7 +117,7 @@ class PortfolioService:
             # conteos por artist_id (para piezas antiguas sin user_id)
             counts_artist = dict(
                 db.query(PortfolioItem.artist_id, func.count(PortfolioItem.id))
-                  .filter(PortfolioItem.artist_id.isnot(None))
+                  .filter(PortfolioItem.artist_id.isnot(None), *scope("portfolio", "view", PortfolioItem))
                   .group_by(PortfolioItem.artist_id).all()
             )
 
@@ -139,7 +141,11 @@ class PortfolioService:
         """Trae piezas por user_id si existe; si no, cae a artist_id."""
         from data.db.session import SessionLocal
         with SessionLocal() as db:
-            q = db.query(PortfolioItem).order_by(PortfolioItem.created_at.desc(), PortfolioItem.id.desc())
+            q = (
+                db.query(PortfolioItem)
+                  .filter(*scope("portfolio", "view", PortfolioItem))
+                  .order_by(PortfolioItem.created_at.desc(), PortfolioItem.id.desc())
+            )
             # preferimos user_id si la columna existe en el modelo
             try:
                 q_user = q.filter(PortfolioItem.user_id == user_id)
@@ -157,10 +163,11 @@ class PortfolioService:
         """
         Copia archivos a assets/uploads/portfolios/<user_id>/ y crea PortfolioItem(s).
         Intenta setear user_id; si no existe la columna, cae a artist_id.
+        Publica PortfolioUploaded con los ids creados.
         """
         from pathlib import Path
         from data.db.session import SessionLocal
-        saved = 0
+        saved: List[PortfolioItem] = []
         base = Path(__file__).resolve().parents[2] / "assets" / "uploads" / "portfolios" / str(int(user["id"]))
         base.mkdir(parents=True, exist_ok=True)
 
@@ -213,9 +220,24 @@ class PortfolioService:
                     pass
 
                 db.add(item)
-                saved += 1
+                saved.append(item)
+            db.flush()
+            item_ids = tuple(int(it.id) for it in saved)
             db.commit()
-        return saved
+        if item_ids:
+            publish(PortfolioUploaded(int(user["id"]), user.get("artist_id"), item_ids))
+        return len(item_ids)
+
+    @staticmethod
+    def items_by_ids(item_ids) -> List[PortfolioItem]:
+        """Piezas visibles con esos ids (p. ej. las recién subidas)."""
+        from data.db.session import SessionLocal
+        with SessionLocal() as db:
+            return (
+                db.query(PortfolioItem)
+                  .filter(PortfolioItem.id.in_(list(item_ids)), *scope("portfolio", "view", PortfolioItem))
+                  .all()
+            )
 
     @staticmethod
     def recent_sessions_for_artist(artist_id: int, limit: int = 20) -> List[Tuple[int, str]]:
@@ -244,7 +266,7 @@ class PortfolioService:
         with SessionLocal() as db:
             return (
                 db.query(PortfolioItem)
-                  .filter(PortfolioItem.artist_id == artist_id)
+                  .filter(PortfolioItem.artist_id == artist_id, *scope("portfolio", "view", PortfolioItem))
                   .order_by(PortfolioItem.created_at.desc(), PortfolioItem.id.desc())
                   .limit(limit).offset(offset)
                   .all()
@@ -254,7 +276,11 @@ class PortfolioService:
     def item_detail(item_id: int) -> dict:
         from data.db.session import SessionLocal
         with SessionLocal() as db:
-            it = db.query(PortfolioItem).filter(PortfolioItem.id == item_id).first()
+            it = (
+                db.query(PortfolioItem)
+                  .filter(PortfolioItem.id == item_id, *scope("portfolio", "view", PortfolioItem))
+                  .first()
+            )
             if not it:
                 return {}
             artist = None
@@ -276,11 +302,16 @@ class PortfolioService:
         
     @staticmethod
     def portfolio_for_client(client_id: int, limit=200, offset=0):
-        """Trae piezas (PortfolioItem) vinculadas a un cliente específico."""
+        """
+        Trae piezas (PortfolioItem) vinculadas a un cliente específico.
+        Sin los joins de sus relaciones: la galería sólo pinta path/fecha y el
+        detalle se consulta aparte (item_detail).
+        """
         from data.db.session import SessionLocal
         with SessionLocal() as db:
             return (
                 db.query(PortfolioItem)
+                  .options(noload("*"))
                   .filter(PortfolioItem.client_id == client_id)
                   .order_by(PortfolioItem.created_at.desc(), PortfolioItem.id.desc())
                   .limit(limit)
@@ -540,12 +571,16 @@ class MiniUserItem(QFrame):
         row.addLayout(col, 1)
 
         # 6) Contador a la derecha
-        cnt = QLabel(f"{int(data['count'] or 0)}")
+        self.cnt = cnt = QLabel(f"{int(data['count'] or 0)}")
         cnt.setFixedHeight(22)
         cnt.setAlignment(Qt.AlignCenter)
         cnt.setStyleSheet("color:#ADB5BD; font-size:12px; border:1px solid #495057; border-radius:11px; padding:0 10px; min-width:26px;")
         row.addWidget(cnt, 0, Qt.AlignVCenter)
 
+    def bump_count(self, n: int):
+        self.data["count"] = int(self.data.get("count") or 0) + n
+        self.cnt.setText(str(self.data["count"]))
+
     def mouseReleaseEvent(self, e):
         if e.button() == Qt.LeftButton and callable(self.on_click):
             self.on_click(self.data)
@@ -660,6 +695,7 @@ class PortfoliosPage(QWidget):
         self._all_items: List[PortfolioItem] = []
         self._selected_user: Optional[dict] = None
         self._load_users()
+        subscribe_events(self, {PortfolioUploaded: self._on_portfolio_uploaded})
 
     # ---------- Sidebar ----------
     def _load_users(self):
@@ -690,6 +726,18 @@ class PortfoliosPage(QWidget):
         self._populate_filter_values(self._all_items)
         self._apply_filters_and_render()
 
+    # ---------- Eventos de dominio ----------
+    def _on_portfolio_uploaded(self, ev: PortfolioUploaded):
+        """Suma las piezas al contador de ese usuario y, si su galería está abierta, las agrega."""
+        for i in range(self.side_v.count()):
+            w = self.side_v.itemAt(i).widget()
+            if isinstance(w, MiniUserItem) and w.data["id"] == ev.user_id:
+                w.bump_count(len(ev.item_ids))   # w.data es el mismo dict de _users_cache
+        if self._selected_user and self._selected_user["id"] == ev.user_id:
+            self._all_items = PortfolioService.items_by_ids(ev.item_ids) + self._all_items
+            self._populate_filter_values(self._all_items)
+            self._apply_filters_and_render()
+
     # ---------- Galería ----------
     def _clear_gallery(self):
         while self.gallery_flow.count():
@@ -728,9 +776,8 @@ class PortfoliosPage(QWidget):
         n = PortfolioService.add_items_for_user(self._selected_user, files, session_id=session_id)
 
         if n > 0:
+            # contador y galería se actualizan con el evento PortfolioUploaded
             QMessageBox.information(self, "Portafolios", f"Se agregaron {n} imagen(es).")
-            self._load_gallery_for_user(self._selected_user)
-            self._load_users()  # refresca contadores
         else:
             QMessageBox.warning(self, "Portafolios", "No se agregó ninguna imagen.")
 
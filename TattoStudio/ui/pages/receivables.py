@@ -0,0 +1,159 @@
+# ui/pages/receivables.py
+from typing import Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QMessageBox
+)
+
+from services.reports import AGE_BUCKETS
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+_reports = service("reports")
+receivable_sessions = _reports.receivable_sessions
+receivables_by_artist = _reports.receivables_by_artist
+
+
+def _money(v: float) -> str:
+    return f"${v:,.2f}"
+
+
+def _num_item(text: str) -> QTableWidgetItem:
+    it = QTableWidgetItem(text)
+    it.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    return it
+
+
+class ReceivablesWidget(QWidget):
+    """
+    Cuentas por cobrar:
+    - Arriba: saldo pendiente por tatuador y antigüedad (0–30, 31–60, 61–90,
+      90+ días), una consulta agrupada por página de tatuadores
+    - Abajo: sesiones con saldo del renglón/cubeta elegido (clic en una celda),
+      más viejas primero, paginadas por keyset
+    Señales: cerrar()
+    """
+    cerrar = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumWidth(820)
+        self._artist_cursor: Optional[Tuple[str, int]] = None
+        self._artist_rows: List[Dict] = []
+        self._detail_filter: Tuple[Optional[int], Optional[int]] = (None, None)  # (artist_id, cubeta)
+        self._detail_cursor = None
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(16, 16, 16, 16)
+        root.setSpacing(10)
+
+        hdr = QHBoxLayout()
+        title = QLabel("Por cobrar"); title.setObjectName("H1")
+        self.lbl_total = QLabel(""); self.lbl_total.setStyleSheet("font-weight:800;")
+        hdr.addWidget(title); hdr.addStretch(1); hdr.addWidget(self.lbl_total)
+        root.addLayout(hdr)
+
+        cols = ["Tatuador", *AGE_BUCKETS, "Total", "Sesiones"]
+        self.tbl_artists = QTableWidget(0, len(cols))
+        self.tbl_artists.setHorizontalHeaderLabels(cols)
+        self.tbl_artists.horizontalHeader().setStretchLastSection(True)
+        self.tbl_artists.horizontalHeader().resizeSection(0, 200)
+        self.tbl_artists.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tbl_artists.setToolTip("Clic en un monto para ver sus sesiones")
+        self.tbl_artists.cellClicked.connect(self._on_cell)
+        root.addWidget(self.tbl_artists, 1)
+
+        self.btn_more_artists = QPushButton("Cargar más tatuadores"); self.btn_more_artists.setObjectName("GhostSmall")
+        self.btn_more_artists.clicked.connect(self._load_artists)
+        root.addWidget(self.btn_more_artists, 0, Qt.AlignLeft)
+
+        self.lbl_detail = QLabel("Sesiones con saldo")
+        root.addWidget(self.lbl_detail)
+        self.tbl_detail = QTableWidget(0, 7)
+        self.tbl_detail.setHorizontalHeaderLabels(["Fecha", "Días", "Cliente", "Tatuador", "Precio", "Pagado", "Saldo"])
+        self.tbl_detail.horizontalHeader().setStretchLastSection(True)
+        self.tbl_detail.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tbl_detail.verticalScrollBar().valueChanged.connect(self._on_detail_scroll)
+        root.addWidget(self.tbl_detail, 2)
+
+        bottom = QHBoxLayout()
+        self.btn_more_detail = QPushButton("Cargar más"); self.btn_more_detail.setObjectName("GhostSmall")
+        self.btn_more_detail.clicked.connect(self._load_detail)
+        btn_close = QPushButton("Cerrar"); btn_close.setObjectName("GhostSmall")
+        btn_close.clicked.connect(self.cerrar.emit)
+        bottom.addWidget(self.btn_more_detail); bottom.addStretch(1); bottom.addWidget(btn_close)
+        root.addLayout(bottom)
+
+        self.reload()
+
+    # ---------- datos ----------
+    def reload(self):
+        self._artist_cursor = None
+        self._artist_rows = []
+        self.tbl_artists.setRowCount(0)
+        self._load_artists()
+        self._show_detail(None, None)
+
+    def _load_artists(self):
+        first = self._artist_cursor is None
+        try:
+            rows, nxt, totals = receivables_by_artist(after=self._artist_cursor)
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudieron cargar las cuentas por cobrar: {e}")
+            return
+        if first:
+            self.lbl_total.setText(f"Total: {_money(totals['total'])} · {totals['sessions']} sesiones")
+        for r in rows:
+            i = self.tbl_artists.rowCount(); self.tbl_artists.insertRow(i)
+            self.tbl_artists.setItem(i, 0, QTableWidgetItem(r["artist"]))
+            for k, amount in enumerate(r["buckets"]):
+                self.tbl_artists.setItem(i, 1 + k, _num_item(_money(amount) if amount else "—"))
+            self.tbl_artists.setItem(i, 1 + len(AGE_BUCKETS), _num_item(_money(r["total"])))
+            self.tbl_artists.setItem(i, 2 + len(AGE_BUCKETS), _num_item(str(r["sessions"])))
+        self._artist_rows.extend(rows)
+        self._artist_cursor = nxt
+        self.btn_more_artists.setVisible(nxt is not None)
+
+    def _on_cell(self, row: int, col: int):
+        if not (0 <= row < len(self._artist_rows)):
+            return
+        bucket = col - 1 if 1 <= col <= len(AGE_BUCKETS) else None
+        self._show_detail(self._artist_rows[row]["artist_id"], bucket)
+
+    def _show_detail(self, artist_id: Optional[int], bucket: Optional[int]):
+        self._detail_filter = (artist_id, bucket)
+        self._detail_cursor = None
+        self.tbl_detail.setRowCount(0)
+        label = "Sesiones con saldo"
+        if artist_id is not None:
+            name = next((r["artist"] for r in self._artist_rows if r["artist_id"] == artist_id), "")
+            label += f" · {name}"
+        if bucket is not None:
+            label += f" · {AGE_BUCKETS[bucket]} días"
+        self.lbl_detail.setText(label)
+        self._load_detail()
+
+    def _load_detail(self):
+        artist_id, bucket = self._detail_filter
+        try:
+            rows, nxt = receivable_sessions(artist_id, bucket, after=self._detail_cursor)
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudieron cargar las sesiones: {e}")
+            return
+        for r in rows:
+            i = self.tbl_detail.rowCount(); self.tbl_detail.insertRow(i)
+            self.tbl_detail.setItem(i, 0, QTableWidgetItem(r["start"].strftime("%d/%m/%Y %H:%M")))
+            self.tbl_detail.setItem(i, 1, _num_item(str(r["days"])))
+            self.tbl_detail.setItem(i, 2, QTableWidgetItem(r["client"]))
+            self.tbl_detail.setItem(i, 3, QTableWidgetItem(r["artist"]))
+            self.tbl_detail.setItem(i, 4, _num_item(_money(r["price"])))
+            self.tbl_detail.setItem(i, 5, _num_item(_money(r["paid"])))
+            self.tbl_detail.setItem(i, 6, _num_item(_money(r["balance"])))
+        self._detail_cursor = nxt
+        self.btn_more_detail.setVisible(nxt is not None)
+
+    def _on_detail_scroll(self, value: int):
+        bar = self.tbl_detail.verticalScrollBar()
+        if self._detail_cursor is not None and value >= bar.maximum() - 2:
+            self._load_detail()
@@ -7,32 +7,37 @@ from PyQt5.QtCore import Qt, QDate, QTimer
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QComboBox,
     QDateEdit, QTableWidget, QTableWidgetItem, QSizePolicy, QSpacerItem,
-    QFileDialog, QMessageBox, QInputDialog, QLineEdit
+    QFileDialog, QMessageBox, QInputDialog, QLineEdit, QDialog
 )
 from PyQt5.QtGui import QPainter, QColor, QPen, QBrush
 
-# --------- Gráfica (si está disponible) ---------
-try:
-    from PyQt5.QtChart import (
-        QChart, QChartView, QLineSeries, QCategoryAxis, QValueAxis
-    )
-    _HAVE_QCHART = True
-except Exception:
-    _HAVE_QCHART = False
+# --------- Gráfica (si está disponible; se importa al construir la gráfica) ---------
+from services.lazyimport import lazy_attr, lazy_import, is_available
+
+QtChart = lazy_import("PyQt5.QtChart")
+ReceivablesWidget = lazy_attr("ui.pages.receivables", "ReceivablesWidget")
+PayoutsWidget = lazy_attr("ui.pages.payouts", "PayoutsWidget")
+CashCloseWidget = lazy_attr("ui.pages.cash_close", "CashCloseWidget")
+_HAVE_QCHART = is_available("PyQt5.QtChart")
 
 # ---- BD ----
 from data.db.session import SessionLocal
-from data.models.transaction import Transaction
-from data.models.session_tattoo import TattooSession
-from data.models.client import Client
 from data.models.artist import Artist as DBArtist
 
 # ---- Permisos / sesión ----
-from services.permissions import assistant_needs_code, verify_master_code, elevate_for
+from services.permissions import assistant_needs_code, elevate_for
+from services.credentials import check_master_code, run_blocking
+from services.scoping import scope_key
 from services.contracts import get_current_user
+from services.tracing import traced
+from services import warmup
+from services.transport import service
+
+# directo a la BD o vía servidor del estudio (services/transport)
+transaction_rows = service("reports").transaction_rows
 
 # ---- Helpers centralizados (common.py) ----
-from ui.pages.common import load_artist_colors, fallback_color_for
+from ui.pages.common import ensure_permission, load_artist_colors, fallback_color_for
 
 
 # ================= utilidades visuales =================
@@ -58,6 +63,9 @@ class ReportsPage(QWidget):
       - Filtros por periodo, tatuador, método de pago
       - Tabla + Gráfica (colores = JSON por ID/nombre, fallback paleta)
       - Export CSV (permisos)
+      - Por cobrar: saldos pendientes por tatuador y antigüedad (diálogo)
+      - Comisiones: liquidación por periodo de pago (vista previa / cierre congelado)
+      - Corte de caja: esperado vs. contado del día; bloquea los cobros del día cerrado
       - Auto-refresh (transacciones, artistas y JSON de colores)
     """
 
@@ -118,6 +126,15 @@ class ReportsPage(QWidget):
         self.dt_to.dateChanged.connect(self._on_custom_dates)
 
         period_row.addSpacerItem(QSpacerItem(20, 10, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        self.btn_receivables = QPushButton("Por cobrar")
+        self.btn_receivables.clicked.connect(self._open_receivables)
+        period_row.addWidget(self._icon_chip("", self.btn_receivables))
+        self.btn_payouts = QPushButton("Comisiones")
+        self.btn_payouts.clicked.connect(self._open_payouts)
+        period_row.addWidget(self._icon_chip("", self.btn_payouts))
+        self.btn_cash_close = QPushButton("Corte de caja")
+        self.btn_cash_close.clicked.connect(self._open_cash_close)
+        period_row.addWidget(self._icon_chip("", self.btn_cash_close))
         self.btn_export = QPushButton("Exportar CSV")
         self.btn_export.clicked.connect(self._export_csv)
         period_row.addWidget(self._icon_chip("📁", self.btn_export))
@@ -188,13 +205,18 @@ class ReportsPage(QWidget):
 
         # Gráfica
         self.chart_box = QFrame()
-        if _HAVE_QCHART:
-            self.chart = QChart()
+        self._have_chart = _HAVE_QCHART
+        if self._have_chart:
+            try:
+                self.chart = QtChart.QChart()
+            except Exception:  # módulo presente pero inutilizable (libs de Qt faltantes)
+                self._have_chart = False
+        if self._have_chart:
             self.chart.setBackgroundVisible(False)
             self.chart.legend().setVisible(True)
             self.chart.legend().setAlignment(Qt.AlignBottom)  # leyenda abajo, horizontal
             self.chart.legend().setLabelBrush(QBrush(QColor("#DADDE3")))
-            self.chart_view = QChartView(self.chart)
+            self.chart_view = QtChart.QChartView(self.chart)
             self.chart_view.setRenderHint(QPainter.Antialiasing)
             cbl = QVBoxLayout(self.chart_box)
             cbl.setContentsMargins(0, 0, 0, 0); cbl.addWidget(self.chart_view)
@@ -213,19 +235,18 @@ class ReportsPage(QWidget):
         side.addWidget(right_card, 2)  # Gráfica
         root.addLayout(side, 1)
 
-        # Timers de auto-refresh
+        # Timers de auto-refresh (corren sólo mientras la página está visible)
         self._data_timer = QTimer(self)
         self._data_timer.setInterval(6000)         # cada 6s: reconsulta y repinta
         self._data_timer.timeout.connect(self._tick_auto_refresh)
-        self._data_timer.start()
 
         self._colors_timer = QTimer(self)
         self._colors_timer.setInterval(2500)       # detecta cambios en JSON de colores
         self._colors_timer.timeout.connect(self._reload_colors_if_changed)
-        self._colors_timer.start()
 
         # Primera carga
         self._refresh()
+        self._fresh_from_init = True
 
     # ---------------- Helpers de UI ----------------
 
@@ -250,6 +271,10 @@ class ReportsPage(QWidget):
 
     def _fetch_artists(self, active_only: bool = True):
         """[(id, name)] desde la BD (por defecto solo activos)."""
+        if active_only:
+            warm = warmup.take("lookups.artists", consume=False)
+            if warm is not None:
+                return list(warm)
         with SessionLocal() as db:
             q = db.query(DBArtist.id, DBArtist.name)
             if active_only:
@@ -284,6 +309,44 @@ class ReportsPage(QWidget):
             return c
         return fallback_color_for(idx_fallback)
 
+    def _open_receivables(self):
+        """Cuentas por cobrar (acotadas por RBAC reports.view en la consulta)."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Por cobrar")
+        dialog.setModal(True)
+        dialog.resize(900, 640)
+        layout = QVBoxLayout(dialog)
+        form = ReceivablesWidget()
+        form.cerrar.connect(dialog.accept)
+        layout.addWidget(form)
+        dialog.exec_()
+
+    def _open_payouts(self):
+        """Comisiones por periodo (vista acotada por reports.view; cerrar pide reports.payouts)."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Comisiones")
+        dialog.setModal(True)
+        dialog.resize(860, 680)
+        layout = QVBoxLayout(dialog)
+        form = PayoutsWidget()
+        form.cerrar.connect(dialog.accept)
+        layout.addWidget(form)
+        dialog.exec_()
+
+    def _open_cash_close(self):
+        """Corte de caja del día (RBAC reports.cash_close; el assistant necesita código)."""
+        if not ensure_permission(self, "reports", "cash_close"):
+            return
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Corte de caja")
+        dialog.setModal(True)
+        dialog.resize(780, 640)
+        layout = QVBoxLayout(dialog)
+        form = CashCloseWidget()
+        form.cerrar.connect(dialog.accept)
+        layout.addWidget(form)
+        dialog.exec_()
+
     def _period_text(self) -> str:
         return {
             "today": "Hoy",
@@ -305,53 +368,38 @@ class ReportsPage(QWidget):
             return start, end
         return min(self.custom_from, self.custom_to), max(self.custom_from, self.custom_to)
 
+    @traced("reports.query_rows")
     def _query_rows(self):
         """Tuplas (QDate, cliente, monto, método, artista_name, artista_id)."""
         q_from, q_to = self._date_range()
         start_dt = datetime.combine(q_from.toPyDate(), time(0, 0, 0))
         end_dt = datetime.combine(q_to.toPyDate(), time(23, 59, 59))
 
-        with SessionLocal() as db:
-            q = (
-                db.query(
-                    Transaction.date,
-                    Client.name,
-                    Transaction.amount,
-                    Transaction.method,
-                    DBArtist.name,
-                    Transaction.artist_id,
-                )
-                .join(TattooSession, TattooSession.id == Transaction.session_id)
-                .join(Client, Client.id == TattooSession.client_id)
-                .join(DBArtist, DBArtist.id == Transaction.artist_id)
-                .filter(Transaction.date >= start_dt, Transaction.date <= end_dt)
-            )
-
-            # ARTIST -> sólo lo propio
-            if self._role == "artist" and self._user_artist_id:
-                q = q.filter(Transaction.artist_id == self._user_artist_id)
-            else:
-                # filtro por tatuador (combo)
-                if self.filter_artist != "Todos":
-                    a_id = self._artist_id_by_name(self.filter_artist)
-                    if a_id is not None:
-                        q = q.filter(Transaction.artist_id == a_id)
-
-            # filtro por tipo de pago
-            if self.filter_payment != "Todos":
-                q = q.filter(Transaction.method == self.filter_payment)
-
-            q = q.order_by(Transaction.date.asc(), Client.name.asc())
-            rows = q.all()
-
-        out = []
-        for dt, cli, amount, method, artist_name, artist_id in rows:
-            qd = QDate(dt.year, dt.month, dt.day)
-            out.append((qd, cli or "—", float(amount or 0.0), method or "—", artist_name or "—", int(artist_id or 0)))
-        return out
+        # ARTIST -> lo propio ya se acota en SQL (services.scoping); el combo sólo
+        # filtra por tatuador cuando el usuario ve todo
+        own = scope_key("reports", "view")
+        artist_id = None
+        if own is None and self.filter_artist != "Todos":
+            artist_id = self._artist_id_by_name(self.filter_artist)
+        method = self.filter_payment if self.filter_payment != "Todos" else None
+
+        rows = None
+        if artist_id is None and method is None:
+            # Sin filtros extra: el mes en curso puede venir del warm-up post-login
+            warm = warmup.take(("reports.rows", own))
+            if warm is not None and warm[0] <= start_dt and end_dt <= warm[1]:
+                rows = [r for r in warm[2] if start_dt <= r[0] <= end_dt]
+        if rows is None:
+            rows = transaction_rows(start_dt, end_dt, artist_id=artist_id, method=method)
+
+        return [
+            (QDate(dt.year, dt.month, dt.day), cli, amount, m, artist_name, artist_id)
+            for dt, cli, amount, m, artist_name, artist_id in rows
+        ]
 
     # ---------------- Render principal ----------------
 
+    @traced("reports.refresh")
     def _refresh(self):
         rows = self._query_rows()
 
@@ -384,7 +432,7 @@ class ReportsPage(QWidget):
     # ---------------- Gráfica de líneas por tatuador ----------------
 
     def _render_chart_lines(self, rows):
-        if not _HAVE_QCHART:
+        if not self._have_chart:
             return
 
         # Limpiar
@@ -430,7 +478,7 @@ class ReportsPage(QWidget):
             if not any(v > 0 for v in per_day.values()) and include_only is None:
                 continue
 
-            line = QLineSeries()
+            line = QtChart.QLineSeries()
             line.setName(name)
 
             # Color desde JSON (id -> nombre -> fallback)
@@ -450,7 +498,7 @@ class ReportsPage(QWidget):
             self.chart.addSeries(line)
 
         # Eje X categórico — evitar '...' mostrando etiquetas espaciadas
-        axisX = QCategoryAxis()
+        axisX = QtChart.QCategoryAxis()
         step = max(1, len(categories) // 10)  # ~10 etiquetas visibles
         for i, label in enumerate(categories):
             if i % step == 0 or i == len(categories) - 1:
@@ -461,7 +509,7 @@ class ReportsPage(QWidget):
             axisX.setLabelsAngle(-45)
 
         # Eje Y con formato de moneda
-        axisY = QValueAxis()
+        axisY = QtChart.QValueAxis()
         axisY.setLabelFormat("$%.0f")
         axisY.applyNiceNumbers()
         axisY.setLabelsBrush(QBrush(QColor("#DADDE3")))
@@ -497,9 +545,21 @@ class ReportsPage(QWidget):
     def showEvent(self, e):
         """Al volver a la pestaña recargamos artistas, colores y datos."""
         super().showEvent(e)
-        self._reload_artists_combo()
-        self._reload_colors_if_changed()
-        self._refresh()
+        if self._fresh_from_init:
+            # Primera vez: __init__ acaba de consultar; no repetir
+            self._fresh_from_init = False
+        else:
+            self._reload_artists_combo()
+            self._reload_colors_if_changed()
+            self._refresh()
+        self._data_timer.start()
+        self._colors_timer.start()
+
+    def hideEvent(self, e):
+        """Oculta: sin pulsos de auto-refresh contra la BD en segundo plano."""
+        super().hideEvent(e)
+        self._data_timer.stop()
+        self._colors_timer.stop()
 
     def _tick_auto_refresh(self):
         """
@@ -555,10 +615,9 @@ class ReportsPage(QWidget):
         if not ok or not code:
             return False
 
-        with SessionLocal() as db:
-            if not verify_master_code(code, db):
-                QMessageBox.warning(self, "Permiso denegado", "Código incorrecto.")
-                return False
+        if not run_blocking(check_master_code, code):
+            QMessageBox.warning(self, "Permiso denegado", "Código incorrecto.")
+            return False
 
         elevate_for(self._user.get("id"), minutes=5)
         return True
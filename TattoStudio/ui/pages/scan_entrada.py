@@ -0,0 +1,223 @@
+# ui/pages/scan_entrada.py
+from collections import deque
+from typing import Dict
+
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QTableWidget, QTableWidgetItem, QListWidget, QListWidgetItem, QMessageBox
+)
+
+from services import inventory
+from services.stock_scan import ScanBatch, parse_code, shared_index
+
+
+class ScanEntradaWidget(QWidget):
+    """
+    Modo escaneo: recibir una caja de proveedor sin abrir producto por producto.
+    - Un lector tipo teclado escribe el SKU + Enter; a mano se acepta "12*SKU".
+    - Los códigos entran a una cola y se procesan en bloque (una actualización
+      de la tabla por ráfaga, no por código).
+    - Búsqueda en memoria (services/stock_scan.SkuIndex); si el SKU no existe se
+      sugieren los que empiezan igual (doble clic para agregar).
+    - "Registrar entradas" asienta todo el lote en una sola transacción.
+    Señales: entradas_registradas(int unidades), cancelado()
+    """
+    entradas_registradas = pyqtSignal(int)
+    cancelado = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumWidth(560)
+        self.index = shared_index()
+        try:
+            self.index.sync()
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudo cargar el catálogo: {e}")
+        self.batch = ScanBatch(self.index)
+        self._queue = deque()
+        self._drain_scheduled = False
+        self._rows: Dict[int, int] = {}        # product_id -> fila de la tabla
+        self._pending_qty = 1                  # cantidad del último código sin coincidencia
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(16, 16, 16, 16)
+        root.setSpacing(10)
+
+        title = QLabel("Entrada por escaneo")
+        title.setObjectName("H1")
+        root.addWidget(title)
+
+        self.in_scan = QLineEdit()
+        self.in_scan.setPlaceholderText("Escanea o escribe un SKU (12*SKU para varias unidades)…")
+        self.in_scan.returnPressed.connect(self._enqueue)
+        self.in_scan.textEdited.connect(self._suggest)
+        root.addWidget(self.in_scan)
+
+        self.lbl_status = QLabel(f"{len(self.index)} productos en el catálogo")
+        self.lbl_status.setStyleSheet("color:#6C757D;")
+        root.addWidget(self.lbl_status)
+
+        self.lst_candidates = QListWidget()
+        self.lst_candidates.setMaximumHeight(140)
+        self.lst_candidates.itemActivated.connect(self._pick_candidate)
+        self.lst_candidates.hide()
+        root.addWidget(self.lst_candidates)
+
+        self.tbl = QTableWidget(0, 3)
+        self.tbl.setHorizontalHeaderLabels(["SKU", "Nombre", "Cantidad"])
+        self.tbl.horizontalHeader().setStretchLastSection(True)
+        self.tbl.horizontalHeader().resizeSection(1, 260)
+        self.tbl.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tbl.setAlternatingRowColors(True)
+        root.addWidget(self.tbl, stretch=1)
+
+        bottom = QHBoxLayout(); bottom.setSpacing(8)
+        self.lbl_total = QLabel("0 productos · 0 unidades")
+        bottom.addWidget(self.lbl_total)
+        bottom.addStretch(1)
+        self.btn_undo = QPushButton("Deshacer último"); self.btn_undo.setObjectName("GhostSmall")
+        self.btn_cancelar = QPushButton("Cancelar"); self.btn_cancelar.setObjectName("GhostSmall")
+        self.btn_guardar = QPushButton("Registrar entradas"); self.btn_guardar.setObjectName("CTA")
+        self.btn_undo.clicked.connect(self._undo)
+        self.btn_cancelar.clicked.connect(self._cancel)
+        self.btn_guardar.clicked.connect(self.guardar)
+        for b in (self.btn_undo, self.btn_cancelar, self.btn_guardar):
+            b.setMinimumHeight(32)
+            bottom.addWidget(b)
+        root.addLayout(bottom)
+
+        self._update_totals()
+        self.in_scan.setFocus()
+
+    # ---------- cola ----------
+    def _enqueue(self):
+        code = self.in_scan.text()
+        self.in_scan.clear()
+        if not code.strip():
+            return
+        self._queue.append(code)
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            QTimer.singleShot(0, self._drain)
+
+    def feed(self, code: str):
+        """Entrada programática (p. ej. lector serial): igual que escribir + Enter."""
+        self.in_scan.setText(code)
+        self._enqueue()
+
+    def _drain(self):
+        self._drain_scheduled = False
+        last = None
+        while self._queue:
+            last = self.batch.add(self._queue.popleft())
+            if last.status == "ok":
+                self._upsert_row(last.product, last.total)
+        if last is None:
+            return
+        if last.status == "ok":
+            self.lbl_status.setText(f"+{last.qty} {last.product.name}  ({last.total} en el lote)")
+            self.lst_candidates.hide()
+        elif last.status == "unknown":
+            self._pending_qty = last.qty
+            self.lbl_status.setText(f"SKU no encontrado: {last.code}")
+            self._show_candidates(last.candidates)
+        else:
+            self.lbl_status.setText(f"Código inválido: {last.code}")
+        self._update_totals()
+
+    # ---------- sugerencias ----------
+    def _suggest(self, text: str):
+        _qty, code = parse_code(text)
+        if len(code) < 2 or self.index.get(code) is not None:
+            self.lst_candidates.hide()
+            return
+        self._pending_qty = max(1, _qty)
+        self._show_candidates(self.index.complete(code))
+
+    def _show_candidates(self, refs):
+        self.lst_candidates.clear()
+        for ref in refs:
+            it = QListWidgetItem(f"{ref.sku} — {ref.name}")
+            it.setData(Qt.UserRole, ref)
+            self.lst_candidates.addItem(it)
+        self.lst_candidates.setVisible(bool(refs))
+
+    def _pick_candidate(self, item: QListWidgetItem):
+        ref = item.data(Qt.UserRole)
+        res = self.batch.add_product(ref, self._pending_qty)
+        self._upsert_row(ref, res.total)
+        self.lbl_status.setText(f"+{res.qty} {ref.name}  ({res.total} en el lote)")
+        self.lst_candidates.hide()
+        self.in_scan.clear()
+        self.in_scan.setFocus()
+        self._update_totals()
+
+    # ---------- tabla ----------
+    def _upsert_row(self, ref, total: int):
+        row = self._rows.get(ref.id)
+        if row is None:
+            row = self.tbl.rowCount()
+            self.tbl.insertRow(row)
+            self._rows[ref.id] = row
+            self.tbl.setItem(row, 0, QTableWidgetItem(ref.sku))
+            self.tbl.setItem(row, 1, QTableWidgetItem(ref.name))
+        qty = QTableWidgetItem(str(total))
+        qty.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.tbl.setItem(row, 2, qty)
+        self.tbl.scrollToItem(qty)
+
+    def _rebuild_table(self):
+        self.tbl.setRowCount(0)
+        self._rows.clear()
+        for ref, total in self.batch.lines():
+            self._upsert_row(ref, total)
+
+    def _update_totals(self):
+        self.lbl_total.setText(f"{len(self.batch)} productos · {self.batch.total_units} unidades")
+        self.btn_guardar.setEnabled(len(self.batch) > 0)
+        self.btn_undo.setEnabled(len(self.batch) > 0)
+
+    # ---------- acciones ----------
+    def _undo(self):
+        undone = self.batch.undo_last()
+        if undone is None:
+            return
+        ref, qty = undone
+        self._rebuild_table()
+        self.lbl_status.setText(f"Deshecho: −{qty} {ref.name}")
+        self._update_totals()
+        self.in_scan.setFocus()
+
+    def _cancel(self):
+        if len(self.batch):
+            resp = QMessageBox.question(
+                self, "Entrada por escaneo",
+                f"Se descartarán {self.batch.total_units} unidades sin registrar. ¿Continuar?",
+            )
+            if resp != QMessageBox.Yes:
+                return
+        self.batch.clear()
+        self.cancelado.emit()
+
+    def guardar(self):
+        """Registra el lote completo como Entradas en una sola transacción."""
+        self._drain()  # por si quedó algo en la cola
+        if not len(self.batch):
+            return
+        units = self.batch.total_units
+        try:
+            rows = self.batch.commit()
+        except inventory.StockError as e:
+            QMessageBox.warning(self, "Entrada por escaneo", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Ocurrió un error al guardar: {str(e)}")
+            return
+        self._rebuild_table()
+        self._update_totals()
+        QMessageBox.information(
+            self, "Entradas registradas",
+            f"Se registraron {units} unidades en {len(rows)} productos.",
+        )
+        self.entradas_registradas.emit(units)
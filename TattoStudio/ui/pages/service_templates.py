@@ -0,0 +1,211 @@
+# ui/pages/service_templates.py
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QCheckBox,
+    QSpinBox, QTableWidget, QTableWidgetItem, QListWidget, QListWidgetItem, QMessageBox
+)
+
+from services import consumables
+from services.stock_scan import shared_index
+
+
+class ServiceTemplatesWidget(QWidget):
+    """
+    Plantillas de consumo por servicio (lista de materiales).
+    - Izquierda: plantillas existentes (+ Nueva / Eliminar)
+    - Derecha: nombre (= texto de "Servicio" en la agenda), predeterminada,
+      activa y renglones SKU × cantidad
+    Al completar una sesión se descuentan los insumos de su plantilla.
+    Señales: guardado(), cerrar()
+    """
+    guardado = pyqtSignal()
+    cerrar = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumWidth(760)
+        self.index = shared_index()
+        try:
+            self.index.sync()
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudo cargar el catálogo: {e}")
+        self._templates: List[Dict] = []
+        self._current_id: Optional[int] = None
+
+        root = QHBoxLayout(self)
+        root.setContentsMargins(16, 16, 16, 16)
+        root.setSpacing(12)
+
+        # ===== Lista de plantillas =====
+        left = QVBoxLayout(); left.setSpacing(8)
+        title = QLabel("Plantillas de consumo"); title.setObjectName("H1")
+        left.addWidget(title)
+        self.lst = QListWidget()
+        self.lst.currentRowChanged.connect(self._on_select)
+        left.addWidget(self.lst, stretch=1)
+        row = QHBoxLayout(); row.setSpacing(6)
+        btn_new = QPushButton("Nueva"); btn_new.setObjectName("GhostSmall")
+        btn_del = QPushButton("Eliminar"); btn_del.setObjectName("GhostSmall")
+        btn_new.clicked.connect(self._new)
+        btn_del.clicked.connect(self._delete)
+        row.addWidget(btn_new); row.addWidget(btn_del)
+        left.addLayout(row)
+        root.addLayout(left, 1)
+
+        # ===== Editor =====
+        right = QVBoxLayout(); right.setSpacing(8)
+        self.in_name = QLineEdit(); self.in_name.setPlaceholderText("Servicio (igual que en la agenda)…")
+        right.addWidget(self.in_name)
+        flags = QHBoxLayout()
+        self.chk_default = QCheckBox("Predeterminada (sesiones sin plantilla propia)")
+        self.chk_active = QCheckBox("Activa"); self.chk_active.setChecked(True)
+        flags.addWidget(self.chk_default); flags.addWidget(self.chk_active); flags.addStretch(1)
+        right.addLayout(flags)
+
+        add = QHBoxLayout(); add.setSpacing(6)
+        self.in_sku = QLineEdit(); self.in_sku.setPlaceholderText("SKU del insumo")
+        self.in_sku.returnPressed.connect(self._add_line)
+        self.in_qty = QSpinBox(); self.in_qty.setRange(1, 10000); self.in_qty.setValue(1)
+        btn_add = QPushButton("Agregar"); btn_add.setObjectName("GhostSmall")
+        btn_add.clicked.connect(self._add_line)
+        add.addWidget(self.in_sku, stretch=1); add.addWidget(self.in_qty); add.addWidget(btn_add)
+        right.addLayout(add)
+
+        self.tbl = QTableWidget(0, 3)
+        self.tbl.setHorizontalHeaderLabels(["SKU", "Nombre", "Cantidad"])
+        self.tbl.horizontalHeader().setStretchLastSection(True)
+        self.tbl.horizontalHeader().resizeSection(1, 240)
+        self.tbl.setEditTriggers(QTableWidget.DoubleClicked | QTableWidget.EditKeyPressed)
+        right.addWidget(self.tbl, stretch=1)
+
+        bottom = QHBoxLayout(); bottom.setSpacing(8)
+        btn_rm = QPushButton("Quitar renglón"); btn_rm.setObjectName("GhostSmall")
+        btn_rm.clicked.connect(self._remove_line)
+        bottom.addWidget(btn_rm); bottom.addStretch(1)
+        btn_close = QPushButton("Cerrar"); btn_close.setObjectName("GhostSmall")
+        btn_save = QPushButton("Guardar"); btn_save.setObjectName("CTA")
+        btn_close.clicked.connect(self.cerrar.emit)
+        btn_save.clicked.connect(self.guardar)
+        bottom.addWidget(btn_close); bottom.addWidget(btn_save)
+        right.addLayout(bottom)
+        root.addLayout(right, 2)
+
+        self._reload()
+
+    # ---------- datos ----------
+    def _reload(self, select_id: Optional[int] = None):
+        try:
+            self._templates = consumables.list_templates()
+        except Exception as e:
+            QMessageBox.critical(self, "BD", f"No se pudieron cargar las plantillas: {e}")
+            self._templates = []
+        self.lst.blockSignals(True)
+        self.lst.clear()
+        for t in self._templates:
+            label = t["name"] + ("  ★" if t["is_default"] else "") + ("" if t["active"] else "  (inactiva)")
+            QListWidgetItem(label, self.lst)
+        self.lst.blockSignals(False)
+        ids = [t["id"] for t in self._templates]
+        if select_id in ids:
+            self.lst.setCurrentRow(ids.index(select_id))
+        elif ids:
+            self.lst.setCurrentRow(0)
+        else:
+            self._new()
+
+    def _on_select(self, row: int):
+        if not (0 <= row < len(self._templates)):
+            return
+        t = self._templates[row]
+        self._current_id = t["id"]
+        self.in_name.setText(t["name"])
+        self.chk_default.setChecked(t["is_default"])
+        self.chk_active.setChecked(t["active"])
+        self.tbl.setRowCount(0)
+        for it in t["items"]:
+            self._put_line(it["product_id"], it["sku"], it["name"], it["qty"])
+
+    # ---------- renglones ----------
+    def _put_line(self, product_id: int, sku: str, name: str, qty: int):
+        for r in range(self.tbl.rowCount()):
+            if self.tbl.item(r, 0).data(Qt.UserRole) == product_id:
+                current = int(self.tbl.item(r, 2).text() or 0)
+                self.tbl.item(r, 2).setText(str(current + qty))
+                return
+        r = self.tbl.rowCount(); self.tbl.insertRow(r)
+        sku_item = QTableWidgetItem(sku); sku_item.setData(Qt.UserRole, product_id)
+        sku_item.setFlags(sku_item.flags() & ~Qt.ItemIsEditable)
+        name_item = QTableWidgetItem(name); name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
+        qty_item = QTableWidgetItem(str(qty)); qty_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.tbl.setItem(r, 0, sku_item); self.tbl.setItem(r, 1, name_item); self.tbl.setItem(r, 2, qty_item)
+
+    def _add_line(self):
+        code = self.in_sku.text().strip()
+        if not code:
+            return
+        ref = self.index.get(code)
+        if ref is None:
+            options = self.index.complete(code, limit=5)
+            hint = "\n".join(f"• {o.sku} — {o.name}" for o in options)
+            QMessageBox.warning(self, "Insumo", f"No existe el SKU '{code}'." + (f"\n\n¿Quisiste decir?\n{hint}" if hint else ""))
+            return
+        self._put_line(ref.id, ref.sku, ref.name, self.in_qty.value())
+        self.in_sku.clear(); self.in_qty.setValue(1); self.in_sku.setFocus()
+
+    def _remove_line(self):
+        r = self.tbl.currentRow()
+        if r >= 0:
+            self.tbl.removeRow(r)
+
+    def _lines(self):
+        out = []
+        for r in range(self.tbl.rowCount()):
+            pid = self.tbl.item(r, 0).data(Qt.UserRole)
+            try:
+                qty = int(self.tbl.item(r, 2).text())
+            except (TypeError, ValueError):
+                raise ValueError(f"Cantidad inválida en el renglón {r + 1}.")
+            out.append((pid, qty))
+        return out
+
+    # ---------- acciones ----------
+    def _new(self):
+        self._current_id = None
+        self.lst.clearSelection()
+        self.in_name.clear()
+        self.chk_default.setChecked(False)
+        self.chk_active.setChecked(True)
+        self.tbl.setRowCount(0)
+        self.in_name.setFocus()
+
+    def _delete(self):
+        if self._current_id is None:
+            return
+        resp = QMessageBox.question(self, "Plantillas", f"¿Eliminar la plantilla '{self.in_name.text()}'?")
+        if resp != QMessageBox.Yes:
+            return
+        try:
+            consumables.delete_template(self._current_id)
+        except Exception as e:
+            QMessageBox.critical(self, "Plantillas", f"No se pudo eliminar: {e}")
+            return
+        self._current_id = None
+        self._reload()
+        self.guardado.emit()
+
+    def guardar(self):
+        try:
+            tid = consumables.save_template(
+                self.in_name.text(), self._lines(), template_id=self._current_id,
+                is_default=self.chk_default.isChecked(), active=self.chk_active.isChecked(),
+            )
+        except ValueError as e:
+            QMessageBox.warning(self, "Plantillas", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Plantillas", f"No se pudo guardar: {e}")
+            return
+        self._reload(select_id=tid)
+        self.guardado.emit()
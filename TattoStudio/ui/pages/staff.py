@@ -19,11 +19,12 @@ from data.models.artist import Artist
 
 # Sesión actual (para RBAC)
 from services.contracts import get_current_user
+from services.events import UserSaved
 
 # === Helpers centralizados (sin cambiar lógica) ===
 from ui.pages.common import (
-    role_to_label, load_artist_colors, fallback_color_for, round_pixmap,
-    FlowLayout, NoStatusTipMenu
+    role_to_label, load_artist_colors, fallback_color_for, round_pixmap, load_pixmap,
+    FlowLayout, NoStatusTipMenu, subscribe_events
 )
 
 
@@ -108,7 +109,7 @@ class StaffCard(QFrame):
         avatar.setStyleSheet("background:transparent;")
         ap = _avatar_path(int(data["id"]))
         if ap.exists():
-            pm = round_pixmap(QPixmap(str(ap)), AV_SIZE)  # ← common.round_pixmap
+            pm = round_pixmap(load_pixmap(ap), AV_SIZE)  # ← common.round_pixmap (+ warm-up)
         else:
             pm = _placeholder_avatar(AV_SIZE, data["nombre"] or data["username"])
         avatar.setPixmap(pm)
@@ -281,6 +282,7 @@ class StaffPage(QWidget):
         self._all: List[Dict] = []
         self.reload_from_db_and_refresh()
         self._apply_fab_rbac()
+        subscribe_events(self, {UserSaved: self._on_user_saved})
 
     # ----------------------- RBAC FAB -----------------------
     def _apply_fab_rbac(self):
@@ -297,7 +299,7 @@ class StaffPage(QWidget):
         self._update_card_widths()  # recalcular al redimensionar ventana
 
     # ----------------------- BD -----------------------
-    def _load_from_db(self) -> List[Dict]:
+    def _load_from_db(self, user_id: Optional[int] = None) -> List[Dict]:
         out: List[Dict] = []
         with SessionLocal() as db:  # type: Session
             q = (
@@ -307,6 +309,8 @@ class StaffPage(QWidget):
                 )
                 .outerjoin(Artist, Artist.id == User.artist_id)
             )
+            if user_id is not None:
+                q = q.filter(User.id == user_id)
             for (uid, username, role, is_active, artist_id, email, instagram, artist_name) in q.all():
                 nombre = artist_name if (role == "artist" and artist_name) else (username or "")
                 out.append({
@@ -326,6 +330,26 @@ class StaffPage(QWidget):
         self._all = self._load_from_db()
         self._refresh()
 
+    # ----------------------- eventos de dominio -----------------------
+    def _on_user_saved(self, ev: UserSaved):
+        """Relee sólo ese usuario y reemplaza/inserta/quita su tarjeta."""
+        fresh = self._load_from_db(ev.user_id)
+        self._all = [s for s in self._all if s["id"] != ev.user_id] + fresh
+
+        old = next((i for i, c in enumerate(self._cards) if c.data["id"] == ev.user_id), None)
+        if old is not None:
+            card = self._cards.pop(old)
+            self.flow.takeAt(old)
+            card.deleteLater()
+        rows = self._apply_filters()
+        new = next((i for i, s in enumerate(rows) if s["id"] == ev.user_id), None)
+        if new is not None:
+            card = StaffCard(rows[new])
+            card.open_requested.connect(self.abrir_staff.emit)
+            self.flow.insertWidget(new, card)
+            self._cards.insert(new, card)
+            self._update_card_widths()
+
     # ----------------------- filtro/orden -----------------------
     def _apply_filters(self) -> List[Dict]:
         txt = self.search_text.lower().strip()
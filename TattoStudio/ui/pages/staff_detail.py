@@ -20,17 +20,20 @@ from sqlalchemy.exc import IntegrityError
 from data.db.session import SessionLocal
 from data.models.user import User
 from data.models.artist import Artist
-from data.models.session_tattoo import TattooSession
+from services.events import CREATED, UPDATED, UserSaved, publish
+from services.sessions import artist_history, artist_status_counts
 
 # Auth/perm
 from services.contracts import get_current_user
 from services import auth
+from services.credentials import run_blocking
 from services.permissions import can
 
 # ===== Helpers centralizados (common.py)
 from ui.pages.common import (
     NoStatusTipMenu,          # menú que no limpia el status bar al hacer hover
     round_pixmap,             # avatar circular
+    load_pixmap,              # pixmap desde disco (+ warm-up)
     role_to_label,            # admin→Admin, assistant→Asistente, artist→Tatuador
     normalize_instagram,      # guarda sin @
     render_instagram,         # muestra con @
@@ -310,8 +313,22 @@ class StaffDetailPage(QWidget):
 
     def _mk_citas_tab(self, w: QWidget):
         outer = QVBoxLayout(w); card = QFrame(); card.setObjectName("Card")
-        lay = QVBoxLayout(card); lay.setContentsMargins(12, 12, 12, 12)
-        self.lst_citas = QListWidget(); lay.addWidget(self.lst_citas); outer.addWidget(card)
+        lay = QVBoxLayout(card); lay.setContentsMargins(12, 12, 12, 12); lay.setSpacing(8)
+        # Estado del historial: artista, filtro y cursor de la siguiente página
+        self._citas_artist_id: Optional[int] = None
+        self._citas_cursor = None
+        top = QHBoxLayout(); top.setSpacing(6)
+        self.cbo_citas_status = QComboBox(); self.cbo_citas_status.setMinimumWidth(180)
+        self.cbo_citas_status.activated.connect(lambda _: self._reload_appointments())
+        top.addWidget(QLabel("Estado:")); top.addWidget(self.cbo_citas_status); top.addStretch(1)
+        lay.addLayout(top)
+        self.lst_citas = QListWidget()
+        self.lst_citas.verticalScrollBar().valueChanged.connect(self._on_citas_scroll)
+        lay.addWidget(self.lst_citas)
+        self.btn_citas_more = QPushButton("Cargar más"); self.btn_citas_more.setObjectName("GhostSmall")
+        self.btn_citas_more.clicked.connect(lambda: self._fetch_appointments()); self.btn_citas_more.setVisible(False)
+        lay.addWidget(self.btn_citas_more, 0, Qt.AlignLeft)
+        outer.addWidget(card)
     # --------------------------------------------------------
     # Galería del STAFF (reusa componentes de portfolios.py)
     # --------------------------------------------------------
@@ -393,7 +410,7 @@ class StaffDetailPage(QWidget):
     def _set_avatar_from_disk_or_placeholder(self, db: Session, u: User, size: int = 128):
         ap = self._avatar_path(u.id)
         if ap.exists():
-            pm = QPixmap(str(ap)); self.avatar.setPixmap(round_pixmap(pm, size))  # ← common.round_pixmap
+            pm = load_pixmap(ap); self.avatar.setPixmap(round_pixmap(pm, size))  # ← common.round_pixmap
         else:
             artist_name = None
             if u.role == "artist" and u.artist_id:
@@ -586,44 +603,51 @@ class StaffDetailPage(QWidget):
                 self._instagram.blockSignals(True); self._instagram.setText(fixed); self._instagram.blockSignals(False)
 
     # ===== Citas
-    def _try_get(self, obj, names: List[str]):
-        for n in names:
-            if hasattr(obj, n):
-                v = getattr(obj, n)
-                if callable(v):
-                    try: v = v()
-                    except Exception: continue
-                return v
-        return None
-
     def _load_appointments(self, db: Session, u: User):
+        """
+        Historial del artista: conteos por estado (consulta agrupada) y la
+        primera página (services.sessions.artist_history, keyset). Las
+        siguientes páginas llegan con el scroll o "Cargar más".
+        """
+        self._citas_artist_id = u.artist_id
+        self.cbo_citas_status.blockSignals(True)
+        self.cbo_citas_status.clear()
+        if u.artist_id:
+            counts = artist_status_counts(u.artist_id, db=db)
+            self.cbo_citas_status.addItem(f"Todas ({sum(counts.values())})", None)
+            for st in ("Activa", "En espera", "Completada", "Cancelada"):
+                self.cbo_citas_status.addItem(f"{st} ({counts.pop(st, 0)})", st)
+            for st, n in sorted(counts.items()):
+                self.cbo_citas_status.addItem(f"{st or 'Sin estado'} ({n})", st)
+        self.cbo_citas_status.blockSignals(False)
+        self._reload_appointments(db)
+
+    def _reload_appointments(self, db: Optional[Session] = None):
         self.lst_citas.clear()
-        if not u.artist_id: return
-        q = db.query(TattooSession).filter(TattooSession.artist_id == u.artist_id)
-        order_attr = None
-        for cand in ("start_at", "start_time", "scheduled_at", "scheduled_time", "datetime", "date"):
-            if hasattr(TattooSession, cand): order_attr = getattr(TattooSession, cand); break
-        if order_attr is not None:
-            try: q = q.order_by(order_attr.desc())
-            except Exception: pass
-        for s in q.all():
-            dt = self._try_get(s, ["start_at", "start_time", "scheduled_at", "scheduled_time", "datetime", "date"])
-            dt_txt = ""
-            try:
-                if isinstance(dt, datetime): dt_txt = self._fmt_local(dt)
-                elif isinstance(dt, date):   dt_txt = QDate(dt.year, dt.month, dt.day).toString("dd/MM/yyyy")
-            except Exception: pass
-            client_name = ""
-            c = self._try_get(s, ["client", "customer"])
-            if c:
-                nm = self._try_get(c, ["name", "full_name"]); client_name = str(nm) if nm else ""
-            else:
-                cn = self._try_get(s, ["client_name", "customer_name"]); client_name = str(cn) if cn else ""
-            status = self._try_get(s, ["status", "state"]) or ""
-            sid = getattr(s, "id", None)
-            parts = [p for p in [dt_txt, client_name, status] if p]
-            text = " — ".join(parts) if parts else (f"Cita #{sid}" if sid else "Cita")
+        self._citas_cursor = None
+        self.btn_citas_more.setVisible(False)
+        if self._citas_artist_id:
+            self._fetch_appointments(db)
+
+    def _fetch_appointments(self, db: Optional[Session] = None):
+        if not self._citas_artist_id:
+            return
+        rows, self._citas_cursor = artist_history(
+            self._citas_artist_id, after=self._citas_cursor,
+            status=self.cbo_citas_status.currentData(), db=db,
+        )
+        for r in rows:
+            parts = [r["start"].strftime("%d/%m/%Y %H:%M") if r["start"] else "", r["client"], r["status"]]
+            if r["paid"]:
+                parts.append(f"pagado $ {r['paid']:,.2f}")
+            text = " — ".join(p for p in parts if p) or f"Cita #{r['id']}"
             self.lst_citas.addItem(QListWidgetItem(text))
+        self.btn_citas_more.setVisible(self._citas_cursor is not None)
+
+    def _on_citas_scroll(self, value: int):
+        bar = self.lst_citas.verticalScrollBar()
+        if self._citas_cursor is not None and value >= bar.maximum() - 2:
+            self._fetch_appointments()
 
     # ===== Guardar
     def _save(self):
@@ -650,17 +674,19 @@ class StaffDetailPage(QWidget):
         if rol_new == "artist" and not artist_name:
             self._toast("Validación", "El nombre de artista es obligatorio para el rol Tatuador."); return
 
+        # bcrypt fuera del hilo de UI y antes de abrir la transacción
+        pwd_hash = run_blocking(auth.hash_password, "temporal123") if self._is_new else None
+
         with SessionLocal() as db:
             try:
                 if self._is_new:
                     new_artist_id = None
                     if rol_new == "artist": new_artist_id = self._create_artist(db, name=artist_name, active=True)
-                    pwd_hash = auth.hash_password("temporal123")
                     u = User(username=username, role=rol_new, artist_id=new_artist_id, is_active=True,
                              name=full_name, birthdate=birthdate_py, email=email, phone=phone,
                              instagram=instagram, password_hash=pwd_hash)
                     db.add(u); db.commit()
-                    self._user_id = u.id; self._is_new = False; self.staff_saved.emit()
+                    self._user_id = u.id; self._is_new = False; action = CREATED
                 else:
                     u = db.query(User).get(self._user_id)
                     if not u: self._toast("Usuario", "El usuario ya no existe."); return
@@ -678,7 +704,9 @@ class StaffDetailPage(QWidget):
                     else:
                         if old_artist_id:
                             self._set_artist_active(db, old_artist_id, False); u.artist_id = None
-                    db.commit(); self.staff_saved.emit()
+                    db.commit(); action = UPDATED
+                publish(UserSaved(self._user_id, u.artist_id, action))
+                self.staff_saved.emit()
 
                 u = db.query(User).get(self._user_id)
                 self._paint_from_user(db, u); self._load_appointments(db, u)
@@ -714,6 +742,8 @@ class StaffDetailPage(QWidget):
             self._apply_artist_color(u.artist_id if u.role == "artist" else None)
             self._paint_from_user(db, u); self._load_appointments(db, u)
             self._refresh_staff_gallery(self._user_id)
+            artist_id = u.artist_id
+        publish(UserSaved(self._user_id, artist_id, UPDATED))
         self.staff_saved.emit()
 
     # ===== Foto / Contraseña / Color
@@ -765,10 +795,15 @@ class StaffDetailPage(QWidget):
             if p1.text() != p2.text():
                 self._toast("Contraseña", "Las contraseñas no coinciden.", parent=dlg); return
             try:
+                b_ok.setEnabled(False)
+                try:
+                    pwd_hash = run_blocking(auth.hash_password, p1.text())
+                finally:
+                    b_ok.setEnabled(True)
                 with SessionLocal() as db:
                     u = db.query(User).get(self._user_id)
                     if not u: self._toast("Usuario", "El usuario ya no existe.", parent=dlg); return
-                    u.password_hash = auth.hash_password(p1.text()); db.commit()
+                    u.password_hash = pwd_hash; db.commit()
                 self._toast("Contraseña", "Contraseña actualizada.", parent=dlg)
                 dlg.accept()
             except Exception as e: